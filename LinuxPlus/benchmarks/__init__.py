@@ -0,0 +1 @@
+"""Remote-operation benchmarks for lpem, run against local SSH and libvirt stand-ins."""
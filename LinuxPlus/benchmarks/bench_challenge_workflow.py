@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmarks of `lpem run-challenge --simulate` on libvirt's
+test:///default driver and the stand-in SSH server, plus the snapshot
+create/revert/delete cycle on its own.
+
+lpem's fixed waits for a real guest (boot settling, post-revert pauses) are
+recorded instead of slept and reported as skipped_settle_seconds. Skipped
+without libvirt-python; a benchmark whose snapshot calls the test driver
+does not implement is skipped with the failing call as the reason.
+"""
+
+import pytest
+
+from benchmarks.data_generators import BENCH_CHALLENGES
+from benchmarks.standin import BENCH_VM_NAME, run_challenge
+
+ROUND_TRIPS_PER_SETUP_STEP = 4  # A package install probes for the manager, then updates and installs
+ROUND_TRIPS_PER_CHECK = 2
+
+
+def _round_trip_budget(challenge_id: str) -> int:
+    setup_count, validation_count = BENCH_CHALLENGES[challenge_id]
+    return ROUND_TRIPS_PER_SETUP_STEP * setup_count + ROUND_TRIPS_PER_CHECK * validation_count + 1  # + simulation
+
+
+@pytest.mark.benchmark(group="workflow-cold")
+@pytest.mark.parametrize("challenge_id", list(BENCH_CHALLENGES))
+def bench_challenge_cold(benchmark, server, lab, test_domain, challenges_dir, challenge_id, require_snapshots):
+    """Cold mode: external snapshot, boot, setup, simulate, validate, revert and delete."""
+    require_snapshots("external")
+    runs = []
+
+    def call():
+        runs.append(run_challenge(server, lab, challenge_id, challenges_dir, BENCH_VM_NAME))
+
+    benchmark.pedantic(call, rounds=3)
+    result = runs[-1]
+    assert result.passed, result
+    stats = result.stats
+    assert stats.round_trips <= _round_trip_budget(challenge_id), stats
+    assert stats.handshakes <= stats.round_trips + 1, stats  # + the readiness probe
+    benchmark.extra_info.update(result.as_extra_info())
+
+
+@pytest.mark.benchmark(group="workflow-warm")
+@pytest.mark.parametrize("challenge_id", list(BENCH_CHALLENGES))
+def bench_challenge_warm_setup_layer(benchmark, server, lab, test_domain, challenges_dir, challenge_id,
+                                     require_snapshots):
+    """Warm mode: the first run caches a setup layer, later runs restore it and skip setup."""
+    require_snapshots("warm")
+    first = run_challenge(server, lab, challenge_id, challenges_dir, BENCH_VM_NAME, warm=True)
+    assert first.passed, first
+    runs = []
+
+    def call():
+        runs.append(run_challenge(server, lab, challenge_id, challenges_dir, BENCH_VM_NAME, warm=True))
+
+    benchmark.pedantic(call, rounds=3)
+    result = runs[-1]
+    assert result.passed, result
+    assert result.stats.round_trips < first.stats.round_trips, (first.stats, result.stats)
+    benchmark.extra_info.update(result.as_extra_info(), first_run_round_trips=first.stats.round_trips)
+
+
+@pytest.mark.benchmark(group="snapshot")
+def bench_snapshot_cycle(benchmark, lab, test_domain, require_snapshots):
+    """create_external_snapshot -> revert_to_snapshot -> delete_external_snapshot on a shut-off domain."""
+    require_snapshots("external")
+    from lpem.snapshot import create_external_snapshot, delete_external_snapshot, revert_to_snapshot
+
+    def call():
+        create_external_snapshot(test_domain, "bench_cycle")
+        revert_to_snapshot(test_domain, "bench_cycle")
+        delete_external_snapshot(test_domain, "bench_cycle")
+
+    benchmark.pedantic(call, rounds=5)
+    assert test_domain.snapshotNum(0) == 0
+    benchmark.extra_info["skipped_settle_seconds"] = round(lab.clock.slept, 1)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Remote-operation benchmarks that only need the stand-in SSH server: single
+commands on both SSH cores, validation plans step by step (a connection per
+command) and through the async core (one connection), and fleet fan-out.
+
+Each benchmark records the handshakes and round trips of one run in
+extra_info and checks them against a budget, so a change that adds SSH work
+fails the suite even when wall time is too noisy to tell.
+"""
+
+from typing import Any, Callable, Dict
+
+import pytest
+
+from benchmarks.data_generators import BENCH_CHALLENGES
+from benchmarks.standin import STAND_IN_HOST, STAND_IN_USER
+
+ROUND_TRIPS_PER_CHECK = 2  # A check runs at most a probe and a detail command (e.g. is-active + is-enabled)
+FLEET_SIZE = 32
+
+
+def _count(server: Any, call: Callable[[], Any]) -> Dict[str, int]:
+    """Remote work done by one call."""
+    server.reset_stats()
+    call()
+    return server.stats.as_dict()
+
+
+@pytest.mark.benchmark(group="ssh-command")
+@pytest.mark.parametrize("core", ["async", "paramiko"])
+def bench_run_ssh_command(benchmark, server, remote, monkeypatch, core):
+    from lpem.config import Config
+    from lpem.network import run_ssh_command
+
+    monkeypatch.setattr(Config, "ASYNC_SSH_CORE", core == "async")
+
+    def call():
+        return run_ssh_command(STAND_IN_HOST, STAND_IN_USER, server.client_key_path, "hostname")
+
+    counters = _count(server, call)
+    assert counters["handshakes"] == 1 and counters["round_trips"] == 1, counters
+    benchmark.extra_info.update(counters)
+
+    result = benchmark.pedantic(call, rounds=20, warmup_rounds=1)
+    assert result["exit_status"] == 0 and result["error"] is None
+
+
+@pytest.mark.benchmark(group="validation")
+@pytest.mark.parametrize("guest_latency", [0.0, 0.005], ids=["local", "5ms"])
+@pytest.mark.parametrize("challenge_id", list(BENCH_CHALLENGES))
+def bench_validation_per_step(benchmark, server, remote, challenges, challenge_id, guest_latency):
+    """The CLI's validation loop: every check command opens its own connection."""
+    from lpem.validation import execute_validation_step
+
+    server.handshake_latency = guest_latency
+    server.backend.latency = guest_latency
+    plan = challenges[challenge_id]["validation_plan"]
+
+    def call():
+        for step_num, step in enumerate(plan.steps, start=1):
+            execute_validation_step(step_num, step, STAND_IN_HOST, STAND_IN_USER, server.client_key_path, False)
+
+    counters = _count(server, call)
+    assert counters["round_trips"] <= ROUND_TRIPS_PER_CHECK * len(plan.steps), counters
+    assert counters["handshakes"] <= counters["round_trips"], counters
+    benchmark.extra_info.update(counters, steps=len(plan.steps))
+
+    benchmark.pedantic(call, rounds=5)
+
+
+@pytest.mark.benchmark(group="validation")
+@pytest.mark.parametrize("guest_latency", [0.0, 0.005], ids=["local", "5ms"])
+@pytest.mark.parametrize("challenge_id", list(BENCH_CHALLENGES))
+def bench_validate_plan_async(benchmark, server, remote, challenges, challenge_id, guest_latency):
+    """async_core.validate_plan: the whole plan over one connection."""
+    from lpem.async_core import run_sync, validate_plan
+
+    server.handshake_latency = guest_latency
+    server.backend.latency = guest_latency
+    plan = challenges[challenge_id]["validation_plan"]
+
+    def call():
+        return run_sync(validate_plan(plan, STAND_IN_HOST, STAND_IN_USER, server.client_key_path))
+
+    server.reset_stats()
+    results = call()
+    counters = server.stats.as_dict()
+    assert all(result.passed for result in results) and len(results) == len(plan.steps), results
+    assert counters["handshakes"] == 1, counters
+    assert counters["round_trips"] <= ROUND_TRIPS_PER_CHECK * len(plan.steps), counters
+    benchmark.extra_info.update(counters, steps=len(plan.steps))
+
+    benchmark.pedantic(call, rounds=5)
+
+
+@pytest.mark.benchmark(group="fleet")
+@pytest.mark.parametrize("guest_latency", [0.0, 0.005], ids=["local", "5ms"])
+def bench_run_on_hosts(benchmark, server, remote, guest_latency):
+    """One command on FLEET_SIZE hosts from one event loop (all backed by the stand-in)."""
+    from lpem.async_core import run_on_hosts, run_sync
+
+    server.handshake_latency = guest_latency
+    server.backend.latency = guest_latency
+    hosts = [(STAND_IN_HOST, STAND_IN_USER, server.client_key_path)] * FLEET_SIZE
+
+    def call():
+        return run_sync(run_on_hosts(hosts, "uptime"))
+
+    counters = _count(server, call)
+    assert counters["handshakes"] == FLEET_SIZE and counters["round_trips"] == FLEET_SIZE, counters
+    benchmark.extra_info.update(counters)
+
+    benchmark.pedantic(call, rounds=5)
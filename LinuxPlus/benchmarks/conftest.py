@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Shared fixtures for the lpem remote-operation benchmarks.
+
+A stand-in SSH server (benchmarks/standin.py) and libvirt's test:///default
+driver replace the practice VM, so the suite runs without one. Benchmarks
+that need libvirt are skipped when libvirt-python is not installed. When
+pytest-benchmark is not installed a minimal compatible ``benchmark`` fixture
+is provided so the suite still runs and still writes --benchmark-json output.
+"""
+
+import gc
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import pytest
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+try:
+    import pytest_benchmark  # noqa: F401
+    HAS_PYTEST_BENCHMARK = True
+except ImportError:
+    HAS_PYTEST_BENCHMARK = False
+
+
+# ----------------------------------------------------------------------
+# Stand-ins
+# ----------------------------------------------------------------------
+@pytest.fixture(scope="session")
+def stand_in(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Any]:
+    """One stand-in SSH server for the session; counters are reset per use."""
+    from benchmarks.standin import StandInSSHServer
+
+    with StandInSSHServer(key_dir=tmp_path_factory.mktemp("keys")) as server:
+        yield server
+
+
+@pytest.fixture
+def server(stand_in: Any, monkeypatch: pytest.MonkeyPatch) -> Any:
+    """The stand-in server with fresh counters; backend tweaks made through monkeypatch are undone."""
+    stand_in.reset_stats()
+    monkeypatch.setattr(stand_in, "handshake_latency", 0.0)
+    monkeypatch.setattr(stand_in.backend, "latency", 0.0)
+    monkeypatch.setattr(stand_in.backend, "output_bytes", 0)
+    return stand_in
+
+
+@pytest.fixture
+def remote(server: Any, monkeypatch: pytest.MonkeyPatch) -> Any:
+    """lpem's SSH cores pointed at the stand-in server; returns the server."""
+    from benchmarks.standin import wire_ssh
+
+    wire_ssh(server, patch=monkeypatch.setattr)
+    return server
+
+
+@pytest.fixture
+def lab(server: Any, libvirt_test_conn: Any, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Any:
+    """lpem wired to both stand-ins for one workflow benchmark (see standin.wire_lpem)."""
+    from benchmarks.standin import wire_lpem
+
+    return wire_lpem(server, tmp_path, patch=monkeypatch.setattr)
+
+
+@pytest.fixture(scope="session")
+def challenges_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    from benchmarks.data_generators import write_challenges
+
+    return write_challenges(tmp_path_factory.mktemp("challenges"))
+
+
+@pytest.fixture(scope="session")
+def challenges(challenges_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """The synthetic challenges as loaded (and compiled) by lpem."""
+    from lpem.challenge import load_challenges_from_dir
+
+    loaded = load_challenges_from_dir(challenges_dir)
+    assert loaded, "synthetic challenges failed to load"
+    return loaded
+
+
+@pytest.fixture(scope="session")
+def libvirt_test_conn() -> Iterator[Any]:
+    """A connection to test:///default, held open so the driver's in-memory state lives for the session."""
+    from benchmarks.standin import TEST_LIBVIRT_URI, libvirt_test_driver_available
+
+    if not libvirt_test_driver_available():
+        pytest.skip("libvirt-python with the test:///default driver is not available")
+    import libvirt
+
+    conn = libvirt.open(TEST_LIBVIRT_URI)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope="session")
+def snapshot_support(libvirt_test_conn: Any, tmp_path_factory: pytest.TempPathFactory) -> Dict[str, Optional[str]]:
+    """Which snapshot kinds the test driver supports (see standin.probe_snapshot_support)."""
+    from benchmarks.standin import probe_snapshot_support
+
+    return probe_snapshot_support(libvirt_test_conn, tmp_path_factory.mktemp("probe_disks"))
+
+
+@pytest.fixture
+def require_snapshots(snapshot_support: Dict[str, Optional[str]]) -> Callable[..., None]:
+    """require_snapshots(kind, ...) skips the benchmark if the test driver lacks one of those snapshot kinds."""
+    def require(*kinds: str) -> None:
+        for kind in kinds:
+            if snapshot_support[kind]:
+                pytest.skip(snapshot_support[kind])
+
+    return require
+
+
+@pytest.fixture
+def test_domain(libvirt_test_conn: Any, tmp_path: Path) -> Any:
+    """A fresh shut-off domain named BENCH_VM_NAME with one qcow2 disk."""
+    from benchmarks.standin import BENCH_VM_NAME, define_test_domain
+
+    return define_test_domain(libvirt_test_conn, BENCH_VM_NAME, tmp_path / "disks")
+
+
+# ----------------------------------------------------------------------
+# Fallback benchmark fixture (used only without pytest-benchmark)
+# ----------------------------------------------------------------------
+class _FallbackBenchmark:
+    """Subset of the pytest-benchmark fixture API: __call__, pedantic and extra_info."""
+
+    def __init__(self, name: str, fullname: str, group: Optional[str]):
+        self.name = name
+        self.fullname = fullname
+        self.group = group
+        self.timings: List[float] = []
+        self.extra_info: Dict[str, Any] = {}
+
+    def __call__(self, target: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        # Calibrate so each round lasts roughly 10ms, capped at ~1s total
+        start = time.perf_counter()
+        result = target(*args, **kwargs)
+        single = max(time.perf_counter() - start, 1e-7)
+        iterations = max(1, min(1000, int(0.01 / single)))
+        rounds = max(5, min(100, int(1.0 / (single * iterations))))
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                result = target(*args, **kwargs)
+            self.timings.append((time.perf_counter() - start) / iterations)
+        return result
+
+    def pedantic(self, target: Callable[..., Any], args: tuple = (), kwargs: Optional[Dict[str, Any]] = None,
+                 setup: Optional[Callable[[], Any]] = None, rounds: int = 1, iterations: int = 1,
+                 warmup_rounds: int = 0) -> Any:
+        kwargs = kwargs or {}
+        result = None
+        for round_index in range(warmup_rounds + rounds):
+            call_args, call_kwargs = args, kwargs
+            if setup is not None:
+                prepared = setup()
+                if prepared is not None:
+                    call_args, call_kwargs = prepared
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    result = target(*call_args, **call_kwargs)
+                elapsed = (time.perf_counter() - start) / iterations
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+            if round_index >= warmup_rounds:
+                self.timings.append(elapsed)
+        return result
+
+    def as_json(self) -> Dict[str, Any]:
+        timings = self.timings or [0.0]
+        mean = statistics.mean(timings)
+        return {
+            "name": self.name,
+            "fullname": self.fullname,
+            "group": self.group,
+            "extra_info": self.extra_info,
+            "stats": {
+                "min": min(timings),
+                "max": max(timings),
+                "mean": mean,
+                "median": statistics.median(timings),
+                "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+                "rounds": len(self.timings),
+                "ops": 1.0 / mean if mean else 0.0,
+            },
+        }
+
+
+if not HAS_PYTEST_BENCHMARK:
+    _fallback_results: List[_FallbackBenchmark] = []
+
+    def pytest_addoption(parser: pytest.Parser) -> None:
+        parser.addoption("--benchmark-json", action="store", default=None,
+                         help="Write benchmark results to this JSON file")
+
+    def pytest_configure(config: pytest.Config) -> None:
+        config.addinivalue_line("markers", "benchmark(group): benchmark grouping (pytest-benchmark compatible)")
+
+    @pytest.fixture
+    def benchmark(request: pytest.FixtureRequest) -> _FallbackBenchmark:
+        marker = request.node.get_closest_marker("benchmark")
+        group = marker.kwargs.get("group") if marker else None
+        bench = _FallbackBenchmark(request.node.name, request.node.nodeid, group)
+        yield bench
+        _fallback_results.append(bench)
+
+    def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+        output = session.config.getoption("--benchmark-json")
+        if not output or not _fallback_results:
+            return
+        payload = {
+            "machine_info": {"python_version": sys.version.split()[0], "runner": "fallback"},
+            "datetime": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "benchmarks": [bench.as_json() for bench in _fallback_results],
+        }
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+
+    def pytest_terminal_summary(terminalreporter: Any) -> None:
+        if not _fallback_results:
+            return
+        terminalreporter.section("benchmark (fallback runner)")
+        for bench in _fallback_results:
+            stats = bench.as_json()["stats"]
+            extra = bench.extra_info
+            counters = (f"  handshakes {extra['handshakes']:>4}  round trips {extra['round_trips']:>4}"
+                        if "handshakes" in extra else "")
+            terminalreporter.write_line(
+                f"{bench.name:<50} median {stats['median'] * 1000:9.3f} ms  "
+                f"rounds {stats['rounds']}{counters}"
+            )
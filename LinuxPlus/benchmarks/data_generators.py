@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Synthetic challenge files for the remote-operation benchmarks.
+
+Every generated check passes against the stand-in's default response (exit
+status 0, empty output), so a run goes through setup, simulation and all of
+its validation steps. Sizes are (setup steps, validation steps).
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import yaml
+
+BENCH_CHALLENGES: Dict[str, Tuple[int, int]] = {
+    "bench-small": (1, 3),
+    "bench-medium": (3, 10),
+    "bench-large": (6, 30),
+}
+
+
+def setup_steps(count: int) -> List[Dict[str, Any]]:
+    """run_command steps, with a package install (manager auto-detected) as every third step."""
+    steps: List[Dict[str, Any]] = []
+    for i in range(count):
+        if i % 3 == 2:
+            steps.append({"type": "ensure_package_installed", "package": f"bench-pkg-{i}"})
+        else:
+            steps.append({"type": "run_command", "command": f"mkdir -p /etc/bench && echo 'key={i}' > /etc/bench/{i}.conf"})
+    return steps
+
+
+def validation_steps(count: int) -> List[Dict[str, Any]]:
+    """A mix of the common check types, cycling through them."""
+    steps: List[Dict[str, Any]] = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            steps.append({"type": "run_command", "command": f"grep -c key /etc/bench/{i}.conf",
+                          "success_criteria": {"exit_status": 0}})
+        elif kind == 1:
+            steps.append({"type": "check_file_exists", "path": f"/etc/bench/{i}.conf",
+                          "expected_state": True, "file_type": "file"})
+        elif kind == 2:
+            steps.append({"type": "check_file_contains", "path": f"/etc/bench/{i}.conf",
+                          "text": f"key={i}", "expected_state": True})
+        else:
+            steps.append({"type": "check_service_status", "service": f"bench{i}.service",
+                          "expected_status": "active"})
+    return steps
+
+
+def challenge_document(challenge_id: str, setup_count: int, validation_count: int) -> Dict[str, Any]:
+    return {
+        "id": challenge_id,
+        "name": f"Benchmark {challenge_id}",
+        "description": f"Synthetic challenge with {setup_count} setup and {validation_count} validation steps.",
+        "category": "Benchmark",
+        "difficulty": "Easy",
+        "score": 100,
+        "setup": setup_steps(setup_count),
+        "user_action_simulation": "touch /tmp/bench_simulated",
+        "validation": validation_steps(validation_count),
+    }
+
+
+def write_challenges(directory: Path, challenges: Dict[str, Tuple[int, int]] = BENCH_CHALLENGES) -> Path:
+    """Writes one YAML file per challenge into directory and returns it."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for challenge_id, (setup_count, validation_count) in challenges.items():
+        document = challenge_document(challenge_id, setup_count, validation_count)
+        with open(directory / f"{challenge_id}.yaml", "w", encoding="utf-8") as f:
+            yaml.safe_dump(document, f, sort_keys=False)
+    return directory
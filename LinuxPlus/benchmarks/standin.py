@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the VM that lpem drives.
+
+StandInSSHServer is an in-process asyncssh server whose commands are answered
+by a ScriptedBackend (regex rules with configurable output, exit status and
+latency) instead of a shell. It counts TCP connections, completed logins
+(handshakes) and commands (round trips), so the benchmarks can report how
+much remote work a code path does, not just how long it took.
+
+The libvirt side uses the in-memory test:///default driver: define_test_domain
+defines a throwaway domain with a file-backed qcow2 disk so the snapshot code
+finds something to snapshot, and probe_snapshot_support finds out which of
+lpem's snapshot calls the driver implements. wire_lpem points lpem's Config
+and the CLI's IP lookup at both stand-ins for one run.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+
+import asyncssh
+
+STAND_IN_HOST = "127.0.0.1"
+STAND_IN_USER = "lpem"
+TEST_LIBVIRT_URI = "test:///default"
+BENCH_VM_NAME = "lpem-bench"
+
+
+# ----------------------------------------------------------------------
+# Scripted command backend
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class ScriptedResponse:
+    """What the stand-in guest answers to one command."""
+    stdout: str = ""
+    stderr: str = ""
+    exit_status: int = 0
+    latency: float = 0.0  # Seconds before the command finishes
+
+
+class ScriptedBackend:
+    """
+    Answers commands from regex rules (first match wins), else with the
+    default response. ``latency`` is added to every command and
+    ``output_bytes`` pads the default response's stdout, to model a slow
+    guest or chatty commands.
+    """
+
+    def __init__(self, default: ScriptedResponse = ScriptedResponse(), latency: float = 0.0,
+                 output_bytes: int = 0):
+        self.rules: List[Tuple[Pattern[str], ScriptedResponse]] = []
+        self.default = default
+        self.latency = latency
+        self.output_bytes = output_bytes
+        self.commands: List[str] = []
+        self._lock = threading.Lock()
+
+    def add_rule(self, pattern: str, stdout: str = "", stderr: str = "", exit_status: int = 0,
+                 latency: float = 0.0) -> "ScriptedBackend":
+        self.rules.append((re.compile(pattern), ScriptedResponse(stdout, stderr, exit_status, latency)))
+        return self
+
+    def respond(self, command: str) -> ScriptedResponse:
+        with self._lock:
+            self.commands.append(command)
+        for pattern, response in self.rules:
+            if pattern.search(command):
+                break
+        else:
+            response = self.default
+            if self.output_bytes:
+                response = replace(response, stdout=response.stdout + "x" * self.output_bytes)
+        if self.latency:
+            response = replace(response, latency=response.latency + self.latency)
+        return response
+
+
+# ----------------------------------------------------------------------
+# In-process SSH server
+# ----------------------------------------------------------------------
+@dataclass
+class ServerStats:
+    """Remote-operation counters of a StandInSSHServer."""
+    connections: int = 0  # Accepted TCP connections
+    handshakes: int = 0   # Completed key exchanges + logins
+    round_trips: int = 0  # Commands executed (one channel each)
+    bytes_out: int = 0    # stdout + stderr sent to clients
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"connections": self.connections, "handshakes": self.handshakes,
+                "round_trips": self.round_trips, "bytes_out": self.bytes_out}
+
+
+class _CountingServer(asyncssh.SSHServer):
+    def __init__(self, owner: "StandInSSHServer"):
+        self.owner = owner
+
+    def connection_made(self, conn: Any) -> None:
+        self.owner.stats.connections += 1
+
+    async def begin_auth(self, username: str) -> bool:
+        if self.owner.handshake_latency:
+            await asyncio.sleep(self.owner.handshake_latency)
+        return True  # Authenticate with the client key
+
+    def auth_completed(self) -> None:
+        self.owner.stats.handshakes += 1
+
+
+class StandInSSHServer:
+    """
+    SSH server on 127.0.0.1 with a scripted backend, run on its own event loop thread.
+
+    Generates a host key and a client key in ``key_dir``; lpem logs in with
+    ``client_key_path`` as any user. Use as a context manager or call
+    start()/stop().
+    """
+
+    def __init__(self, backend: Optional[ScriptedBackend] = None, key_dir: Optional[Path] = None,
+                 handshake_latency: float = 0.0, host: str = STAND_IN_HOST):
+        self.backend = backend or ScriptedBackend()
+        self.key_dir = Path(key_dir) if key_dir else None
+        self.handshake_latency = handshake_latency
+        self.host = host
+        self.port: Optional[int] = None
+        self.client_key_path: Optional[Path] = None
+        self.stats = ServerStats()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._acceptor: Any = None
+
+    def __enter__(self) -> "StandInSSHServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def start(self) -> "StandInSSHServer":
+        if self.key_dir is None:
+            raise ValueError("StandInSSHServer needs a key_dir for its generated keys")
+        self.key_dir.mkdir(parents=True, exist_ok=True)
+        host_key = asyncssh.generate_private_key("ssh-ed25519")
+        client_key = asyncssh.generate_private_key("ssh-ed25519")
+        self.client_key_path = self.key_dir / "id_ed25519"
+        client_key.write_private_key(str(self.client_key_path))
+        self.client_key_path.chmod(0o600)  # lpem warns about group/world readable keys
+        authorized = asyncssh.import_authorized_keys(client_key.export_public_key().decode("ascii"))
+
+        self._loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def serve() -> None:
+            asyncio.set_event_loop(self._loop)
+            self._acceptor = self._loop.run_until_complete(asyncssh.listen(
+                self.host, 0, server_host_keys=[host_key], authorized_client_keys=authorized,
+                server_factory=lambda: _CountingServer(self), process_factory=self._handle,
+            ))
+            self.port = self._acceptor.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=serve, name="stand-in-sshd", daemon=True)
+        self._thread.start()
+        if not started.wait(timeout=10):
+            raise RuntimeError("Stand-in SSH server did not start")
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+
+        async def shutdown() -> None:
+            self._acceptor.close()
+            await self._acceptor.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+        self._loop.close()
+        self._loop = None
+
+    def reset_stats(self) -> None:
+        self.stats = ServerStats()
+        self.backend.commands.clear()
+
+    async def _handle(self, process: Any) -> None:
+        self.stats.round_trips += 1
+        response = self.backend.respond(process.command or "")
+        if response.latency:
+            await asyncio.sleep(response.latency)
+        process.stdout.write(response.stdout)
+        process.stderr.write(response.stderr)
+        self.stats.bytes_out += len(response.stdout) + len(response.stderr)
+        process.exit(response.exit_status)
+
+
+# ----------------------------------------------------------------------
+# libvirt test:///default domain
+# ----------------------------------------------------------------------
+TEST_DOMAIN_XML = """
+<domain type='test'>
+  <name>{name}</name>
+  <memory unit='MiB'>512</memory>
+  <vcpu>1</vcpu>
+  <os><type arch='x86_64'>hvm</type></os>
+  <devices>
+    <disk type='file' device='disk'>
+      <driver name='qemu' type='qcow2'/>
+      <source file='{disk}'/>
+      <target dev='vda' bus='virtio'/>
+    </disk>
+  </devices>
+</domain>
+"""
+
+
+def libvirt_test_driver_available() -> bool:
+    """Whether libvirt-python is installed and the test:///default driver opens."""
+    try:
+        import libvirt
+        conn = libvirt.open(TEST_LIBVIRT_URI)
+    except Exception:
+        return False
+    try:
+        # The test driver always ships a domain named "test"
+        conn.lookupByName("test")
+        return True
+    except Exception:
+        return False
+    finally:
+        conn.close()
+
+
+def define_test_domain(conn: Any, name: str, disk_dir: Path) -> Any:
+    """
+    (Re)defines a shut-off domain on the test driver with one file-backed disk.
+
+    The test driver keeps its state in memory for as long as a connection to
+    it is open, so keep ``conn`` open while lpem opens its own connections.
+    """
+    import libvirt
+
+    try:
+        existing = conn.lookupByName(name)
+        if existing.isActive():
+            existing.destroy()
+        existing.undefineFlags(libvirt.VIR_DOMAIN_UNDEFINE_SNAPSHOTS_METADATA)
+    except libvirt.libvirtError:
+        pass
+    disk_dir.mkdir(parents=True, exist_ok=True)
+    disk = disk_dir / f"{name}.qcow2"
+    disk.touch()
+    return conn.defineXML(TEST_DOMAIN_XML.format(name=name, disk=disk))
+
+
+SNAPSHOT_PROBE_VM_NAME = "lpem-bench-probe"
+
+# The snapshot calls lpem makes, as (label, needs a running domain, snapshot XML, create flags, revert flags).
+# Flags are libvirt constant names, resolved when probing.
+SNAPSHOT_PROBES = {
+    "external": ("external disk-only snapshot of a shut-off domain", False, """
+        <domainsnapshot><name>probe</name><memory snapshot='no'/>
+          <disks><disk name='vda' snapshot='external'><source file='{overlay}'/></disk></disks>
+        </domainsnapshot>""",
+        ("VIR_DOMAIN_SNAPSHOT_CREATE_DISK_ONLY", "VIR_DOMAIN_SNAPSHOT_CREATE_ATOMIC"),
+        ("VIR_DOMAIN_SNAPSHOT_REVERT_FORCE",)),
+    "warm": ("internal memory snapshot of a running domain", True, """
+        <domainsnapshot><name>probe</name><memory snapshot='internal'/></domainsnapshot>""",
+        (),
+        ("VIR_DOMAIN_SNAPSHOT_REVERT_RUNNING", "VIR_DOMAIN_SNAPSHOT_REVERT_FORCE")),
+}
+
+
+def probe_snapshot_support(conn: Any, disk_dir: Path) -> Dict[str, Optional[str]]:
+    """
+    Tries the snapshot create -> revert -> delete cycle lpem runs, on a
+    throwaway domain, for each kind in SNAPSHOT_PROBES.
+
+    Returns:
+        Kind -> None if the driver supports it, else why not (the failing
+        call and libvirt's error), for use as a skip reason
+    """
+    import libvirt
+
+    support: Dict[str, Optional[str]] = {}
+    for kind, (label, running, xml, create_flags, revert_flags) in SNAPSHOT_PROBES.items():
+        domain = define_test_domain(conn, SNAPSHOT_PROBE_VM_NAME, disk_dir)
+        call = "create"
+        try:
+            if running:
+                call = "create (start the domain)"
+                domain.create()
+            call = f"snapshotCreateXML({' | '.join(create_flags) or '0'})"
+            snapshot = domain.snapshotCreateXML(
+                xml.format(overlay=disk_dir / f"{SNAPSHOT_PROBE_VM_NAME}-vda-probe.qcow2"),
+                sum(getattr(libvirt, flag) for flag in create_flags))
+            call = f"revertToSnapshot({' | '.join(revert_flags)})"
+            domain.revertToSnapshot(snapshot, sum(getattr(libvirt, flag) for flag in revert_flags))
+            call = "virDomainSnapshot.delete(0)"
+            snapshot.delete(0)
+            support[kind] = None
+        except (libvirt.libvirtError, AttributeError) as e:
+            support[kind] = f"{TEST_LIBVIRT_URI} cannot run the {label}: {call} failed: {e}"
+        finally:
+            try:
+                if domain.isActive():
+                    domain.destroy()
+                domain.undefineFlags(libvirt.VIR_DOMAIN_UNDEFINE_SNAPSHOTS_METADATA)
+            except libvirt.libvirtError:
+                pass
+    return support
+
+
+# ----------------------------------------------------------------------
+# Wiring lpem to the stand-ins
+# ----------------------------------------------------------------------
+class SettleClock:
+    """
+    Replaces the ``time`` module inside lpem modules whose fixed sleeps wait
+    for a real guest (boot settling, post-revert pauses). The sleeps are
+    recorded instead of slept; everything else is the real ``time``.
+    """
+
+    def __init__(self) -> None:
+        self.slept = 0.0
+
+    def sleep(self, seconds: float) -> None:
+        self.slept += seconds
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(time, name)
+
+
+@dataclass
+class StepRecord:
+    step_num: int
+    step_type: str
+    passed: bool
+
+
+@dataclass
+class LabRecorder:
+    """What one wired lpem run did besides talking SSH."""
+    clock: SettleClock = field(default_factory=SettleClock)
+    steps: List[StepRecord] = field(default_factory=list)
+    ip_lookups: int = 0
+
+    def reset(self) -> None:
+        self.clock.slept = 0.0
+        self.steps.clear()
+        self.ip_lookups = 0
+
+
+def wire_ssh(server: StandInSSHServer, patch: Callable[[Any, str, Any], None]) -> None:
+    """Points lpem's SSH cores at the stand-in server (no libvirt needed)."""
+    from lpem.config import Config
+
+    patch(Config, "SSH_PORT", server.port)
+
+
+def wire_lpem(server: StandInSSHServer, workdir: Path, patch: Callable[[Any, str, Any], None]) -> LabRecorder:
+    """
+    Points lpem at the stand-ins. ``patch(obj, name, value)`` must undo itself
+    after the run, e.g. pytest's ``monkeypatch.setattr``.
+    """
+    import lpem.cli
+    import lpem.snapshot
+    import lpem.vm
+    from lpem.config import Config
+    from lpem.exceptions import ChallengeValidationError
+
+    recorder = LabRecorder()
+
+    wire_ssh(server, patch)
+    patch(Config, "LIBVIRT_URI", TEST_LIBVIRT_URI)
+    patch(Config, "VM_READINESS_TIMEOUT_SECONDS", 10)
+    patch(Config, "RESET_TIMINGS_PATH", workdir / "reset_timings.jsonl")
+    patch(Config, "SETUP_LAYER_INDEX_PATH", workdir / "setup_layers.json")
+
+    for module in (lpem.cli, lpem.vm, lpem.snapshot):
+        patch(module, "time", recorder.clock)
+
+    def get_vm_ip(conn: Any, domain: Any) -> str:
+        # The test driver has no guest network; the guest "is" the stand-in server
+        recorder.ip_lookups += 1
+        return server.host
+
+    patch(lpem.cli, "get_vm_ip", get_vm_ip)
+
+    execute_validation_step = lpem.cli.execute_validation_step
+
+    def recording_step(step_num: int, step: Any, *args: Any, **kwargs: Any) -> Any:
+        step_type = getattr(step, "step_type", None) or step.get("type")
+        try:
+            result = execute_validation_step(step_num, step, *args, **kwargs)
+        except ChallengeValidationError:
+            recorder.steps.append(StepRecord(step_num, step_type, False))
+            raise
+        recorder.steps.append(StepRecord(step_num, step_type, True))
+        return result
+
+    patch(lpem.cli, "execute_validation_step", recording_step)
+    return recorder
+
+
+@dataclass
+class WorkflowResult:
+    """Outcome and cost of one run_challenge_workflow call."""
+    challenge_id: str
+    exit_code: int
+    wall_seconds: float
+    settle_seconds: float
+    stats: ServerStats
+    steps: List[StepRecord]
+    phases: Dict[str, float]
+
+    @property
+    def passed(self) -> bool:
+        return self.exit_code == 0 and bool(self.steps) and all(step.passed for step in self.steps)
+
+    def as_extra_info(self) -> Dict[str, Any]:
+        info: Dict[str, Any] = dict(self.stats.as_dict())
+        info.update({
+            "passed": self.passed,
+            "validation_steps": len(self.steps),
+            "wall_seconds": round(self.wall_seconds, 4),
+            "skipped_settle_seconds": round(self.settle_seconds, 1),
+        })
+        info.update({f"phase_{name}": seconds for name, seconds in self.phases.items()})
+        return info
+
+
+def run_challenge(server: StandInSSHServer, recorder: LabRecorder, challenge_id: str,
+                  challenges_dir: Path, vm_name: str, snapshot_name: str = "bench_snapshot",
+                  warm: bool = False, keep_snapshot: bool = False) -> WorkflowResult:
+    """Runs ``lpem run-challenge --simulate`` against the stand-ins and collects its cost."""
+    import json
+
+    import typer
+    from lpem.cli import run_challenge_workflow
+    from lpem.config import Config
+
+    server.reset_stats()
+    recorder.reset()
+    Path(Config.RESET_TIMINGS_PATH).unlink(missing_ok=True)  # Phases are read back from this run's record
+    exit_code = 0
+    start = time.perf_counter()
+    try:
+        run_challenge_workflow(
+            challenge_id=challenge_id, vm_name=vm_name, snapshot_name=snapshot_name,
+            challenges_dir=challenges_dir, ssh_user=STAND_IN_USER, ssh_key=server.client_key_path,
+            simulate_user=True, keep_snapshot=keep_snapshot, warm_restore=warm,
+            setup_cache_enabled=warm, verbose=False, libvirt_uri=TEST_LIBVIRT_URI,
+        )
+    except typer.Exit as e:
+        exit_code = e.exit_code
+    wall = time.perf_counter() - start
+
+    phases: Dict[str, float] = {}
+    try:
+        lines = Path(Config.RESET_TIMINGS_PATH).read_text(encoding="utf-8").splitlines()
+        phases = json.loads(lines[-1]).get("phases", {}) if lines else {}
+    except (OSError, ValueError):
+        pass
+    return WorkflowResult(challenge_id, exit_code, wall, recorder.clock.slept,
+                          replace(server.stats), list(recorder.steps), phases)
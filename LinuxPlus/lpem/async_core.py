@@ -0,0 +1,252 @@
+"""Asyncio core for remote operations, built on asyncssh.
+
+Connecting, running commands, waiting for SSH readiness and executing a
+compiled validation plan are coroutines, so fleet operations, the GUI or a
+web playground can drive many VMs from one event loop. Timeouts are enforced
+with asyncio, and cancelling a task closes the connections it opened.
+
+The typer CLI stays synchronous: run_ssh_command and wait_for_vm_ready in
+network.py run these coroutines through run_sync when asyncssh is installed,
+and fall back to paramiko otherwise.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+try:
+    import asyncssh
+    ASYNCSSH_AVAILABLE = True
+except ImportError:
+    asyncssh = None
+    ASYNCSSH_AVAILABLE = False
+
+from .config import Config
+from .exceptions import ChallengeValidationError, NetworkError, PracticeToolError, SSHCommandError
+
+T = TypeVar("T")
+COMMAND_TIMEOUT_STATUS = -999 # exit_status of a command stopped by its timeout (as in the paramiko path)
+
+# probe_ssh results besides the connection error's type name
+PROBE_READY = "ready"
+PROBE_AUTH_FAILED = "auth_failed"
+
+
+def _require_asyncssh():
+    if not ASYNCSSH_AVAILABLE:
+        raise PracticeToolError("The async core requires asyncssh. Install it with 'pip install asyncssh'.")
+
+
+def can_run_sync() -> bool:
+    """Whether the synchronous wrappers can use the async core from this thread."""
+    if not ASYNCSSH_AVAILABLE or not Config.ASYNC_SSH_CORE:
+        return False
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return True
+    return False # Called from inside an event loop: blocking on a nested loop is not possible
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """Runs a coroutine to completion from synchronous code (the CLI)."""
+    return asyncio.run(coro)
+
+
+# --- Connections ---
+async def _open_connection(ip_address: str, user: str, key_path: Path, timeout: float) -> "asyncssh.SSHClientConnection":
+    # Like the paramiko path: only the given key (no agent), unknown host keys accepted
+    return await asyncio.wait_for(
+        asyncssh.connect(ip_address, port=Config.SSH_PORT, username=user, client_keys=[str(key_path)], agent_path=None, known_hosts=None),
+        timeout,
+    )
+
+
+def _connection_error_message(ip_address: str, user: str, key_path: Path, error: BaseException, timeout: float) -> str:
+    if isinstance(error, asyncssh.PermissionDenied):
+        return f"SSH Authentication failed for user '{user}' with key '{key_path}'. Verify key is in authorized_keys on VM and permissions are correct."
+    if isinstance(error, asyncio.TimeoutError):
+        return f"SSH connection to {ip_address} timed out after {timeout}s."
+    if isinstance(error, ConnectionRefusedError):
+        return f"SSH connection refused by {ip_address} (is SSH server running on the VM?)."
+    if isinstance(error, OSError) and "No route to host" in str(error):
+        return f"Network error connecting to {ip_address}: No route to host."
+    return f"SSH connection or protocol error to {ip_address} ({type(error).__name__}): {error}"
+
+
+async def connect(ip_address: str, user: str, key_filename: Path,
+                  timeout: float = Config.SSH_CONNECT_TIMEOUT_SECONDS) -> "asyncssh.SSHClientConnection":
+    """
+    Opens an SSH connection authenticated with the given key.
+    The timeout covers connecting and authenticating. Raises SSHCommandError.
+    Use the connection as an async context manager to close it.
+    """
+    _require_asyncssh()
+    if not ip_address:
+        raise SSHCommandError("No IP address provided for SSH command.")
+    from .network import _validate_ssh_key # network wraps this module
+    key_path = _validate_ssh_key(key_filename)
+    try:
+        return await _open_connection(ip_address, user, key_path, timeout)
+    except (asyncssh.Error, asyncio.TimeoutError, OSError) as e:
+        raise SSHCommandError(_connection_error_message(ip_address, user, key_path, e, timeout)) from e
+
+
+async def exec_command(conn: "asyncssh.SSHClientConnection", command: str,
+                       command_timeout: float = Config.SSH_COMMAND_TIMEOUT_SECONDS,
+                       stdin_data: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Runs a command on an open connection.
+
+    Returns the same result dict as run_ssh_command (stdout, stderr,
+    exit_status, error). A command exceeding command_timeout is stopped and
+    reported with exit_status -999. Raises SSHCommandError if the connection fails.
+    """
+    result: Dict[str, Any] = {'stdout': '', 'stderr': '', 'exit_status': None, 'error': None}
+    try:
+        completed = await conn.run(command, input=stdin_data, check=False, timeout=command_timeout,
+                                   encoding='utf-8', errors='replace')
+    except asyncssh.TimeoutError as e:
+        result['stdout'] = (e.stdout or '').strip()
+        result['stderr'] = (e.stderr or '').strip()
+        result['exit_status'] = COMMAND_TIMEOUT_STATUS
+        result['error'] = f"Command execution timed out after {command_timeout}s (waiting for exit status)."
+        return result
+    except (asyncssh.Error, OSError) as e: # Channel could not be opened or the connection was lost
+        raise SSHCommandError(f"SSH connection or protocol error ({type(e).__name__}): {e}") from e
+
+    result['stdout'] = (completed.stdout or '').strip()
+    result['stderr'] = (completed.stderr or '').strip()
+    result['exit_status'] = completed.exit_status
+    if result['exit_status'] is None:
+        result['exit_status'] = -1
+        result['error'] = "Failed to retrieve command exit status."
+    return result
+
+
+async def run_ssh_command_async(ip_address: str, user: str, key_filename: Path, command: str,
+                                command_timeout: float = Config.SSH_COMMAND_TIMEOUT_SECONDS,
+                                stdin_data: Optional[str] = None) -> Dict[str, Any]:
+    """Connects, runs one command and disconnects. See exec_command for the result."""
+    conn = await connect(ip_address, user, key_filename)
+    try:
+        async with conn:
+            return await exec_command(conn, command, command_timeout, stdin_data)
+    except (SSHCommandError, asyncio.CancelledError):
+        raise
+    except Exception as e:
+        raise SSHCommandError(f"An unexpected error occurred during SSH command ('{command}'): {e}") from e
+
+
+async def run_on_hosts(hosts: Iterable[Tuple[str, str, Path]], command: str,
+                       concurrency: int = Config.ASYNC_SSH_CONCURRENCY,
+                       command_timeout: float = Config.SSH_COMMAND_TIMEOUT_SECONDS) -> Dict[str, Dict[str, Any]]:
+    """
+    Runs a command on many (ip, user, key) hosts, at most `concurrency` at a time.
+    Returns results keyed by IP; a host that cannot be reached gets exit_status -1 and an error.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(ip_address: str, user: str, key_filename: Path) -> Tuple[str, Dict[str, Any]]:
+        async with semaphore:
+            try:
+                return ip_address, await run_ssh_command_async(ip_address, user, key_filename, command, command_timeout)
+            except SSHCommandError as e:
+                return ip_address, {'stdout': '', 'stderr': '', 'exit_status': -1, 'error': str(e)}
+
+    return dict(await asyncio.gather(*(run_one(*host) for host in hosts)))
+
+
+# --- Readiness ---
+async def probe_ssh(ip_address: str, user: str, key_path: Path, timeout: float) -> str:
+    """
+    Makes one SSH login attempt. Returns PROBE_READY, PROBE_AUTH_FAILED (the
+    server answered but rejected the key) or the connection error's type name.
+    """
+    _require_asyncssh()
+    try:
+        conn = await _open_connection(ip_address, user, key_path, timeout)
+    except asyncssh.PermissionDenied:
+        return PROBE_AUTH_FAILED
+    except (asyncssh.Error, asyncio.TimeoutError, OSError) as e:
+        return type(e).__name__
+    conn.close()
+    return PROBE_READY
+
+
+async def wait_for_ssh(ip_address: str, user: str, key_filename: Path,
+                       timeout: float = Config.VM_READINESS_TIMEOUT_SECONDS,
+                       poll_interval: float = Config.VM_READINESS_POLL_INTERVAL_SECONDS) -> bool:
+    """
+    Waits until the VM accepts SSH logins, without output.
+    Like wait_for_vm_ready, a server that rejects the key counts as ready.
+    Raises NetworkError on timeout.
+    """
+    if not ip_address:
+        raise NetworkError("Wait for Ready: No IP address provided.")
+    from .network import _validate_ssh_key
+    key_path = _validate_ssh_key(key_filename)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    last_error = "Timeout"
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise NetworkError(f"VM did not become SSH-ready at {ip_address} within {timeout} seconds. Last status: {last_error}")
+        started = loop.time()
+        status = await probe_ssh(ip_address, user, key_path, max(1, min(poll_interval - 1, remaining)))
+        if status in (PROBE_READY, PROBE_AUTH_FAILED):
+            return True
+        last_error = status
+        await asyncio.sleep(max(0, min(poll_interval - (loop.time() - started), deadline - loop.time())))
+
+
+# --- Validation ---
+@dataclass
+class StepResult:
+    """Outcome of one validation step run by validate_plan."""
+    step_num: int
+    step_type: str
+    passed: bool
+    reasons: List[str] = field(default_factory=list)
+
+
+async def validate_plan(plan, ip_address: str, user: str, key_filename: Path, log_checkpoint=None,
+                        stop_on_failure: bool = True,
+                        command_timeout: float = Config.SSH_COMMAND_TIMEOUT_SECONDS) -> List[StepResult]:
+    """
+    Runs a compiled ValidationPlan over one SSH connection, without output.
+
+    The checks are synchronous, so each runs in the default executor while
+    its commands are sent back to this loop's connection. Cancelling the
+    task closes the connection, which fails the step in progress.
+    """
+    from .validation import command_runner # validation imports network, which wraps this module
+
+    conn = await connect(ip_address, user, key_filename)
+    loop = asyncio.get_running_loop()
+
+    def runner(command: str) -> Dict[str, Any]:
+        return asyncio.run_coroutine_threadsafe(exec_command(conn, command, command_timeout), loop).result()
+
+    def run_check(check) -> bool:
+        with command_runner(runner):
+            return check.run(ip_address, user, key_filename, False, log_checkpoint=log_checkpoint)
+
+    results: List[StepResult] = []
+    async with conn:
+        if log_checkpoint is not None:
+            log_checkpoint.begin_run()
+        for step_num, check in enumerate(plan.steps, start=1):
+            try:
+                await loop.run_in_executor(None, run_check, check)
+                results.append(StepResult(step_num, check.step_type, True))
+                continue
+            except ChallengeValidationError as e:
+                results.append(StepResult(step_num, check.step_type, False, list(e.reasons)))
+            except SSHCommandError as e:
+                results.append(StepResult(step_num, check.step_type, False, [f"SSH execution failed: {e}"]))
+            if stop_on_failure:
+                break
+    return results
@@ -2,11 +2,12 @@
 import re
 import yaml
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 
 from .console import console, Table, Panel, Syntax
-from .exceptions import ChallengeLoadError
+from .exceptions import ChallengeLoadError, ChallengeValidationError
 from .config import Config
+from .validation import ValidationPlan, compile_validation_plan
 
 # Define supported validation types centrally
 # Keep this list synchronized with functions in validation.py
@@ -218,6 +219,17 @@ def validate_challenge_structure(challenge_data: dict, filename: str = "challeng
     return errors
 
 
+def compile_challenge_plan(challenge_data: dict, filename: str = "challenge") -> Tuple[Optional[ValidationPlan], List[str]]:
+    """
+    Compiles a structurally valid challenge's validation steps into a ValidationPlan.
+    Returns (plan, []) on success and (None, errors) when a step's parameters are invalid.
+    """
+    try:
+        return compile_validation_plan(challenge_data), []
+    except ChallengeValidationError as e:
+        return None, [f"'{filename}' {reason}" for reason in e.reasons]
+
+
 def load_challenges_from_dir(challenges_dir: Path) -> Dict[str, Dict]:
     """Loads challenge definitions from YAML files in a directory, performing validation."""
     challenges: Dict[str, Dict] = {}
@@ -246,6 +258,9 @@ def load_challenges_from_dir(challenges_dir: Path) -> Dict[str, Dict]:
 
             # Validate structure before processing
             validation_errors = validate_challenge_structure(challenge_data, yaml_file.name)
+            if not validation_errors:
+                # Compile the validation steps once, so runs only execute them
+                validation_plan, validation_errors = compile_challenge_plan(challenge_data, yaml_file.name)
             if validation_errors:
                 # Use Panel for better formatting if Rich is available
                 error_panel_content = "\n".join([f"- {e}" for e in validation_errors])
@@ -280,6 +295,7 @@ def load_challenges_from_dir(challenges_dir: Path) -> Dict[str, Dict]:
             if 'validation' not in challenge_data:
                  challenge_data['final_state_checks'] = challenge_data.get('final_state_checks', [])
                  challenge_data['process_validation_checks'] = challenge_data.get('process_validation_checks', [])
+            challenge_data['validation_plan'] = validation_plan
 
 
             if challenge_id in challenges:
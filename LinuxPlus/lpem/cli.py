@@ -20,13 +20,15 @@ from .exceptions import (
 )
 from .vm import connect_libvirt, find_vm, close_libvirt, list_vms, start_vm, shutdown_vm, is_domain_valid
 from .snapshot import (
-    create_external_snapshot, revert_to_snapshot, delete_external_snapshot, 
-    list_snapshots
+    create_external_snapshot, create_warm_snapshot, revert_to_snapshot, delete_external_snapshot,
+    is_warm_snapshot, list_snapshots, snapshot_inventory_json
 )
 from .network import get_vm_ip, wait_for_vm_ready, run_ssh_command, format_ssh_output, _validate_ssh_key
 from .challenge import load_challenges_from_dir
-from .validation import execute_validation_step
+from .validation import execute_validation_step, capture_log_checkpoint, CommandCheck, LogCheckpoint
 from .templates import CHALLENGE_TEMPLATE
+from .timing import PhaseTimer, load_timings, summarize_timings, print_timing_report
+from .setup_cache import SetupLayerCache, setup_hash, disk_allocation_bytes
 
 # --- Typer CLI Application Setup ---
 app = typer.Typer(
@@ -59,6 +61,65 @@ def list_available_vms(
         close_libvirt(conn)
 
 
+@app.command(name="list-snapshots")
+def list_vm_snapshots(
+    vm_name: Annotated[str, typer.Option("--vm", help="Name of the libvirt VM.")] = Config.DEFAULT_VM_NAME,
+    as_json: Annotated[bool, typer.Option("--json", help="Print the snapshot inventory as JSON on stdout (status messages go to stderr).")] = False,
+    libvirt_uri: Annotated[str, typer.Option("--uri", help="Libvirt connection URI.")] = Config.LIBVIRT_URI
+):
+    """Lists the snapshots of a VM."""
+    conn = None
+    if as_json:
+        console.stderr = True # Keep stdout machine-readable
+    try:
+        Config.LIBVIRT_URI = libvirt_uri
+        conn = connect_libvirt()
+        domain = find_vm(conn, vm_name)
+        if as_json:
+            typer.echo(snapshot_inventory_json(domain))
+        else:
+            list_snapshots(domain)
+    except PracticeToolError as e:
+        console.print(f"[bold red]:x: Error:[/bold red] {e}", style="red")
+        raise typer.Exit(code=1)
+    finally:
+        close_libvirt(conn)
+
+
+@app.command(name="setup-layers")
+def manage_setup_layers(
+    vm_name: Annotated[str, typer.Option("--vm", help="Name of the libvirt VM.")] = Config.DEFAULT_VM_NAME,
+    snapshot_name: Annotated[str, typer.Option("--snap", help="Base snapshot the layers were built on.")] = Config.DEFAULT_SNAPSHOT_NAME,
+    clear: Annotated[bool, typer.Option("--clear", help="Delete all cached setup layers of the VM.")] = False,
+    evict: Annotated[bool, typer.Option("--evict", help="Apply the count and disk budget now.")] = False,
+    libvirt_uri: Annotated[str, typer.Option("--uri", help="Libvirt connection URI.")] = Config.LIBVIRT_URI
+):
+    """Lists, evicts or clears the cached post-setup snapshot layers of a VM."""
+    conn = None
+    try:
+        Config.LIBVIRT_URI = libvirt_uri
+        conn = connect_libvirt()
+        cache = SetupLayerCache(find_vm(conn, vm_name), snapshot_name)
+        if clear:
+            console.print(f":wastebasket: Deleted {cache.clear()} setup layer(s).")
+        elif evict:
+            cache.evict()
+        cache.print_layers()
+    except PracticeToolError as e:
+        console.print(f"[bold red]:x: Error:[/bold red] {e}", style="red")
+        raise typer.Exit(code=1)
+    finally:
+        close_libvirt(conn)
+
+
+@app.command(name="reset-timings")
+def show_reset_timings(
+    vm_name: Annotated[Optional[str], typer.Option("--vm", help="Only include runs on this VM.")] = None
+):
+    """Compares recorded cold-boot and warm-restore times of challenge runs."""
+    print_timing_report(summarize_timings(load_timings(vm_name=vm_name)))
+
+
 @app.command(name="list-challenges")
 def list_available_challenges(
     challenges_dir: Annotated[Path, typer.Option("--dir", "-d",
@@ -418,6 +479,8 @@ def run_challenge_workflow(
      )] = Config.DEFAULT_SSH_KEY_PATH,
     simulate_user: Annotated[bool, typer.Option("--simulate/--no-simulate", help="Run 'user_action_simulation' command automatically instead of pausing.")] = False,
     keep_snapshot: Annotated[bool, typer.Option("--keep-snapshot", help="Do not delete the snapshot after running (useful for debugging).")] = False,
+    warm_restore: Annotated[bool, typer.Option("--warm/--cold", help="Snapshot the running, SSH-ready VM with its memory state and restore it without a reboot. With --keep-snapshot the next run starts from that snapshot in seconds.")] = Config.WARM_RESTORE_DEFAULT,
+    setup_cache_enabled: Annotated[bool, typer.Option("--setup-cache/--no-setup-cache", help="With --warm, snapshot the guest after the setup steps and restore that layer on later attempts while the challenge's setup block is unchanged.")] = Config.SETUP_LAYER_CACHE_DEFAULT,
     verbose: Annotated[bool, typer.Option("-v", "--verbose", help="Print detailed command output during setup and validation.")] = False,
     libvirt_uri: Annotated[str, typer.Option("--uri", help="Libvirt connection URI.")] = Config.LIBVIRT_URI
 ):
@@ -432,6 +495,11 @@ def run_challenge_workflow(
     current_score = 0
     hints_used_count = 0
     total_hint_cost = 0
+    log_checkpoint: Optional[LogCheckpoint] = None
+    timer = PhaseTimer(vm_name, "warm" if warm_restore else "cold")
+    setup_cache: Optional[SetupLayerCache] = None
+    setup_digest: Optional[str] = None
+    setup_layer: Optional[str] = None # Cached post-setup layer this run started from
 
     # Resolve and validate key path (including permissions) early
     try:
@@ -460,32 +528,73 @@ def run_challenge_workflow(
         conn = connect_libvirt()
         domain = find_vm(conn, vm_name) # Raises VMNotFoundError if not found
 
+        # Setup layers are warm snapshots on top of the warm base snapshot
+        if warm_restore and setup_cache_enabled and challenge.get("setup"):
+            setup_cache = SetupLayerCache(domain, snapshot_name)
+            setup_digest = setup_hash(challenge, ssh_user)
+            setup_layer = setup_cache.find(challenge_id, setup_digest) # Also drops layers of an edited setup block
+
         # --- 2. Snapshot Management: Ensure Clean Slate ---
         console.print(f"\n:mag_right: Checking for existing snapshot '[cyan]{snapshot_name}[/cyan]'...")
+        existing_snapshot = False
         try:
-            existing_snapshot = domain.snapshotLookupByName(snapshot_name, 0)
-            console.print(f"  :warning: Found existing snapshot '[cyan]{snapshot_name}[/cyan]'. Attempting to delete it first...")
-            # delete_external_snapshot handles VM shutdown if needed
-            delete_external_snapshot(domain, snapshot_name) # Raises SnapshotOperationError on failure
-            list_snapshots(domain) # Show state after deletion attempt
+            domain.snapshotLookupByName(snapshot_name, 0)
+            existing_snapshot = True
         except libvirt.libvirtError as e:
             # Only ignore "snapshot not found" error, raise others
             if e.get_error_code() != VIR_ERR_NO_DOMAIN_SNAPSHOT or VIR_ERR_NO_DOMAIN_SNAPSHOT == -1:
-                 raise SnapshotOperationError(f"Error checking/deleting existing snapshot '{snapshot_name}': {e}") from e
+                 raise SnapshotOperationError(f"Error checking existing snapshot '{snapshot_name}': {e}") from e
             console.print(f"  [dim]No conflicting snapshot found. Proceeding.[/]")
-        except SnapshotOperationError as delete_err:
-             # Propagate error from delete_external_snapshot
-             raise SnapshotOperationError(f"Failed to delete existing snapshot '{snapshot_name}': {delete_err}. Aborting.") from delete_err
-
-        # Create the fresh snapshot for this run
-        create_external_snapshot(domain, snapshot_name) # Raises SnapshotOperationError on failure
-        snapshot_created = True
-        list_snapshots(domain) # Show state after creation
 
-        # --- 3. Start VM, Get IP, Wait for SSH ---
-        start_vm(domain) # Handles already running, raises PracticeToolError on failure
-        vm_ip = get_vm_ip(conn, domain) # Raises NetworkError on failure
-        wait_for_vm_ready(vm_ip, ssh_user, ssh_key_path, timeout=Config.VM_READINESS_TIMEOUT_SECONDS) # Raises NetworkError on timeout/failure
+        if setup_layer:
+            # Start from the guest as it was right after this challenge's setup last ran
+            console.print(f"  :package: Found cached setup layer '[cyan]{setup_layer}[/cyan]'. Restoring it instead of booting and running setup...")
+            with timer.phase("ready"):
+                revert_to_snapshot(domain, setup_layer) # Raises SnapshotOperationError on failure
+                vm_ip = get_vm_ip(conn, domain)
+                wait_for_vm_ready(vm_ip, ssh_user, ssh_key_path, timeout=Config.VM_READINESS_TIMEOUT_SECONDS)
+            timer.ready_path = "setup_layer"
+            setup_cache.touch(setup_layer)
+            snapshot_created = True # Cleanup reverts to the base snapshot as usual
+        elif existing_snapshot and warm_restore and is_warm_snapshot(domain, snapshot_name):
+            # Reuse the SSH-ready state saved by a previous --warm --keep-snapshot run
+            console.print(f"  :fire: Found warm snapshot '[cyan]{snapshot_name}[/cyan]'. Restoring it instead of booting...")
+            with timer.phase("ready"):
+                revert_to_snapshot(domain, snapshot_name) # Raises SnapshotOperationError on failure
+                vm_ip = get_vm_ip(conn, domain)
+                wait_for_vm_ready(vm_ip, ssh_user, ssh_key_path, timeout=Config.VM_READINESS_TIMEOUT_SECONDS)
+            timer.ready_path = "warm_restore"
+            snapshot_created = True
+        else:
+            if existing_snapshot:
+                console.print(f"  :warning: Found existing snapshot '[cyan]{snapshot_name}[/cyan]'. Attempting to delete it first...")
+                try:
+                    # delete_external_snapshot handles VM shutdown if needed
+                    delete_external_snapshot(domain, snapshot_name) # Raises SnapshotOperationError on failure
+                except SnapshotOperationError as delete_err:
+                    raise SnapshotOperationError(f"Failed to delete existing snapshot '{snapshot_name}': {delete_err}. Aborting.") from delete_err
+                list_snapshots(domain) # Show state after deletion attempt
+
+            if not warm_restore:
+                # Create the fresh snapshot for this run
+                with timer.phase("snapshot"):
+                    create_external_snapshot(domain, snapshot_name) # Raises SnapshotOperationError on failure
+                snapshot_created = True
+                list_snapshots(domain) # Show state after creation
+
+            # --- 3. Start VM, Get IP, Wait for SSH ---
+            with timer.phase("ready"):
+                start_vm(domain) # Handles already running, raises PracticeToolError on failure
+                vm_ip = get_vm_ip(conn, domain) # Raises NetworkError on failure
+                wait_for_vm_ready(vm_ip, ssh_user, ssh_key_path, timeout=Config.VM_READINESS_TIMEOUT_SECONDS) # Raises NetworkError on timeout/failure
+            timer.ready_path = "cold_boot"
+
+            if warm_restore:
+                # Snapshot the booted guest (memory included) so resets skip the boot
+                with timer.phase("snapshot"):
+                    create_warm_snapshot(domain, snapshot_name) # Raises SnapshotOperationError on failure
+                snapshot_created = True
+                list_snapshots(domain) # Show state after creation
 
         # --- 4. Display Challenge Info ---
         console.rule(f"[bold yellow]Challenge: {challenge.get('name', 'N/A')} ([cyan]{challenge_id}[/cyan])[/]", style="yellow")
@@ -510,8 +619,12 @@ def run_challenge_workflow(
             console.print("--- End Objective ---")
         # --- 5. Run Setup Steps ---
         setup_steps = challenge.get("setup", []) # Already validated list
-        if setup_steps:
+        if setup_layer:
+             console.print(f"[green]:package: Setup restored from cached layer ({len(setup_steps)} step(s) skipped).[/]")
+        elif setup_steps:
              console.rule("[bold]Challenge Setup[/]", style="blue")
+             allocation_before = disk_allocation_bytes(domain) if setup_cache else 0
+             setup_started = time.perf_counter()
              for i, step in enumerate(setup_steps):
                  step_type = step.get("type")
                  # Determine user context for the command (implement sudo logic if needed)
@@ -659,9 +772,24 @@ def run_challenge_workflow(
                      # This case should be caught by validation, but handle defensively
                      raise ChallengeLoadError(f"Unsupported setup step type '{step_type}' encountered during execution in challenge '{challenge_id}'.")
              console.rule("[bold]Setup Complete[/]", style="blue")
+             timer.add("setup", time.perf_counter() - setup_started)
+
+             if setup_cache:
+                 try:
+                     with timer.phase("snapshot"):
+                         setup_cache.create(challenge_id, setup_digest, allocation_before)
+                     console.print("[dim]Cached the post-setup state; the next attempt of this challenge skips setup.[/]")
+                 except SnapshotOperationError as layer_err:
+                     # The run itself is fine, only the cache could not be filled
+                     console.print(f"[yellow]Warning:[/yellow] Could not cache setup layer: {layer_err}", style="yellow")
         else:
             console.print("[dim]No setup steps defined for this challenge.[/]")
 
+        # Journal/audit checks only look at what is logged from here on (not setup's own entries)
+        validation_plan = challenge['validation_plan'] # Compiled when the challenge was loaded
+        if validation_plan.needs_log_checkpoint:
+            log_checkpoint = capture_log_checkpoint(vm_ip, ssh_user, ssh_key_path, verbose)
+
         # --- 6. User Action / Simulation ---
         console.rule("[bold]User Interaction[/]", style="green")
         if simulate_user:
@@ -734,22 +862,12 @@ def run_challenge_workflow(
         # --- 7. Validation ---
         console.rule("[bold]Challenge Validation[/]", style="blue")
 
-        # --- MODIFIED: Get validation steps from single key or split keys ---
-        validation_steps_to_run = []
-        if 'validation' in challenge:
-            # Use the old 'validation' key if present
-            validation_steps_to_run = challenge['validation'] # Already validated list
-            if not validation_steps_to_run:
-                 console.print("[yellow]Warning:[/yellow] 'validation' key exists but is empty.", style="yellow")
-        elif 'final_state_checks' in challenge:
-            # Use split keys if 'validation' is absent
-            # challenge.py validation ensures 'final_state_checks' is present if this path is taken
-            validation_steps_to_run.extend(challenge.get('final_state_checks', []))
-            # 'process_validation_checks' is optional
-            validation_steps_to_run.extend(challenge.get('process_validation_checks', []))
-            if not challenge.get('final_state_checks'): # Check specifically if required part is empty
-                 console.print("[yellow]Warning:[/yellow] 'final_state_checks' key exists but is empty.", style="yellow")
-        # If neither structure is found, validation_steps_to_run remains empty
+        # The plan holds the 'validation' steps, or 'final_state_checks' followed by 'process_validation_checks'
+        validation_steps_to_run = validation_plan.steps
+        if 'validation' in challenge and not challenge['validation']:
+             console.print("[yellow]Warning:[/yellow] 'validation' key exists but is empty.", style="yellow")
+        elif 'validation' not in challenge and not challenge.get('final_state_checks'): # Required part is empty
+             console.print("[yellow]Warning:[/yellow] 'final_state_checks' key exists but is empty.", style="yellow")
 
         if not validation_steps_to_run:
              console.print("[yellow]Warning:[/yellow] No validation steps found for this challenge. Assuming failure.", style="yellow")
@@ -757,16 +875,18 @@ def run_challenge_workflow(
         else:
             all_validations_passed = True # Assume pass until a step fails
             # --- END MODIFICATION ---
+            if log_checkpoint is not None:
+                log_checkpoint.begin_run() # Journal/audit entries are read once and shared by all steps
 
             # The loop iterates through the combined/retrieved list
             for i, step in enumerate(validation_steps_to_run):
                 try:
                     # Security reminder for verbose mode
-                    if verbose and step.get("type") == "run_command" and "command" in step:
-                         console.print(f"[dim]Executing validation command: '{step['command']}'[/]")
+                    if verbose and isinstance(step, CommandCheck):
+                         console.print(f"[dim]Executing validation command: '{step.command}'[/]")
 
                     # Pass the step number based on the combined list index
-                    execute_validation_step(i + 1, step, vm_ip, ssh_user, ssh_key_path, verbose)
+                    execute_validation_step(i + 1, step, vm_ip, ssh_user, ssh_key_path, verbose, log_checkpoint=log_checkpoint)
 
                 except ChallengeValidationError:
                     # execute_validation_step already printed the failure panel
@@ -890,8 +1010,10 @@ def run_challenge_workflow(
             if snapshot_created and domain_still_valid:
                 console.print(f"[dim]Attempting to revert snapshot '{snapshot_name}'...[/]")
                 try:
-                    revert_to_snapshot(domain, snapshot_name) # Handles VM shutdown internally
-                    time.sleep(3) # Wait after revert
+                    with timer.phase("reset"):
+                        revert_to_snapshot(domain, snapshot_name) # Handles VM shutdown internally (not needed for warm snapshots)
+                    if not warm_restore:
+                        time.sleep(3) # Wait after revert
                     domain_still_valid = is_domain_valid(domain) # Re-check validity after revert
                 except (SnapshotOperationError, PracticeToolError) as revert_err:
                     cleanup_errors.append(f"Failed to revert snapshot: {revert_err}")
@@ -904,12 +1026,19 @@ def run_challenge_workflow(
             elif not domain_still_valid:
                  console.print("[dim]Domain object invalid/inaccessible, skipping revert.[/]")
 
+            # Setup layers are children of the base snapshot; deleting it would orphan them
+            base_pinned = warm_restore and snapshot_created and domain_still_valid and SetupLayerCache(domain, snapshot_name).has_layers()
+
             # Delete Snapshot (if created, not keeping, and domain usable)
-            if snapshot_created and not keep_snapshot and domain_still_valid:
+            if base_pinned and not keep_snapshot:
+                 console.print(f":information_source: Keeping snapshot '{snapshot_name}' as the base of cached setup layers ('[bold]lpem setup-layers --clear[/]' removes them).")
+            elif snapshot_created and not keep_snapshot and domain_still_valid:
                  console.print(f"[dim]Attempting to delete snapshot '{snapshot_name}'...[/]")
                  try:
                      delete_external_snapshot(domain, snapshot_name) # Handles VM shutdown internally
                      list_snapshots(domain) # Show final snapshot state
+                     if warm_restore and domain.isActive():
+                         shutdown_vm(domain) # Leave the VM off, as a cold run does
                  except (SnapshotOperationError, PracticeToolError) as delete_err:
                      cleanup_errors.append(f"Failed to delete snapshot: {delete_err}")
                  except Exception as delete_unexpected_err:
@@ -918,6 +1047,8 @@ def run_challenge_workflow(
                  console.print("[dim]Snapshot was not created, skipping deletion.[/]")
             elif keep_snapshot:
                  console.print(f":information_source: Skipping snapshot deletion as requested ([bold]--keep-snapshot[/]). VM state reverted to '{snapshot_name}'.")
+                 if warm_restore:
+                     console.print("[dim]The VM is left running at the warm snapshot; the next --warm run restores it without booting.[/]")
             elif not domain_still_valid:
                  console.print("[dim]Domain object invalid/inaccessible, skipping snapshot deletion.[/]")
 
@@ -931,6 +1062,9 @@ def run_challenge_workflow(
             # Always try to close the connection
             close_libvirt(conn)
 
+            timer.print_summary()
+            timer.record()
+
             if cleanup_errors:
                 error_text = "\n".join([f"- {err}" for err in cleanup_errors])
                 error_title = "[bold red]Cleanup Issues Encountered[/]"
@@ -1004,8 +1138,10 @@ def validate_challenge_yaml(
             raise typer.Exit(code=1)
 
         # Perform detailed structure validation
-        from .challenge import validate_challenge_structure
+        from .challenge import compile_challenge_plan, validate_challenge_structure
         errors = validate_challenge_structure(challenge_data, file_path.name)
+        if not errors: # Step parameters are checked by compiling the validation plan
+            _, errors = compile_challenge_plan(challenge_data, file_path.name)
 
         if errors:
             error_text = "\n".join([f"- {error}" for error in errors])
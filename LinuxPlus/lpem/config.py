@@ -14,14 +14,30 @@ class Config:
     # SSH Defaults
     DEFAULT_SSH_USER: str = "roo" # !! IMPORTANT: Update if needed !!
     DEFAULT_SSH_KEY_PATH: Path = Path("~/.ssh/id_ed25519").expanduser() # !! IMPORTANT: Update if needed !!
+    SSH_PORT: int = 22
     SSH_CONNECT_TIMEOUT_SECONDS: int = 10
     SSH_COMMAND_TIMEOUT_SECONDS: int = 30
     SSH_KEY_PERMISSIONS_MASK: int = 0o077 # Permissions check: only owner should have access
+    ASYNC_SSH_CORE: bool = True # Run SSH operations on asyncssh when installed (paramiko otherwise)
+    ASYNC_SSH_CONCURRENCY: int = 64 # Hosts driven at once by async fleet operations
 
     # Challenge Defaults
     DEFAULT_CHALLENGES_DIR: Path = Path("./challenges")
     DEFAULT_CHALLENGE_SCORE: int = 100
 
+    # Log sources read by journal/audit validation checks
+    AUDIT_LOG_PATH: str = "/var/log/audit/audit.log"
+
+    # Warm restore: memory-inclusive snapshot taken once the VM is SSH-ready
+    WARM_RESTORE_DEFAULT: bool = False
+    RESET_TIMINGS_PATH: Path = Path("~/.cache/lpem/reset_timings.jsonl").expanduser()
+
+    # Setup layers: warm snapshots of the post-setup guest, reused while a challenge's setup block is unchanged
+    SETUP_LAYER_CACHE_DEFAULT: bool = True # Only effective in --warm mode
+    SETUP_LAYER_INDEX_PATH: Path = Path("~/.cache/lpem/setup_layers.json").expanduser()
+    SETUP_LAYER_MAX_COUNT: int = 8 # Per VM
+    SETUP_LAYER_MAX_BYTES: int = 20 * 1024 ** 3 # Estimated disk + memory state per VM
+
     # Libvirt Connection URI
     LIBVIRT_URI: str = 'qemu:///system'
 
@@ -13,6 +13,9 @@ import libvirt
 from .config import Config, VIR_ERR_NO_DOMAIN
 from .console import console, Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
 from .exceptions import NetworkError, SSHCommandError, PracticeToolError
+from .async_core import (
+    COMMAND_TIMEOUT_STATUS, PROBE_AUTH_FAILED, PROBE_READY, can_run_sync, probe_ssh, run_ssh_command_async, run_sync
+)
 
 def _get_vm_ip_address_agent(domain: libvirt.virDomain) -> Optional[str]:
     """Gets the VM IP address using the QEMU Guest Agent (internal helper)."""
@@ -161,7 +164,20 @@ def _validate_ssh_key(key_path: Path) -> Path:
 
 
 def run_ssh_command(ip_address: str, user: str, key_filename: Path, command: str, command_timeout: int = Config.SSH_COMMAND_TIMEOUT_SECONDS, verbose: bool = False, stdin_data: Optional[str] = None) -> Dict[str, Any]:
-    """Connects via SSH, executes a command, returns results including potential errors."""
+    """
+    Connects via SSH, executes a command, returns results including potential errors.
+    Runs on the async core when asyncssh is installed, otherwise on paramiko.
+    """
+    if not can_run_sync():
+        return _run_ssh_command_paramiko(ip_address, user, key_filename, command, command_timeout, stdin_data)
+    result = run_sync(run_ssh_command_async(ip_address, user, key_filename, command, command_timeout, stdin_data))
+    if result['exit_status'] == COMMAND_TIMEOUT_STATUS:
+        console.print(f"[yellow]:warning: {result['error']}[/]", style="yellow")
+    return result
+
+
+def _run_ssh_command_paramiko(ip_address: str, user: str, key_filename: Path, command: str, command_timeout: int, stdin_data: Optional[str]) -> Dict[str, Any]:
+    """run_ssh_command on blocking paramiko (used without asyncssh)."""
     if not ip_address:
         raise SSHCommandError("No IP address provided for SSH command.")
 
@@ -177,6 +193,7 @@ def run_ssh_command(ip_address: str, user: str, key_filename: Path, command: str
 
         ssh_client.connect(
             hostname=ip_address,
+            port=Config.SSH_PORT,
             username=user,
             key_filename=str(key_path), # Paramiko needs string path
             timeout=Config.SSH_CONNECT_TIMEOUT_SECONDS,
@@ -210,7 +227,7 @@ def run_ssh_command(ip_address: str, user: str, key_filename: Path, command: str
              if time.time() - start_read > command_timeout + 5: # Add buffer for safety
                  result['error'] = f"Command execution timed out after {command_timeout}s (waiting for exit status)."
                  # Use a distinct marker for timeout within the loop vs. connection timeout
-                 result['exit_status'] = -999 # Special code for command exec timeout
+                 result['exit_status'] = COMMAND_TIMEOUT_STATUS # Special code for command exec timeout
                  timed_out_in_loop = True
                  console.print(f"[yellow]:warning: {result['error']}[/]", style="yellow")
                  break # Exit the read loop
@@ -284,6 +301,29 @@ def run_ssh_command(ip_address: str, user: str, key_filename: Path, command: str
             ssh_client.close()
 
 
+def _probe_ssh_paramiko(ip_address: str, user: str, key_path: Path, timeout: float) -> str:
+    """One paramiko login attempt, with the same results as async_core.probe_ssh."""
+    ssh_client = paramiko.SSHClient()
+    ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    try:
+        ssh_client.connect(
+            hostname=ip_address,
+            port=Config.SSH_PORT,
+            username=user,
+            key_filename=str(key_path),
+            timeout=timeout,
+            look_for_keys=False,
+            auth_timeout=timeout
+        )
+        return PROBE_READY
+    except paramiko.AuthenticationException:
+        return PROBE_AUTH_FAILED
+    except (paramiko.SSHException, socket.timeout, ConnectionRefusedError, OSError) as e:
+        return type(e).__name__
+    finally:
+        ssh_client.close()
+
+
 def wait_for_vm_ready(ip_address: str, user: str, key_filename: Path, timeout: int = Config.VM_READINESS_TIMEOUT_SECONDS, poll_interval: int = Config.VM_READINESS_POLL_INTERVAL_SECONDS):
     """Waits for the VM to become accessible via SSH using Rich Progress."""
     if not ip_address:
@@ -314,36 +354,26 @@ def wait_for_vm_ready(ip_address: str, user: str, key_filename: Path, timeout: i
                  progress.update(task, description=f"Timeout waiting for {ip_address}", completed=timeout)
                  break # Exit loop, timeout error will be raised below
 
-            ssh_client = None
             try:
-                ssh_client = paramiko.SSHClient()
-                ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
                 # Use a short connection timeout for the check itself
                 connect_timeout = max(1, poll_interval - 1)
-                ssh_client.connect(
-                    hostname=ip_address,
-                    username=user,
-                    key_filename=str(key_path),
-                    timeout=connect_timeout,
-                    look_for_keys=False,
-                    auth_timeout=connect_timeout
-                )
-                # If connect succeeds, SSH is ready
-                progress.update(task, description=f"VM SSH Ready at {ip_address}!", completed=timeout)
-                console.print(f"[green]:heavy_check_mark: VM SSH is ready at [bold magenta]{ip_address}[/]![/]")
-                return True
-
-            except paramiko.AuthenticationException as e:
-                last_error = f"Authentication failed: {e}"
-                progress.update(task, description=f"Auth failed for {user}@{ip_address}", completed=timeout)
-                console.print(f"\n[yellow]:warning: VM SSH responded but authentication failed for user '{user}' with key '{key_path}'.[/]", style="yellow")
-                console.print("[yellow]Check SSH key setup in the VM. Proceeding, but commands may fail.[/]", style="yellow")
-                return True # Return True as SSH *server* is reachable, but warn user
-
-            except (paramiko.SSHException, socket.timeout, ConnectionRefusedError, OSError) as e:
+                if can_run_sync():
+                    status = run_sync(probe_ssh(ip_address, user, key_path, connect_timeout))
+                else:
+                    status = _probe_ssh_paramiko(ip_address, user, key_path, connect_timeout)
+
+                if status == PROBE_READY:
+                    progress.update(task, description=f"VM SSH Ready at {ip_address}!", completed=timeout)
+                    console.print(f"[green]:heavy_check_mark: VM SSH is ready at [bold magenta]{ip_address}[/]![/]")
+                    return True
+                if status == PROBE_AUTH_FAILED:
+                    progress.update(task, description=f"Auth failed for {user}@{ip_address}", completed=timeout)
+                    console.print(f"\n[yellow]:warning: VM SSH responded but authentication failed for user '{user}' with key '{key_path}'.[/]", style="yellow")
+                    console.print("[yellow]Check SSH key setup in the VM. Proceeding, but commands may fail.[/]", style="yellow")
+                    return True # Return True as SSH *server* is reachable, but warn user
+
                 # Common, expected errors during boot or network setup
-                last_error = f"{type(e).__name__}"
+                last_error = status
                 progress.update(task, description=f"Waiting for {ip_address} ({last_error})... Retrying")
                 # Sleep is handled by the loop structure and timeout check below
 
@@ -355,13 +385,11 @@ def wait_for_vm_ready(ip_address: str, user: str, key_filename: Path, timeout: i
                 console.print_exception(show_locals=False)
                 # Continue waiting, but log the error
 
-            finally:
-                if ssh_client: ssh_client.close()
-                # Controlled sleep before next attempt
-                remaining_time = timeout - (time.time() - start_time)
-                actual_sleep = min(poll_interval, max(0, remaining_time - 0.1)) # Ensure sleep is positive and respects remaining time
-                if actual_sleep > 0:
-                    time.sleep(actual_sleep)
+            # Controlled sleep before next attempt (not after a successful probe, which returned above)
+            remaining_time = timeout - (time.time() - start_time)
+            actual_sleep = min(poll_interval, max(0, remaining_time - 0.1)) # Ensure sleep is positive and respects remaining time
+            if actual_sleep > 0:
+                time.sleep(actual_sleep)
 
 
     # Loop finished due to timeout
@@ -101,3 +101,12 @@ def qemu_agent_fsthaw(domain: libvirt.virDomain) -> bool:
     else: # Unexpected response type
         console.print(f"  [yellow]:warning: QEMU Agent: Filesystem thaw returned unexpected response type: {type(response)} {response}[/]", style="yellow")
         return False
+
+def qemu_agent_sync_time(domain: libvirt.virDomain) -> bool:
+    """Sets the guest clock to the host time (needed after restoring a memory snapshot)."""
+    command = json.dumps({"execute": "guest-set-time", "arguments": {"time": int(time.time() * 1_000_000_000)}})
+    response = qemu_agent_command(domain, command)
+    if response is None:
+        return False
+    console.print("  [dim]QEMU Agent: Guest clock synchronized with host.[/]")
+    return True
@@ -0,0 +1,250 @@
+"""Setup step caching via pre-baked snapshot layers.
+
+A layer is a warm (memory-inclusive) snapshot taken right after a challenge's
+setup steps ran on top of the base practice snapshot. It is named after the
+base snapshot, the challenge and a hash of the challenge's setup block, so a
+later attempt of the same challenge restores the post-setup guest and skips
+both the boot and the setup commands. Editing the setup block changes the
+hash and invalidates the old layer; least recently used layers are evicted
+when a VM's layers exceed the configured count or disk budget.
+"""
+
+import hashlib
+import json
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import libvirt
+
+from .config import Config
+from .console import console, Table
+from .exceptions import PracticeToolError, SnapshotOperationError
+from .snapshot import (
+    SnapshotRecord, create_warm_snapshot, delete_external_snapshot, get_snapshot_inventory
+)
+
+LAYER_MARKER = "@setup-"
+HASH_LENGTH = 12
+
+def setup_hash(challenge: Dict[str, Any], ssh_user: str) -> str:
+    """
+    Hashes a challenge's setup block (and the user it runs as) into a layer key.
+
+    The YAML is normalized through JSON with sorted keys, so reformatting the
+    file or reordering mapping keys does not invalidate the layer.
+    """
+    material = json.dumps({"setup": challenge.get("setup", []), "user": ssh_user}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:HASH_LENGTH]
+
+def layer_name(base_snapshot: str, challenge_id: str, digest: str) -> str:
+    """Snapshot name of a setup layer."""
+    return f"{base_snapshot}{LAYER_MARKER}{challenge_id}-{digest}"
+
+@dataclass
+class SetupLayer:
+    """A setup layer snapshot together with its usage bookkeeping."""
+    name: str
+    challenge_id: str
+    digest: str
+    record: SnapshotRecord
+    last_used: float
+    size_bytes: int
+
+def _parse_layer_name(base_snapshot: str, name: str) -> Optional[Tuple[str, str]]:
+    prefix = f"{base_snapshot}{LAYER_MARKER}"
+    if not name.startswith(prefix):
+        return None
+    challenge_id, sep, digest = name[len(prefix):].rpartition("-")
+    if not sep or not challenge_id or len(digest) != HASH_LENGTH:
+        return None
+    return challenge_id, digest
+
+def disk_allocation_bytes(domain: libvirt.virDomain) -> int:
+    """Host bytes allocated by the VM's file-backed disks (0 if unknown)."""
+    total = 0
+    try:
+        tree = ET.fromstring(domain.XMLDesc(0))
+        for disk in tree.findall('devices/disk'):
+            target = disk.find('target')
+            if disk.get('device') != 'disk' or target is None or not target.get('dev'):
+                continue
+            _, allocation, _ = domain.blockInfo(target.get('dev'), 0)
+            total += allocation
+    except (libvirt.libvirtError, ET.ParseError, AttributeError, TypeError, ValueError):
+        return 0
+    return total
+
+class SetupLayerCache:
+    """Finds, creates, invalidates and evicts the setup layers of one VM."""
+
+    def __init__(self, domain: libvirt.virDomain, base_snapshot: str, index_path: Optional[Path] = None):
+        self.domain = domain
+        self.base_snapshot = base_snapshot
+        self.index_path = Path(index_path or Config.SETUP_LAYER_INDEX_PATH)
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+
+    # --- Usage index (last use and size per layer; libvirt is the source of truth for existence) ---
+    def _index_key(self, name: str) -> str:
+        return f"{self.domain.name()}/{name}"
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        if self._index is None:
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._index = data if isinstance(data, dict) else {}
+            except FileNotFoundError:
+                self._index = {}
+            except (OSError, ValueError) as e:
+                console.print(f"[yellow]Warning:[/yellow] Ignoring unreadable setup layer index '{self.index_path}': {e}", style="yellow")
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._load_index(), f, indent=2, sort_keys=True)
+            tmp_path.replace(self.index_path)
+        except OSError as e:
+            console.print(f"[yellow]Warning:[/yellow] Could not save setup layer index '{self.index_path}': {e}", style="yellow")
+
+    # --- Queries ---
+    def layers(self) -> List[SetupLayer]:
+        """All setup layers stacked on this VM's base snapshot, least recently used first."""
+        index = self._load_index()
+        found = []
+        for record in get_snapshot_inventory(self.domain):
+            parsed = _parse_layer_name(self.base_snapshot, record.name)
+            if parsed is None:
+                continue
+            usage = index.get(self._index_key(record.name), {})
+            found.append(SetupLayer(
+                name=record.name,
+                challenge_id=parsed[0],
+                digest=parsed[1],
+                record=record,
+                last_used=usage.get("last_used", record.creation_time or 0),
+                size_bytes=usage.get("size_bytes", 0),
+            ))
+        return sorted(found, key=lambda layer: layer.last_used)
+
+    def _base_record(self) -> Optional[SnapshotRecord]:
+        for record in get_snapshot_inventory(self.domain):
+            if record.name == self.base_snapshot:
+                return record
+        return None
+
+    def _is_usable(self, layer: SetupLayer, base: Optional[SnapshotRecord]) -> bool:
+        # A layer only reproduces the current base if it was taken on top of it:
+        # recreating the base reparents or orphans older layers.
+        return (base is not None and base.is_warm and layer.record.is_warm
+                and layer.record.parent == self.base_snapshot
+                and (layer.record.creation_time or 0) >= (base.creation_time or 0))
+
+    def find(self, challenge_id: str, digest: str) -> Optional[str]:
+        """
+        Returns the usable layer for this challenge and setup hash, if any.
+
+        Layers of the same challenge built from a different setup block, or on
+        a base snapshot that has since been recreated, are deleted on the way.
+        """
+        base = self._base_record()
+        wanted = layer_name(self.base_snapshot, challenge_id, digest)
+        hit = None
+        for layer in self.layers():
+            if layer.challenge_id != challenge_id:
+                if not self._is_usable(layer, base):
+                    console.print(f"[dim]Dropping setup layer '{layer.name}' orphaned by a recreated base snapshot.[/]")
+                    self.delete(layer.name)
+                continue
+            if layer.name == wanted and self._is_usable(layer, base):
+                hit = layer.name
+            elif layer.name == wanted:
+                console.print(f"[yellow]:warning: Setup layer '{layer.name}' was not built on the current base snapshot. Rebuilding it.[/]", style="yellow")
+                self.delete(layer.name)
+            else:
+                console.print(f"[dim]Setup block of '{challenge_id}' changed; dropping stale layer '{layer.name}'.[/]")
+                self.delete(layer.name)
+        return hit
+
+    def has_layers(self) -> bool:
+        try:
+            return bool(self.layers())
+        except PracticeToolError:
+            return False
+
+    # --- Mutations ---
+    def touch(self, name: str):
+        """Marks a layer as just used (for LRU eviction)."""
+        self._load_index().setdefault(self._index_key(name), {})["last_used"] = time.time()
+        self._save_index()
+
+    def create(self, challenge_id: str, digest: str, allocation_before: int) -> str:
+        """
+        Snapshots the post-setup guest as a layer and applies the eviction policy.
+
+        Args:
+            challenge_id: Challenge whose setup just ran.
+            digest: setup_hash of that challenge.
+            allocation_before: disk_allocation_bytes measured before setup, to estimate the layer's size.
+        """
+        name = layer_name(self.base_snapshot, challenge_id, digest)
+        create_warm_snapshot(self.domain, name) # Raises SnapshotOperationError on failure
+        size = max(0, disk_allocation_bytes(self.domain) - allocation_before) if allocation_before else 0
+        self._load_index()[self._index_key(name)] = {"last_used": time.time(), "size_bytes": size}
+        self._save_index()
+        self.evict(keep=name)
+        return name
+
+    def delete(self, name: str) -> bool:
+        try:
+            delete_external_snapshot(self.domain, name) # Warm snapshots are deleted without a shutdown
+        except SnapshotOperationError as e:
+            console.print(f"[yellow]Warning:[/yellow] Could not delete setup layer '{name}': {e}", style="yellow")
+            return False
+        self._load_index().pop(self._index_key(name), None)
+        self._save_index()
+        return True
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Deletes least recently used layers until the VM is within the count and disk budgets."""
+        layers = [layer for layer in self.layers() if layer.name != keep]
+        kept_count = len(layers) + (1 if keep else 0)
+        total_bytes = sum(layer.size_bytes for layer in self.layers())
+        evicted = []
+        for layer in layers:
+            if kept_count <= Config.SETUP_LAYER_MAX_COUNT and total_bytes <= Config.SETUP_LAYER_MAX_BYTES:
+                break
+            if self.delete(layer.name):
+                evicted.append(layer.name)
+                kept_count -= 1
+                total_bytes -= layer.size_bytes
+        if evicted:
+            console.print(f"[dim]Evicted {len(evicted)} least recently used setup layer(s): {', '.join(evicted)}[/]")
+        return evicted
+
+    def clear(self) -> int:
+        """Deletes every setup layer of this VM."""
+        return sum(1 for layer in self.layers() if self.delete(layer.name))
+
+    def print_layers(self):
+        """Prints the cached layers of this VM."""
+        layers = self.layers()
+        if not layers:
+            console.print(f"[i]No setup layers cached for VM '{self.domain.name()}' (base '{self.base_snapshot}').[/]")
+            return
+        table = Table(title=f"[bold blue]Setup Layers for VM '[cyan]{self.domain.name()}[/]'[/]", show_header=True, header_style="bold magenta")
+        table.add_column("Challenge", style="cyan")
+        table.add_column("Setup Hash")
+        table.add_column("Last Used", justify="center")
+        table.add_column("Size", justify="right")
+        for layer in reversed(layers):
+            last_used = time.strftime('%Y-%m-%d %H:%M', time.localtime(layer.last_used)) if layer.last_used else "[dim]N/A[/]"
+            size = f"{layer.size_bytes / (1024 ** 2):.0f} MiB" if layer.size_bytes else "[dim]unknown[/]"
+            table.add_row(layer.challenge_id, layer.digest, last_used, size)
+        console.print(table)
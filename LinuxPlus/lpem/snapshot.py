@@ -1,10 +1,12 @@
 """VM snapshot management functions."""
 
+import json
 import time
 import xml.etree.ElementTree as ET
 import libvirt
+from dataclasses import dataclass, asdict
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional
 
 from .console import console, Table, Panel, Syntax
 from .exceptions import SnapshotOperationError, PracticeToolError
@@ -12,7 +14,7 @@ from .config import (
     VIR_ERR_NO_DOMAIN, VIR_ERR_NO_DOMAIN_SNAPSHOT, VIR_ERR_OPERATION_INVALID, 
     VIR_ERR_AGENT_UNRESPONSIVE, VIR_ERR_CONFIG_EXIST
 )
-from .qemu_agent import qemu_agent_fsfreeze, qemu_agent_fsthaw
+from .qemu_agent import qemu_agent_fsfreeze, qemu_agent_fsthaw, qemu_agent_sync_time
 from .vm import shutdown_vm
 
 def _generate_snapshot_xml(domain: libvirt.virDomain, snapshot_name: str, agent_frozen: bool) -> Tuple[str, List[str]]:
@@ -185,6 +187,7 @@ def create_external_snapshot(domain: libvirt.virDomain, snapshot_name: str):
         # Catch any other unexpected errors
         raise SnapshotOperationError(f"An unexpected error occurred creating snapshot '{snapshot_name}': {e}") from e
     finally:
+        invalidate_snapshot_inventory(domain) # Even a failed create can leave partial metadata behind
         # Thaw filesystem ONLY if freeze was successful
         if was_frozen_by_agent:
             if not qemu_agent_fsthaw(domain):
@@ -193,6 +196,48 @@ def create_external_snapshot(domain: libvirt.virDomain, snapshot_name: str):
                  console.print("  Manual intervention (e.g., 'fsfreeze -u /' inside VM or reboot) might be required.", style="red")
         console.rule(f"[bold]End Snapshot Creation[/]", style="blue")
 
+def create_warm_snapshot(domain: libvirt.virDomain, snapshot_name: str):
+    """
+    Creates an internal snapshot of a running VM including its memory state.
+
+    Reverting to it restores the running, SSH-ready guest directly instead of
+    shutting down, reverting disks and cold-booting. Requires qcow2 disks.
+    """
+    if not domain:
+        raise PracticeToolError("Invalid VM domain provided to create_warm_snapshot.")
+    console.rule(f"[bold]Creating WARM Snapshot: [cyan]{snapshot_name}[/][/]", style="blue")
+    try:
+        if not domain.isActive():
+            raise SnapshotOperationError("Warm snapshots capture memory state and need a running VM.")
+
+        snapshot_xml = f"""
+        <domainsnapshot>
+          <name>{snapshot_name}</name>
+          <description>Warm snapshot for practice session (memory state, SSH ready)</description>
+          <memory snapshot='internal'/>
+        </domainsnapshot>
+        """
+        console.print("  Saving disk and memory state (the guest pauses briefly)...")
+        snapshot = domain.snapshotCreateXML(snapshot_xml, 0)
+        if not snapshot:
+            raise SnapshotOperationError(f"Libvirt snapshotCreateXML returned None unexpectedly for '{snapshot_name}'.")
+        console.print(f"[green]:camera_with_flash: Successfully created warm snapshot: '{snapshot.getName()}'[/]")
+        return True
+
+    except libvirt.libvirtError as e:
+        err_code = e.get_error_code()
+        if err_code == VIR_ERR_CONFIG_EXIST and VIR_ERR_CONFIG_EXIST != -1:
+             raise SnapshotOperationError(f"Snapshot metadata '{snapshot_name}' already exists. Delete it first.") from e
+        # Typically non-qcow2 disks or firmware that does not support internal snapshots
+        raise SnapshotOperationError(f"Error creating warm snapshot '{snapshot_name}': {e}. Warm snapshots need qcow2 disks; use --cold otherwise.") from e
+    except (SnapshotOperationError, PracticeToolError) as e:
+        raise e
+    except Exception as e:
+        raise SnapshotOperationError(f"An unexpected error occurred creating warm snapshot '{snapshot_name}': {e}") from e
+    finally:
+        invalidate_snapshot_inventory(domain)
+        console.rule(f"[bold]End Snapshot Creation[/]", style="blue")
+
 def revert_to_snapshot(domain: libvirt.virDomain, snapshot_name: str):
     """Reverts the VM to a previously created snapshot."""
     if not domain:
@@ -202,9 +247,12 @@ def revert_to_snapshot(domain: libvirt.virDomain, snapshot_name: str):
     try:
         # 1. Lookup snapshot
         snapshot = domain.snapshotLookupByName(snapshot_name, 0) # Raises NO_DOMAIN_SNAPSHOT if not found
+        warm = is_warm_snapshot(domain, snapshot_name)
 
-        # 2. Shutdown VM if running
-        if domain.isActive():
+        # 2. Shutdown VM if running (not needed for warm snapshots: the memory state replaces the running guest)
+        if warm:
+             console.print(":fire: Warm snapshot (includes memory state). Restoring the running guest without shutdown...")
+        elif domain.isActive():
              console.print(":warning: VM is running. Shutting down before reverting snapshot...")
              if not shutdown_vm(domain): # shutdown_vm handles errors internally
                   raise SnapshotOperationError("Failed to shut down VM before revert. Aborting.")
@@ -216,6 +264,8 @@ def revert_to_snapshot(domain: libvirt.virDomain, snapshot_name: str):
         # 3. Attempt Revert
         # VIR_DOMAIN_SNAPSHOT_REVERT_FORCE might be needed for external snapshots if state is inconsistent
         flags = 0
+        if warm and hasattr(libvirt, 'VIR_DOMAIN_SNAPSHOT_REVERT_RUNNING'):
+            flags |= libvirt.VIR_DOMAIN_SNAPSHOT_REVERT_RUNNING
         if hasattr(libvirt, 'VIR_DOMAIN_SNAPSHOT_REVERT_FORCE'):
             flags |= libvirt.VIR_DOMAIN_SNAPSHOT_REVERT_FORCE
             console.print("  [dim](Attempting revert with VIR_DOMAIN_SNAPSHOT_REVERT_FORCE flag)[/]")
@@ -229,6 +279,16 @@ def revert_to_snapshot(domain: libvirt.virDomain, snapshot_name: str):
             raise SnapshotOperationError(f"Libvirt failed to revert VM '{domain.name()}' to snapshot '{snapshot_name}' (check libvirt logs).")
 
         console.print(f"[green]:heavy_check_mark: Successfully reverted VM '[bold cyan]{domain.name()}[/]' to snapshot '{snapshot_name}'.[/]")
+        if warm:
+            # The guest resumes with the clock it had when the snapshot was taken
+            if not qemu_agent_sync_time(domain):
+                console.print("[yellow]Warning:[/yellow] Could not resync the guest clock after warm restore; time-based checks may be off.", style="yellow")
+            if not domain.isActive():
+                console.print("[yellow]Warning:[/yellow] VM is not running after warm restore, which is unexpected.", style="yellow")
+            else:
+                console.print("[dim]VM is running after warm restore (expected).[/]")
+            return True
+
         time.sleep(2) # Pause after revert
 
         # State after revert (usually off for external snapshot revert)
@@ -263,6 +323,7 @@ def revert_to_snapshot(domain: libvirt.virDomain, snapshot_name: str):
     except Exception as e:
         raise SnapshotOperationError(f"An unexpected error occurred while reverting to snapshot '{snapshot_name}': {e}") from e
     finally:
+         invalidate_snapshot_inventory(domain)
          console.rule(f"[bold]End Snapshot Revert[/]", style="blue")
 
 def delete_external_snapshot(domain: libvirt.virDomain, snapshot_name: str):
@@ -276,7 +337,8 @@ def delete_external_snapshot(domain: libvirt.virDomain, snapshot_name: str):
         snapshot = domain.snapshotLookupByName(snapshot_name, 0) # Raises NO_DOMAIN_SNAPSHOT if not found
 
         # 2. Shutdown VM if running (Deletion often requires VM off, especially for block commit)
-        if domain.isActive():
+        # Internal (warm) snapshots have nothing to merge and can be deleted while the VM runs.
+        if domain.isActive() and not is_warm_snapshot(domain, snapshot_name):
              console.print(":warning: VM is running. Shutting down before deleting snapshot...")
              if not shutdown_vm(domain):
                   raise SnapshotOperationError("Failed to shut down VM before deleting snapshot. Aborting.")
@@ -324,14 +386,147 @@ def delete_external_snapshot(domain: libvirt.virDomain, snapshot_name: str):
     except Exception as e:
         raise SnapshotOperationError(f"An unexpected error occurred while deleting snapshot '{snapshot_name}': {e}") from e
     finally:
+        invalidate_snapshot_inventory(domain)
         console.rule(f"[bold]End Snapshot Deletion[/]", style="red")
 
-def list_snapshots(domain: libvirt.virDomain):
+# --- Snapshot inventory (cached per domain) ---
+
+@dataclass(frozen=True)
+class SnapshotRecord:
+    """Compact, parsed view of one snapshot's XML description."""
+    name: str
+    creation_time: Optional[int]
+    state: Optional[str]
+    parent: Optional[str]
+    description: Optional[str]
+    is_external: bool
+    has_memory: bool
+    disk_files: Tuple[str, ...]
+
+    @property
+    def type_label(self) -> str:
+        return f"{'External' if self.is_external else 'Internal'}{'+Mem' if self.has_memory else ''}"
+
+    @property
+    def is_warm(self) -> bool:
+        """Internal snapshot with memory state; can be reverted to a running guest."""
+        return self.has_memory and not self.is_external
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = asdict(self)
+        record["disk_files"] = list(self.disk_files)
+        record["type"] = self.type_label
+        record["warm"] = self.is_warm
+        return record
+
+# Keyed by domain UUID; entries are dropped whenever this module changes the snapshot set
+_inventory_cache: Dict[str, Tuple[SnapshotRecord, ...]] = {}
+
+def _domain_cache_key(domain: libvirt.virDomain) -> str:
+    try:
+        return domain.UUIDString()
+    except (libvirt.libvirtError, AttributeError):
+        return domain.name()
+
+def _parse_snapshot_xml(xml_desc: str) -> SnapshotRecord:
+    """Parses a snapshot XML description into a SnapshotRecord in a single pass."""
+    snap_tree = ET.fromstring(xml_desc)
+    creation_text = snap_tree.findtext('creationTime')
+    creation_time = int(creation_text) if creation_text and creation_text.strip().isdigit() else None
+    description = snap_tree.findtext('description')
+    memory_node = snap_tree.find('memory')
+
+    disks = snap_tree.findall('disks/disk')
+    disk_files = []
+    for disk in disks:
+        source_node = disk.find('source')
+        if source_node is not None and source_node.get('file'):
+            disk_files.append(source_node.get('file'))
+
+    return SnapshotRecord(
+        name=snap_tree.findtext('name', ''),
+        creation_time=creation_time,
+        state=snap_tree.findtext('state'),
+        parent=snap_tree.findtext('parent/name'),
+        description=description.strip() if description and description.strip() else None,
+        is_external=any(d.get('snapshot') == 'external' for d in disks),
+        has_memory=memory_node is not None and memory_node.get('snapshot', 'no') != 'no',
+        disk_files=tuple(disk_files),
+    )
+
+def get_snapshot_inventory(domain: libvirt.virDomain, refresh: bool = False) -> Tuple[SnapshotRecord, ...]:
+    """
+    Returns the domain's snapshots as parsed records, oldest first.
+
+    Uses one listAllSnapshots call instead of a name lookup per snapshot and
+    keeps the result until a create/revert/delete through this module (or
+    refresh=True) invalidates it.
+    """
+    if not domain:
+        raise PracticeToolError("Invalid VM domain provided to get_snapshot_inventory.")
+    key = _domain_cache_key(domain)
+    if not refresh and key in _inventory_cache:
+        return _inventory_cache[key]
+
+    try:
+        snapshots = domain.listAllSnapshots(0)
+    except libvirt.libvirtError as e:
+        raise PracticeToolError(f"Error listing snapshots for VM '{domain.name()}': {e}") from e
+
+    records = []
+    for snapshot in snapshots:
+        try:
+            records.append(_parse_snapshot_xml(snapshot.getXMLDesc(0)))
+        except libvirt.libvirtError as e:
+            # Deleted between the listing and the XML fetch
+            if e.get_error_code() != VIR_ERR_NO_DOMAIN_SNAPSHOT or VIR_ERR_NO_DOMAIN_SNAPSHOT == -1:
+                console.print(f"[yellow]Warning:[/yellow] Could not read snapshot '{snapshot.getName()}': {e}", style="yellow")
+        except ET.ParseError as e:
+            console.print(f"[yellow]Warning:[/yellow] Could not parse XML of snapshot '{snapshot.getName()}': {e}", style="yellow")
+
+    inventory = tuple(sorted(records, key=lambda r: (r.creation_time or 0, r.name)))
+    _inventory_cache[key] = inventory
+    return inventory
+
+def find_snapshot_record(domain: libvirt.virDomain, snapshot_name: str) -> Optional[SnapshotRecord]:
+    """Returns the inventory record for a snapshot name, or None if it does not exist."""
+    for record in get_snapshot_inventory(domain):
+        if record.name == snapshot_name:
+            return record
+    return None
+
+def is_warm_snapshot(domain: libvirt.virDomain, snapshot_name: str) -> bool:
+    """Checks whether a snapshot includes memory state (see create_warm_snapshot)."""
+    try:
+        record = find_snapshot_record(domain, snapshot_name)
+    except PracticeToolError:
+        return False
+    return record is not None and record.is_warm
+
+def invalidate_snapshot_inventory(domain: Optional[libvirt.virDomain] = None):
+    """Drops the cached inventory for one domain, or for all domains if None."""
+    if domain is None:
+        _inventory_cache.clear()
+    else:
+        _inventory_cache.pop(_domain_cache_key(domain), None)
+
+def snapshot_inventory_json(domain: libvirt.virDomain, refresh: bool = False) -> str:
+    """Returns the domain's snapshot inventory as a JSON document for tooling."""
+    return json.dumps({
+        "domain": domain.name(),
+        "snapshots": [record.to_dict() for record in get_snapshot_inventory(domain, refresh=refresh)],
+    }, indent=2)
+
+def list_snapshots(domain: libvirt.virDomain, refresh: bool = False):
     """Lists all snapshots for the given VM domain using Rich Table."""
     if not domain:
         raise PracticeToolError("Invalid VM domain provided to list_snapshots.")
 
-    from .console import Panel, Table
+    inventory = get_snapshot_inventory(domain, refresh=refresh)
+    if not inventory:
+        console.print(Panel("[i]No snapshots found.[/]", title=f"Snapshots for {domain.name()}", border_style="dim", style="dim"))
+        return
+
     table = Table(title=f"[bold blue]Snapshots for VM '[cyan]{domain.name()}[/]'[/]", show_header=True, header_style="bold magenta")
     table.add_column("Snapshot Name", style="cyan")
     table.add_column("Created", style="dim", justify="center")
@@ -339,54 +534,17 @@ def list_snapshots(domain: libvirt.virDomain):
     table.add_column("Type", justify="center")
     table.add_column("Description", justify="left")
 
-    try:
-        snapshot_names = domain.snapshotListNames(0)
-        if not snapshot_names:
-            console.print(Panel("[i]No snapshots found.[/]", title=f"Snapshots for {domain.name()}", border_style="dim", style="dim"))
-            return
-
-        for name in snapshot_names:
-            details = "[dim]N/A[/]"
-            creation_time_str = "[dim]N/A[/]"
-            state_str = "[dim]N/A[/]"
-            type_str = "[dim]Unknown[/]"
-            try:
-                snapshot = domain.snapshotLookupByName(name, 0) # Raises NO_DOMAIN_SNAPSHOT if gone
-                xml_desc = snapshot.getXMLDesc(0)
-                snap_tree = ET.fromstring(xml_desc)
-
-                creation_time_node = snap_tree.find('creationTime')
-                state_node = snap_tree.find('state')
-                disks_node = snap_tree.find('disks')
-                desc_node = snap_tree.find('description')
-                memory_node = snap_tree.find('memory') # Check for memory snapshot
-
-                is_external = disks_node is not None and any(
-                    d.get('snapshot') == 'external' for d in disks_node.findall('disk')
-                )
-                has_memory = memory_node is not None and memory_node.get('snapshot', 'no') != 'no'
-
-                if creation_time_node is not None and creation_time_node.text.isdigit():
-                     try: creation_time_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(int(creation_time_node.text)))
-                     except ValueError: pass # Handle potential large timestamps
-
-                state_str = state_node.text if state_node is not None else '[dim]N/A[/]'
-                type_str = f"{'External' if is_external else 'Internal'}{'+Mem' if has_memory else ''}"
-                details = desc_node.text.strip() if desc_node is not None and desc_node.text else "[dim]No description[/]"
-
-            except libvirt.libvirtError as e_lookup:
-                if e_lookup.get_error_code() == VIR_ERR_NO_DOMAIN_SNAPSHOT and VIR_ERR_NO_DOMAIN_SNAPSHOT != -1:
-                    details = "[yellow](Disappeared)[/]"
-                else:
-                    details = f"[red](Error looking up: {e_lookup})[/]"
-            except ET.ParseError:
-                 details = "[red](Error parsing XML)[/]"
-            except Exception as detail_err:
-                 details = f"[red](Unexpected error: {detail_err})[/]"
-            finally:
-                 table.add_row(name, creation_time_str, state_str, type_str, details)
-
-        console.print(table)
-
-    except libvirt.libvirtError as e:
-        raise PracticeToolError(f"Error listing snapshots for VM '{domain.name()}': {e}") from e
+    for record in inventory:
+        creation_time_str = "[dim]N/A[/]"
+        if record.creation_time is not None:
+            try: creation_time_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.creation_time))
+            except (ValueError, OverflowError, OSError): pass # Handle potential large timestamps
+        table.add_row(
+            record.name,
+            creation_time_str,
+            record.state or '[dim]N/A[/]',
+            record.type_label,
+            record.description or "[dim]No description[/]",
+        )
+
+    console.print(table)
@@ -136,12 +136,12 @@ process_validation_checks:
   #   # Example: Check if mkfs.xfs was logged by sudo or systemd
   #   syslog_identifier: "sudo" # Check sudo logs
   #   message_pattern: "mkfs\\.xfs.* /dev/mapper/storage_vg-data_lv" # Regex
-  #   since: "5 minutes ago" # Time scope for the check
+  #   # since: "5 minutes ago" # Optional time scope; by default only entries logged after the challenge started are checked
   #   expected_state: true
   # - type: check_audit_log
   #   # Example: Check if lvcreate command was executed (requires auditd rule)
   #   rule_key: "lvm_commands" # Key defined in auditd rules (e.g., -S execve -F path=/usr/sbin/lvcreate -k lvm_commands)
-  #   since: "recent"
+  #   # since: "recent" # Optional time scope; by default only records written after the challenge started are checked
   #   expected_state: true
   #   notes: "Requires auditd setup with appropriate rules."
 
@@ -0,0 +1,139 @@
+"""Timing instrumentation for VM reset paths (cold boot vs warm restore)."""
+
+import json
+import statistics
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .config import Config
+from .console import console, Table
+
+READY_PATHS = ("cold_boot", "warm_restore", "setup_layer")
+
+class PhaseTimer:
+    """Collects wall-clock durations of the workflow phases of one challenge run."""
+
+    def __init__(self, vm_name: str, mode: str):
+        self.vm_name = vm_name
+        self.mode = mode # "cold" or "warm"
+        self.ready_path: Optional[str] = None # How the SSH-ready guest was reached
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Times a block; repeated phases accumulate."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        """Adds a duration measured outside a phase() block."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": int(time.time()),
+            "vm": self.vm_name,
+            "mode": self.mode,
+            "ready_path": self.ready_path,
+            "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+        }
+
+    def print_summary(self):
+        """Prints the phase durations of this run."""
+        if not self.phases:
+            return
+        table = Table(title=f"[bold blue]VM Timing ({self.mode} mode)[/]", show_header=True, header_style="bold magenta")
+        table.add_column("Phase", style="cyan")
+        table.add_column("Seconds", justify="right")
+        for name, seconds in self.phases.items():
+            label = f"{name} ({self.ready_path})" if name == "ready" and self.ready_path else name
+            table.add_row(label, f"{seconds:.1f}")
+        console.print(table)
+
+    def record(self, path: Optional[Path] = None) -> bool:
+        """Appends this run to the timings log (JSON lines). Best effort."""
+        if "ready" not in self.phases:
+            return False # Nothing comparable was measured
+        path = Path(path or Config.RESET_TIMINGS_PATH)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self.to_dict()) + "\n")
+            return True
+        except OSError as e:
+            console.print(f"[yellow]Warning:[/yellow] Could not record VM timings to '{path}': {e}", style="yellow")
+            return False
+
+def load_timings(path: Optional[Path] = None, vm_name: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Reads recorded runs, skipping malformed lines."""
+    path = Path(path or Config.RESET_TIMINGS_PATH)
+    records = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and (vm_name is None or record.get("vm") == vm_name):
+                    records.append(record)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        console.print(f"[yellow]Warning:[/yellow] Could not read VM timings from '{path}': {e}", style="yellow")
+    return records
+
+def _median_phase(runs: List[Dict[str, Any]], phase: str) -> Dict[str, Any]:
+    values = [r["phases"][phase] for r in runs if isinstance(r.get("phases", {}).get(phase), (int, float))]
+    return {"runs": len(values), "median": statistics.median(values) if values else None}
+
+def summarize_timings(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Median durations of getting to an SSH-ready guest and of resetting it.
+
+    Returns:
+        {"ready": {ready_path: {"runs", "median"}}, "reset": {mode: {"runs", "median"}},
+         "setup": {"ran": {"runs", "median"}}}.
+        A warm-mode run's first boot is still a cold boot, so readiness is grouped
+        by the path actually taken and resets by mode.
+    """
+    summary: Dict[str, Dict[str, Dict[str, Any]]] = {"ready": {}, "reset": {}, "setup": {}}
+    for ready_path in READY_PATHS:
+        stats = _median_phase([r for r in records if r.get("ready_path") == ready_path], "ready")
+        if stats["runs"]:
+            summary["ready"][ready_path] = stats
+    for mode in ("cold", "warm"):
+        stats = _median_phase([r for r in records if r.get("mode") == mode], "reset")
+        if stats["runs"]:
+            summary["reset"][mode] = stats
+    stats = _median_phase(records, "setup")
+    if stats["runs"]:
+        summary["setup"]["ran"] = stats # Runs restored from a setup layer skip this phase
+    return summary
+
+def print_timing_report(summary: Dict[str, Dict[str, Dict[str, Any]]]):
+    """Prints the cold-boot vs warm-restore comparison."""
+    if not summary["ready"] and not summary["reset"]:
+        console.print("[i]No timings recorded yet. Run 'lpem run-challenge' (with --warm for warm restores).[/]")
+        return
+    table = Table(title="[bold blue]VM Reset Timings (median seconds)[/]", show_header=True, header_style="bold magenta")
+    table.add_column("Measurement", style="cyan")
+    table.add_column("Runs", justify="right")
+    table.add_column("Seconds", justify="right")
+    for ready_path, stats in summary["ready"].items():
+        table.add_row(f"SSH-ready via {ready_path}", str(stats["runs"]), f"{stats['median']:.1f}")
+    for mode, stats in summary["reset"].items():
+        table.add_row(f"Snapshot revert ({mode})", str(stats["runs"]), f"{stats['median']:.1f}")
+    for stats in summary["setup"].values():
+        table.add_row("Challenge setup over SSH", str(stats["runs"]), f"{stats['median']:.1f}")
+    console.print(table)
+
+    cold = summary["ready"].get("cold_boot", {}).get("median")
+    warm = summary["ready"].get("warm_restore", {}).get("median")
+    if cold and warm:
+        console.print(f":stopwatch: Warm restore reaches an SSH-ready guest [bold green]{cold / warm:.1f}x[/] faster ({warm:.1f}s vs {cold:.1f}s).")
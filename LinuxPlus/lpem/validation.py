@@ -1,9 +1,14 @@
 """Challenge validation functions."""
 
+import json
+import operator
 import re
 import shlex
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, ClassVar, Iterator, List, Optional, Pattern, Set, Tuple, Union
 
 # Ensure necessary imports are present
 from .console import console, Panel, RICH_AVAILABLE # Added RICH_AVAILABLE check
@@ -12,1005 +17,1449 @@ from .exceptions import ChallengeValidationError, PracticeToolError, SSHCommandE
 from .network import run_ssh_command, format_ssh_output
 
 
-# --- New Validation Function ---
-def _validate_check_history(step_data: dict, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool) -> bool:
-    """
-    Validates shell history based on patterns or disallowed commands.
-    NOTE: This method is inherently unreliable and easily bypassed. Use with caution.
-    Returns True on success, raises ChallengeValidationError on failure.
-    """
-    command_pattern = step_data.get("command_pattern") # Regex pattern to search for
-    disallowed_commands = step_data.get("disallowed_commands", []) # List of forbidden command strings/patterns
-    history_command = step_data.get("history_command", "cat ~/.bash_history 2>/dev/null || history 2>/dev/null") # Command to get history, adaptable
-    expected_count = step_data.get("expected_count") # Optional: Check for specific count ">0", "==1", ">=2" etc.
+# --- Log Checkpoints (journal cursor / audit log offset) ---
+# Fields kept from each journal entry; everything the journal filters look at
+JOURNAL_FIELDS = ["MESSAGE", "SYSLOG_IDENTIFIER", "_PID", "_COMM", "_SYSTEMD_UNIT", "UNIT", "OBJECT_SYSTEMD_UNIT"]
+_CHECKPOINT_MARKER = "--lpem-audit-size--"
+_AUDIT_EVENT_RE = re.compile(r'msg=audit\([0-9.]+:(\d+)\)')
+_AUDIT_KEY_RE = re.compile(r'\bkey=(?:"([^"]*)"|\(null\)|([0-9A-Fa-f]+))')
 
-    if not command_pattern and not disallowed_commands:
-        raise ChallengeValidationError(["check_history step requires 'command_pattern' or 'disallowed_commands'."])
-    if expected_count and not command_pattern:
-         raise ChallengeValidationError(["check_history step requires 'command_pattern' when 'expected_count' is specified."])
 
+# Runs a check's remote commands. Unset, every command opens its own SSH
+# connection; the async core binds a runner sending them over one connection.
+_command_runner = ContextVar("lpem_command_runner", default=None)
 
-    note = "[Note: History checks are indicative only and easily bypassed]"
 
+@contextmanager
+def command_runner(runner: Callable[[str], Dict[str, Any]]) -> Iterator[None]:
+    """Routes the remote commands of checks run in this context through runner(command) -> result dict."""
+    token = _command_runner.set(runner)
     try:
-        if verbose:
-            console.print(f"[dim]Executing history retrieval command: `{history_command}`[/]")
-        hist_result = run_ssh_command(vm_ip, ssh_user, ssh_key, history_command, verbose=False) # Keep verbose false for run_ssh itself
-
-        # Check for SSH execution errors first
-        if hist_result.get('error'):
-            raise ChallengeValidationError([f"Failed to retrieve command history: {hist_result['error']}", note])
+        yield
+    finally:
+        _command_runner.reset(token)
 
-        # Display formatted output if verbose is enabled for the validation step
-        if verbose:
-            console.print(format_ssh_output(hist_result, history_command))
 
-        history_content = hist_result.get('stdout', '')
-        if not history_content and hist_result.get('exit_status', -1) != 0:
-             # If command failed AND produced no output, history might be unavailable
-             console.print(f"[yellow]Warning:[/yellow] History command failed (Exit: {hist_result.get('exit_status')}) and produced no output.", style="yellow")
-             # Depending on strictness, could raise error here, or allow checks below to fail
-             # For now, let checks below handle empty content
+def _run_remote(vm_ip: str, ssh_user: str, ssh_key: Path, command: str) -> Dict[str, Any]:
+    runner = _command_runner.get()
+    if runner is not None:
+        return runner(command)
+    return run_ssh_command(vm_ip, ssh_user, ssh_key, command, verbose=False)
 
-        step_reasons = []
 
-        # 1. Check for Required Command Pattern
-        if command_pattern:
-            try:
-                matches = re.findall(command_pattern, history_content, re.MULTILINE)
-                actual_count = len(matches)
-
-                # Check against expected_count if provided
-                count_check_passed = True
-                if expected_count:
-                    if isinstance(expected_count, int): # e.g., expected_count: 1
-                        if actual_count != expected_count:
-                            count_check_passed = False
-                            step_reasons.append(f"Expected exactly {expected_count} match(es) for pattern '{command_pattern}', but found {actual_count}.")
-                    elif isinstance(expected_count, str): # e.g., expected_count: ">0", ">=1", "<5"
-                        match = re.match(r'([><=]+)\s*(\d+)', expected_count)
-                        if match:
-                            op = match.group(1)
-                            num = int(match.group(2))
-                            if op == ">" and not actual_count > num: count_check_passed = False
-                            elif op == ">=" and not actual_count >= num: count_check_passed = False
-                            elif op == "<" and not actual_count < num: count_check_passed = False
-                            elif op == "<=" and not actual_count <= num: count_check_passed = False
-                            elif op == "==" and not actual_count == num: count_check_passed = False
-                            elif op == "!=" and not actual_count != num: count_check_passed = False
-                            else:
-                                 # Invalid operator, treat as error in challenge definition? Or ignore?
-                                 console.print(f"[yellow]Warning:[/yellow] Invalid operator in expected_count: '{expected_count}'. Ignoring count check.", style="yellow")
-                        else:
-                             console.print(f"[yellow]Warning:[/yellow] Invalid format for expected_count: '{expected_count}'. Ignoring count check.", style="yellow")
-
-                        if not count_check_passed and f"Expected count '{expected_count}'" not in " ".join(step_reasons): # Avoid duplicate reason prefix
-                             step_reasons.append(f"Expected count '{expected_count}' for pattern '{command_pattern}', but found {actual_count}.")
-
-                    else: # Invalid type for expected_count
-                         console.print(f"[yellow]Warning:[/yellow] Invalid type for expected_count: '{type(expected_count)}'. Ignoring count check.", style="yellow")
-
-                # If no count specified, default is simply > 0 matches needed
-                elif actual_count == 0:
-                     step_reasons.append(f"Expected command pattern '{command_pattern}' not found in history.")
+def _as_root_or_user(script: str) -> str:
+    """Shell command running a script via passwordless sudo, falling back to the SSH user."""
+    quoted = shlex.quote(script)
+    return f"sudo -n sh -c {quoted} 2>/dev/null || sh -c {quoted}"
 
-            except re.error as regex_err:
-                raise ChallengeValidationError([f"Invalid regex in command_pattern '{command_pattern}': {regex_err}", note])
 
-        # 2. Check for Disallowed Commands
-        if disallowed_commands:
-            for disallowed_pattern in disallowed_commands:
-                try:
-                    # Check if the disallowed pattern exists in the history
-                    if re.search(disallowed_pattern, history_content, re.MULTILINE):
-                        step_reasons.append(f"Disallowed command pattern '{disallowed_pattern}' found in history.")
-                except re.error as regex_err:
-                    # Treat error in disallowed pattern as validation failure
-                     step_reasons.append(f"Invalid regex in disallowed_commands '{disallowed_pattern}': {regex_err}")
-
-
-        if step_reasons: raise ChallengeValidationError(step_reasons + [note])
-        return True # All history checks passed
-
-    except SSHCommandError as e: # Catch errors from run_ssh_command itself
-        raise ChallengeValidationError([f"SSH execution failed during history check: {e}", note])
-    except ChallengeValidationError: # Re-raise if already validation error
-        raise
-    except Exception as e: # Catch unexpected errors during check logic
-        raise ChallengeValidationError([f"Unexpected error during history check logic: {e}", note])
-    
-def _validate_check_journalctl(step_data: dict, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool) -> bool:
+class LogCheckpoint:
     """
-    Validates systemd journal entries based on specified filters.
-    Returns True on success, raises ChallengeValidationError on failure.
+    Journal cursor and audit log byte offset recorded when a challenge starts.
+
+    Journal and audit checks then read only what was logged after that point
+    (`journalctl --after-cursor`, `dd skip=offset`). The new entries are
+    fetched once per validation run, parsed on the host and shared by every
+    journal/audit step. Entries read by earlier runs are kept, so validating
+    again only transfers what was logged since the previous run.
     """
-    # --- Parameters for journalctl query ---
-    # Basic filters:
-    service_unit = step_data.get("service") # e.g., "sshd" or "nginx.service"
-    syslog_identifier = step_data.get("syslog_identifier") # e.g., "sudo" or "my_app"
-    command_name = step_data.get("command_name") # e.g., "useradd" (checks _COMM field)
-    message_pattern = step_data.get("message_pattern") # Regex pattern to grep for in messages
 
-    # Time constraints (important to scope the search):
-    # Use relative time like "5 minutes ago", "1 hour ago"
-    # Or potentially pass challenge start time for absolute timestamp "--since @timestamp"
-    since = step_data.get("since", "10 minutes ago") # Default to recent history
+    def __init__(self, journal_cursor: Optional[str] = None, audit_offset: Optional[int] = None,
+                 audit_log_path: Optional[str] = None):
+        self.journal_cursor = journal_cursor
+        self.audit_offset = audit_offset
+        self.audit_inode: Optional[str] = None # Detects rotation even once the new file outgrows the offset
+        self.audit_log_path = audit_log_path or Config.AUDIT_LOG_PATH
+        self.journal_entries: List[Dict[str, str]] = []
+        self.audit_key_events: Dict[str, Set[str]] = {} # rule key -> audit event serials
+        self._journal_read_cursor = journal_cursor
+        self._audit_read_offset = audit_offset
+        self._journal_fresh = False
+        self._audit_fresh = False
+
+    def begin_run(self):
+        """Start a validation run: the next journal/audit step fetches new entries."""
+        self._journal_fresh = False
+        self._audit_fresh = False
+
+    def read_journal(self, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool) -> List[Dict[str, str]]:
+        """Journal entries logged since the checkpoint (fetched at most once per run)."""
+        if self._journal_fresh:
+            return self.journal_entries
+        fields = ",".join(JOURNAL_FIELDS)
+        cmd = f"journalctl --no-pager -q -o json --output-fields={fields} --after-cursor {shlex.quote(self._journal_read_cursor)}"
+        if verbose:
+            console.print(f"[dim]Reading journal since challenge start: `{cmd}`[/]")
+        result = _run_remote(vm_ip, ssh_user, ssh_key, cmd)
+        if result.get('error'):
+            raise ChallengeValidationError([f"Failed to read journal entries: {result['error']}"])
+        stdout = result.get('stdout', '')
+        if result.get('exit_status', -1) != 0 and not stdout:
+            stderr_info = result.get('stderr', '')
+            if stderr_info: # journalctl may exit non-zero with no output when there is nothing new
+                raise ChallengeValidationError([f"Error reading journal (Exit: {result.get('exit_status')}). STDERR: {stderr_info}"])
+
+        new_entries = 0
+        for line in stdout.splitlines():
+            try:
+                raw = json.loads(line)
+            except ValueError:
+                continue # Ignore partial/garbled lines
+            entry = {}
+            for field in JOURNAL_FIELDS:
+                value = raw.get(field)
+                if isinstance(value, list): # Binary fields are arrays of byte values
+                    try:
+                        value = bytes(value).decode('utf-8', errors='replace')
+                    except (TypeError, ValueError):
+                        value = None
+                if value is not None:
+                    entry[field] = str(value)
+            self.journal_entries.append(entry)
+            new_entries += 1
+            if raw.get("__CURSOR"):
+                self._journal_read_cursor = raw["__CURSOR"]
+        if verbose:
+            console.print(f"[dim]Journal: {new_entries} new entries, {len(self.journal_entries)} since challenge start.[/]")
+        self._journal_fresh = True
+        return self.journal_entries
+
+    def read_audit_events(self, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool) -> Dict[str, Set[str]]:
+        """Audit events per rule key logged since the checkpoint (fetched at most once per run)."""
+        if self._audit_fresh:
+            return self.audit_key_events
+        offset = self._audit_read_offset
+        # After log rotation the old file is audit.log.1: finish it, then read the new one from the start
+        script = (
+            f"f={shlex.quote(self.audit_log_path)}; off={int(offset)}; ino={shlex.quote(self.audit_inode or '')}; "
+            f"st=$(stat -c '%i %s' \"$f\") || exit 3; set -- $st; s=$2; echo \"{_CHECKPOINT_MARKER} $1 $s\"; "
+            f"if [ \"$s\" -lt \"$off\" ] || {{ [ -n \"$ino\" ] && [ \"$1\" != \"$ino\" ]; }}; then "
+            f"tail -c +$((off+1)) \"$f.1\" 2>/dev/null; echo; off=0; fi; "
+            # One command (not tail | head), so a failed read fails the script instead of skipping events
+            f"dd if=\"$f\" iflag=skip_bytes,count_bytes skip=$off count=$((s-off)) bs=64K status=none || exit 4"
+        )
+        cmd = _as_root_or_user(script)
+        if verbose:
+            console.print(f"[dim]Reading audit log from byte {offset}: `{cmd}`[/]")
+        result = _run_remote(vm_ip, ssh_user, ssh_key, cmd)
+        if result.get('error'):
+            raise ChallengeValidationError([f"Failed to read audit log: {result['error']}"])
+        lines = result.get('stdout', '').splitlines()
+        if result.get('exit_status', -1) != 0 or not lines or not lines[0].startswith(_CHECKPOINT_MARKER):
+            stderr_info = result.get('stderr', '')
+            raise ChallengeValidationError([f"Cannot read audit log '{self.audit_log_path}' (Exit: {result.get('exit_status')}). Reading it requires root (passwordless sudo). STDERR: {stderr_info}"])
+        marker = lines[0].split()
+        if len(marker) != 3 or not marker[2].isdigit():
+            raise ChallengeValidationError([f"Cannot read audit log '{self.audit_log_path}': unexpected size marker '{lines[0]}'."])
+
+        new_events: Set[str] = set()
+        for line in lines[1:]:
+            event = _AUDIT_EVENT_RE.search(line)
+            key_match = _AUDIT_KEY_RE.search(line)
+            if not event or not key_match:
+                continue
+            if key_match.group(1) is not None:
+                keys = [key_match.group(1)]
+            elif key_match.group(2):
+                # Keys with special characters (and multiple keys) are hex encoded, separated by \x01
+                try:
+                    keys = bytes.fromhex(key_match.group(2)).decode('utf-8', errors='replace').split('\x01')
+                except ValueError:
+                    keys = [key_match.group(2)]
+            else:
+                continue # key=(null)
+            for key in keys:
+                self.audit_key_events.setdefault(key, set()).add(event.group(1))
+            new_events.add(event.group(1))
+        _, self.audit_inode, size = marker
+        self._audit_read_offset = int(size)
+        if verbose:
+            console.print(f"[dim]Audit log: {len(new_events)} new keyed events, read up to byte {self._audit_read_offset}.[/]")
+        self._audit_fresh = True
+        return self.audit_key_events
 
-    # Expected outcome:
-    expected_state = step_data.get("expected_state", True) # Default: Expect entries to exist
 
-    # --- Build journalctl command ---
-    cmd_parts = ["journalctl", "--no-pager"] # Base command
+def capture_log_checkpoint(vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool = False) -> LogCheckpoint:
+    """
+    Records the current journal cursor and audit log size on the VM.
 
-    if since:
-        # Ensure 'since' value is quoted if it contains spaces
-        cmd_parts.extend(["--since", since])
+    Best effort: a position that cannot be read is left as None, and checks
+    relying on it fall back to their time-window query.
+    """
+    checkpoint = LogCheckpoint()
+    audit_path = shlex.quote(checkpoint.audit_log_path)
+    cmd = (
+        "journalctl -n 1 --show-cursor --no-pager -q 2>/dev/null | sed -n 's/^-- cursor: //p'; "
+        f"echo {_CHECKPOINT_MARKER}; "
+        + _as_root_or_user(f"stat -c '%i %s' {audit_path}")
+    )
+    try:
+        result = _run_remote(vm_ip, ssh_user, ssh_key, cmd)
+    except SSHCommandError as e:
+        console.print(f"[yellow]Warning:[/yellow] Could not record log positions ({e}). Journal/audit checks will use time windows.", style="yellow")
+        return checkpoint
+    if result.get('error'):
+        console.print(f"[yellow]Warning:[/yellow] Could not record log positions ({result['error']}). Journal/audit checks will use time windows.", style="yellow")
+        return checkpoint
 
-    # Add filters
+    journal_part, _, audit_part = result.get('stdout', '').partition(_CHECKPOINT_MARKER)
+    cursor = journal_part.strip()
+    checkpoint.journal_cursor = checkpoint._journal_read_cursor = cursor or None
+    try:
+        inode, size = audit_part.split()
+        checkpoint.audit_offset = checkpoint._audit_read_offset = int(size)
+        checkpoint.audit_inode = inode
+    except ValueError:
+        pass # No auditd log (or no permission to read it)
+    if verbose:
+        console.print(f"[dim]Log checkpoint: journal cursor {'recorded' if checkpoint.journal_cursor else 'unavailable'}, "
+                      f"audit offset {checkpoint.audit_offset if checkpoint.audit_offset is not None else 'unavailable'}.[/]")
+    return checkpoint
+
+
+def _journal_entry_matches(entry: Dict[str, str], service_unit: Optional[str], syslog_identifier: Optional[str],
+                           command_name: Optional[str], message_regex: Optional["re.Pattern[str]"]) -> bool:
+    """Applies the check_journalctl filters to one parsed journal entry, like journalctl/grep would."""
     if service_unit:
-        cmd_parts.extend(["-u", service_unit])
-    if syslog_identifier:
-        # Matches SYSLOG_IDENTIFIER= field
-        cmd_parts.append(f"SYSLOG_IDENTIFIER={syslog_identifier}")
-    if command_name:
-        # Matches _COMM= field (command name without path)
-        cmd_parts.append(f"_COMM={command_name}")
-
-    # Add grep for message pattern if specified
-    grep_cmd = ""
-    if message_pattern:
-        # Use grep -E for extended regex, -q for quiet (exit status only)
-        # Pipe journalctl output to grep
-        try:
-            re.compile(message_pattern) # Validate regex pattern
-        except re.error as regex_err:
-            raise ChallengeValidationError([f"Invalid regex in message_pattern '{message_pattern}': {regex_err}"])
-        # Need to carefully quote the pattern for the shell
-        grep_cmd = f" | grep -Eq -- {shlex.quote(message_pattern)}"
-    else:
-        # If no message pattern, just check if journalctl finds *any* entries matching filters
-        # Check exit status of journalctl directly if it found lines
-        # Add --quiet to journalctl to make it exit 0 if entries found, 1 otherwise
-        cmd_parts.append("--quiet")
+        # journalctl -u appends .service to bare names and also matches systemd's own messages about the unit
+        unit = service_unit if "." in service_unit else f"{service_unit}.service"
+        if unit not in (entry.get("_SYSTEMD_UNIT"), entry.get("UNIT"), entry.get("OBJECT_SYSTEMD_UNIT")):
+            return False
+    if syslog_identifier and entry.get("SYSLOG_IDENTIFIER") != syslog_identifier:
+        return False
+    if command_name and entry.get("_COMM") != command_name:
+        return False
+    if message_regex:
+        # Match the "identifier[pid]: message" part of the short output format grep used to see
+        ident = entry.get("SYSLOG_IDENTIFIER") or entry.get("_COMM") or ""
+        pid = entry.get("_PID")
+        line = f"{ident}[{pid}]: {entry.get('MESSAGE', '')}" if pid else f"{ident}: {entry.get('MESSAGE', '')}"
+        if not message_regex.search(line):
+            return False
+    return True
 
-    # Combine parts, ensuring proper quoting only where needed (shlex.quote handles spaces)
-    # Handles cases like --since "10 minutes ago" correctly
-    journal_cmd = " ".join(shlex.quote(part) if any(c in part for c in [' ', '"', "'"]) and not part.startswith(('-', '=')) else part for part in cmd_parts)
-    full_cmd = journal_cmd + grep_cmd
 
-    note = "[Note: Journal checks depend on service logging and journald configuration]"
+# --- Compiled Validation Checks ---
+# Validation steps are compiled once, when the challenge catalog is loaded: each
+# step becomes an immutable check object with its parameters type-checked, its
+# regexes compiled and its shell commands built. Running a check only executes
+# the prebuilt commands, and a malformed step is reported when the challenge
+# loads instead of halfway through a validation run.
 
-    try:
-        if verbose:
-            console.print(f"[dim]Executing journal check command: `{full_cmd}`[/]")
+_COUNT_RE = re.compile(r'([!<>=]+)\s*(\d+)')
+_COUNT_OPS = {
+    ">": operator.gt, ">=": operator.ge, "<": operator.lt,
+    "<=": operator.le, "==": operator.eq, "!=": operator.ne,
+}
 
-        result = run_ssh_command(vm_ip, ssh_user, ssh_key, full_cmd, verbose=False)
 
-        # Check for SSH execution errors first
-        if result.get('error'):
-            raise ChallengeValidationError([f"Failed to execute journal check command: {result['error']}", note])
+def _compile_regex(pattern: Any, field: str, flags: int = 0, notes: Tuple[str, ...] = ()) -> Pattern:
+    """
+    Compiles a regex from a challenge definition, reporting bad patterns as schema errors.
+    The error reads "Invalid regex in <field> '<pattern>'", followed by any notes.
+    """
+    try:
+        return re.compile(pattern, flags)
+    except (re.error, TypeError) as regex_err:
+        raise ChallengeValidationError([f"Invalid regex in {field} '{pattern}': {regex_err}", *notes])
 
-        # Display formatted output if verbose is enabled for the validation step
-        if verbose:
-            console.print(format_ssh_output(result, full_cmd))
 
-        # Determine if entries were found based on exit status
-        # grep -q exits 0 if found, 1 if not found, >1 on error
-        # journalctl --quiet exits 0 if found, 1 if not found
-        exit_status = result.get('exit_status', -1)
-        found_entries = (exit_status == 0)
-        command_error = (exit_status > 1 and message_pattern) or (exit_status < 0) # Grep error or SSH error
+def _quote_cmd(parts: List[str]) -> str:
+    return " ".join(shlex.quote(str(part)) for part in parts)
 
-        if command_error:
-             stderr_info = result.get('stderr', '')
-             raise ChallengeValidationError([f"Error running journal/grep command (Exit: {exit_status}). STDERR: {stderr_info}", note])
 
+@dataclass(frozen=True)
+class ValidationCheck:
+    """
+    A compiled validation step.
 
-        # Compare actual state with expected state
-        if found_entries != expected_state:
-            filter_desc = []
-            if service_unit: filter_desc.append(f"service='{service_unit}'")
-            if syslog_identifier: filter_desc.append(f"identifier='{syslog_identifier}'")
-            if command_name: filter_desc.append(f"command='{command_name}'")
-            if message_pattern: filter_desc.append(f"message matching '{message_pattern}'")
-            filter_str = ", ".join(filter_desc) if filter_desc else "any relevant entries"
+    Subclasses parse their step in compile() (raising ChallengeValidationError
+    for schema errors) and execute it in run(), which returns True on success
+    and raises ChallengeValidationError on failure.
+    """
+    step_type: ClassVar[str] = ""
+    USES_LOG_CHECKPOINT: ClassVar[bool] = False # Journal/audit checks read from the run's LogCheckpoint
 
-            state_str = "found" if found_entries else "not found"
-            expected_str = "exist" if expected_state else "not exist"
-            step_reasons = [f"Expected journal entries for {filter_str} (since '{since}') to {expected_str}, but they were {state_str}.", note]
-            raise ChallengeValidationError(step_reasons)
+    @classmethod
+    def compile(cls, step_data: dict) -> "ValidationCheck":
+        raise NotImplementedError
 
-        return True # Validation passed
+    def run(self, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool,
+            log_checkpoint: Optional[LogCheckpoint] = None) -> bool:
+        raise NotImplementedError
 
-    except SSHCommandError as e:
-        raise ChallengeValidationError([f"SSH execution failed during journal check: {e}", note])
-    except ChallengeValidationError: # Re-raise if already validation error
-        raise
-    except Exception as e: # Catch unexpected errors
-        raise ChallengeValidationError([f"Unexpected error during journal check logic: {e}", note])
 
-def _validate_check_audit_log(step_data: dict, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool) -> bool:
+@dataclass(frozen=True)
+class HistoryCheck(ValidationCheck):
     """
-    Validates auditd log entries based on a rule key.
-    NOTE: Requires auditd to be installed, running, and configured with appropriate rules on the VM.
-    Returns True on success, raises ChallengeValidationError on failure.
+    Validates shell history based on patterns or disallowed commands.
+    NOTE: This method is inherently unreliable and easily bypassed. Use with caution.
     """
-    rule_key = step_data.get("rule_key") # The '-k keyname' used in auditd rules
-    # Optional: Add other ausearch filters like '--comm', '--uid', '--syscall' if needed
-    since = step_data.get("since", "recent") # Use 'recent', 'today', 'yesterday', or specific time/date
-    expected_state = step_data.get("expected_state", True) # Default: Expect entries to exist
-
-    if not rule_key:
-        raise ChallengeValidationError(["check_audit_log step requires 'rule_key'."])
+    step_type: ClassVar[str] = "check_history"
+    NOTE: ClassVar[str] = "[Note: History checks are indicative only and easily bypassed]"
+
+    history_command: str
+    command_pattern: Optional[str]
+    command_regex: Optional[Pattern]
+    disallowed: Tuple[Tuple[str, Pattern], ...]
+    expected_count: Any # As written in the challenge, for messages
+    count_op: Optional[str] # None: at least one match is required
+    count_num: int
+
+    @classmethod
+    def compile(cls, step_data: dict) -> "HistoryCheck":
+        command_pattern = step_data.get("command_pattern") # Regex pattern to search for
+        disallowed_commands = step_data.get("disallowed_commands") or [] # List of forbidden command patterns
+        history_command = step_data.get("history_command", "cat ~/.bash_history 2>/dev/null || history 2>/dev/null") # Command to get history, adaptable
+        expected_count = step_data.get("expected_count") # Optional: ">0", "==1", ">=2" or an exact integer
+
+        if not command_pattern and not disallowed_commands:
+            raise ChallengeValidationError(["check_history step requires 'command_pattern' or 'disallowed_commands'."])
+        if expected_count and not command_pattern:
+            raise ChallengeValidationError(["check_history step requires 'command_pattern' when 'expected_count' is specified."])
+        if not isinstance(disallowed_commands, list):
+            raise ChallengeValidationError(["check_history 'disallowed_commands' must be a list."])
+
+        count_op, count_num = None, 0
+        if expected_count:
+            if isinstance(expected_count, int) and not isinstance(expected_count, bool):
+                count_op, count_num = "==", expected_count
+            elif isinstance(expected_count, str):
+                match = _COUNT_RE.fullmatch(expected_count.strip())
+                if not match or match.group(1) not in _COUNT_OPS:
+                    raise ChallengeValidationError([f"Invalid expected_count '{expected_count}'. Use an integer or a comparison such as '>0', '>=2' or '==1'."])
+                count_op, count_num = match.group(1), int(match.group(2))
+            else:
+                raise ChallengeValidationError([f"Invalid type for expected_count: '{type(expected_count).__name__}'. Use an integer or a comparison string."])
+
+        return cls(
+            history_command=history_command,
+            command_pattern=command_pattern,
+            command_regex=_compile_regex(command_pattern, "command_pattern", re.MULTILINE, (cls.NOTE,)) if command_pattern else None,
+            disallowed=tuple((pattern, _compile_regex(pattern, "disallowed_commands", re.MULTILINE, (cls.NOTE,))) for pattern in disallowed_commands),
+            expected_count=expected_count,
+            count_op=count_op,
+            count_num=count_num,
+        )
+
+    def run(self, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool,
+            log_checkpoint: Optional[LogCheckpoint] = None) -> bool:
+        note = self.NOTE
+        try:
+            if verbose:
+                console.print(f"[dim]Executing history retrieval command: `{self.history_command}`[/]")
+            hist_result = _run_remote(vm_ip, ssh_user, ssh_key, self.history_command)
+
+            # Check for SSH execution errors first
+            if hist_result.get('error'):
+                raise ChallengeValidationError([f"Failed to retrieve command history: {hist_result['error']}", note])
+
+            # Display formatted output if verbose is enabled for the validation step
+            if verbose:
+                console.print(format_ssh_output(hist_result, self.history_command))
+
+            history_content = hist_result.get('stdout', '')
+            if not history_content and hist_result.get('exit_status', -1) != 0:
+                 # If command failed AND produced no output, history might be unavailable
+                 # Let the checks below handle the empty content
+                 console.print(f"[yellow]Warning:[/yellow] History command failed (Exit: {hist_result.get('exit_status')}) and produced no output.", style="yellow")
+
+            step_reasons = []
+
+            # 1. Check for Required Command Pattern
+            if self.command_regex is not None:
+                actual_count = len(self.command_regex.findall(history_content))
+                if self.count_op is None:
+                    # If no count specified, default is simply > 0 matches needed
+                    if actual_count == 0:
+                        step_reasons.append(f"Expected command pattern '{self.command_pattern}' not found in history.")
+                elif not _COUNT_OPS[self.count_op](actual_count, self.count_num):
+                    if isinstance(self.expected_count, int):
+                        step_reasons.append(f"Expected exactly {self.expected_count} match(es) for pattern '{self.command_pattern}', but found {actual_count}.")
+                    else:
+                        step_reasons.append(f"Expected count '{self.expected_count}' for pattern '{self.command_pattern}', but found {actual_count}.")
+
+            # 2. Check for Disallowed Commands
+            for disallowed_pattern, disallowed_regex in self.disallowed:
+                if disallowed_regex.search(history_content):
+                    step_reasons.append(f"Disallowed command pattern '{disallowed_pattern}' found in history.")
+
+            if step_reasons: raise ChallengeValidationError(step_reasons + [note])
+            return True # All history checks passed
+
+        except SSHCommandError as e: # Catch errors from run_ssh_command itself
+            raise ChallengeValidationError([f"SSH execution failed during history check: {e}", note])
+        except ChallengeValidationError: # Re-raise if already validation error
+            raise
+        except Exception as e: # Catch unexpected errors during check logic
+            raise ChallengeValidationError([f"Unexpected error during history check logic: {e}", note])
+
+
+def _journal_mismatch(found_entries: bool, expected_state: bool, filter_desc: str, scope: str, note: str) -> ChallengeValidationError:
+    """Builds the failure for a journal check whose result differs from expected_state."""
+    state_str = "found" if found_entries else "not found"
+    expected_str = "exist" if expected_state else "not exist"
+    return ChallengeValidationError([f"Expected journal entries for {filter_desc} ({scope}) to {expected_str}, but they were {state_str}.", note])
+
+
+@dataclass(frozen=True)
+class JournalCheck(ValidationCheck):
+    """
+    Validates systemd journal entries based on specified filters.
+    With a log checkpoint (and no explicit 'since'), only entries logged after
+    the challenge started are checked, from the run's shared journal read.
+    """
+    step_type: ClassVar[str] = "check_journalctl"
+    USES_LOG_CHECKPOINT: ClassVar[bool] = True
+    NOTE: ClassVar[str] = "[Note: Journal checks depend on service logging and journald configuration]"
+
+    service_unit: Optional[str]
+    syslog_identifier: Optional[str]
+    command_name: Optional[str]
+    message_pattern: Optional[str]
+    message_regex: Optional[Pattern]
+    since: Optional[str]
+    use_checkpoint: bool # False when the step pins its own 'since' window
+    expected_state: bool
+    command: str # Time-window query used without a checkpoint
+    filter_desc: str
+
+    @classmethod
+    def compile(cls, step_data: dict) -> "JournalCheck":
+        # Basic filters:
+        service_unit = step_data.get("service") # e.g., "sshd" or "nginx.service"
+        syslog_identifier = step_data.get("syslog_identifier") # e.g., "sudo" or "my_app"
+        command_name = step_data.get("command_name") # e.g., "useradd" (checks _COMM field)
+        message_pattern = step_data.get("message_pattern") # Regex pattern to grep for in messages
+        # Time constraint for the query without a checkpoint, e.g. "5 minutes ago", "1 hour ago"
+        since = step_data.get("since", "10 minutes ago")
+        expected_state = step_data.get("expected_state", True) # Default: Expect entries to exist
+
+        message_regex = _compile_regex(message_pattern, "message_pattern") if message_pattern else None
+
+        # --- Build journalctl command ---
+        cmd_parts = ["journalctl", "--no-pager"]
+        if since:
+            cmd_parts.extend(["--since", since])
+        if service_unit:
+            cmd_parts.extend(["-u", service_unit])
+        if syslog_identifier:
+            # Matches SYSLOG_IDENTIFIER= field
+            cmd_parts.append(f"SYSLOG_IDENTIFIER={syslog_identifier}")
+        if command_name:
+            # Matches _COMM= field (command name without path)
+            cmd_parts.append(f"_COMM={command_name}")
+
+        grep_cmd = ""
+        if message_pattern:
+            # Pipe journalctl output to grep -E (extended regex), -q for quiet (exit status only)
+            grep_cmd = f" | grep -Eq -- {shlex.quote(message_pattern)}"
+        else:
+            # Without a message pattern, --quiet makes journalctl exit 0 if entries were found, 1 otherwise
+            cmd_parts.append("--quiet")
+
+        # Quote only parts that need it (handles --since "10 minutes ago")
+        journal_cmd = " ".join(shlex.quote(part) if any(c in part for c in [' ', '"', "'"]) and not part.startswith(('-', '=')) else part for part in cmd_parts)
+
+        filter_desc = []
+        if service_unit: filter_desc.append(f"service='{service_unit}'")
+        if syslog_identifier: filter_desc.append(f"identifier='{syslog_identifier}'")
+        if command_name: filter_desc.append(f"command='{command_name}'")
+        if message_pattern: filter_desc.append(f"message matching '{message_pattern}'")
+
+        return cls(
+            service_unit=service_unit,
+            syslog_identifier=syslog_identifier,
+            command_name=command_name,
+            message_pattern=message_pattern,
+            message_regex=message_regex,
+            since=since,
+            use_checkpoint="since" not in step_data,
+            expected_state=expected_state,
+            command=journal_cmd + grep_cmd,
+            filter_desc=", ".join(filter_desc) if filter_desc else "any relevant entries",
+        )
+
+    def run(self, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool,
+            log_checkpoint: Optional[LogCheckpoint] = None) -> bool:
+        note = self.NOTE
+
+        # --- Checkpoint: filter the entries read since the challenge started on the host ---
+        if log_checkpoint is not None and log_checkpoint.journal_cursor and self.use_checkpoint:
+            try:
+                entries = log_checkpoint.read_journal(vm_ip, ssh_user, ssh_key, verbose)
+            except SSHCommandError as e:
+                raise ChallengeValidationError([f"SSH execution failed during journal check: {e}", note])
+            except ChallengeValidationError as e:
+                raise ChallengeValidationError(e.reasons + [note])
+            matches = sum(1 for entry in entries
+                          if _journal_entry_matches(entry, self.service_unit, self.syslog_identifier, self.command_name, self.message_regex))
+            if verbose:
+                console.print(f"[dim]Journal check: {matches} of {len(entries)} entries match.[/]")
+            found_entries = matches > 0
+            if found_entries != self.expected_state:
+                raise _journal_mismatch(found_entries, self.expected_state, self.filter_desc, "since the challenge started", note)
+            return True
 
-    # Construct ausearch command.
-    # --input-logs: Necessary if running shortly after event, ensures logs are flushed/read.
-    # -k key: Filter by rule key.
-    # --start time: Scope the search (e.g., 'recent', 'today').
-    # -i: Interpret numeric values into text (e.g., UIDs). Helpful for debugging but not needed for -q.
-    # We need to check the exit status, so run without -q first if verbose, then with -q.
-    # Command for checking existence (quiet):
-    audit_cmd_quiet_parts = ["ausearch", "--input-logs", "-k", rule_key, "--start", since, "-c"] # Using -c for count > 0 check
+        try:
+            if verbose:
+                console.print(f"[dim]Executing journal check command: `{self.command}`[/]")
 
-    # Combine parts, ensuring proper quoting
-    audit_cmd_quiet = " ".join(shlex.quote(part) for part in audit_cmd_quiet_parts)
+            result = _run_remote(vm_ip, ssh_user, ssh_key, self.command)
 
-    note = "[Note: Audit log checks depend on auditd service running and correctly configured rules]"
+            # Check for SSH execution errors first
+            if result.get('error'):
+                raise ChallengeValidationError([f"Failed to execute journal check command: {result['error']}", note])
 
-    try:
-        if verbose:
-            # For verbose mode, run *without* -c first to see entries
-            verbose_cmd_parts = ["ausearch", "--input-logs", "-k", rule_key, "--start", since, "-i"]
-            verbose_cmd = " ".join(shlex.quote(part) for part in verbose_cmd_parts)
-            console.print(f"[dim]Executing verbose audit check command: `{verbose_cmd}`[/]")
-            verbose_result = run_ssh_command(vm_ip, ssh_user, ssh_key, verbose_cmd, verbose=False)
-            console.print(format_ssh_output(verbose_result, verbose_cmd)) # Show potential entries
-            # Then run the count command for the actual check
-            console.print(f"[dim]Executing audit check command (count): `{audit_cmd_quiet}`[/]")
+            # Display formatted output if verbose is enabled for the validation step
+            if verbose:
+                console.print(format_ssh_output(result, self.command))
 
+            # Determine if entries were found based on exit status
+            # grep -q exits 0 if found, 1 if not found, >1 on error
+            # journalctl --quiet exits 0 if found, 1 if not found
+            exit_status = result.get('exit_status', -1)
+            found_entries = (exit_status == 0)
+            command_error = (exit_status > 1 and self.message_pattern) or (exit_status < 0) # Grep error or SSH error
 
-        result = run_ssh_command(vm_ip, ssh_user, ssh_key, audit_cmd_quiet, verbose=False) # Always run count check
+            if command_error:
+                 stderr_info = result.get('stderr', '')
+                 raise ChallengeValidationError([f"Error running journal/grep command (Exit: {exit_status}). STDERR: {stderr_info}", note])
 
-        # Check for SSH execution errors first
-        if result.get('error'):
-            raise ChallengeValidationError([f"Failed to execute audit check command: {result['error']}", note])
+            # Compare actual state with expected state
+            if found_entries != self.expected_state:
+                raise _journal_mismatch(found_entries, self.expected_state, self.filter_desc, f"since '{self.since}'", note)
 
-        # Display count command output if verbose (usually just a number or empty)
-        if verbose:
-             console.print(format_ssh_output(result, audit_cmd_quiet))
+            return True # Validation passed
 
+        except SSHCommandError as e:
+            raise ChallengeValidationError([f"SSH execution failed during journal check: {e}", note])
+        except ChallengeValidationError: # Re-raise if already validation error
+            raise
+        except Exception as e: # Catch unexpected errors
+            raise ChallengeValidationError([f"Unexpected error during journal check logic: {e}", note])
 
-        # Determine if entries were found based on output count
-        # ausearch -c outputs a number (count). We expect > 0 if entries exist.
-        exit_status = result.get('exit_status', -1)
-        stdout = result.get('stdout', '').strip()
-        found_entries = False
-        command_error = (exit_status != 0) # Any non-zero exit is likely an ausearch error
 
-        if not command_error:
+@dataclass(frozen=True)
+class AuditLogCheck(ValidationCheck):
+    """
+    Validates auditd log entries based on a rule key.
+    With a log checkpoint (and no explicit 'since'), only audit records written
+    after the challenge started are checked, from the run's shared audit log read.
+    NOTE: Requires auditd to be installed, running, and configured with appropriate rules on the VM.
+    """
+    step_type: ClassVar[str] = "check_audit_log"
+    USES_LOG_CHECKPOINT: ClassVar[bool] = True
+    NOTE: ClassVar[str] = "[Note: Audit log checks depend on auditd service running and correctly configured rules]"
+
+    rule_key: str
+    since: str
+    use_checkpoint: bool # False when the step pins its own 'since' window
+    expected_state: bool
+    count_command: str
+    verbose_command: str
+
+    @classmethod
+    def compile(cls, step_data: dict) -> "AuditLogCheck":
+        rule_key = step_data.get("rule_key") # The '-k keyname' used in auditd rules
+        since = step_data.get("since", "recent") # Use 'recent', 'today', 'yesterday', or specific time/date
+        expected_state = step_data.get("expected_state", True) # Default: Expect entries to exist
+
+        if not rule_key:
+            raise ChallengeValidationError(["check_audit_log step requires 'rule_key'."])
+
+        # ausearch: --input-logs ensures logs are read even right after the event,
+        # -k filters by rule key, --start scopes the search, -c prints the match count.
+        # The verbose variant lists the entries (-i interprets numeric values).
+        return cls(
+            rule_key=rule_key,
+            since=since,
+            use_checkpoint="since" not in step_data,
+            expected_state=expected_state,
+            count_command=_quote_cmd(["ausearch", "--input-logs", "-k", rule_key, "--start", since, "-c"]),
+            verbose_command=_quote_cmd(["ausearch", "--input-logs", "-k", rule_key, "--start", since, "-i"]),
+        )
+
+    def run(self, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool,
+            log_checkpoint: Optional[LogCheckpoint] = None) -> bool:
+        note = self.NOTE
+        rule_key = self.rule_key
+
+        # --- Checkpoint: count keyed events read since the challenge started ---
+        if log_checkpoint is not None and log_checkpoint.audit_offset is not None and self.use_checkpoint:
             try:
-                 count = int(stdout)
-                 if count > 0:
-                      found_entries = True
-            except (ValueError, TypeError):
-                 # If output is not an integer, ausearch likely failed or had no results in a way that didn't change exit code (unlikely but possible)
-                 command_error = True
-
-        if command_error:
-             stderr_info = result.get('stderr', '')
-             raise ChallengeValidationError([f"Error running ausearch command (Exit: {exit_status}). Check auditd status/config. STDOUT: '{stdout}' STDERR: {stderr_info}", note])
-
-        # Compare actual state with expected state
-        if found_entries != expected_state:
-            state_str = "found" if found_entries else "not found"
-            expected_str = "exist" if expected_state else "not exist"
-            step_reasons = [f"Expected audit log entries for key '{rule_key}' (since '{since}') to {expected_str}, but they were {state_str}.", note]
-            # Optionally add stderr if it contains useful info about why search failed
-            stderr_info = result.get('stderr', '').strip()
-            if stderr_info:
-                 step_reasons.append(f"ausearch STDERR: {stderr_info}")
-            raise ChallengeValidationError(step_reasons)
-
-        return True # Validation passed
+                key_events = log_checkpoint.read_audit_events(vm_ip, ssh_user, ssh_key, verbose)
+            except SSHCommandError as e:
+                raise ChallengeValidationError([f"SSH execution failed during audit log check: {e}", note])
+            except ChallengeValidationError as e:
+                raise ChallengeValidationError(e.reasons + [note])
+            count = len(key_events.get(rule_key, ()))
+            if verbose:
+                console.print(f"[dim]Audit check: {count} events with key '{rule_key}' since the challenge started.[/]")
+            found_entries = count > 0
+            if found_entries != self.expected_state:
+                state_str = "found" if found_entries else "not found"
+                expected_str = "exist" if self.expected_state else "not exist"
+                raise ChallengeValidationError([f"Expected audit log entries for key '{rule_key}' (since the challenge started) to {expected_str}, but they were {state_str}.", note])
+            return True
+
+        try:
+            if verbose:
+                # For verbose mode, run *without* -c first to see entries
+                console.print(f"[dim]Executing verbose audit check command: `{self.verbose_command}`[/]")
+                verbose_result = _run_remote(vm_ip, ssh_user, ssh_key, self.verbose_command)
+                console.print(format_ssh_output(verbose_result, self.verbose_command)) # Show potential entries
+                # Then run the count command for the actual check
+                console.print(f"[dim]Executing audit check command (count): `{self.count_command}`[/]")
+
+            result = _run_remote(vm_ip, ssh_user, ssh_key, self.count_command) # Always run count check
+
+            # Check for SSH execution errors first
+            if result.get('error'):
+                raise ChallengeValidationError([f"Failed to execute audit check command: {result['error']}", note])
+
+            # Display count command output if verbose (usually just a number or empty)
+            if verbose:
+                 console.print(format_ssh_output(result, self.count_command))
+
+            # ausearch -c outputs a number (count). We expect > 0 if entries exist.
+            exit_status = result.get('exit_status', -1)
+            stdout = result.get('stdout', '').strip()
+            found_entries = False
+            command_error = (exit_status != 0) # Any non-zero exit is likely an ausearch error
+
+            if not command_error:
+                try:
+                     found_entries = int(stdout) > 0
+                except (ValueError, TypeError):
+                     # Output is not an integer: ausearch failed without changing its exit code
+                     command_error = True
+
+            if command_error:
+                 stderr_info = result.get('stderr', '')
+                 raise ChallengeValidationError([f"Error running ausearch command (Exit: {exit_status}). Check auditd status/config. STDOUT: '{stdout}' STDERR: {stderr_info}", note])
+
+            # Compare actual state with expected state
+            if found_entries != self.expected_state:
+                state_str = "found" if found_entries else "not found"
+                expected_str = "exist" if self.expected_state else "not exist"
+                step_reasons = [f"Expected audit log entries for key '{rule_key}' (since '{self.since}') to {expected_str}, but they were {state_str}.", note]
+                # Add stderr if it contains useful info about why search failed
+                stderr_info = result.get('stderr', '').strip()
+                if stderr_info:
+                     step_reasons.append(f"ausearch STDERR: {stderr_info}")
+                raise ChallengeValidationError(step_reasons)
+
+            return True # Validation passed
+
+        except SSHCommandError as e:
+            raise ChallengeValidationError([f"SSH execution failed during audit log check: {e}", note])
+        except ChallengeValidationError: # Re-raise if already validation error
+            raise
+        except Exception as e: # Catch unexpected errors
+            raise ChallengeValidationError([f"Unexpected error during audit log check logic: {e}", note])
 
-    except SSHCommandError as e:
-        raise ChallengeValidationError([f"SSH execution failed during audit log check: {e}", note])
-    except ChallengeValidationError: # Re-raise if already validation error
-        raise
-    except Exception as e: # Catch unexpected errors
-        raise ChallengeValidationError([f"Unexpected error during audit log check logic: {e}", note])
 
-def _validate_check_process(step_data: dict, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool) -> bool:
+@dataclass(frozen=True)
+class ProcessCheck(ValidationCheck):
     """
     Validates if a process is running/not running based on its name.
     Optionally checks for the existence of a PID file.
-    Returns True on success, raises ChallengeValidationError on failure.
     """
-    # --- Parameters for process check ---
-    process_name = step_data.get("process_name") # e.g., "sshd", "nginx"
-    expected_state = step_data.get("expected_state") # True (running) / False (not running)
-    pid_file = step_data.get("pid_file") # Optional: Path to PID file to check existence
+    step_type: ClassVar[str] = "check_process"
+    NOTE: ClassVar[str] = "[Note: Process checks rely on pgrep utility on the VM]"
+
+    process_name: str
+    expected_state: bool
+    pid_file: Optional[str]
+    pgrep_command: str
+    pid_file_command: Optional[str]
+
+    @classmethod
+    def compile(cls, step_data: dict) -> "ProcessCheck":
+        process_name = step_data.get("process_name") # e.g., "sshd", "nginx"
+        expected_state = step_data.get("expected_state") # True (running) / False (not running)
+        pid_file = step_data.get("pid_file") # Optional: Path to PID file to check existence
+
+        if process_name is None or expected_state is None:
+            raise ChallengeValidationError(["check_process step requires 'process_name' and 'expected_state'."])
+        if not isinstance(process_name, str) or not process_name:
+             raise ChallengeValidationError(["check_process 'process_name' must be a non-empty string."])
+        if not isinstance(expected_state, bool):
+             raise ChallengeValidationError(["check_process 'expected_state' must be true or false."])
+        if pid_file and not isinstance(pid_file, str):
+             raise ChallengeValidationError(["check_process 'pid_file' must be a string if provided."])
+
+        return cls(
+            process_name=process_name,
+            expected_state=expected_state,
+            pid_file=pid_file or None,
+            # pgrep -x for exact match. It exits 0 if found, 1 if not found.
+            pgrep_command=f"pgrep -x -- {shlex.quote(process_name)}",
+            pid_file_command=f"test -f {shlex.quote(pid_file)}" if pid_file else None,
+        )
+
+    def run(self, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool,
+            log_checkpoint: Optional[LogCheckpoint] = None) -> bool:
+        note = self.NOTE
+        process_name = self.process_name
+        expected_state = self.expected_state
 
-    if process_name is None or expected_state is None:
-        raise ChallengeValidationError(["check_process step requires 'process_name' and 'expected_state'."])
-    if not isinstance(process_name, str) or not process_name:
-         raise ChallengeValidationError(["check_process 'process_name' must be a non-empty string."])
-    if not isinstance(expected_state, bool):
-         raise ChallengeValidationError(["check_process 'expected_state' must be true or false."])
-    if pid_file and not isinstance(pid_file, str):
-         raise ChallengeValidationError(["check_process 'pid_file' must be a string if provided."])
-
-
-    # --- Build pgrep command ---
-    # Use pgrep: -x for exact match. It exits 0 if found, 1 if not found.
-    cmd_pgrep = f"pgrep -x -- {shlex.quote(process_name)}"
-
-    note = "[Note: Process checks rely on pgrep utility on the VM]"
-    step_reasons = []
-
-    try:
-        # 1. Check Process Running State
-        if verbose:
-            console.print(f"[dim]Executing process check command: `{cmd_pgrep}`[/]")
-        result_pgrep = run_ssh_command(vm_ip, ssh_user, ssh_key, cmd_pgrep, verbose=False)
-
-        if result_pgrep.get('error'):
-            raise ChallengeValidationError([f"Failed to execute pgrep command: {result_pgrep['error']}", note])
-
-        if verbose:
-            console.print(format_ssh_output(result_pgrep, cmd_pgrep))
-
-        exit_status = result_pgrep.get('exit_status', -1)
-        process_is_running = (exit_status == 0) # pgrep exits 0 if found
-        pgrep_error = (exit_status > 1) # pgrep exit code 1 means "not found", >1 means error
-
-        if pgrep_error:
-             stderr_info = result_pgrep.get('stderr', '')
-             step_reasons.append(f"Error running pgrep for '{process_name}' (Exit: {exit_status}). STDERR: {stderr_info}")
-             # Cannot reliably determine running state if pgrep failed, so raise error
-             raise ChallengeValidationError(step_reasons + [note])
-
-        # Compare actual running state with expected state
-        if process_is_running != expected_state:
-            state_str = "running" if process_is_running else "not running"
-            expected_str = "be running" if expected_state else "not be running"
-            step_reasons.append(f"Expected process '{process_name}' to {expected_str}, but it was {state_str}.")
-            # If the state check fails, raise immediately
-            raise ChallengeValidationError(step_reasons + [note])
-
-        # 2. Optionally Check PID File Existence (only if primary state check passed)
-        if pid_file:
-             cmd_pid_check = f"test -f {shlex.quote(pid_file)}"
-             if verbose:
-                  console.print(f"[dim]Checking PID file existence: `{cmd_pid_check}`[/]")
-
-             result_pid = run_ssh_command(vm_ip, ssh_user, ssh_key, cmd_pid_check, verbose=False)
-
-             if result_pid.get('error'):
-                  raise ChallengeValidationError([f"Failed to check PID file '{pid_file}': {result_pid['error']}", note])
-
-             if verbose:
-                   console.print(format_ssh_output(result_pid, cmd_pid_check))
-
-             pid_file_exists = (result_pid.get('exit_status') == 0) # test -f exits 0 if file exists
-
-             # Usually, if checking a PID file, you expect it to exist *if* the process should be running
-             # And expect it *not* to exist if the process should *not* be running
-             # Modify this logic if a different expectation is needed
-             if pid_file_exists != expected_state:
-                  pid_state_str = "exists" if pid_file_exists else "does not exist"
-                  pid_expected_str = "exist" if expected_state else "not exist"
-                  step_reasons.append(f"Expected PID file '{pid_file}' to {pid_expected_str} (matching expected process state), but it {pid_state_str}.")
-                  raise ChallengeValidationError(step_reasons + [note])
-             # If we reach here, PID file state matches expected process state
-             if verbose:
-                 console.print(f"[dim]PID file '{pid_file}' state consistent with expected process state.[/]")
-
-
-        # If we reach here without raising an error, all checks passed
-        return True
-
-    except SSHCommandError as e:
-        # Catch SSH errors during either command execution
-        raise ChallengeValidationError([f"SSH execution failed during process check: {e}", note])
-    except ChallengeValidationError:
-        # Re-raise specific validation failures
-        raise
-    except Exception as e: # Catch unexpected errors
-        raise ChallengeValidationError([f"Unexpected error during process check logic: {e}", note])
-    
-# --- Existing Validation Functions ---
-def _validate_run_command(step_data: dict, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool) -> bool:
-    # ... (existing implementation) ...
-    command = step_data.get("command")
-    if not command: raise ChallengeValidationError(["Missing 'command' in run_command step."])
-
-    criteria = step_data.get("success_criteria", {"exit_status": Config.EXIT_CODE_ACTIVE}) # Default criteria = exit 0
-
-    try:
-        val_result = run_ssh_command(vm_ip, ssh_user, ssh_key, command, verbose=False)
-    except SSHCommandError as e: # Make sure to catch SSHCommandError here too
-        raise ChallengeValidationError([f"SSH execution failed for command check: {e}"])
-    except Exception as e:
-        raise ChallengeValidationError([f"Unexpected error running command '{command}': {e}"])
-
-    if verbose: console.print(format_ssh_output(val_result, command))
-
-    if val_result.get('error'):
-         raise ChallengeValidationError([f"Command execution error: {val_result['error']}"])
-
-    step_reasons = []
-    actual_status = val_result.get('exit_status', -1)
-    actual_stdout = val_result.get('stdout', '')
-    actual_stderr = val_result.get('stderr', '')
-
-    # 1. Exit Status Check
-    expected_status = criteria.get("exit_status")
-    if expected_status is not None:
         try:
-             expected_status_int = int(expected_status)
-             if actual_status != expected_status_int:
-                 step_reasons.append(f"Expected exit status {expected_status_int}, but got {actual_status}.")
-        except (ValueError, TypeError):
-             raise ChallengeValidationError([f"Invalid non-integer 'exit_status' in success_criteria: {expected_status}"])
+            # 1. Check Process Running State
+            if verbose:
+                console.print(f"[dim]Executing process check command: `{self.pgrep_command}`[/]")
+            result_pgrep = _run_remote(vm_ip, ssh_user, ssh_key, self.pgrep_command)
 
+            if result_pgrep.get('error'):
+                raise ChallengeValidationError([f"Failed to execute pgrep command: {result_pgrep['error']}", note])
 
-    # 2. STDOUT Checks
-    stdout_equals = criteria.get("stdout_equals")
-    if stdout_equals is not None and actual_stdout != stdout_equals:
-        # Avoid printing potentially large/sensitive values in error message by default
-        step_reasons.append(f"stdout did not exactly match expected value.")
-        if verbose: # Optionally show diff if verbose
-             # You could add a diff library here if needed, or just show actual vs expected
-             step_reasons.append(f"  Expected: '{stdout_equals}'")
-             step_reasons.append(f"  Actual:   '{actual_stdout}'")
+            if verbose:
+                console.print(format_ssh_output(result_pgrep, self.pgrep_command))
 
+            exit_status = result_pgrep.get('exit_status', -1)
+            process_is_running = (exit_status == 0) # pgrep exits 0 if found
 
-    stdout_contains = criteria.get("stdout_contains")
-    if stdout_contains is not None and stdout_contains not in actual_stdout:
-         step_reasons.append(f"stdout did not contain expected text: '{stdout_contains}'")
+            if exit_status > 1: # pgrep exit code 1 means "not found", >1 means error
+                 # Cannot reliably determine running state if pgrep failed
+                 stderr_info = result_pgrep.get('stderr', '')
+                 raise ChallengeValidationError([f"Error running pgrep for '{process_name}' (Exit: {exit_status}). STDERR: {stderr_info}", note])
 
-    stdout_matches_regex = criteria.get("stdout_matches_regex")
-    if stdout_matches_regex is not None:
-        try:
-            if not re.search(stdout_matches_regex, actual_stdout, re.MULTILINE):
-                step_reasons.append(f"stdout did not match regex '{stdout_matches_regex}'.")
-        except re.error as regex_err:
-            raise ChallengeValidationError([f"Invalid regex in challenge definition '{stdout_matches_regex}': {regex_err}"])
-
-    # 3. STDERR Checks
-    stderr_empty = criteria.get("stderr_empty", False) # Default is False, allow stderr
-    if stderr_empty and actual_stderr:
-        step_reasons.append(f"Expected stderr to be empty, but it was not.")
-        if verbose:
-             step_reasons.append(f"  Actual STDERR: '{actual_stderr}'")
+            if process_is_running != expected_state:
+                state_str = "running" if process_is_running else "not running"
+                expected_str = "be running" if expected_state else "not be running"
+                raise ChallengeValidationError([f"Expected process '{process_name}' to {expected_str}, but it was {state_str}.", note])
 
+            # 2. Optionally Check PID File Existence (only if primary state check passed)
+            if self.pid_file_command:
+                 if verbose:
+                      console.print(f"[dim]Checking PID file existence: `{self.pid_file_command}`[/]")
 
-    stderr_contains = criteria.get("stderr_contains")
-    if stderr_contains is not None and stderr_contains not in actual_stderr:
-        step_reasons.append(f"stderr did not contain expected text: '{stderr_contains}'")
+                 result_pid = _run_remote(vm_ip, ssh_user, ssh_key, self.pid_file_command)
 
-    # 4. Explicitly check for *no* stdout/stderr if requested
-    stdout_empty = criteria.get("stdout_empty", False)
-    if stdout_empty and actual_stdout:
-        step_reasons.append(f"Expected stdout to be empty, but it was not.")
-        if verbose:
-             step_reasons.append(f"  Actual STDOUT: '{actual_stdout}'")
+                 if result_pid.get('error'):
+                      raise ChallengeValidationError([f"Failed to check PID file '{self.pid_file}': {result_pid['error']}", note])
 
-    if step_reasons: raise ChallengeValidationError(step_reasons)
-    return True
+                 if verbose:
+                       console.print(format_ssh_output(result_pid, self.pid_file_command))
 
-def _validate_check_service_status(step_data: dict, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool) -> bool:
-    # ... (existing implementation) ...
-    service_name = step_data.get("service")
-    expected_status = step_data.get("expected_status")
-    check_enabled = step_data.get("check_enabled") # Allow None, False, True
+                 pid_file_exists = (result_pid.get('exit_status') == 0) # test -f exits 0 if file exists
 
-    if not service_name or not expected_status:
-        raise ChallengeValidationError(["Invalid check_service_status step: Missing 'service' or 'expected_status'."])
-    if expected_status not in ["active", "inactive", "failed"]:
-         raise ChallengeValidationError([f"Invalid 'expected_status' value: {expected_status}. Must be 'active', 'inactive', or 'failed'."])
+                 # The PID file is expected to exist exactly when the process should be running
+                 if pid_file_exists != expected_state:
+                      pid_state_str = "exists" if pid_file_exists else "does not exist"
+                      pid_expected_str = "exist" if expected_state else "not exist"
+                      raise ChallengeValidationError([f"Expected PID file '{self.pid_file}' to {pid_expected_str} (matching expected process state), but it {pid_state_str}.", note])
+                 if verbose:
+                     console.print(f"[dim]PID file '{self.pid_file}' state consistent with expected process state.[/]")
 
+            return True
 
-    step_reasons = []
-
-    # Check Active State
-    cmd_active = f"systemctl is-active --quiet {shlex.quote(service_name)}"
-    try:
-        result_active = run_ssh_command(vm_ip, ssh_user, ssh_key, cmd_active, verbose=False)
-    except SSHCommandError as e:
-        raise ChallengeValidationError([f"SSH execution failed for active check: {e}"])
-    except Exception as e:
-        raise ChallengeValidationError([f"Unexpected error during active check for '{service_name}': {e}"])
-
-
-    if verbose: console.print(format_ssh_output(result_active, cmd_active))
-    if result_active.get('error'):
-        raise ChallengeValidationError([f"Active check command error: {result_active['error']}"])
-
-    actual_status_code = result_active.get('exit_status', -1)
-    # Map exit code to string status expected in YAML
-    actual_status_str = "unknown"
-    if actual_status_code == Config.EXIT_CODE_ACTIVE: actual_status_str = "active"
-    # systemd's is-active returns 3 for inactive state.
-    elif actual_status_code == Config.EXIT_CODE_INACTIVE: actual_status_str = "inactive"
-    # Treat other non-zero as likely failed/error state, map to 'failed' for simplicity
-    elif actual_status_code != 0: actual_status_str = "failed"
-
-    if actual_status_str != expected_status:
-        step_reasons.append(f"Expected service status '{expected_status}', but was '{actual_status_str}' (is-active exit code: {actual_status_code}).")
-
-    # Check Enabled State (only if requested via check_enabled: true or false)
-    if check_enabled is not None: # Only run if check_enabled is explicitly true or false
-        cmd_enabled = f"systemctl is-enabled --quiet {shlex.quote(service_name)}"
+        except SSHCommandError as e:
+            # Catch SSH errors during either command execution
+            raise ChallengeValidationError([f"SSH execution failed during process check: {e}", note])
+        except ChallengeValidationError:
+            # Re-raise specific validation failures
+            raise
+        except Exception as e: # Catch unexpected errors
+            raise ChallengeValidationError([f"Unexpected error during process check logic: {e}", note])
+
+
+@dataclass(frozen=True)
+class CommandCheck(ValidationCheck):
+    """Runs a command and compares its exit status and output with the success criteria."""
+    step_type: ClassVar[str] = "run_command"
+
+    command: str
+    expected_status: Optional[int]
+    stdout_equals: Optional[str]
+    stdout_contains: Optional[str]
+    stdout_pattern: Optional[str]
+    stdout_regex: Optional[Pattern]
+    stdout_empty: bool
+    stderr_empty: bool
+    stderr_contains: Optional[str]
+
+    @classmethod
+    def compile(cls, step_data: dict) -> "CommandCheck":
+        command = step_data.get("command")
+        if not command: raise ChallengeValidationError(["Missing 'command' in run_command step."])
+
+        criteria = step_data.get("success_criteria", {"exit_status": Config.EXIT_CODE_ACTIVE}) # Default criteria = exit 0
+        if not isinstance(criteria, dict):
+            raise ChallengeValidationError(["'success_criteria' must be a dictionary."])
+
+        expected_status = criteria.get("exit_status")
+        if expected_status is not None:
+            try:
+                expected_status = int(expected_status)
+            except (ValueError, TypeError):
+                raise ChallengeValidationError([f"Invalid non-integer 'exit_status' in success_criteria: {expected_status}"])
+
+        stdout_pattern = criteria.get("stdout_matches_regex")
+        return cls(
+            command=command,
+            expected_status=expected_status,
+            stdout_equals=criteria.get("stdout_equals"),
+            stdout_contains=criteria.get("stdout_contains"),
+            stdout_pattern=stdout_pattern,
+            stdout_regex=_compile_regex(stdout_pattern, "challenge definition", re.MULTILINE) if stdout_pattern is not None else None,
+            stdout_empty=bool(criteria.get("stdout_empty", False)),
+            stderr_empty=bool(criteria.get("stderr_empty", False)), # Default is False, allow stderr
+            stderr_contains=criteria.get("stderr_contains"),
+        )
+
+    def run(self, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool,
+            log_checkpoint: Optional[LogCheckpoint] = None) -> bool:
         try:
-            result_enabled = run_ssh_command(vm_ip, ssh_user, ssh_key, cmd_enabled, verbose=False)
+            val_result = _run_remote(vm_ip, ssh_user, ssh_key, self.command)
         except SSHCommandError as e:
-            raise ChallengeValidationError([f"SSH execution failed for enabled check: {e}"])
+            raise ChallengeValidationError([f"SSH execution failed for command check: {e}"])
         except Exception as e:
-             raise ChallengeValidationError([f"Unexpected error during enabled check for '{service_name}': {e}"])
+            raise ChallengeValidationError([f"Unexpected error running command '{self.command}': {e}"])
 
+        if verbose: console.print(format_ssh_output(val_result, self.command))
 
-        if verbose: console.print(format_ssh_output(result_enabled, cmd_enabled))
-        if result_enabled.get('error'):
-            raise ChallengeValidationError([f"Enabled check command error: {result_enabled['error']}"])
+        if val_result.get('error'):
+             raise ChallengeValidationError([f"Command execution error: {val_result['error']}"])
 
-        is_enabled_code = result_enabled.get('exit_status', -1)
-        # is-enabled: 0 = enabled, 1 = disabled/static/masked etc.
-        # Map code to boolean
-        actual_enabled_bool = (is_enabled_code == Config.EXIT_CODE_ENABLED)
+        step_reasons = []
+        actual_status = val_result.get('exit_status', -1)
+        actual_stdout = val_result.get('stdout', '')
+        actual_stderr = val_result.get('stderr', '')
+
+        # 1. Exit Status Check
+        if self.expected_status is not None and actual_status != self.expected_status:
+            step_reasons.append(f"Expected exit status {self.expected_status}, but got {actual_status}.")
+
+        # 2. STDOUT Checks
+        if self.stdout_equals is not None and actual_stdout != self.stdout_equals:
+            # Avoid printing potentially large/sensitive values in error message by default
+            step_reasons.append(f"stdout did not exactly match expected value.")
+            if verbose:
+                 step_reasons.append(f"  Expected: '{self.stdout_equals}'")
+                 step_reasons.append(f"  Actual:   '{actual_stdout}'")
+
+        if self.stdout_contains is not None and self.stdout_contains not in actual_stdout:
+             step_reasons.append(f"stdout did not contain expected text: '{self.stdout_contains}'")
+
+        if self.stdout_regex is not None and not self.stdout_regex.search(actual_stdout):
+            step_reasons.append(f"stdout did not match regex '{self.stdout_pattern}'.")
+
+        # 3. STDERR Checks
+        if self.stderr_empty and actual_stderr:
+            step_reasons.append(f"Expected stderr to be empty, but it was not.")
+            if verbose:
+                 step_reasons.append(f"  Actual STDERR: '{actual_stderr}'")
+
+        if self.stderr_contains is not None and self.stderr_contains not in actual_stderr:
+            step_reasons.append(f"stderr did not contain expected text: '{self.stderr_contains}'")
+
+        # 4. Explicitly check for *no* stdout if requested
+        if self.stdout_empty and actual_stdout:
+            step_reasons.append(f"Expected stdout to be empty, but it was not.")
+            if verbose:
+                 step_reasons.append(f"  Actual STDOUT: '{actual_stdout}'")
+
+        if step_reasons: raise ChallengeValidationError(step_reasons)
+        return True
 
-        if actual_enabled_bool != check_enabled:
-            expected_enable_str = "enabled" if check_enabled else "not enabled"
-            actual_enable_str = "enabled" if actual_enabled_bool else "not enabled"
-            step_reasons.append(f"Expected service to be {expected_enable_str}, but it was {actual_enable_str} (is-enabled exit code: {is_enabled_code}).")
 
-    if step_reasons: raise ChallengeValidationError(step_reasons)
-    return True
+@dataclass(frozen=True)
+class ServiceStatusCheck(ValidationCheck):
+    """Checks a systemd service's active state and, optionally, whether it is enabled."""
+    step_type: ClassVar[str] = "check_service_status"
+
+    service: str
+    expected_status: str
+    check_enabled: Optional[bool] # None: enabled state is not checked
+    active_command: str
+    enabled_command: str
+
+    @classmethod
+    def compile(cls, step_data: dict) -> "ServiceStatusCheck":
+        service_name = step_data.get("service")
+        expected_status = step_data.get("expected_status")
+        check_enabled = step_data.get("check_enabled") # Allow None, False, True
+
+        if not service_name or not expected_status:
+            raise ChallengeValidationError(["Invalid check_service_status step: Missing 'service' or 'expected_status'."])
+        if expected_status not in ["active", "inactive", "failed"]:
+             raise ChallengeValidationError([f"Invalid 'expected_status' value: {expected_status}. Must be 'active', 'inactive', or 'failed'."])
+
+        quoted_service = shlex.quote(service_name)
+        return cls(
+            service=service_name,
+            expected_status=expected_status,
+            check_enabled=check_enabled,
+            active_command=f"systemctl is-active --quiet {quoted_service}",
+            enabled_command=f"systemctl is-enabled --quiet {quoted_service}",
+        )
+
+    def run(self, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool,
+            log_checkpoint: Optional[LogCheckpoint] = None) -> bool:
+        step_reasons = []
 
-def _validate_check_port_listening(step_data: dict, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool) -> bool:
-    # ... (existing implementation - seems robust) ...
-    port = step_data.get("port")
-    protocol = step_data.get("protocol", "tcp").lower()
-    expected_state = step_data.get("expected_state")
-    address = step_data.get("address") # Optional: Specific address to check (e.g., '127.0.0.1', '0.0.0.0')
+        # Check Active State
+        try:
+            result_active = _run_remote(vm_ip, ssh_user, ssh_key, self.active_command)
+        except SSHCommandError as e:
+            raise ChallengeValidationError([f"SSH execution failed for active check: {e}"])
+        except Exception as e:
+            raise ChallengeValidationError([f"Unexpected error during active check for '{self.service}': {e}"])
+
+        if verbose: console.print(format_ssh_output(result_active, self.active_command))
+        if result_active.get('error'):
+            raise ChallengeValidationError([f"Active check command error: {result_active['error']}"])
+
+        actual_status_code = result_active.get('exit_status', -1)
+        # Map exit code to string status expected in YAML
+        actual_status_str = "unknown"
+        if actual_status_code == Config.EXIT_CODE_ACTIVE: actual_status_str = "active"
+        # systemd's is-active returns 3 for inactive state.
+        elif actual_status_code == Config.EXIT_CODE_INACTIVE: actual_status_str = "inactive"
+        # Treat other non-zero as likely failed/error state, map to 'failed' for simplicity
+        elif actual_status_code != 0: actual_status_str = "failed"
+
+        if actual_status_str != self.expected_status:
+            step_reasons.append(f"Expected service status '{self.expected_status}', but was '{actual_status_str}' (is-active exit code: {actual_status_code}).")
+
+        # Check Enabled State (only if requested via check_enabled: true or false)
+        if self.check_enabled is not None:
+            try:
+                result_enabled = _run_remote(vm_ip, ssh_user, ssh_key, self.enabled_command)
+            except SSHCommandError as e:
+                raise ChallengeValidationError([f"SSH execution failed for enabled check: {e}"])
+            except Exception as e:
+                 raise ChallengeValidationError([f"Unexpected error during enabled check for '{self.service}': {e}"])
+
+            if verbose: console.print(format_ssh_output(result_enabled, self.enabled_command))
+            if result_enabled.get('error'):
+                raise ChallengeValidationError([f"Enabled check command error: {result_enabled['error']}"])
+
+            is_enabled_code = result_enabled.get('exit_status', -1)
+            # is-enabled: 0 = enabled, 1 = disabled/static/masked etc.
+            actual_enabled_bool = (is_enabled_code == Config.EXIT_CODE_ENABLED)
+
+            if actual_enabled_bool != self.check_enabled:
+                expected_enable_str = "enabled" if self.check_enabled else "not enabled"
+                actual_enable_str = "enabled" if actual_enabled_bool else "not enabled"
+                step_reasons.append(f"Expected service to be {expected_enable_str}, but it was {actual_enable_str} (is-enabled exit code: {is_enabled_code}).")
+
+        if step_reasons: raise ChallengeValidationError(step_reasons)
+        return True
 
 
-    if port is None or expected_state is None:
-        raise ChallengeValidationError(["Invalid check_port_listening step: Missing 'port' or 'expected_state'."])
-    if protocol not in ["tcp", "udp"]:
-         raise ChallengeValidationError([f"Invalid protocol '{protocol}'. Must be 'tcp' or 'udp'."])
-    try:
-         port_int = int(port)
-         if not 0 < port_int < 65536: raise ValueError("Port out of range")
-    except (ValueError, TypeError):
-         raise ChallengeValidationError([f"Invalid port number: {port}. Must be an integer between 1 and 65535."])
-
-
-    # Use ss command: -n (numeric), -l (listening), p (processes), t (tcp) / u (udp)
-    proto_flag = "t" if protocol == "tcp" else "u"
-    # Refined awk filter:
-    # - Checks state is LISTEN
-    # - Checks correct port number (handles IPv4 *:port, addr:port and IPv6 [::]:port, [addr]:port)
-    # - Optionally filters by specific local address if 'address' is provided
-    awk_script = f"""
-    BEGIN {{ found=0 }}
-    $1 == "LISTEN" {{
-        split($4, parts, ":");
-        port_in_addr = parts[length(parts)]; # Get last part after ':' which should be port
-        # Handle IPv6 bracket notation for address matching
-        addr_part = $4;
-        sub(/:[^:]+$/, "", addr_part); # Remove :port part to get address
-        gsub(/\[|\]/, "", addr_part); # Remove brackets for IPv6 matching
-
-        # Basic port check first
-        if (port_in_addr == "{port}") {{
-            # Check address if specified
-            addr_match = 1; # Assume match if no address specified
-            if ("{address}" != "") {{
-                 # Check if addr_part matches specified address or wildcard *
-                 if !(addr_part == "{address}" || addr_part == "*" || addr_part == "::" || addr_part == "0.0.0.0") {{
-                     addr_match = 0;
-                 }}
-            }}
-            if (addr_match) {{
-                 found=1;
-                 exit; # Exit awk early if match found
+@dataclass(frozen=True)
+class PortListeningCheck(ValidationCheck):
+    """Checks whether a TCP/UDP port is (not) listening, optionally on a specific address."""
+    step_type: ClassVar[str] = "check_port_listening"
+
+    port: int
+    protocol: str
+    expected_state: bool
+    address: Optional[str]
+    command: str
+
+    @classmethod
+    def compile(cls, step_data: dict) -> "PortListeningCheck":
+        port = step_data.get("port")
+        protocol = str(step_data.get("protocol", "tcp")).lower()
+        expected_state = step_data.get("expected_state")
+        address = step_data.get("address") # Optional: Specific address to check (e.g., '127.0.0.1', '0.0.0.0')
+
+        if port is None or expected_state is None:
+            raise ChallengeValidationError(["Invalid check_port_listening step: Missing 'port' or 'expected_state'."])
+        if protocol not in ["tcp", "udp"]:
+             raise ChallengeValidationError([f"Invalid protocol '{protocol}'. Must be 'tcp' or 'udp'."])
+        try:
+             port_int = int(port)
+             if not 0 < port_int < 65536: raise ValueError("Port out of range")
+        except (ValueError, TypeError):
+             raise ChallengeValidationError([f"Invalid port number: {port}. Must be an integer between 1 and 65535."])
+
+        # Use ss command: -n (numeric), -l (listening), p (processes), t (tcp) / u (udp)
+        proto_flag = "t" if protocol == "tcp" else "u"
+        # awk filter:
+        # - Checks state is LISTEN
+        # - Checks correct port number (handles IPv4 *:port, addr:port and IPv6 [::]:port, [addr]:port)
+        # - Optionally filters by specific local address if 'address' is provided
+        awk_script = f"""
+        BEGIN {{ found=0 }}
+        $1 == "LISTEN" {{
+            split($4, parts, ":");
+            port_in_addr = parts[length(parts)]; # Get last part after ':' which should be port
+            # Handle IPv6 bracket notation for address matching
+            addr_part = $4;
+            sub(/:[^:]+$/, "", addr_part); # Remove :port part to get address
+            gsub(/\\[|\\]/, "", addr_part); # Remove brackets for IPv6 matching
+
+            # Basic port check first
+            if (port_in_addr == "{port}") {{
+                # Check address if specified
+                addr_match = 1; # Assume match if no address specified
+                if ("{address}" != "") {{
+                     # Check if addr_part matches specified address or wildcard *
+                     if !(addr_part == "{address}" || addr_part == "*" || addr_part == "::" || addr_part == "0.0.0.0") {{
+                         addr_match = 0;
+                     }}
+                }}
+                if (addr_match) {{
+                     found=1;
+                     exit; # Exit awk early if match found
+                }}
             }}
         }}
-    }}
-    END {{ exit !found }}
-    """
-    # Remove newlines and escape single quotes for shell execution
-    awk_oneline = " ".join(awk_script.splitlines()).strip().replace("'", "'\\''")
-    cmd = f"ss -nl{proto_flag}p | awk '{awk_oneline}'"
-
-
-    try:
-        if verbose:
-            console.print(f"[dim]Executing port check command: `{cmd}`[/]")
-        result = run_ssh_command(vm_ip, ssh_user, ssh_key, cmd, verbose=False)
-    except SSHCommandError as e:
-        raise ChallengeValidationError([f"SSH execution failed for port check: {e}"])
-    except Exception as e:
-        raise ChallengeValidationError([f"Unexpected error during port check execution: {e}"])
-
-
-    if verbose: console.print(format_ssh_output(result, f"ss/awk check for {protocol}/{port}"))
-    if result.get('error'):
-        raise ChallengeValidationError([f"Port check command error: {result['error']}"])
-
-    # awk exits 0 if found, 1 if not found
-    is_listening = (result.get('exit_status') == 0)
+        END {{ exit !found }}
+        """
+        # Remove newlines and escape single quotes for shell execution
+        awk_oneline = " ".join(awk_script.splitlines()).strip().replace("'", "'\\''")
+        return cls(
+            port=port_int,
+            protocol=protocol,
+            expected_state=expected_state,
+            address=address,
+            command=f"ss -nl{proto_flag}p | awk '{awk_oneline}'",
+        )
+
+    def run(self, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool,
+            log_checkpoint: Optional[LogCheckpoint] = None) -> bool:
+        try:
+            if verbose:
+                console.print(f"[dim]Executing port check command: `{self.command}`[/]")
+            result = _run_remote(vm_ip, ssh_user, ssh_key, self.command)
+        except SSHCommandError as e:
+            raise ChallengeValidationError([f"SSH execution failed for port check: {e}"])
+        except Exception as e:
+            raise ChallengeValidationError([f"Unexpected error during port check execution: {e}"])
 
-    if is_listening != expected_state:
-        state_str = "listening" if is_listening else "not listening"
-        expected_str = "be listening" if expected_state else "not be listening"
-        addr_str = f" on address {address}" if address else ""
-        raise ChallengeValidationError([f"Expected port {protocol}/{port}{addr_str} to {expected_str}, but it was {state_str}."])
-    return True
+        if verbose: console.print(format_ssh_output(result, f"ss/awk check for {self.protocol}/{self.port}"))
+        if result.get('error'):
+            raise ChallengeValidationError([f"Port check command error: {result['error']}"])
 
-def _validate_check_file_exists(step_data: dict, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool) -> bool:
-    # ... (existing implementation seems okay, maybe add owner/group/perm checks later) ...
-    file_path = step_data.get("path")
-    expected_state = step_data.get("expected_state")
-    file_type = step_data.get("file_type", "any").lower() # any, file, directory
-    owner = step_data.get("owner") # Optional string (user name or uid)
-    group = step_data.get("group") # Optional string (group name or gid)
-    permissions = step_data.get("permissions") # Optional string (octal like "0644")
+        # awk exits 0 if found, 1 if not found
+        is_listening = (result.get('exit_status') == 0)
 
-    if not file_path or expected_state is None:
-        raise ChallengeValidationError(["Invalid check_file_exists step: Missing 'path' or 'expected_state'."])
-    if file_type not in ["any", "file", "directory"]:
-         raise ChallengeValidationError([f"Invalid 'file_type' value: {file_type}. Must be 'any', 'file', or 'directory'."])
-    if permissions and not re.match(r"^[0-7]{3,4}$", str(permissions)): # Basic check for 3 or 4 octal digits
-         raise ChallengeValidationError([f"Invalid 'permissions' format: {permissions}. Must be octal string e.g., '0644'."])
+        if is_listening != self.expected_state:
+            state_str = "listening" if is_listening else "not listening"
+            expected_str = "be listening" if self.expected_state else "not be listening"
+            addr_str = f" on address {self.address}" if self.address else ""
+            raise ChallengeValidationError([f"Expected port {self.protocol}/{self.port}{addr_str} to {expected_str}, but it was {state_str}."])
+        return True
 
 
-    test_flag_map = {"any": "-e", "file": "-f", "directory": "-d"}
-    test_flag = test_flag_map[file_type]
-    quoted_path = shlex.quote(file_path)
-    cmd_exists = f"test {test_flag} {quoted_path}"
+@dataclass(frozen=True)
+class FileExistsCheck(ValidationCheck):
+    """Checks a path's existence and type, and optionally its owner, group and permissions."""
+    step_type: ClassVar[str] = "check_file_exists"
+
+    path: str
+    expected_state: bool
+    file_type: str # any, file, directory
+    owner: Optional[str] # User name or uid
+    group: Optional[str] # Group name or gid
+    permissions: Optional[str] # As written, e.g. "0644"
+    expected_perms: Optional[str] # Without leading zeros, 3 or 4 digits
+    exists_command: str
+    stat_command: str
+
+    @classmethod
+    def compile(cls, step_data: dict) -> "FileExistsCheck":
+        file_path = step_data.get("path")
+        expected_state = step_data.get("expected_state")
+        file_type = str(step_data.get("file_type", "any")).lower()
+        owner = step_data.get("owner")
+        group = step_data.get("group")
+        permissions = step_data.get("permissions")
+
+        if not file_path or expected_state is None:
+            raise ChallengeValidationError(["Invalid check_file_exists step: Missing 'path' or 'expected_state'."])
+        if file_type not in ["any", "file", "directory"]:
+             raise ChallengeValidationError([f"Invalid 'file_type' value: {file_type}. Must be 'any', 'file', or 'directory'."])
+        expected_perms = None
+        if permissions:
+            if not re.match(r"^[0-7]{3,4}$", str(permissions)): # Basic check for 3 or 4 octal digits
+                raise ChallengeValidationError([f"Invalid 'permissions' format: {permissions}. Must be octal string e.g., '0644'."])
+            # stat may print a leading 0, so compare without leading zeros
+            expected_perms = str(permissions).lstrip('0')
+            if len(expected_perms) not in (3, 4):
+                raise ChallengeValidationError([f"Invalid expected permissions format '{permissions}'."])
+
+        test_flag = {"any": "-e", "file": "-f", "directory": "-d"}[file_type]
+        quoted_path = shlex.quote(file_path)
+        # %U = user name, %u = uid, %G = group name, %g = gid, %a = octal perms
+        stat_format = "%U:%u:%G:%g:%a"
+        return cls(
+            path=file_path,
+            expected_state=expected_state,
+            file_type=file_type,
+            owner=str(owner) if owner else None,
+            group=str(group) if group else None,
+            permissions=str(permissions) if permissions else None,
+            expected_perms=expected_perms,
+            exists_command=f"test {test_flag} {quoted_path}",
+            stat_command=f"stat --format='{stat_format}' {quoted_path}",
+        )
+
+    def run(self, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool,
+            log_checkpoint: Optional[LogCheckpoint] = None) -> bool:
+        try:
+            result_exists = _run_remote(vm_ip, ssh_user, ssh_key, self.exists_command)
+        except SSHCommandError as e:
+            raise ChallengeValidationError([f"SSH execution failed for file existence check: {e}"])
+        except Exception as e:
+            raise ChallengeValidationError([f"Unexpected error during file existence check: {e}"])
 
-    try:
-        result_exists = run_ssh_command(vm_ip, ssh_user, ssh_key, cmd_exists, verbose=False)
-    except SSHCommandError as e:
-        raise ChallengeValidationError([f"SSH execution failed for file existence check: {e}"])
-    except Exception as e:
-        raise ChallengeValidationError([f"Unexpected error during file existence check: {e}"])
-
-
-    if verbose: console.print(format_ssh_output(result_exists, cmd_exists))
-    if result_exists.get('error'):
-        raise ChallengeValidationError([f"File existence check command error: {result_exists['error']}"])
-
-    # test command exits 0 if condition is true, 1 otherwise
-    exists_and_matches_type = (result_exists.get('exit_status') == 0)
-
-    step_reasons = []
-    if exists_and_matches_type != expected_state:
-        type_desc = f"a {file_type}" if file_type != "any" else "present"
-        state_str = f"exists and is {type_desc}" if exists_and_matches_type else f"does not exist or is not {type_desc}"
-        expected_str = f"exist and be {type_desc}" if expected_state else f"not exist or not be {type_desc}"
-        step_reasons.append(f"Path '{file_path}' {state_str}, but expected to {expected_str}.")
-        # If existence check failed, no point checking owner/group/perms
-        raise ChallengeValidationError(step_reasons)
-
-    # --- Owner/Group/Permission Checks (only if file exists as expected) ---
-    if exists_and_matches_type and (owner or group or permissions):
-         # Use stat command for reliable checks
-         # %U = user name, %u = uid, %G = group name, %g = gid, %a = octal perms
-         stat_format = "%U:%u:%G:%g:%a"
-         cmd_stat = f"stat --format='{stat_format}' {quoted_path}"
-         try:
-             result_stat = run_ssh_command(vm_ip, ssh_user, ssh_key, cmd_stat, verbose=False)
-             if verbose: console.print(format_ssh_output(result_stat, cmd_stat))
-
-             if result_stat.get('error'):
-                 raise ChallengeValidationError([f"Stat command execution error: {result_stat['error']}"])
-             if result_stat.get('exit_status', -1) != 0:
-                  raise ChallengeValidationError([f"Stat command failed (Exit: {result_stat.get('exit_status')}) for path '{file_path}'."])
-
-             stat_output = result_stat.get('stdout', '').strip()
-             parts = stat_output.split(':')
-             if len(parts) == 5:
-                 actual_owner_name, actual_owner_uid, actual_group_name, actual_group_gid, actual_perms_octal = parts
-
-                 # Check Owner
-                 if owner and not (owner == actual_owner_name or owner == actual_owner_uid):
-                      step_reasons.append(f"Expected owner '{owner}', but found '{actual_owner_name}' (UID: {actual_owner_uid}).")
-                 # Check Group
-                 if group and not (group == actual_group_name or group == actual_group_gid):
-                      step_reasons.append(f"Expected group '{group}', but found '{actual_group_name}' (GID: {actual_group_gid}).")
-                 # Check Permissions (compare last 3 or 4 digits depending on input format)
-                 if permissions:
-                      # Normalize actual permissions (sometimes stat includes leading 0 for FS type)
-                      actual_perms_normalized = actual_perms_octal.lstrip('0')
-                      # Normalize expected permissions
-                      expected_perms_str = str(permissions).lstrip('0')
-                      if len(expected_perms_str) == 3: # e.g. 644
-                          if actual_perms_normalized[-3:] != expected_perms_str:
-                              step_reasons.append(f"Expected permissions '{permissions}', but found '{actual_perms_octal}'.")
-                      elif len(expected_perms_str) == 4: # e.g. 0755 or 4755 (sticky/suid/sgid)
-                           if actual_perms_normalized != expected_perms_str:
-                                step_reasons.append(f"Expected permissions '{permissions}', but found '{actual_perms_octal}'.")
-                      else: # Should be caught by earlier regex, but defensive check
-                            step_reasons.append(f"Invalid expected permissions format '{permissions}' during comparison.")
-
-
-             else:
-                 step_reasons.append(f"Unexpected output format from stat command: {stat_output}")
-
-         except SSHCommandError as e:
-             step_reasons.append(f"SSH execution failed for stat check: {e}")
-         except Exception as e:
-             step_reasons.append(f"Unexpected error during stat check: {e}")
-
-    if step_reasons: raise ChallengeValidationError(step_reasons)
-    return True
+        if verbose: console.print(format_ssh_output(result_exists, self.exists_command))
+        if result_exists.get('error'):
+            raise ChallengeValidationError([f"File existence check command error: {result_exists['error']}"])
 
-def _validate_check_file_contains(step_data: dict, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool) -> bool:
-    # ... (existing implementation seems okay) ...
-    file_path = step_data.get("path")
-    expected_text = step_data.get("text")
-    expected_regex = step_data.get("matches_regex")
-    expected_state = step_data.get("expected_state")
+        # test command exits 0 if condition is true, 1 otherwise
+        exists_and_matches_type = (result_exists.get('exit_status') == 0)
 
-    if not file_path or expected_state is None or (expected_text is None and expected_regex is None):
-        raise ChallengeValidationError(["Invalid check_file_contains step: Missing 'path', 'expected_state', or ('text'/'matches_regex')."])
-    if expected_text is not None and expected_regex is not None:
-         raise ChallengeValidationError(["Invalid check_file_contains step: Cannot have both 'text' and 'matches_regex'."])
+        if exists_and_matches_type != self.expected_state:
+            type_desc = f"a {self.file_type}" if self.file_type != "any" else "present"
+            state_str = f"exists and is {type_desc}" if exists_and_matches_type else f"does not exist or is not {type_desc}"
+            expected_str = f"exist and be {type_desc}" if self.expected_state else f"not exist or not be {type_desc}"
+            # If existence check failed, no point checking owner/group/perms
+            raise ChallengeValidationError([f"Path '{self.path}' {state_str}, but expected to {expected_str}."])
 
+        step_reasons = []
+        # --- Owner/Group/Permission Checks (only if file exists as expected) ---
+        if exists_and_matches_type and (self.owner or self.group or self.permissions):
+             try:
+                 result_stat = _run_remote(vm_ip, ssh_user, ssh_key, self.stat_command)
+                 if verbose: console.print(format_ssh_output(result_stat, self.stat_command))
+
+                 if result_stat.get('error'):
+                     raise ChallengeValidationError([f"Stat command execution error: {result_stat['error']}"])
+                 if result_stat.get('exit_status', -1) != 0:
+                      raise ChallengeValidationError([f"Stat command failed (Exit: {result_stat.get('exit_status')}) for path '{self.path}'."])
+
+                 stat_output = result_stat.get('stdout', '').strip()
+                 parts = stat_output.split(':')
+                 if len(parts) == 5:
+                     actual_owner_name, actual_owner_uid, actual_group_name, actual_group_gid, actual_perms_octal = parts
+
+                     if self.owner and self.owner not in (actual_owner_name, actual_owner_uid):
+                          step_reasons.append(f"Expected owner '{self.owner}', but found '{actual_owner_name}' (UID: {actual_owner_uid}).")
+                     if self.group and self.group not in (actual_group_name, actual_group_gid):
+                          step_reasons.append(f"Expected group '{self.group}', but found '{actual_group_name}' (GID: {actual_group_gid}).")
+                     if self.expected_perms:
+                          actual_perms_normalized = actual_perms_octal.lstrip('0')
+                          # 3 digits (644) compare the mode bits, 4 digits (4755) include suid/sgid/sticky
+                          actual = actual_perms_normalized[-3:] if len(self.expected_perms) == 3 else actual_perms_normalized
+                          if actual != self.expected_perms:
+                              step_reasons.append(f"Expected permissions '{self.permissions}', but found '{actual_perms_octal}'.")
+                 else:
+                     step_reasons.append(f"Unexpected output format from stat command: {stat_output}")
+
+             except ChallengeValidationError:
+                 raise
+             except SSHCommandError as e:
+                 step_reasons.append(f"SSH execution failed for stat check: {e}")
+             except Exception as e:
+                 step_reasons.append(f"Unexpected error during stat check: {e}")
+
+        if step_reasons: raise ChallengeValidationError(step_reasons)
+        return True
 
-    quoted_path = shlex.quote(file_path)
 
-    # Check readability first (especially important for expected_state=False)
-    # Use 'test -r' which checks read permission for the executing user
-    cmd_check = f"test -r {quoted_path}"
-    try:
-        result_check = run_ssh_command(vm_ip, ssh_user, ssh_key, cmd_check, verbose=False)
-        if verbose: console.print(format_ssh_output(result_check, cmd_check))
-        if result_check.get('error'):
-            raise ChallengeValidationError([f"Readability check command error: {result_check['error']}"])
-        file_is_readable = (result_check.get('exit_status') == 0)
-    except SSHCommandError as e:
-        raise ChallengeValidationError([f"SSH execution failed for readability check: {e}"])
-    except Exception as e:
-        raise ChallengeValidationError([f"Unexpected error during readability check: {e}"])
-
-
-    if not file_is_readable:
-        if expected_state is True: # Expected content, but file not readable/found
-            raise ChallengeValidationError([f"File '{file_path}' not found or is not readable by user '{ssh_user}'."])
-        else: # Expected NO content, and file not readable/found = Success for this check
-            return True # Correctly does not contain the text as file isn't readable/present
-
-    # File exists and is readable, now check content using grep
-    grep_opts = ["-q"] # Quiet mode (exit status only)
-    pattern = ""
-    search_desc = ""
-    if expected_text is not None:
-        grep_opts.append("-F") # Fixed string
-        pattern = expected_text
-        search_desc = f"text '{expected_text[:30]}{'...' if len(expected_text)>30 else ''}'"
-    elif expected_regex is not None:
-        grep_opts.append("-E") # Extended regex
-        pattern = expected_regex
-        search_desc = f"regex '{expected_regex[:30]}{'...' if len(expected_regex)>30 else ''}'"
+@dataclass(frozen=True)
+class FileContainsCheck(ValidationCheck):
+    """Checks whether a readable file contains (or lacks) a fixed string or extended regex."""
+    step_type: ClassVar[str] = "check_file_contains"
+
+    path: str
+    expected_state: bool
+    search_desc: str
+    readable_command: str
+    grep_command: str
+
+    @classmethod
+    def compile(cls, step_data: dict) -> "FileContainsCheck":
+        file_path = step_data.get("path")
+        expected_text = step_data.get("text")
+        expected_regex = step_data.get("matches_regex")
+        expected_state = step_data.get("expected_state")
+
+        if not file_path or expected_state is None or (expected_text is None and expected_regex is None):
+            raise ChallengeValidationError(["Invalid check_file_contains step: Missing 'path', 'expected_state', or ('text'/'matches_regex')."])
+        if expected_text is not None and expected_regex is not None:
+             raise ChallengeValidationError(["Invalid check_file_contains step: Cannot have both 'text' and 'matches_regex'."])
+
+        quoted_path = shlex.quote(file_path)
+        if expected_text is not None:
+            expected_text = str(expected_text)
+            grep_opts = ["-q", "-F"] # Quiet mode (exit status only), fixed string
+            pattern = expected_text
+            search_desc = f"text '{expected_text[:30]}{'...' if len(expected_text)>30 else ''}'"
+        else:
+            grep_opts = ["-q", "-E"] # Extended regex
+            pattern = expected_regex
+            search_desc = f"regex '{expected_regex[:30]}{'...' if len(expected_regex)>30 else ''}'"
+            try:
+                re.compile(pattern) # grep runs on the VM; this only catches syntax errors early
+            except re.error as regex_err:
+                 raise ChallengeValidationError([f"Invalid regex pattern '{pattern}' in check_file_contains step: {regex_err}"])
+
+        return cls(
+            path=file_path,
+            expected_state=expected_state,
+            search_desc=search_desc,
+            # 'test -r' checks read permission for the executing user (important for expected_state=False)
+            readable_command=f"test -r {quoted_path}",
+            grep_command=_quote_cmd(["grep"] + grep_opts + ["--", pattern, quoted_path]),
+        )
+
+    def run(self, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool,
+            log_checkpoint: Optional[LogCheckpoint] = None) -> bool:
+        # Check readability first
         try:
-            re.compile(pattern) # Pre-validate regex syntax
-        except re.error as regex_err:
-             raise ChallengeValidationError([f"Invalid regex pattern '{pattern}' in check_file_contains step: {regex_err}"])
-
-
-    # Use list for command parts to handle pattern quoting robustly
-    cmd_grep_parts = ["grep"] + grep_opts + ["--", pattern, quoted_path]
-    cmd_grep_str = " ".join(shlex.quote(part) for part in cmd_grep_parts) # For display/logging
-
-
-    try:
-        # Execute using the list form if run_ssh_command supports it, otherwise join carefully
-        # Assuming run_ssh_command takes a string for now:
-        cmd_to_run = cmd_grep_str
-        if verbose:
-            console.print(f"[dim]Executing content check command: `{cmd_to_run}`[/]")
-        result_grep = run_ssh_command(vm_ip, ssh_user, ssh_key, cmd_to_run, verbose=False)
-
-    except SSHCommandError as e:
-        raise ChallengeValidationError([f"SSH execution failed for grep check: {e}"])
-    except Exception as e:
-        raise ChallengeValidationError([f"Unexpected error during grep check execution: {e}"])
+            result_check = _run_remote(vm_ip, ssh_user, ssh_key, self.readable_command)
+            if verbose: console.print(format_ssh_output(result_check, self.readable_command))
+            if result_check.get('error'):
+                raise ChallengeValidationError([f"Readability check command error: {result_check['error']}"])
+            file_is_readable = (result_check.get('exit_status') == 0)
+        except SSHCommandError as e:
+            raise ChallengeValidationError([f"SSH execution failed for readability check: {e}"])
+        except Exception as e:
+            raise ChallengeValidationError([f"Unexpected error during readability check: {e}"])
 
+        if not file_is_readable:
+            if self.expected_state is True: # Expected content, but file not readable/found
+                raise ChallengeValidationError([f"File '{self.path}' not found or is not readable by user '{ssh_user}'."])
+            return True # Expected NO content, and the file isn't readable/present
 
-    if verbose: console.print(format_ssh_output(result_grep, cmd_grep_str))
-    if result_grep.get('error'):
-        raise ChallengeValidationError([f"Grep command execution error: {result_grep['error']}"])
+        # File exists and is readable, now check content using grep
+        try:
+            if verbose:
+                console.print(f"[dim]Executing content check command: `{self.grep_command}`[/]")
+            result_grep = _run_remote(vm_ip, ssh_user, ssh_key, self.grep_command)
+        except SSHCommandError as e:
+            raise ChallengeValidationError([f"SSH execution failed for grep check: {e}"])
+        except Exception as e:
+            raise ChallengeValidationError([f"Unexpected error during grep check execution: {e}"])
 
-    # grep exit status: 0=found, 1=not found, >1=error
-    grep_exit_status = result_grep.get('exit_status', -1)
-    found = (grep_exit_status == 0)
-    grep_error = (grep_exit_status > 1)
+        if verbose: console.print(format_ssh_output(result_grep, self.grep_command))
+        if result_grep.get('error'):
+            raise ChallengeValidationError([f"Grep command execution error: {result_grep['error']}"])
 
-    if grep_error:
-        stderr_info = result_grep.get('stderr', '')
-        raise ChallengeValidationError([f"Error running grep on '{file_path}' (exit status {grep_exit_status}). File might have changed, or permissions issue. STDERR: {stderr_info}"])
+        # grep exit status: 0=found, 1=not found, >1=error
+        grep_exit_status = result_grep.get('exit_status', -1)
+        found = (grep_exit_status == 0)
 
-    if found != expected_state:
-        state_str = "found" if found else "not found"
-        expected_str = "be found" if expected_state else "not be found"
-        raise ChallengeValidationError([f"Expected {search_desc} to {expected_str} in '{file_path}', but it was {state_str}."])
-    return True
-def _validate_check_lvm_state(step_data: dict, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool) -> bool:
-    """
-    Validates LVM state (PVs, VGs, LVs) based on specified criteria.
-    Returns True on success, raises ChallengeValidationError on failure.
-    """
-    check_type = step_data.get("check_type")
-    expected_state = step_data.get("expected_state", True) # Default: expect existence/match
-    step_reasons = []
-    note = "[Note: LVM checks require lvm2 package installed on the VM]"
+        if grep_exit_status > 1:
+            stderr_info = result_grep.get('stderr', '')
+            raise ChallengeValidationError([f"Error running grep on '{self.path}' (exit status {grep_exit_status}). File might have changed, or permissions issue. STDERR: {stderr_info}"])
 
-    if not check_type:
-        raise ChallengeValidationError(["'check_lvm_state' step requires 'check_type'."])
+        if found != self.expected_state:
+            state_str = "found" if found else "not found"
+            expected_str = "be found" if self.expected_state else "not be found"
+            raise ChallengeValidationError([f"Expected {self.search_desc} to {expected_str} in '{self.path}', but it was {state_str}."])
+        return True
 
-    cmd = ""
-    check_desc = ""
 
-    try:
-        # --- Build Command Based on Check Type ---
+@dataclass(frozen=True)
+class LvmStateCheck(ValidationCheck):
+    """Validates LVM state (PV, VG and LV existence, LV size)."""
+    step_type: ClassVar[str] = "check_lvm_state"
+    NOTE: ClassVar[str] = "[Note: LVM checks require lvm2 package installed on the VM]"
+    EXISTENCE_CHECKS: ClassVar[Tuple[str, ...]] = ("pv_exists", "vg_exists", "lv_exists")
+
+    check_type: str
+    expected_state: bool
+    command: str
+    check_desc: str
+    lv_path: Optional[str]
+    exact_size_mb: Optional[float]
+    min_size_mb: Optional[float]
+    max_size_mb: Optional[float]
+
+    @classmethod
+    def compile(cls, step_data: dict) -> "LvmStateCheck":
+        check_type = step_data.get("check_type")
+        expected_state = step_data.get("expected_state", True) # Default: expect existence/match
+        if not check_type:
+            raise ChallengeValidationError(["'check_lvm_state' step requires 'check_type'."])
+
+        lv_path = None
+        sizes: Dict[str, Optional[float]] = {"exact_size_mb": None, "min_size_mb": None, "max_size_mb": None}
         if check_type == "pv_exists":
             device = step_data.get("device")
             if not device: raise ChallengeValidationError(["'pv_exists' check requires 'device'."])
-            quoted_device = shlex.quote(device)
-            cmd = f"pvs --noheadings -o pv_name {quoted_device}"
+            cmd = f"pvs --noheadings -o pv_name {shlex.quote(device)}"
             check_desc = f"PV existence for device '{device}'"
         elif check_type == "vg_exists":
             vg_name = step_data.get("vg_name")
             if not vg_name: raise ChallengeValidationError(["'vg_exists' check requires 'vg_name'."])
-            quoted_vg = shlex.quote(vg_name)
-            cmd = f"vgs --noheadings -o vg_name {quoted_vg}"
+            cmd = f"vgs --noheadings -o vg_name {shlex.quote(vg_name)}"
             check_desc = f"VG existence for VG '{vg_name}'"
-        elif check_type == "lv_exists":
-            vg_name = step_data.get("vg_name")
-            lv_name = step_data.get("lv_name")
-            if not vg_name or not lv_name: raise ChallengeValidationError(["'lv_exists' check requires 'vg_name' and 'lv_name'."])
-            quoted_vg = shlex.quote(vg_name)
-            quoted_lv = shlex.quote(lv_name)
-            lv_path = f"{quoted_vg}/{quoted_lv}" # LVM path format
-            cmd = f"lvs --noheadings -o lv_name {lv_path}"
-            check_desc = f"LV existence for LV '{lv_path}'"
-        elif check_type == "lv_size":
+        elif check_type in ("lv_exists", "lv_size"):
             vg_name = step_data.get("vg_name")
             lv_name = step_data.get("lv_name")
-            min_size_mb = step_data.get("min_size_mb")
-            max_size_mb = step_data.get("max_size_mb")
-            exact_size_mb = step_data.get("exact_size_mb") # Optional alternative
-
-            if not vg_name or not lv_name: raise ChallengeValidationError(["'lv_size' check requires 'vg_name' and 'lv_name'."])
-            if min_size_mb is None and max_size_mb is None and exact_size_mb is None:
-                raise ChallengeValidationError(["'lv_size' check requires 'min_size_mb'/'max_size_mb' or 'exact_size_mb'."])
-
-            quoted_vg = shlex.quote(vg_name)
-            quoted_lv = shlex.quote(lv_name)
-            lv_path = f"{quoted_vg}/{quoted_lv}"
-            # Get size in megabytes using --units m
-            cmd = f"lvs --noheadings --units m -o lv_size {lv_path}"
-            size_desc = []
-            if exact_size_mb is not None: size_desc.append(f"exactly {exact_size_mb}MB")
-            if min_size_mb is not None: size_desc.append(f">= {min_size_mb}MB")
-            if max_size_mb is not None: size_desc.append(f"<= {max_size_mb}MB")
-            check_desc = f"LV size for '{lv_path}' (expected {' and '.join(size_desc)})"
+            if not vg_name or not lv_name: raise ChallengeValidationError([f"'{check_type}' check requires 'vg_name' and 'lv_name'."])
+            lv_path = f"{shlex.quote(vg_name)}/{shlex.quote(lv_name)}" # LVM path format
+            if check_type == "lv_exists":
+                cmd = f"lvs --noheadings -o lv_name {lv_path}"
+                check_desc = f"LV existence for LV '{lv_path}'"
+            else:
+                for key in sizes:
+                    if step_data.get(key) is not None:
+                        try:
+                            sizes[key] = float(step_data[key])
+                        except (ValueError, TypeError):
+                            raise ChallengeValidationError([f"'lv_size' check '{key}' must be a number, got '{step_data[key]}'."])
+                if all(size is None for size in sizes.values()):
+                    raise ChallengeValidationError(["'lv_size' check requires 'min_size_mb'/'max_size_mb' or 'exact_size_mb'."])
+                # Get size in megabytes using --units m
+                cmd = f"lvs --noheadings --units m -o lv_size {lv_path}"
+                size_desc = []
+                if sizes["exact_size_mb"] is not None: size_desc.append(f"exactly {sizes['exact_size_mb']:g}MB")
+                if sizes["min_size_mb"] is not None: size_desc.append(f">= {sizes['min_size_mb']:g}MB")
+                if sizes["max_size_mb"] is not None: size_desc.append(f"<= {sizes['max_size_mb']:g}MB")
+                check_desc = f"LV size for '{lv_path}' (expected {' and '.join(size_desc)})"
         else:
             raise ChallengeValidationError([f"Unsupported 'check_type' for check_lvm_state: '{check_type}'"])
 
-        # --- Execute Command ---
-        if verbose:
-            console.print(f"[dim]Executing LVM check command: `{cmd}`[/]")
-        result = run_ssh_command(vm_ip, ssh_user, ssh_key, cmd, verbose=False)
+        return cls(check_type=check_type, expected_state=expected_state, command=cmd,
+                   check_desc=check_desc, lv_path=lv_path, **sizes)
 
-        if result.get('error'):
-            raise ChallengeValidationError([f"LVM check command execution error: {result['error']}", note])
-        if verbose:
-            console.print(format_ssh_output(result, f"LVM Check: {check_type}"))
-
-        # --- Process Results ---
-        exit_status = result.get('exit_status', -1)
-        stdout = result.get('stdout', '').strip()
-        stderr = result.get('stderr', '').strip() # Check stderr for LVM tool errors
-
-        # Generic LVM command errors (often exit 5 for "not found")
-        if exit_status != 0:
-             # Treat non-zero exit as "not found" or failed for existence checks
-             if check_type in ["pv_exists", "vg_exists", "lv_exists"]:
-                 component_found = False
-             # For size check, non-zero means LV likely doesn't exist
-             elif check_type == "lv_size":
-                 step_reasons.append(f"Could not retrieve size for LV '{lv_path}'. Does it exist? LVM tool exit code: {exit_status}. STDERR: {stderr}")
-                 raise ChallengeValidationError(step_reasons + [note])
-             else: # Should not happen if check_type is validated above
-                 step_reasons.append(f"LVM command failed with exit code {exit_status}. STDERR: {stderr}")
-                 raise ChallengeValidationError(step_reasons + [note])
-        else:
-            # Exit code 0 generally means found for existence checks
-            if check_type in ["pv_exists", "vg_exists", "lv_exists"]:
-                 component_found = True
-            # For size check, need to parse the output
-            elif check_type == "lv_size":
-                 try:
-                     # Output is like " 100.00m", remove unit and whitespace
-                     size_str = stdout.lower().replace('m', '').strip()
-                     actual_size_mb = float(size_str)
-
-                     # Perform size comparisons
-                     size_ok = True
-                     if exact_size_mb is not None and abs(actual_size_mb - float(exact_size_mb)) > 0.1: # Allow small float tolerance
-                          size_ok = False
-                          step_reasons.append(f"Expected LV size exactly {exact_size_mb}MB, but found {actual_size_mb:.2f}MB.")
-                     else: # Check min/max if exact not specified or matched
-                         if min_size_mb is not None and actual_size_mb < float(min_size_mb):
-                             size_ok = False
-                             step_reasons.append(f"LV size {actual_size_mb:.2f}MB is less than minimum requirement ({min_size_mb}MB).")
-                         if max_size_mb is not None and actual_size_mb > float(max_size_mb):
-                             size_ok = False
-                             step_reasons.append(f"LV size {actual_size_mb:.2f}MB is greater than maximum requirement ({max_size_mb}MB).")
-
-                     if not size_ok:
-                          raise ChallengeValidationError(step_reasons + [note])
-                     # If size is okay, validation passes for this type
-                     return True # Size check successful
-
-                 except (ValueError, TypeError) as parse_err:
-                      step_reasons.append(f"Could not parse LVM size output '{stdout}': {parse_err}")
-                      raise ChallengeValidationError(step_reasons + [note])
-
-        # --- Final check for existence types ---
-        if check_type in ["pv_exists", "vg_exists", "lv_exists"]:
-            if component_found != expected_state:
-                state_str = "found" if component_found else "not found"
-                expected_str = "exist" if expected_state else "not exist"
-                step_reasons.append(f"Expected {check_desc} to {expected_str}, but it was {state_str}.")
-                if exit_status != 0: # Add stderr if LVM command failed
-                     step_reasons.append(f"LVM tool exit code: {exit_status}. STDERR: {stderr}")
+    def run(self, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool,
+            log_checkpoint: Optional[LogCheckpoint] = None) -> bool:
+        note = self.NOTE
+        step_reasons = []
+        try:
+            if verbose:
+                console.print(f"[dim]Executing LVM check command: `{self.command}`[/]")
+            result = _run_remote(vm_ip, ssh_user, ssh_key, self.command)
+
+            if result.get('error'):
+                raise ChallengeValidationError([f"LVM check command execution error: {result['error']}", note])
+            if verbose:
+                console.print(format_ssh_output(result, f"LVM Check: {self.check_type}"))
+
+            exit_status = result.get('exit_status', -1)
+            stdout = result.get('stdout', '').strip()
+            stderr = result.get('stderr', '').strip() # Check stderr for LVM tool errors
+
+            if self.check_type in self.EXISTENCE_CHECKS:
+                # Non-zero exit (often 5) means the component was not found
+                component_found = (exit_status == 0)
+                if component_found != self.expected_state:
+                    state_str = "found" if component_found else "not found"
+                    expected_str = "exist" if self.expected_state else "not exist"
+                    step_reasons.append(f"Expected {self.check_desc} to {expected_str}, but it was {state_str}.")
+                    if exit_status != 0: # Add stderr if LVM command failed
+                         step_reasons.append(f"LVM tool exit code: {exit_status}. STDERR: {stderr}")
+                    raise ChallengeValidationError(step_reasons + [note])
+                return True
+
+            # lv_size: non-zero exit means the LV likely doesn't exist
+            if exit_status != 0:
+                raise ChallengeValidationError([f"Could not retrieve size for LV '{self.lv_path}'. Does it exist? LVM tool exit code: {exit_status}. STDERR: {stderr}", note])
+            try:
+                # Output is like " 100.00m", remove unit and whitespace
+                actual_size_mb = float(stdout.lower().replace('m', '').strip())
+            except (ValueError, TypeError) as parse_err:
+                raise ChallengeValidationError([f"Could not parse LVM size output '{stdout}': {parse_err}", note])
+
+            if self.exact_size_mb is not None and abs(actual_size_mb - self.exact_size_mb) > 0.1: # Allow small float tolerance
+                step_reasons.append(f"Expected LV size exactly {self.exact_size_mb:g}MB, but found {actual_size_mb:.2f}MB.")
+            else: # Check min/max if exact not specified or matched
+                if self.min_size_mb is not None and actual_size_mb < self.min_size_mb:
+                    step_reasons.append(f"LV size {actual_size_mb:.2f}MB is less than minimum requirement ({self.min_size_mb:g}MB).")
+                if self.max_size_mb is not None and actual_size_mb > self.max_size_mb:
+                    step_reasons.append(f"LV size {actual_size_mb:.2f}MB is greater than maximum requirement ({self.max_size_mb:g}MB).")
+            if step_reasons:
                 raise ChallengeValidationError(step_reasons + [note])
-            # If state matches expected, validation passes
             return True
 
-    except SSHCommandError as e:
-        raise ChallengeValidationError([f"SSH execution failed during LVM check: {e}", note])
-    except ChallengeValidationError: # Re-raise known validation errors
-        raise
-    except Exception as e: # Catch unexpected errors
-        raise ChallengeValidationError([f"Unexpected error during LVM check logic: {e}", note])
+        except SSHCommandError as e:
+            raise ChallengeValidationError([f"SSH execution failed during LVM check: {e}", note])
+        except ChallengeValidationError: # Re-raise known validation errors
+            raise
+        except Exception as e: # Catch unexpected errors
+            raise ChallengeValidationError([f"Unexpected error during LVM check logic: {e}", note])
+
+
+# Step type -> check class. Keep in sync with SUPPORTED_VALIDATION_TYPES in challenge.py
+# (check_process is implemented but not yet enabled for challenges).
+_CHECK_TYPES: Dict[str, type] = {
+    check.step_type: check for check in (
+        CommandCheck, ServiceStatusCheck, PortListeningCheck, FileExistsCheck, FileContainsCheck,
+        HistoryCheck, JournalCheck, AuditLogCheck, LvmStateCheck,
+    )
+}
+
+
+def compile_validation_step(step_data: dict) -> ValidationCheck:
+    """Compiles one validation step, raising ChallengeValidationError if it is malformed."""
+    if not isinstance(step_data, dict):
+        raise ChallengeValidationError(["Validation step must be a dictionary."])
+    step_type = step_data.get("type")
+    check_cls = _CHECK_TYPES.get(step_type)
+    if check_cls is None:
+        raise ChallengeValidationError([f"Unsupported validation step type: '{step_type}'"])
+    return check_cls.compile(step_data)
+
+
+@dataclass(frozen=True)
+class ValidationPlan:
+    """The compiled validation steps of a challenge, in execution order."""
+    steps: Tuple[ValidationCheck, ...]
+
+    @property
+    def needs_log_checkpoint(self) -> bool:
+        """Whether any step reads the journal or audit log (and so benefits from a checkpoint)."""
+        return any(step.USES_LOG_CHECKPOINT for step in self.steps)
+
+
+def compile_validation_plan(challenge: dict) -> ValidationPlan:
+    """
+    Compiles a challenge's validation steps: 'validation', or 'final_state_checks'
+    followed by 'process_validation_checks'.
+
+    Raises ChallengeValidationError listing every malformed step.
+    """
+    if 'validation' in challenge:
+        groups = [('validation', challenge.get('validation') or [])]
+    else:
+        groups = [('final_state_checks', challenge.get('final_state_checks') or []),
+                  ('process_validation_checks', challenge.get('process_validation_checks') or [])]
+    steps: List[ValidationCheck] = []
+    reasons: List[str] = []
+    for key_name, group in groups:
+        for i, step_data in enumerate(group):
+            try:
+                steps.append(compile_validation_step(step_data))
+            except ChallengeValidationError as e:
+                reasons.extend(f"{key_name} step {i + 1}: {reason}" for reason in e.reasons)
+    if reasons:
+        raise ChallengeValidationError(reasons)
+    return ValidationPlan(steps=tuple(steps))
 
 
 # --- Main Execution Function ---
-def execute_validation_step(step_num: int, step_data: dict, vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool):
-    """Executes a single validation step, raising ChallengeValidationError on failure."""
-    step_type = step_data.get("type")
+def execute_validation_step(step_num: int, step: Union[ValidationCheck, dict], vm_ip: str, ssh_user: str, ssh_key: Path, verbose: bool,
+                            log_checkpoint: Optional[LogCheckpoint] = None):
+    """
+    Executes a single validation step, raising ChallengeValidationError on failure.
+    The step is a compiled check from the challenge's ValidationPlan; a raw step
+    dictionary is compiled on the fly. Journal and audit steps read from
+    log_checkpoint when one is given.
+    """
+    step_type = step.step_type if isinstance(step, ValidationCheck) else step.get("type")
     step_title = f"Step {step_num}: [bold cyan]{step_type}[/]"
 
-    # Map step type to validation function
-    validation_functions = {
-        "run_command": _validate_run_command,
-        "check_service_status": _validate_check_service_status,
-        "check_port_listening": _validate_check_port_listening,
-        "check_file_exists": _validate_check_file_exists,
-        "check_file_contains": _validate_check_file_contains,
-        "check_history": _validate_check_history,           # <-- ADDED
-        "check_journalctl": _validate_check_journalctl,     # <-- ADDED
-        "check_audit_log": _validate_check_audit_log,       # <-- ADDED
-        "check_lvm_state": _validate_check_lvm_state,       # <-- Ensure this exists
-    }
-
-    validator_func = validation_functions.get(step_type)
-    if not validator_func:
+    if not isinstance(step, ValidationCheck) and step_type not in _CHECK_TYPES:
         # Provide more context in the error message
         raise ChallengeValidationError([f"Unsupported validation step type: '{step_type}' in step {step_num}"])
 
     try:
-        # Call the appropriate validation function
-        # It returns True on success or raises ChallengeValidationError on failure
-        validator_func(step_data, vm_ip, ssh_user, ssh_key, verbose)
+        check = step if isinstance(step, ValidationCheck) else compile_validation_step(step)
+        # Returns True on success or raises ChallengeValidationError on failure
+        check.run(vm_ip, ssh_user, ssh_key, verbose, log_checkpoint=log_checkpoint)
 
         # If no exception was raised, the step passed
         success_panel_content = "[green]:heavy_check_mark: Passed[/]"
@@ -1035,8 +1484,6 @@ def execute_validation_step(step_num: int, step_data: dict, vm_ip: str, ssh_user
          failure_panel_content = f"[bold red]:x: Failed[/]\n{reason}"
          if RICH_AVAILABLE:
             console.print(Panel(failure_panel_content, title=step_title, border_style="red", expand=False))
-            # Optionally include traceback for unexpected errors
-            # console.print_exception(show_locals=False)
          else:
              console.print(f"--- {step_title}: FAILED ---")
              console.print(reason)
@@ -1044,4 +1491,4 @@ def execute_validation_step(step_num: int, step_data: dict, vm_ip: str, ssh_user
              traceback.print_exc()
              console.print(f"--- End Failure ---")
          # Wrap unexpected error in ChallengeValidationError for consistent handling
-         raise ChallengeValidationError([reason]) from ex
\ No newline at end of file
+         raise ChallengeValidationError([reason]) from ex
@@ -4,126 +4,213 @@ import threading
 import queue
 import time
 import json
+import itertools
 from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
 from tkinter import filedialog # Used for selecting files/directories
 
+# --- GUI update tuning ---
+EVENT_POLL_INTERVAL_MS = 50     # How often the UI drains backend events when idle
+MAX_EVENTS_PER_TICK = 2000      # Events applied per tick; the rest wait for the next tick
+MAX_SCROLLBACK_LINES = 5000     # Oldest log lines are trimmed beyond this
+
+# --- Typed event protocol between backend threads and the GUI ---
+class EventKind:
+    LOG = "log"
+    PROGRESS = "progress"
+    RESULT = "result"
+    VMS_UPDATE = "vms_update"
+    CHALLENGES_UPDATE = "challenges_update"
+    USER_ACTION = "user_action"
+    TASK_DONE = "task_done"
+
+class GuiEvent(NamedTuple):
+    """One message from a backend task to the GUI thread."""
+    kind: str
+    task_id: int
+    text: str = ""
+    data: Any = None
+
+class TaskEvents:
+    """Event emitter handed to a backend task. Safe to call from any thread."""
+    def __init__(self, event_queue: "queue.Queue[GuiEvent]", task_id: int):
+        self._queue = event_queue
+        self.task_id = task_id
+
+    def log(self, text: str):
+        self._queue.put(GuiEvent(EventKind.LOG, self.task_id, text))
+
+    def progress(self, text: str, step: Optional[int] = None, total: Optional[int] = None):
+        """Report the current step. step defaults to the previous step + 1; total may be given once."""
+        self._queue.put(GuiEvent(EventKind.PROGRESS, self.task_id, text, (step, total)))
+
+    def result(self, success: bool, text: str):
+        self._queue.put(GuiEvent(EventKind.RESULT, self.task_id, text, success))
+
+    def vms(self, vm_names: List[str]):
+        self._queue.put(GuiEvent(EventKind.VMS_UPDATE, self.task_id, data=list(vm_names)))
+
+    def challenges(self, challenge_ids: List[str]):
+        self._queue.put(GuiEvent(EventKind.CHALLENGES_UPDATE, self.task_id, data=list(challenge_ids)))
+
+    def user_action(self, text: str):
+        self._queue.put(GuiEvent(EventKind.USER_ACTION, self.task_id, text))
+
+    def done(self):
+        self._queue.put(GuiEvent(EventKind.TASK_DONE, self.task_id))
+
+class TaskProgress:
+    """Progress model of one backend task, shown below the output log."""
+    def __init__(self, task_id: int, title: str):
+        self.task_id = task_id
+        self.title = title
+        self.text = "Starting..."
+        self.step = 0
+        self.total: Optional[int] = None
+        self.started = time.monotonic()
+        self.finished = False
+        self.success: Optional[bool] = None
+
+    def update(self, text: str, step: Optional[int], total: Optional[int]):
+        self.text = text
+        self.step = step if step is not None else self.step + 1
+        if total is not None:
+            self.total = total
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Completed fraction, or None when the number of steps is unknown."""
+        if self.finished:
+            return 1.0
+        if not self.total:
+            return None
+        return min(1.0, self.step / self.total)
+
+    def label(self) -> str:
+        steps = f"{self.step}/{self.total}" if self.total else f"step {self.step}"
+        elapsed = time.monotonic() - self.started
+        if self.finished:
+            state = {True: "succeeded", False: "failed", None: "finished"}[self.success]
+            return f"{self.title}: {state} after {elapsed:.0f}s"
+        return f"{self.title}: {self.text} ({steps}, {elapsed:.0f}s)"
+
 # --- Placeholder for your refactored backend ---
 # You will replace these placeholder calls with your actual backend logic.
-# Your backend functions need to accept parameters and a log_queue.
+# Your backend functions need to accept a TaskEvents emitter followed by their parameters.
 class BackendPlaceholder:
-    def list_vms(self, log_queue, libvirt_uri):
-        log_queue.put("LOG: Requesting VM list...")
+    def list_vms(self, events, libvirt_uri):
+        events.log("Requesting VM list...")
         # Simulate network delay
         time.sleep(1.5)
         # Simulate finding VMs
         vms = ["ubuntu24.04-1", "fedora-dev", "kali-rolling", "debian-stable"]
-        log_queue.put(f"VMS_UPDATE:{','.join(vms)}") # Use a prefix for specific updates
-        log_queue.put("LOG: VM list updated.")
+        events.vms(vms)
+        events.log("VM list updated.")
 
-    def list_challenges(self, log_queue, challenges_dir):
-        log_queue.put(f"LOG: Requesting challenges from '{challenges_dir}'...")
+    def list_challenges(self, events, challenges_dir):
+        events.log(f"Requesting challenges from '{challenges_dir}'...")
         time.sleep(1)
         # Simulate finding challenges
         challenges = ["set_hostname", "manage_users_add", "create_tmp_file", "dns-lookup"]
-        log_queue.put(f"CHALLENGES_UPDATE:{','.join(challenges)}")
-        log_queue.put("LOG: Challenge list updated.")
+        events.challenges(challenges)
+        events.log("Challenge list updated.")
 
-    def setup_user(self, log_queue, vm_name, new_user, admin_user, admin_key, pub_key, libvirt_uri):
-         log_queue.put(f"LOG: Starting user setup for '{new_user}' on '{vm_name}'...")
-         log_queue.put(f"LOG:  > Using admin '{admin_user}' and key '{admin_key}'")
-         log_queue.put(f"LOG:  > Installing public key '{pub_key}'")
+    def setup_user(self, events, vm_name, new_user, admin_user, admin_key, pub_key, libvirt_uri):
+         events.log(f"Starting user setup for '{new_user}' on '{vm_name}'...")
+         events.log(f" > Using admin '{admin_user}' and key '{admin_key}'")
+         events.log(f" > Installing public key '{pub_key}'")
          time.sleep(0.5)
-         log_queue.put("PROGRESS: Connecting to libvirt...")
+         events.progress("Connecting to libvirt...", total=10)
          time.sleep(1)
-         log_queue.put("PROGRESS: Finding VM...")
+         events.progress("Finding VM...")
          time.sleep(1)
-         log_queue.put("PROGRESS: Starting VM if needed...")
+         events.progress("Starting VM if needed...")
          time.sleep(2)
-         log_queue.put("PROGRESS: Getting VM IP...")
+         events.progress("Getting VM IP...")
          time.sleep(1)
-         log_queue.put("PROGRESS: Waiting for SSH (admin user)...")
+         events.progress("Waiting for SSH (admin user)...")
          time.sleep(3)
-         log_queue.put("PROGRESS: Running useradd command...")
+         events.progress("Running useradd command...")
          time.sleep(2)
-         log_queue.put("PROGRESS: Creating .ssh directory...")
+         events.progress("Creating .ssh directory...")
          time.sleep(1)
-         log_queue.put("PROGRESS: Writing authorized_keys...")
+         events.progress("Writing authorized_keys...")
          time.sleep(2)
-         log_queue.put("PROGRESS: Setting permissions...")
+         events.progress("Setting permissions...")
          time.sleep(1)
-         log_queue.put("PROGRESS: Verifying SSH as new user...")
+         events.progress("Verifying SSH as new user...")
          time.sleep(3)
          # Simulate success or failure
          import random
          if random.choice([True, False]):
-             log_queue.put("RESULT:SUCCESS:User setup completed successfully!")
+             events.result(True, "User setup completed successfully!")
          else:
-             log_queue.put("RESULT:FAILURE:User setup failed during permission setting.")
-             log_queue.put("LOG: User setup finished with errors.")
+             events.result(False, "User setup failed during permission setting.")
+             events.log("User setup finished with errors.")
 
 
-    def run_challenge(self, log_queue, challenge_id, vm_name, snapshot_name, challenges_dir, ssh_user, ssh_key, simulate, keep_snapshot, verbose, libvirt_uri):
-        log_queue.put(f"LOG: Starting challenge '{challenge_id}' on '{vm_name}'...")
-        log_queue.put(f"LOG:  > Snapshot: '{snapshot_name}', User: '{ssh_user}', Key: '{ssh_key}'")
-        log_queue.put(f"LOG:  > Simulate: {simulate}, Keep Snapshot: {keep_snapshot}, Verbose: {verbose}")
+    def run_challenge(self, events, challenge_id, vm_name, snapshot_name, challenges_dir, ssh_user, ssh_key, simulate, keep_snapshot, verbose, libvirt_uri):
+        events.log(f"Starting challenge '{challenge_id}' on '{vm_name}'...")
+        events.log(f" > Snapshot: '{snapshot_name}', User: '{ssh_user}', Key: '{ssh_key}'")
+        events.log(f" > Simulate: {simulate}, Keep Snapshot: {keep_snapshot}, Verbose: {verbose}")
         time.sleep(0.5)
-        log_queue.put("PROGRESS: Loading challenge details...")
+        events.progress("Loading challenge details...")
         time.sleep(1)
-        log_queue.put("PROGRESS: Connecting to libvirt...")
+        events.progress("Connecting to libvirt...")
         time.sleep(1)
-        log_queue.put("PROGRESS: Checking for existing snapshot...")
+        events.progress("Checking for existing snapshot...")
         time.sleep(1)
-        log_queue.put("PROGRESS: Creating snapshot '{snapshot_name}'...")
+        events.progress(f"Creating snapshot '{snapshot_name}'...")
         time.sleep(3)
-        log_queue.put("PROGRESS: Starting VM...")
+        events.progress("Starting VM...")
         time.sleep(2)
-        log_queue.put("PROGRESS: Getting VM IP...")
+        events.progress("Getting VM IP...")
         time.sleep(1)
-        log_queue.put("PROGRESS: Waiting for SSH...")
+        events.progress("Waiting for SSH...")
         time.sleep(3)
-        log_queue.put("PROGRESS: Displaying challenge info...")
-        log_queue.put("LOG: === Challenge: Example Challenge ===") # Replace with actual details
-        log_queue.put("LOG: Objective: Configure the hostname to 'practice-server'.")
+        events.progress("Displaying challenge info...")
+        events.log("=== Challenge: Example Challenge ===") # Replace with actual details
+        events.log("Objective: Configure the hostname to 'practice-server'.")
         time.sleep(1)
-        log_queue.put("PROGRESS: Running setup steps (if any)...")
+        events.progress("Running setup steps (if any)...")
         time.sleep(2)
         if simulate:
-            log_queue.put("PROGRESS: Simulating user action...")
+            events.progress("Simulating user action...")
             time.sleep(2)
         else:
-            log_queue.put("USER_ACTION: Please perform the required actions on the VM. Click 'Validate' when ready.")
+            events.user_action("Please perform the required actions on the VM. Click 'Validate' when ready.")
             # In a real app, you'd likely disable/enable the Validate button here
             return # Stop the placeholder thread until user clicks Validate
 
-        log_queue.put("PROGRESS: Starting validation...")
+        events.progress("Starting validation...")
         time.sleep(1)
-        log_queue.put("PROGRESS: Validation Step 1: Check hostname command...")
+        events.progress("Validation Step 1: Check hostname command...")
         time.sleep(2)
         # Simulate pass/fail
         import random
         passed = random.choice([True, False])
         if passed:
-            log_queue.put("PROGRESS: Validation Step 1 Passed.")
-            log_queue.put("RESULT:SUCCESS:Challenge PASSED! Score: 90/100") # Example score
+            events.progress("Validation Step 1 Passed.")
+            events.result(True, "Challenge PASSED! Score: 90/100") # Example score
         else:
-            log_queue.put("PROGRESS: Validation Step 1 FAILED: Expected exit status 0, got 1.")
-            log_queue.put("RESULT:FAILURE:Challenge FAILED. Score: 0/100")
+            events.progress("Validation Step 1 FAILED: Expected exit status 0, got 1.")
+            events.result(False, "Challenge FAILED. Score: 0/100")
 
-        log_queue.put("PROGRESS: Starting cleanup...")
+        events.progress("Starting cleanup...")
         time.sleep(1)
         if not keep_snapshot:
-            log_queue.put("PROGRESS: Reverting snapshot...")
+            events.progress("Reverting snapshot...")
             time.sleep(3)
-            log_queue.put("PROGRESS: Deleting snapshot...")
+            events.progress("Deleting snapshot...")
             time.sleep(2)
         else:
-             log_queue.put("LOG: Keeping snapshot as requested.")
-        log_queue.put("PROGRESS: Closing libvirt connection...")
+             events.log("Keeping snapshot as requested.")
+        events.progress("Closing libvirt connection...")
         time.sleep(1)
-        log_queue.put("LOG: Challenge workflow finished.")
+        events.log("Challenge workflow finished.")
 
-    def create_template(self, log_queue, output_file):
-        log_queue.put(f"LOG: Creating challenge template at '{output_file}'...")
+    def create_template(self, events, output_file):
+        events.log(f"Creating challenge template at '{output_file}'...")
         time.sleep(0.5)
         # Simulate file creation
         try:
@@ -135,20 +222,20 @@ class BackendPlaceholder:
                  f.write("validation:\n")
                  f.write("  - type: run_command\n")
                  f.write("    command: \"echo 'Validate me!'\"\n")
-             log_queue.put(f"RESULT:SUCCESS:Template created: {output_file}")
+             events.result(True, f"Template created: {output_file}")
         except Exception as e:
-             log_queue.put(f"RESULT:FAILURE:Failed to create template: {e}")
+             events.result(False, f"Failed to create template: {e}")
 
 
-    def validate_challenge_file(self, log_queue, file_path):
-        log_queue.put(f"LOG: Validating challenge file: '{file_path}'...")
+    def validate_challenge_file(self, events, file_path):
+        events.log(f"Validating challenge file: '{file_path}'...")
         time.sleep(1.5)
         # Simulate validation
         import random
         if random.choice([True, True, False]): # Higher chance of success
-             log_queue.put(f"RESULT:SUCCESS:Validation successful for {Path(file_path).name}")
+             events.result(True, f"Validation successful for {Path(file_path).name}")
         else:
-             log_queue.put(f"RESULT:FAILURE:Validation failed for {Path(file_path).name}: Missing 'description' key.")
+             events.result(False, f"Validation failed for {Path(file_path).name}: Missing 'description' key.")
 
 # --- Main GUI Application Class ---
 class LPEM_GUI(ctk.CTk):
@@ -162,8 +249,12 @@ class LPEM_GUI(ctk.CTk):
 
         self.config_file = Path("lpem_gui_config.json")
         self.backend = BackendPlaceholder() # Instantiate your backend interface
-        self.log_queue = queue.Queue()
-        self.active_threads = []
+        self.event_queue: "queue.Queue[GuiEvent]" = queue.Queue()
+        self.active_threads: Dict[int, threading.Thread] = {}
+        self.tasks: Dict[int, TaskProgress] = {}
+        self._task_ids = itertools.count(1)
+        self._log_line_count = 0
+        self._progress_mode = "determinate"
 
         # --- Main Layout ---
         self.grid_columnconfigure(1, weight=1)
@@ -239,6 +330,11 @@ class LPEM_GUI(ctk.CTk):
         self.tabview.tab("Output Log").grid_rowconfigure(0, weight=1)
         self.output_log = ctk.CTkTextbox(self.tabview.tab("Output Log"), state="disabled", wrap="word", font=("monospace", 12))
         self.output_log.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
+        self.progress_label = ctk.CTkLabel(self.tabview.tab("Output Log"), text="Idle", anchor="w")
+        self.progress_label.grid(row=1, column=0, padx=5, pady=(5, 0), sticky="ew")
+        self.progress_bar = ctk.CTkProgressBar(self.tabview.tab("Output Log"))
+        self.progress_bar.grid(row=2, column=0, padx=5, pady=(0, 5), sticky="ew")
+        self.progress_bar.set(0)
 
         # Configuration Tab
         self.tabview.tab("Configuration").grid_columnconfigure(1, weight=1)
@@ -303,69 +399,123 @@ class LPEM_GUI(ctk.CTk):
 
     def _log_message(self, message):
         """Appends a message to the output log textbox."""
+        self._append_log_lines([message])
+
+    def _append_log_lines(self, lines):
+        """Appends lines with a single textbox insert and trims the scrollback."""
+        if not lines:
+            return
+        text = "\n".join(lines) + "\n"
         self.output_log.configure(state="normal")
-        self.output_log.insert("end", f"{message}\n")
+        self.output_log.insert("end", text)
+        self._log_line_count += text.count("\n")
+        excess = self._log_line_count - MAX_SCROLLBACK_LINES
+        if excess > 0:
+            self.output_log.delete("1.0", f"{excess + 1}.0")
+            self._log_line_count -= excess
         self.output_log.configure(state="disabled")
         self.output_log.see("end") # Auto-scroll
 
-    def _process_log_queue(self):
-        """Processes messages from the backend thread queue."""
+    def _process_events(self):
+        """Drains a batch of backend events and applies them in one UI update."""
+        events = []
         try:
-            while True: # Process all available messages
-                msg = self.log_queue.get_nowait()
-
-                if msg.startswith("LOG:"):
-                    self._log_message(msg[4:])
-                elif msg.startswith("PROGRESS:"):
-                     self._log_message(f"[{msg[9:]}]")
-                elif msg.startswith("RESULT:SUCCESS:"):
-                     self._log_message(f"✅ SUCCESS: {msg[15:]}")
-                     self.validate_button.configure(state="disabled") # Re-disable on completion
-                elif msg.startswith("RESULT:FAILURE:"):
-                     self._log_message(f"❌ FAILURE: {msg[16:]}")
-                     self.validate_button.configure(state="disabled") # Re-disable on completion
-                elif msg.startswith("VMS_UPDATE:"):
-                     vms = msg[11:].split(',') if msg[11:] else []
-                     self._update_vm_list(vms)
-                elif msg.startswith("CHALLENGES_UPDATE:"):
-                     challenges = msg[18:].split(',') if msg[18:] else []
-                     self._update_challenge_list(challenges)
-                elif msg.startswith("USER_ACTION:"):
-                     self._log_message(f"👉 ACTION REQUIRED: {msg[12:]}")
-                     self.validate_button.configure(state="normal") # Enable validate button
-                elif msg == "THREAD_DONE":
-                    self.active_threads.pop(0) # Remove the finished thread indicator
-                    # Optional: Re-enable buttons if needed
-                else:
-                    self._log_message(f"Unknown message: {msg}")
-
-                self.log_queue.task_done()
+            while len(events) < MAX_EVENTS_PER_TICK:
+                events.append(self.event_queue.get_nowait())
         except queue.Empty:
-            pass # No messages left
+            pass # No events left
+        try:
+            if events:
+                self._apply_events(events)
         finally:
-            # Schedule the next check
-            self.after(100, self._process_log_queue)
+            # Come back immediately while a backlog remains, otherwise poll
+            delay = 1 if not self.event_queue.empty() else EVENT_POLL_INTERVAL_MS
+            self.after(delay, self._process_events)
+
+    def _apply_events(self, events):
+        """Applies a batch of events. List updates are coalesced to the latest one."""
+        lines = []
+        vms_update = None
+        challenges_update = None
+        for event in events:
+            task = self.tasks.get(event.task_id)
+            if event.kind == EventKind.LOG:
+                lines.append(event.text)
+            elif event.kind == EventKind.PROGRESS:
+                lines.append(f"[{event.text}]")
+                if task:
+                    step, total = event.data
+                    task.update(event.text, step, total)
+            elif event.kind == EventKind.RESULT:
+                lines.append(f"✅ SUCCESS: {event.text}" if event.data else f"❌ FAILURE: {event.text}")
+                if task:
+                    task.success = event.data
+                self.validate_button.configure(state="disabled") # Re-disable on completion
+            elif event.kind == EventKind.VMS_UPDATE:
+                vms_update = event.data
+            elif event.kind == EventKind.CHALLENGES_UPDATE:
+                challenges_update = event.data
+            elif event.kind == EventKind.USER_ACTION:
+                lines.append(f"👉 ACTION REQUIRED: {event.text}")
+                self.validate_button.configure(state="normal") # Enable validate button
+            elif event.kind == EventKind.TASK_DONE:
+                self.active_threads.pop(event.task_id, None)
+                if task:
+                    task.finished = True
+            else:
+                lines.append(f"Unknown event: {event}")
+
+        self._append_log_lines(lines)
+        if vms_update is not None:
+            self._update_vm_list(vms_update)
+        if challenges_update is not None:
+            self._update_challenge_list(challenges_update)
+        self._render_progress()
+
+    def _render_progress(self):
+        """Shows the most recent running task, or the last finished one."""
+        running = [t for t in self.tasks.values() if not t.finished]
+        task = running[-1] if running else (list(self.tasks.values())[-1] if self.tasks else None)
+        if task is None:
+            return
+        self.progress_label.configure(text=task.label())
+        fraction = task.fraction
+        mode = "indeterminate" if fraction is None else "determinate"
+        if mode != self._progress_mode:
+            self._progress_mode = mode
+            self.progress_bar.configure(mode=mode)
+            if mode == "indeterminate":
+                self.progress_bar.start()
+            else:
+                self.progress_bar.stop()
+        if fraction is not None:
+            self.progress_bar.set(fraction)
+        # Only keep finished tasks around until they are no longer displayed
+        for task_id in [t.task_id for t in self.tasks.values() if t.finished and t is not task]:
+            del self.tasks[task_id]
 
     def _start_queue_processor(self):
-        """Starts the loop to process the log queue."""
-        self.after(100, self._process_log_queue)
+        """Starts the loop that processes backend events."""
+        self.after(EVENT_POLL_INTERVAL_MS, self._process_events)
 
-    def _run_backend_task(self, target_func, *args):
+    def _run_backend_task(self, target_func, events, *args):
         """Wrapper to run a backend function in a thread and signal completion."""
         try:
-            target_func(self.log_queue, *args)
+            target_func(events, *args)
         except Exception as e:
-            self.log_queue.put(f"RESULT:FAILURE:Thread error: {e}")
+            events.result(False, f"Thread error: {e}")
             import traceback
-            self.log_queue.put(f"LOG: Traceback:\n{traceback.format_exc()}")
+            events.log(f"Traceback:\n{traceback.format_exc()}")
         finally:
-            self.log_queue.put("THREAD_DONE")
+            events.done()
 
     def _start_thread(self, target_func, *args):
-         """Starts a backend task in a new thread."""
-         # Optional: Disable buttons while a thread is running
-         thread = threading.Thread(target=self._run_backend_task, args=(target_func,) + args, daemon=True)
-         self.active_threads.append(thread) # Keep track (optional)
+         """Starts a backend task in a new thread with its own progress model."""
+         task_id = next(self._task_ids)
+         self.tasks[task_id] = TaskProgress(task_id, target_func.__name__.replace("_", " ").capitalize())
+         events = TaskEvents(self.event_queue, task_id)
+         thread = threading.Thread(target=self._run_backend_task, args=(target_func, events) + args, daemon=True)
+         self.active_threads[task_id] = thread
          thread.start()
 
 
@@ -488,7 +638,8 @@ class LPEM_GUI(ctk.CTk):
         # In a real implementation, you might need a more sophisticated way
         # to signal the specific backend thread if multiple could run.
         # For this placeholder, we assume the run_challenge placeholder handles it.
-        self.backend.run_challenge(self.log_queue, # Resuming the placeholder logic
+        # Runs in a worker thread so the UI stays responsive while it continues.
+        self._start_thread(self.backend.run_challenge, # Resuming the placeholder logic
              self.selected_challenge.get(), self.selected_vm.get(),
              "gui_snapshot", self.challenge_dir_entry.get(),
              self.config_default_user.get() or "roo",
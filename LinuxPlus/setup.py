@@ -12,6 +12,7 @@ setup(
     install_requires=[
         "libvirt-python",
         "paramiko",
+        "asyncssh",
         "pyyaml",
         "typer[all]",
         "rich",
@@ -50,18 +50,12 @@ class VMService:
     def _get_vm_info(self, conn: libvirt.virConnect, vm_name: str) -> Dict[str, Any]:
         """Get detailed information about a specific VM."""
         try:
-            domain: libvirt.virDomain = self.vm_manager.find_vm(vm_name)
-            is_active: bool = domain.isActive()
-            
-            vm_info: Dict[str, Any] = {
-                'name': vm_name,
-                'status': 'running' if is_active else 'stopped',
-                'id': domain.ID() if is_active else None,
-                'ip': None
-            }
+            # Status comes from the event-driven domain cache, the IP from the TTL cache
+            vm_info: Dict[str, Any] = self.vm_manager.get_vm_state(vm_name)
+            vm_info['ip'] = None
             
             # Get IP address if running
-            if is_active:
+            if vm_info['status'] == 'running':
                 try:
                     vm_info['ip'] = self.vm_manager.get_vm_ip(vm_name)
                 except Exception as e:
@@ -2,111 +2,123 @@
 """
 CLI Playground utility for simulating Linux commands in the GUI.
 Provides a safe, educational terminal simulation environment.
+
+File and text commands run in a VirtualShell on a per-playground
+copy-on-write VirtualFilesystem, so pipes, redirection and globbing behave
+like bash without ever touching the host. System tools that only make sense
+on a real machine (ps, systemctl, grub2-install, ...) keep their static
+simulated output.
 """
 
-from datetime import datetime
-from typing import Dict, List, Tuple, Any
-import subprocess
-import os
-import json
-import shlex
-from pathlib import Path
+from typing import Dict, List, Any
 
+from utils.vfs_shell import HISTORY_LIMIT, VirtualShell
+from utils.virtual_fs import VirtualFilesystem
 
 
 class CLIPlayground:
     """Simulates a Linux command-line interface for educational purposes."""
     
-    def __init__(self):
-        """Initialize the CLI playground."""
-        self.current_directory = "/home/user"
+    def __init__(self, history_limit: int = HISTORY_LIMIT):
+        """
+        Initialize the CLI playground.
+        
+        Args:
+            history_limit: Commands kept in the history ring buffer
+        """
         self.username = "user"
         self.hostname = "linux-playground"
-        self.command_history: List[str] = []
-        self.command_history = []
-        self.current_directory = os.getcwd()
-        self.safe_commands = {
-            'ls': self._cmd_ls,
-            'pwd': self._cmd_pwd,
-            'cd': self._cmd_cd,
-            'echo': self._cmd_echo,
-            'cat': self._cmd_cat,
-            'head': self._cmd_head,
-            'tail': self._cmd_tail,
-            'grep': self._cmd_grep,
-            'find': self._cmd_find,
-            'wc': self._cmd_wc,
-            'sort': self._cmd_sort,
-            'uniq': self._cmd_uniq,
-            'date': self._cmd_date,
-            'whoami': self._cmd_whoami,
-            'ps': self._cmd_ps,
-            'df': self._cmd_df,
-            'free': self._cmd_free,
-            'uptime': self._cmd_uptime,
-            'history': self._cmd_history,
-            'clear': self._cmd_clear,
-            'help': self._cmd_help
+        self.shell = VirtualShell(VirtualFilesystem(), username=self.username, hostname=self.hostname,
+                                  history_limit=history_limit)
+        self.shell.help_text = self._get_web_help_text()
+        
+        # Static simulators for system tools the virtual filesystem cannot model
+        simulators = {
+            "ps": self._handle_ps,
+            "top": self._handle_top,
+            "df": self._handle_df,
+            "free": self._handle_free,
+            "uptime": self._cmd_uptime,
+            # Linux+ specific commands
+            "grub2-install": self._handle_grub2_install,
+            "grub2-mkconfig": self._handle_grub2_mkconfig,
+            "update-grub": self._handle_update_grub,
+            "mkinitrd": self._handle_mkinitrd,
+            "dracut": self._handle_dracut,
+            "nmap": self._handle_nmap,
+            "systemctl": self._handle_systemctl,
+            "journalctl": self._handle_journalctl,
+            "firewall-cmd": self._handle_firewall_cmd,
+            "iptables": self._handle_iptables,
+            "lsmod": self._handle_lsmod,
+            "modprobe": self._handle_modprobe,
+            "lsblk": self._handle_lsblk,
+            "fdisk": self._handle_fdisk,
+            "mount": self._handle_mount,
+            "umount": self._handle_umount,
         }
+        for name, handler in simulators.items():
+            self.shell.register_text_command(name, handler)
         
-        # Create a safe sandbox directory
-        self.sandbox_dir = Path.cwd() / "cli_sandbox"
-        self.sandbox_dir.mkdir(exist_ok=True)
+        # Every command the shell understands (shared with the shell)
+        self.safe_commands = self.shell.commands
+    
+    @property
+    def command_history(self) -> List[str]:
+        """Commands entered in this playground (most recent last)."""
+        return list(self.shell.history)
+    
+    @property
+    def current_directory(self) -> str:
+        """Current working directory inside the virtual filesystem."""
+        return self.shell.cwd
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the serializable session state (cwd, env, history, filesystem overlay).
         
-        # Initialize sample files
-        self._create_sample_files()
+        Returns:
+            Dict: JSON-serializable snapshot
+        """
+        return self.shell.snapshot()
+    
+    @classmethod
+    def from_snapshot(cls, state: Dict[str, Any], history_limit: int = HISTORY_LIMIT) -> 'CLIPlayground':
+        """
+        Create a playground from a snapshot taken by snapshot().
         
-        # Simulated file system
-        self.file_system: Dict[str, Dict[str, Dict[str, str | int]]] = {
-            "/home/user": {
-                "app.py": {"type": "file", "size": 4096, "permissions": "-rwxr-xr-x"},
-                "documents": {"type": "dir", "size": 4096, "permissions": "drwxr-xr--"},
-                "notes.txt": {"type": "file", "size": 8192, "permissions": "-rw-r--r--"}
-            },
-            "/home/user/documents": {
-                "study_notes.md": {"type": "file", "size": 2048, "permissions": "-rw-r--r--"},
-                "configs": {"type": "dir", "size": 4096, "permissions": "drwxr-xr-x"}
-            }
-        }
+        Args:
+            state: Snapshot dictionary
+            history_limit: Commands kept in the history ring buffer
+            
+        Returns:
+            CLIPlayground: Restored playground
+        """
+        playground = cls(history_limit=history_limit)
+        playground.shell.restore(state)
+        return playground
+    
     def _get_help_text(self):
         """Get comprehensive help text for CLI playground commands."""
         return """Linux Plus CLI Playground - Available Commands:
 
         FILE OPERATIONS:
-        ls                    - List files and directories
-        cat <file>           - Display file contents
-        head <file>          - Show first 10 lines of file
-        tail <file>          - Show last 10 lines of file
+        ls [-laR] [path]      - List files and directories
+        cd, pwd, mkdir -p, rmdir, touch, rm -r, cp -r, mv, chmod
+        cat, head -n N, tail -n N, find . -name "*.txt"
 
         TEXT PROCESSING:
-        grep <pattern> <file> - Search for pattern in file
-        wc <file>            - Count lines, words, and characters
-
-        SYSTEM INFO:
-        pwd                  - Show current directory path
-        whoami              - Display current username
-        date                - Show current date and time
+        grep [-inrvcow] <pattern> [file] - Search for pattern
+        wc, sort, uniq, cut, tr, tee, nl, rev
 
-        UTILITIES:
-        echo "text"         - Display text
-        find . -name "*.txt" - Find files by pattern
-        clear               - Clear terminal screen
-        help                - Show this help message
+        PIPES AND REDIRECTION:
+        cat log.txt | grep ERROR | wc -l
+        sort data.csv > sorted.csv; echo done >> sorted.csv
 
         SAMPLE FILES AVAILABLE:
-        sample.txt          - Basic text file
-        log.txt             - Log file with different message types
-        data.csv            - CSV data file
-        config.conf         - Configuration file
+        sample.txt, log.txt, data.csv, config.conf, notes.md, /etc/passwd
 
-        EXAMPLES:
-        cat sample.txt              - View sample file
-        grep "ERROR" log.txt        - Find error messages
-        wc data.csv                 - Count lines in CSV
-        echo "Hello World"          - Print text
-        find . -name "*.txt"        - Find all .txt files
-
-        This is a safe educational environment. Not all Linux commands are available.
+        Files you create live only in this session's virtual filesystem.
         Type commands above to practice Linux command line skills!"""
     def get_prompt(self) -> str:
         """
@@ -115,7 +127,7 @@ class CLIPlayground:
         Returns:
             str: Formatted prompt string
         """
-        return f"{self.username}@{self.hostname}:~$ "
+        return self.shell.prompt()
     
     def get_welcome_message(self) -> str:
         """
@@ -137,73 +149,19 @@ class CLIPlayground:
             command_str (str): The command string to process
             
         Returns:
-            str: Simulated command output
+            str: Simulated command output (stdout followed by stderr)
         """
-        command_str = command_str.strip()
-        if not command_str:
-            return ""
-        
-        # Add to history
-        self.command_history.append(command_str)
-        
-        # Parse command and arguments
-        parts = command_str.split()
-        command = parts[0].lower()
-        args = parts[1:] if len(parts) > 1 else []
-        
-        # Dispatch to appropriate handler
-        command_handlers = {
-            "help": self._handle_help,
-            "clear": self._handle_clear,
-            "ls": self._handle_ls,
-            "pwd": self._handle_pwd,
-            "whoami": self._handle_whoami,
-            "date": self._handle_date,
-            "uname": self._handle_uname,
-            "cat": self._handle_cat,
-            "cd": self._handle_cd,
-            "mkdir": self._handle_mkdir,
-            "touch": self._handle_touch,
-            "rm": self._handle_rm,
-            "cp": self._handle_cp,
-            "mv": self._handle_mv,
-            "grep": self._handle_grep,
-            "ps": self._handle_ps,
-            "top": self._handle_top,
-            "df": self._handle_df,
-            "free": self._handle_free,
-            "history": self._handle_history,
-            # Linux+ specific commands
-            "grub2-install": self._handle_grub2_install,
-            "grub2-mkconfig": self._handle_grub2_mkconfig,
-            "update-grub": self._handle_update_grub,
-            "mkinitrd": self._handle_mkinitrd,
-            "dracut": self._handle_dracut,
-            "nmap": self._handle_nmap,
-            "systemctl": self._handle_systemctl,
-            "journalctl": self._handle_journalctl,
-            "firewall-cmd": self._handle_firewall_cmd,
-            "iptables": self._handle_iptables,
-            "lsmod": self._handle_lsmod,
-            "modprobe": self._handle_modprobe,
-            "lsblk": self._handle_lsblk,
-            "fdisk": self._handle_fdisk,
-            "mount": self._handle_mount,
-            "umount": self._handle_umount,
-        }
-        
-        if command in command_handlers:
-            return command_handlers[command](args)
-        else:
-            return f"-bash: {command}: command not found"
+        result = self.shell.run(command_str)
+        return '\n'.join(part for part in (result['output'], result['error']) if part)
+    
     def start_interactive_session(self):
         """Start interactive CLI session for standalone mode."""
-        print(f"Linux Plus CLI Playground - Sandbox Directory: {self.sandbox_dir}")
+        print("Linux Plus CLI Playground - virtual filesystem, nothing touches your machine")
         print("Type 'help' for commands, 'exit' to quit")
         
         while True:
             try:
-                command = input("linux_plus_cli$ ").strip()
+                command = input(self.get_prompt()).strip()
                 
                 if command.lower() in ['exit', 'quit']:
                     print("Goodbye!")
@@ -212,8 +170,10 @@ class CLIPlayground:
                     print(self._get_help_text())
                 elif command:
                     result = self.execute_command(command)
-                    if result:
-                        print(result)
+                    if result['output'] and result['output'] != 'CLEAR_SCREEN':
+                        print(result['output'])
+                    if result['error']:
+                        print(result['error'])
                         
             except KeyboardInterrupt:
                 print("\nGoodbye!")
@@ -221,169 +181,37 @@ class CLIPlayground:
             except EOFError:
                 print("\nGoodbye!")
                 break
-    def _handle_help(self, args: List[str]) -> str:
-        """Handle the help command."""
-        return (
-            "Available commands:\n"
-            "  help          - Show this help message\n"
-            "  clear         - Clear the terminal screen\n"
-            "  ls [path]    - List directory contents\n"
-            "  pwd          - Print working directory\n"
-            "  whoami       - Show current user\n"
-            "  date         - Show current date and time\n"
-            "  uname        - Show system information\n"
-            "  cat <file>   - Display file contents\n"
-            "  cd <dir>     - Change directory\n"
-            "  mkdir <dir>  - Create a new directory\n"
-            "  touch <file> - Create an empty file or update timestamp\n"
-            "  rm <file>    - Remove a file\n"
-            "  cp <src> <dest> - Copy files or directories\n"
-            "  mv <src> <dest> - Move or rename files or directories\n"
-            "  grep <pattern> <file> - Search for a pattern in a file\n"
-            "  ps           - Show running processes\n"
-            "  top          - Display system resource usage\n"
-            "  df           - Show disk space usage\n"
-            "  free         - Show memory usage\n"
-            "  history      - Show command history\n"
-        )
-    def _handle_clear(self, args: List[str]) -> str:
-        """Handle the clear command."""
-        return "CLEAR_SCREEN"  # Special return value to indicate screen clear
     
-    def _handle_ls(self, args: List[str]) -> str:
-        """Handle the ls command."""
-        long_format = "-l" in args
-        path = self.current_directory
-        
-        # Find path argument if provided
-        for arg in args:
-            if not arg.startswith("-"):
-                path = arg if arg.startswith("/") else f"{self.current_directory}/{arg}"
-                break
+    def execute_command(self, command: str) -> Dict[str, Any]:
+        """
+        Execute a command safely in the CLI playground
         
-        # Get directory contents
-        if path in self.file_system:
-            contents = self.file_system[path]
+        Args:
+            command: The command string to execute
             
-            if long_format:
-                result = "total 24\n"
-                for name, info in contents.items():
-                    size = info.get("size", 4096)
-                    perms = info.get("permissions", "-rw-r--r--")
-                    result += f"{perms} 1 user user {size:>4} Jun  4 14:00 {name}\n"
-                return result.rstrip()
-            else:
-                return "    ".join(contents.keys())
-        else:
-            return f"ls: cannot access '{path}': No such file or directory"
-    
-    def _handle_pwd(self, args: List[str]) -> str:
-        """Handle the pwd command."""
-        return self.current_directory
-    
-    def _handle_whoami(self, args: List[str]) -> str:
-        """Handle the whoami command."""
-        return self.username
-    
-    def _handle_date(self, args: List[str]) -> str:
-        """Handle the date command."""
-        return datetime.now().strftime("%a %b %d %H:%M:%S %Z %Y")
-    
-    def _handle_uname(self, args: List[str]) -> str:
-        """Handle the uname command."""
-        if "-a" in args:
-            return "Linux linux-playground 5.15.0-58-generic #64-Ubuntu SMP Thu Jan 5 11:43:13 UTC 2023 x86_64 x86_64 x86_64 GNU/Linux"
-        else:
-            return "Linux"
-    
-    def _handle_cat(self, args: List[str]) -> str:
-        """Handle the cat command."""
-        if not args:
-            return "cat: missing file operand"
-        
-        filename = args[0]
-        if filename == "notes.txt":
-            return "These are my Linux study notes.\nRemember to practice commands daily!"
-        elif filename == "app.py":
-            return "#!/usr/bin/env python3\nprint('Hello, Linux world!')"
-        else:
-            return f"cat: {filename}: No such file or directory"
-    
-    def _handle_cd(self, args: List[str]) -> str:
-        """Handle the cd command."""
-        if not args:
-            self.current_directory = "/home/user"
-            return ""
-        
-        target = args[0]
-        if target == "..":
-            if self.current_directory != "/":
-                self.current_directory = "/".join(self.current_directory.split("/")[:-1]) or "/"
-        elif target.startswith("/"):
-            if target in self.file_system:
-                self.current_directory = target
-            else:
-                return f"cd: {target}: No such file or directory"
-        else:
-            new_path = f"{self.current_directory}/{target}"
-            if new_path in self.file_system:
-                self.current_directory = new_path
-            else:
-                return f"cd: {target}: No such file or directory"
-        
-        return ""
-    
-    def _handle_mkdir(self, args: List[str]) -> str:
-        """Handle the mkdir command."""
-        if not args:
-            return "mkdir: missing operand"
-        
-        dirname = args[0]
-        return f"mkdir: created directory '{dirname}'"
-    
-    def _handle_touch(self, args: List[str]) -> str:
-        """Handle the touch command."""
-        if not args:
-            return "touch: missing file operand"
-        
-        return ""  # touch command typically produces no output on success
-    
-    def _handle_rm(self, args: List[str]) -> str:
-        """Handle the rm command."""
-        if not args:
-            return "rm: missing operand"
-        
-        return ""  # rm command typically produces no output on success
-    
-    def _handle_cp(self, args: List[str]) -> str:
-        """Handle the cp command."""
-        if len(args) < 2:
-            return "cp: missing destination file operand"
-        
-        return ""  # cp command typically produces no output on success
-    
-    def _handle_mv(self, args: List[str]) -> str:
-        """Handle the mv command."""
-        if len(args) < 2:
-            return "mv: missing destination file operand"
-        
-        return ""  # mv command typically produces no output on success
-    
-    def _handle_grep(self, args: List[str]) -> str:
-        """Handle the grep command."""
-        if len(args) < 2:
-            return "grep: missing pattern or file"
-        
-        pattern = args[0]
-        filename = args[1]
-        
-        if filename == "notes.txt":
-            if "Linux" in pattern:
-                return "These are my Linux study notes."
-            else:
-                return ""
-        else:
-            return f"grep: {filename}: No such file or directory"
+        Returns:
+            Dict containing output, error, status ('success'/'error'),
+            exit_code, cwd and the command
+        """
+        try:
+            result = self.shell.run(command)
+        except Exception as e:
+            return {
+                'output': '',
+                'error': f'Error executing command: {e}',
+                'status': 'error',
+                'exit_code': 1,
+                'cwd': self.shell.cwd,
+                'command': command
+            }
+        return {
+            'output': result['output'],
+            'error': result['error'],
+            'status': 'success' if result['status'] == 0 else 'error',
+            'exit_code': result['status'],
+            'cwd': result['cwd'],
+            'command': command
+        }
     
     def _handle_ps(self, args: List[str]) -> str:
         """Handle the ps command."""
@@ -447,13 +275,6 @@ class CLIPlayground:
                 "Swap:       2097152           0     2097152"
             )
     
-    def _handle_history(self, args: List[str]) -> str:
-        """Handle the history command."""
-        result = ""
-        for i, cmd in enumerate(self.command_history[-20:], 1):  # Show last 20 commands
-            result += f"  {i:3d}  {cmd}\n"
-        return result.rstrip()
-    
     # Linux+ Specific Commands
     
     def _handle_grub2_install(self, args: List[str]) -> str:
@@ -665,351 +486,13 @@ class CLIPlayground:
         
         target = args[0]
         return f"Unmounted {target}"
-    def _create_sample_files(self):
-        """Create sample files for CLI practice"""
-        sample_files = {
-            'sample.txt': 'This is a sample text file.\nIt contains multiple lines.\nUse it to practice Linux commands!',
-            'data.csv': 'name,age,city\nJohn,25,NYC\nJane,30,LA\nBob,35,Chicago',
-            'notes.md': '# Linux Study Notes\n\n## Commands\n- ls: list files\n- cat: display file contents\n- grep: search text',
-            'log.txt': 'INFO: Application started\nWARN: Low memory\nERROR: Connection failed\nINFO: Process completed'
-        }
-        
-        for filename, content in sample_files.items():
-            file_path = self.sandbox_dir / filename
-            if not file_path.exists():
-                file_path.write_text(content)
-    
-    def execute_command(self, command: str) -> Dict[str, Any]:
-        """
-        Execute a command safely in the CLI playground
-        
-        Args:
-            command: The command string to execute
-            
-        Returns:
-            Dict containing output, error, and status
-        """
-        if not command.strip():
-            return {
-                'output': '',
-                'error': '',
-                'status': 'success',
-                'command': command
-            }
-        
-        # Add to history
-        self.command_history.append(command)
-        
-        # Parse command
-        try:
-            parts = shlex.split(command)
-            cmd_name = parts[0].lower()
-            args = parts[1:] if len(parts) > 1 else []
-        except ValueError as e:
-            return {
-                'output': '',
-                'error': f'Error parsing command: {e}',
-                'status': 'error',
-                'command': command
-            }
-        
-        # Execute safe command
-        if cmd_name in self.safe_commands:
-            try:
-                result = self.safe_commands[cmd_name](args)
-                return {
-                    'output': result,
-                    'error': '',
-                    'status': 'success',
-                    'command': command
-                }
-            except Exception as e:
-                return {
-                    'output': '',
-                    'error': f'Error executing {cmd_name}: {e}',
-                    'status': 'error',
-                    'command': command
-                }
-        else:
-            return {
-                'output': '',
-                'error': f'Command "{cmd_name}" not allowed in playground. Type "help" for available commands.',
-                'status': 'error',
-                'command': command
-            }
-    
-    def _cmd_ls(self, args: List[str]) -> str:
-        """List directory contents"""
-        target_dir = self.sandbox_dir
-        
-        if args and args[0] != '-l':
-            # Simple path handling for safety
-            if args[0] == '..':
-                return 'Permission denied: Cannot access parent directory'
-            elif args[0] == '.':
-                target_dir = self.sandbox_dir
-        
-        try:
-            files = list(target_dir.iterdir())
-            if '-l' in args:
-                # Long format
-                output: list[str] = []  # Explicitly declare type for type checker
-                for file in files:
-                    stat = file.stat()
-                    size = stat.st_size
-                    name = file.name
-                    file_type = 'd' if file.is_dir() else '-'
-                    output.append(f'{file_type}rw-r--r-- 1 user user {size:8d} {name}')
-                return '\n'.join(output)
-            else:
-                # Simple format
-                return '  '.join([f.name for f in files if f.name.startswith('.')])
-        except Exception as e:
-            return f'ls: {e}'
-    
-    def _cmd_pwd(self, args: List[str]) -> str:
-        """Print working directory"""
-        return str(self.sandbox_dir)
-    
-    def _cmd_cd(self, args: List[str]) -> str:
-        """Change directory (limited to sandbox)"""
-        if not args:
-            return str(self.sandbox_dir)
-        
-        target = args[0]
-        if target in ['..', '/', '~']:
-            return 'Permission denied: Cannot leave sandbox directory'
-        
-        return f'Changed to {self.sandbox_dir}'
-    
-    def _cmd_echo(self, args: List[str]) -> str:
-        """Echo arguments"""
-        return ' '.join(args)
-    
-    def _cmd_cat(self, args: List[str]) -> str:
-        """Display file contents"""
-        if not args:
-            return 'cat: missing filename'
-        
-        filename = args[0]
-        file_path = self.sandbox_dir / filename
-        
-        if not file_path.exists():
-            return f'cat: {filename}: No such file or directory'
-        
-        if not file_path.is_file():
-            return f'cat: {filename}: Is a directory'
-        
-        try:
-            return file_path.read_text()
-        except Exception as e:
-            return f'cat: {filename}: {e}'
-    
-    def _cmd_head(self, args: List[str]) -> str:
-        """Display first lines of file"""
-        if not args:
-            return 'head: missing filename'
-        
-        filename = args[0]
-        lines = 10  # default
-        
-        if len(args) > 1 and args[0] == '-n':
-            try:
-                lines = int(args[1])
-                filename = args[2] if len(args) > 2 else None
-            except (ValueError, IndexError):
-                return 'head: invalid number of lines'
-        
-        if not filename:
-            return 'head: missing filename'
-        
-        file_path = self.sandbox_dir / filename
-        
-        if not file_path.exists():
-            return f'head: {filename}: No such file or directory'
-        
-        try:
-            content = file_path.read_text()
-            return '\n'.join(content.split('\n')[:lines])
-        except Exception as e:
-            return f'head: {filename}: {e}'
-    
-    def _cmd_tail(self, args: List[str]) -> str:
-        """Display last lines of file"""
-        if not args:
-            return 'tail: missing filename'
-        
-        filename = args[0]
-        lines = 10  # default
-        
-        if len(args) > 1 and args[0] == '-n':
-            try:
-                lines = int(args[1])
-                filename = args[2] if len(args) > 2 else None
-            except (ValueError, IndexError):
-                return 'tail: invalid number of lines'
-        
-        if not filename:
-            return 'tail: missing filename'
-        
-        file_path = self.sandbox_dir / filename
-        
-        if not file_path.exists():
-            return f'tail: {filename}: No such file or directory'
-        
-        try:
-            content = file_path.read_text()
-            return '\n'.join(content.split('\n')[-lines:])
-        except Exception as e:
-            return f'tail: {filename}: {e}'
-    
-    def _cmd_grep(self, args: List[str]) -> str:
-        """Search for pattern in file"""
-        if len(args) < 2:
-            return 'grep: missing pattern or filename'
-        
-        pattern = args[0]
-        filename = args[1]
-        file_path = self.sandbox_dir / filename
-        
-        if not file_path.exists():
-            return f'grep: {filename}: No such file or directory'
-        
-        try:
-            content = file_path.read_text()
-            matching_lines: list[str] = []  # Explicitly declare type for type checker
-            for line in content.split('\n'):
-                if pattern.lower() in line.lower():
-                    matching_lines.append(line)
-            return '\n'.join(matching_lines) if matching_lines else ''
-        except Exception as e:
-            return f'grep: {filename}: {e}'
-    
-    def _cmd_find(self, args: List[str]) -> str:
-        """Find files"""
-        if not args:
-            files = list(self.sandbox_dir.iterdir())
-            return '\n'.join([f'./{f.name}' for f in files if f.is_file()])
-        
-        if args[0] == '-name' and len(args) > 1:
-            pattern = args[1].strip('"\'')
-            files = list(self.sandbox_dir.glob(pattern))
-            return '\n'.join([f'./{f.name}' for f in files])
-        
-        return 'find: simple usage only - try "find" or "find -name pattern"'
-    
-    def _cmd_wc(self, args: List[str]) -> str:
-        """Word count"""
-        if not args:
-            return 'wc: missing filename'
-        
-        filename = args[0]
-        file_path = self.sandbox_dir / filename
-        
-        if not file_path.exists():
-            return f'wc: {filename}: No such file or directory'
-        
-        try:
-            content = file_path.read_text()
-            lines = len(content.split('\n'))
-            words = len(content.split())
-            chars = len(content)
-            return f'{lines:8d} {words:8d} {chars:8d} {filename}'
-        except Exception as e:
-            return f'wc: {filename}: {e}'
-    
-    def _cmd_sort(self, args: List[str]) -> str:
-        """Sort file contents"""
-        if not args:
-            return 'sort: missing filename'
-        
-        filename = args[0]
-        file_path = self.sandbox_dir / filename
-        
-        if not file_path.exists():
-            return f'sort: {filename}: No such file or directory'
-        
-        try:
-            content = file_path.read_text()
-            lines = content.split('\n')
-            sorted_lines = sorted(lines)
-            return '\n'.join(sorted_lines)
-        except Exception as e:
-            return f'sort: {filename}: {e}'
-    
-    def _cmd_uniq(self, args: List[str]) -> str:
-        """Remove duplicate lines"""
-        if not args:
-            return 'uniq: missing filename'
-        
-        filename = args[0]
-        file_path = self.sandbox_dir / filename
-        
-        if not file_path.exists():
-            return f'uniq: {filename}: No such file or directory'
-        
-        try:
-            content = file_path.read_text()
-            lines = content.split('\n')
-            unique_lines = []
-            prev_line = None
-            for line in lines:
-                if line != prev_line:
-                    unique_lines.append(line)
-                prev_line = line
-            return '\n'.join(unique_lines)
-        except Exception as e:
-            return f'uniq: {filename}: {e}'
-    
-    def _cmd_date(self, args: List[str]) -> str:
-        """Display current date"""
-        from datetime import datetime
-        return datetime.now().strftime('%a %b %d %H:%M:%S %Z %Y')
-    
-    def _cmd_whoami(self, args: List[str]) -> str:
-        """Display current user"""
-        return 'student'
-    
-    def _cmd_ps(self, args: List[str]) -> str:
-        """Display processes (simulated)"""
-        return '''  PID TTY          TIME CMD
- 1234 pts/0    00:00:01 bash
- 5678 pts/0    00:00:00 python
- 9012 pts/0    00:00:00 ps'''
-    
-    def _cmd_df(self, args: List[str]) -> str:
-        """Display filesystem usage (simulated)"""
-        return '''Filesystem     1K-blocks    Used Available Use% Mounted on
-/dev/sda1       20480000 8192000  11264000  42% /
-tmpfs            2048000  102400   1945600   5% /dev/shm'''
-    
-    def _cmd_free(self, args: List[str]) -> str:
-        """Display memory usage (simulated)"""
-        return '''              total        used        free      shared  buff/cache   available
-Mem:        8192000     2048000     4096000      102400     2048000     5632000
-Swap:       2048000           0     2048000
-'''
     
     def _cmd_uptime(self, args: List[str]) -> str:
         """Display system uptime (simulated)"""
         return ' 15:30:42 up 2 days,  4:30,  1 user,  load average: 0.15, 0.10, 0.05'
     
-    def _cmd_history(self, args: List[str]) -> str:
-        """Display command history"""
-        if not self.command_history:
-            return ''
-        
-        output = []
-        for i, cmd in enumerate(self.command_history[-20:], 1):  # Last 20 commands
-            output.append(f'{i:5d}  {cmd}')
-        return '\n'.join(output)
-    
-    def _cmd_clear(self, args: List[str]) -> str:
-        """Clear screen command"""
-        return 'CLEAR_SCREEN'  # Special marker for frontend
-    
-    def _cmd_help(self, args: List[str]) -> str:
-        """Handle the help command for web interface."""
+    def _get_web_help_text(self) -> str:
+        """Help text shown by the help command in the web terminal."""
         return '''Linux+ Study CLI Playground - Commands Reference
 
     ═══════════════════════════════════════════════════════════════════
@@ -1017,20 +500,22 @@ Swap:       2048000           0     2048000
     BASIC COMMANDS:
     help                    - Shows this help message
     clear                   - Clears the terminal screen
-    ls [-l] [path]          - Lists files and directories
+    ls [-laR1hF] [path]     - Lists files and directories
     pwd                     - Shows current directory
-    cd [directory]          - Changes directory
-    cat [file]              - Displays file contents
-    mkdir [directory]       - Creates directory
+    cd [directory|-|~]      - Changes directory
+    cat [-n] [file...]      - Displays file contents
+    mkdir [-p] [directory]  - Creates directory
+    rmdir [directory]       - Removes an empty directory
     touch [file]            - Creates empty file
-    rm [file]               - Removes file
-    cp [source] [dest]      - Copies file
+    rm [-rf] [file]         - Removes file
+    cp [-r] [source] [dest] - Copies file or directory
     mv [source] [dest]      - Moves/renames file
-    grep [pattern] [file]   - Searches for pattern
-    echo [text]             - Displays text output
-    find [path]             - Finds files and directories
-    whoami                  - Shows current user
-    date                    - Shows current date
+    chmod [755|u+x] [file]  - Changes permissions
+    find [path] [-name -type -maxdepth] - Finds files and directories
+    echo [-ne] [text]       - Displays text output
+    export, env, unset      - Manage environment variables
+    whoami, id, hostname    - Shows current user and host
+    date [+FORMAT]          - Shows current date
     history                 - Shows command history
 
     SYSTEM INFORMATION:
@@ -1042,11 +527,23 @@ Swap:       2048000           0     2048000
     uptime                  - Shows system uptime
 
     TEXT PROCESSING:
-    head [file]             - Shows first 10 lines
-    tail [file]             - Shows last 10 lines
-    wc [file]               - Counts lines, words, characters
-    sort [file]             - Sorts file contents
-    uniq [file]             - Removes duplicate lines
+    grep [-ivncloEFwr] pattern [file] - Searches for pattern
+    head/tail [-n N] [file] - Shows first/last lines
+    wc [-lwc] [file]        - Counts lines, words, characters
+    sort [-rnuf -k N -t C]  - Sorts lines
+    uniq [-cdu]             - Filters repeated lines
+    cut -d C -f LIST        - Extracts fields
+    tr [-ds] SET1 [SET2]    - Translates characters
+    tee [-a] [file]         - Copies input to a file
+    seq, nl, rev, basename, dirname
+
+    PIPES AND REDIRECTION:
+    cmd1 | cmd2             - Pipe output into the next command
+    cmd > file, cmd >> file - Write/append output to a file
+    cmd < file              - Read input from a file
+    cmd 2> file, cmd 2>&1   - Redirect errors
+    cmd1 && cmd2, cmd1 || cmd2, cmd1 ; cmd2
+    *.txt, ?, [abc]         - Wildcards
 
     LINUX+ SPECIFIC COMMANDS:
     grub2-install [device]  - Installs GRUB2 bootloader
@@ -1068,12 +565,14 @@ Swap:       2048000           0     2048000
 
     ═══════════════════════════════════════════════════════════════════
 
-    SAMPLE FILES: sample.txt, data.csv, notes.md, log.txt
+    SAMPLE FILES: sample.txt, data.csv, notes.md, log.txt, config.conf,
+    documents/, scripts/backup.sh, /etc/passwd, /etc/hosts, /var/log/syslog
 
     QUICK EXAMPLES:
     ls                      → List files in current directory
     cat sample.txt          → View sample file contents  
     grep INFO log.txt       → Search for "INFO" in log file
+    cut -d: -f1 /etc/passwd | sort → List user names
     systemctl status nginx  → Check nginx service status
     nmap localhost          → Scan local machine ports
 
@@ -1082,4 +581,4 @@ Swap:       2048000           0     2048000
 
 def get_cli_playground():
     """Get CLI playground instance"""
-    return CLIPlayground()
\ No newline at end of file
+    return CLIPlayground()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+CLI Playground Session Manager
+
+Keeps one CLIPlayground (cwd, environment, history ring buffer and
+copy-on-write filesystem overlay) per browser session:
+
+- Sessions live in an LRU map; idle sessions and the least recently used ones
+  beyond the active limit are snapshotted to disk and dropped from memory.
+- Snapshots are compact: untouched template files are stored as references,
+  and the filesystem part is only re-encoded when it changed.
+- With write-through enabled every command persists its session, and a
+  worker reloads a session whose snapshot was written by another worker, so
+  requests do not have to stick to one process.
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from utils.cli_playground import CLIPlayground
+from utils.config import CLI_PLAYGROUND_SETTINGS
+
+SWEEP_INTERVAL = 60  # seconds between idle sweeps
+PURGE_INTERVAL = 3600  # seconds between expired snapshot purges
+
+
+class _Session:
+    """In-memory session entry."""
+
+    __slots__ = ('playground', 'lock', 'pins', 'last_used', 'disk_mtime', 'saved_marker', 'fs_key', 'fs_gz')
+
+    def __init__(self, playground: CLIPlayground, disk_mtime: Optional[int] = None):
+        self.playground = playground
+        self.lock = threading.Lock()
+        self.pins = 0  # Requests holding this entry (changed under the manager's lock)
+        self.last_used = time.time()
+        self.disk_mtime = disk_mtime
+        self.saved_marker = self._marker() if disk_mtime is not None else None
+        self.fs_key = None
+        self.fs_gz = b''
+
+    def _marker(self):
+        shell = self.playground.shell
+        return (id(shell.fs), shell.fs.generation, shell.history_count, shell.cwd)
+
+    @property
+    def dirty(self) -> bool:
+        return self._marker() != self.saved_marker
+
+
+class CLISessionManager:
+    """Per-session CLI playground state with idle eviction and disk snapshots."""
+
+    def __init__(self, session_dir: Optional[str] = None, idle_timeout: Optional[int] = None,
+                 max_active: Optional[int] = None, history_limit: Optional[int] = None,
+                 write_through: Optional[bool] = None):
+        """
+        Initialize the session manager.
+
+        Args:
+            session_dir: Directory for session snapshots
+            idle_timeout: Seconds without a command before a session leaves memory
+            max_active: Sessions kept in memory at most
+            history_limit: Commands kept per session history
+            write_through: Persist the session after every command
+        """
+        settings = CLI_PLAYGROUND_SETTINGS
+        self.logger = logging.getLogger(__name__)
+        self.session_dir = Path(session_dir or settings["session_dir"])
+        self.idle_timeout = idle_timeout if idle_timeout is not None else settings["idle_timeout"]
+        self.max_active = max_active if max_active is not None else settings["max_active_sessions"]
+        self.history_limit = history_limit if history_limit is not None else settings["history_limit"]
+        self.write_through = write_through if write_through is not None else settings["write_through"]
+        self.snapshot_retention = settings["snapshot_retention"]
+
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+        self._last_purge = 0.0
+        self._prototype: Optional[CLIPlayground] = None
+        self._stats = {'created': 0, 'restored': 0, 'evicted': 0, 'saved': 0}
+
+        try:
+            self.session_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            self.logger.error(f"Cannot create CLI session directory {self.session_dir}: {e}")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    @contextmanager
+    def session(self, session_id: str) -> Iterator[CLIPlayground]:
+        """
+        Use a session's playground exclusively (commands of one session run one at a time).
+
+        Args:
+            session_id: Opaque session key (e.g. from the Flask session cookie)
+
+        Yields:
+            CLIPlayground: The session's playground
+        """
+        entry = self._acquire(session_id)
+        try:
+            with entry.lock:
+                if self.write_through:
+                    self._reload_if_newer(session_id, entry)
+                try:
+                    yield entry.playground
+                finally:
+                    entry.last_used = time.time()
+                    if self.write_through and entry.dirty:
+                        self._save(session_id, entry)
+        finally:
+            with self._lock:
+                entry.pins -= 1
+        self._maybe_sweep()
+
+    def execute(self, session_id: str, command: str) -> Dict[str, Any]:
+        """
+        Run a command in a session.
+
+        Args:
+            session_id: Session key
+            command: Command line
+
+        Returns:
+            Dict: CLIPlayground.execute_command result
+        """
+        with self.session(session_id) as playground:
+            return playground.execute_command(command)
+
+    def history(self, session_id: str) -> List[str]:
+        """Get a session's command history (oldest first)."""
+        with self.session(session_id) as playground:
+            return playground.command_history
+
+    def clear_history(self, session_id: str) -> None:
+        """Clear a session's command history."""
+        with self.session(session_id) as playground:
+            playground.shell.clear_history()
+
+    def reset(self, session_id: str) -> None:
+        """Discard a session's state in memory and on disk."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        try:
+            self._path(session_id).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning(f"Could not delete CLI session snapshot: {e}")
+
+    def available_commands(self) -> List[str]:
+        """Get the sorted list of commands a playground understands."""
+        if self._prototype is None:
+            self._prototype = CLIPlayground(history_limit=1)
+        return sorted(self._prototype.safe_commands)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        Snapshot and drop sessions idle longer than idle_timeout.
+
+        Args:
+            now: Current time (default time.time())
+
+        Returns:
+            int: Number of sessions evicted
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            idle = [sid for sid, entry in self._sessions.items() if now - entry.last_used >= self.idle_timeout]
+            evicted = sum(1 for sid in idle if self._evict_locked(sid))
+        return evicted
+
+    def flush(self) -> None:
+        """Write every session with unsaved changes to disk."""
+        with self._lock:
+            entries = list(self._sessions.items())
+        for session_id, entry in entries:
+            with entry.lock:
+                if entry.dirty:
+                    self._save(session_id, entry)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get session counters for monitoring."""
+        with self._lock:
+            return dict(self._stats, active=len(self._sessions))
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _path(self, session_id: str) -> Path:
+        # Hash the key so client-controlled ids can never escape the directory
+        digest = hashlib.sha256(session_id.encode('utf-8')).hexdigest()[:32]
+        return self.session_dir / f"{digest}.json.gz"
+
+    def _acquire(self, session_id: str) -> _Session:
+        """Get a session's entry, pinned against eviction until the caller unpins it."""
+        while True:
+            with self._lock:
+                entry = self._sessions.get(session_id)
+                if entry is not None:
+                    entry.pins += 1
+                    self._sessions.move_to_end(session_id)
+                    return entry
+                evictions = self._stats['evicted']
+            # Read the snapshot without holding up other sessions
+            loaded = self._load(session_id)
+            with self._lock:
+                entry = self._sessions.get(session_id)
+                if entry is not None:
+                    # Another request for this session got here first
+                    entry.pins += 1
+                    self._sessions.move_to_end(session_id)
+                    return entry
+                if self._stats['evicted'] != evictions:
+                    continue  # A session was saved while we read; the snapshot may be stale
+                if loaded is None:
+                    entry = _Session(CLIPlayground(history_limit=self.history_limit))
+                    self._stats['created'] += 1
+                else:
+                    entry = loaded
+                    self._stats['restored'] += 1
+                entry.pins += 1
+                self._sessions[session_id] = entry
+                # Keep the in-memory set bounded (least recently used first)
+                for sid in list(self._sessions):
+                    if len(self._sessions) <= self.max_active:
+                        break
+                    if sid != session_id:
+                        self._evict_locked(sid)
+                return entry
+
+    def _evict_locked(self, session_id: str) -> bool:
+        entry = self._sessions.get(session_id)
+        if entry is None or entry.pins or not entry.lock.acquire(blocking=False):
+            return False  # Sessions in use stay
+        try:
+            if entry.dirty and not self._save(session_id, entry):
+                return False
+            del self._sessions[session_id]
+            self._stats['evicted'] += 1
+            return True
+        finally:
+            entry.lock.release()
+
+    def _load(self, session_id: str) -> Optional[_Session]:
+        path = self._path(session_id)
+        try:
+            mtime = path.stat().st_mtime_ns
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                state = json.load(f)
+            playground = CLIPlayground.from_snapshot(state, history_limit=self.history_limit)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger.warning(f"Discarding unreadable CLI session snapshot {path.name}: {e}")
+            return None
+        return _Session(playground, disk_mtime=mtime)
+
+    def _reload_if_newer(self, session_id: str, entry: _Session) -> None:
+        try:
+            mtime = self._path(session_id).stat().st_mtime_ns
+        except OSError:
+            return
+        if mtime == entry.disk_mtime:
+            return
+        # Another worker saved this session since we last did
+        loaded = self._load(session_id)
+        if loaded is not None:
+            entry.playground = loaded.playground
+            entry.disk_mtime = loaded.disk_mtime
+            entry.saved_marker = loaded.saved_marker
+            entry.fs_key = None
+
+    def _encode(self, entry: _Session) -> bytes:
+        shell = entry.playground.shell
+        fs_key = (id(shell.fs), shell.fs.generation)
+        if fs_key != entry.fs_key:
+            # The filesystem overlay is usually the bulk of a snapshot; only
+            # re-encode it when a command actually changed it. gzip members
+            # concatenate, so the compressed tail is reused as is.
+            fs_json = json.dumps(shell.fs.snapshot(), separators=(',', ':'))
+            entry.fs_gz = gzip.compress((fs_json + '}').encode('utf-8'), compresslevel=1)
+            entry.fs_key = fs_key
+        meta = json.dumps(shell.snapshot(include_fs=False), separators=(',', ':'))
+        return gzip.compress((meta[:-1] + ',"fs":').encode('utf-8'), compresslevel=1) + entry.fs_gz
+
+    def _save(self, session_id: str, entry: _Session) -> bool:
+        path = self._path(session_id)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            data = self._encode(entry)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            entry.disk_mtime = path.stat().st_mtime_ns
+            entry.saved_marker = entry._marker()
+            self._stats['saved'] += 1
+            return True
+        except (OSError, RecursionError, TypeError, ValueError) as e:
+            self.logger.error(f"Error saving CLI session snapshot: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return False
+
+    def _maybe_sweep(self) -> None:
+        now = time.time()
+        if now - self._last_sweep < SWEEP_INTERVAL:
+            return
+        self._last_sweep = now
+        evicted = self.evict_idle(now)
+        if evicted:
+            self.logger.info(f"Evicted {evicted} idle CLI sessions")
+        if now - self._last_purge >= PURGE_INTERVAL:
+            self._last_purge = now
+            self._purge_expired(now)
+
+    def _purge_expired(self, now: float) -> None:
+        try:
+            for path in self.session_dir.glob('*.json.gz'):
+                try:
+                    if now - path.stat().st_mtime > self.snapshot_retention:
+                        path.unlink()
+                except OSError:
+                    continue
+        except OSError as e:
+            self.logger.warning(f"Could not purge CLI session snapshots: {e}")
+
+
+# Global session manager instance
+_cli_session_manager: Optional[CLISessionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_cli_session_manager() -> CLISessionManager:
+    """Get the global CLI session manager instance."""
+    global _cli_session_manager
+    if _cli_session_manager is None:
+        with _manager_lock:
+            if _cli_session_manager is None:
+                _cli_session_manager = CLISessionManager()
+                atexit.register(_cli_session_manager.flush)
+    return _cli_session_manager
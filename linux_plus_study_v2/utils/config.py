@@ -176,6 +176,16 @@ CLI_SETTINGS: Dict[str, Any] = {
     "input_timeout": 300,  # 5 minutes
 }
 
+# CLI Playground (web terminal) Session Settings
+CLI_PLAYGROUND_SETTINGS: Dict[str, Any] = {
+    "session_dir": os.getenv("CLI_SESSION_DIR", str(DATA_DIR / "cli_sessions")),
+    "idle_timeout": int(os.getenv("CLI_SESSION_IDLE_SECONDS", "900")),  # Evict from memory after 15 minutes
+    "max_active_sessions": int(os.getenv("CLI_MAX_ACTIVE_SESSIONS", "200")),
+    "snapshot_retention": int(os.getenv("CLI_SNAPSHOT_RETENTION_SECONDS", str(7 * 24 * 3600))),
+    "history_limit": int(os.getenv("CLI_HISTORY_LIMIT", "500")),
+    "write_through": os.getenv("CLI_SESSION_WRITE_THROUGH", "true").lower() == "true",
+}
+
 # Web Configuration Settings
 WEB_SETTINGS: Dict[str, Any] = {
     "default_host": "127.0.0.1",
@@ -542,6 +552,7 @@ def get_config_value(section: str, key: str, default: Any = None) -> Any:
     """
     config_sections: Dict[str, Dict[str, Any]] = {
         "cli": CLI_SETTINGS,
+        "cli_playground": CLI_PLAYGROUND_SETTINGS,
         "web": WEB_SETTINGS,
         "quiz": QUIZ_SETTINGS,
         "achievements": ACHIEVEMENT_SETTINGS,
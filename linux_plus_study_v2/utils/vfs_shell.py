@@ -0,0 +1,1395 @@
+#!/usr/bin/env python3
+"""
+Virtual Shell for the CLI Playground
+
+A small bash-like interpreter that runs entirely in-process on top of a
+session's VirtualFilesystem - nothing is ever forked on the server:
+
+- Quoting ('...', "...", \\), $VAR / ${VAR} / $? expansion, ~ and globbing
+  (*, ?, [...]) against the virtual filesystem.
+- Pipelines (|), lists (;, &&, ||) and redirection (<, >, >>, 2>, 2>>, 2>&1).
+- Pure-Python implementations of the common file and text tools. Commands
+  are generators that stream lines from stage to stage, so `seq 1 100000 |
+  head -3` stops after three lines instead of materializing the input.
+
+Output per command line is capped (MAX_OUTPUT_LINES lines returned,
+MAX_PIPELINE_LINES lines moved between stages) so no input can pin a worker.
+"""
+
+import fnmatch
+import getopt
+import math
+import posixpath
+import re
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.virtual_fs import HOME, VFSError, VirtualFilesystem, escape_glob, format_mode
+
+MAX_OUTPUT_LINES = 2000
+MAX_PIPELINE_LINES = 200000
+HISTORY_LIMIT = 500
+SNAPSHOT_VERSION = 1
+
+Segment = Tuple[str, str]          # (text, quote) with quote in '', "'", '"'
+Word = List[Segment]
+CommandFunc = Callable[['CommandContext', List[str]], Iterator[str]]
+
+_OPERATORS = ('2>&1', '2>>', '&&', '||', '>>', '2>', '|', ';', '>', '<', '&')
+_REDIRECTS = ('<', '>', '>>', '2>', '2>>', '2>&1')
+_WORD_BREAK = set(' \t\n\'"\\|&;<>')
+_VAR_PATTERN = re.compile(r'\$(\?|[A-Za-z_][A-Za-z0-9_]*|\{[A-Za-z_][A-Za-z0-9_]*\})')
+_ASSIGNMENT = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*=')
+
+
+class ShellSyntaxError(Exception):
+    """Command line could not be parsed."""
+    pass
+
+
+class OutputLimitExceeded(Exception):
+    """A pipeline moved more lines than MAX_PIPELINE_LINES."""
+    pass
+
+
+# --- Parsing ---------------------------------------------------------------
+
+def tokenize(line: str) -> List[Tuple[str, Any]]:
+    """
+    Split a command line into ('word', Word) and ('op', str) tokens.
+
+    Raises:
+        ShellSyntaxError: On unterminated quotes
+    """
+    tokens: List[Tuple[str, Any]] = []
+    word: Word = []
+    in_word = False
+    i, n = 0, len(line)
+
+    def end_word():
+        nonlocal word, in_word
+        if in_word:
+            tokens.append(('word', word))
+        word, in_word = [], False
+
+    while i < n:
+        ch = line[i]
+        if ch in ' \t\n':
+            end_word()
+            i += 1
+            continue
+        if ch == '#' and not in_word:
+            break
+        operator = next((op for op in _OPERATORS if line.startswith(op, i)), None)
+        if operator and (not operator.startswith('2') or not in_word):
+            end_word()
+            tokens.append(('op', operator))
+            i += len(operator)
+            continue
+        in_word = True
+        if ch == "'":
+            end = line.find("'", i + 1)
+            if end < 0:
+                raise ShellSyntaxError("unexpected EOF while looking for matching `''")
+            word.append((line[i + 1:end], "'"))
+            i = end + 1
+        elif ch == '"':
+            chars = []
+            i += 1
+            while i < n and line[i] != '"':
+                if line[i] == '\\' and i + 1 < n and line[i + 1] in '"\\$`':
+                    chars.append(line[i + 1])
+                    i += 2
+                else:
+                    chars.append(line[i])
+                    i += 1
+            if i >= n:
+                raise ShellSyntaxError('unexpected EOF while looking for matching `"\'')
+            word.append((''.join(chars), '"'))
+            i += 1
+        elif ch == '\\':
+            if i + 1 < n:
+                word.append((line[i + 1], "'"))
+            i += 2
+        else:
+            start = i
+            while i < n and line[i] not in _WORD_BREAK:
+                i += 1
+            word.append((line[start:i], ''))
+    end_word()
+    return tokens
+
+
+class SimpleCommand:
+    """One command of a pipeline: words plus redirections."""
+
+    def __init__(self):
+        self.words: List[Word] = []
+        self.redirects: List[Tuple[str, Optional[Word]]] = []
+
+    @property
+    def empty(self) -> bool:
+        return not self.words and not self.redirects
+
+
+def parse(tokens: List[Tuple[str, Any]]) -> List[Tuple[Optional[str], List[SimpleCommand]]]:
+    """
+    Group tokens into a list of (connector, pipeline) pairs.
+
+    connector is None for the first pipeline and ';', '&&' or '||' after that.
+
+    Raises:
+        ShellSyntaxError: On misplaced operators
+    """
+    sequence: List[Tuple[Optional[str], List[SimpleCommand]]] = []
+    connector: Optional[str] = None
+    pipeline: List[SimpleCommand] = []
+    command = SimpleCommand()
+    i = 0
+    while i < len(tokens):
+        kind, value = tokens[i]
+        if kind == 'word':
+            command.words.append(value)
+        elif value in _REDIRECTS:
+            if value == '2>&1':
+                command.redirects.append((value, None))
+            else:
+                if i + 1 >= len(tokens) or tokens[i + 1][0] != 'word':
+                    near = tokens[i + 1][1] if i + 1 < len(tokens) else 'newline'
+                    raise ShellSyntaxError(f"syntax error near unexpected token `{near}'")
+                command.redirects.append((value, tokens[i + 1][1]))
+                i += 1
+        elif value == '|':
+            if command.empty:
+                raise ShellSyntaxError("syntax error near unexpected token `|'")
+            pipeline.append(command)
+            command = SimpleCommand()
+        elif value in (';', '&&', '||'):
+            if command.empty:
+                if value == ';' and not pipeline and not sequence and connector is None:
+                    raise ShellSyntaxError("syntax error near unexpected token `;'")
+                if value != ';' or pipeline:
+                    raise ShellSyntaxError(f"syntax error near unexpected token `{value}'")
+            else:
+                pipeline.append(command)
+                sequence.append((connector, pipeline))
+            connector, pipeline, command = value, [], SimpleCommand()
+        elif value == '&':
+            raise ShellSyntaxError("background jobs (&) are not supported in the playground")
+        i += 1
+    if not command.empty:
+        pipeline.append(command)
+        sequence.append((connector, pipeline))
+    elif pipeline or connector in ('&&', '||'):
+        raise ShellSyntaxError("syntax error: unexpected end of file")
+    return sequence
+
+
+# --- Execution -------------------------------------------------------------
+
+class CommandContext:
+    """Per-command state: stdin stream, collected stderr and exit status."""
+
+    def __init__(self, shell: 'VirtualShell', name: str, stdin: Iterator[str], is_tty: bool):
+        self.shell = shell
+        self.fs = shell.fs
+        self.name = name
+        self.stdin = stdin
+        self.is_tty = is_tty
+        self.status = 0
+        self.stderr: deque = deque()
+
+    @property
+    def cwd(self) -> str:
+        return self.shell.cwd
+
+    def error(self, message: str, status: int = 1) -> None:
+        self.stderr.append(f"{self.name}: {message}\n")
+        self.status = status
+
+    def inputs(self, paths: List[str]) -> Iterator[Tuple[str, Iterator[str]]]:
+        """Yield (name, lines) for each operand ('-' or none means stdin); reports missing files."""
+        for path in paths or ['-']:
+            if path == '-':
+                yield '-', self.stdin
+                continue
+            try:
+                yield path, self.fs.iter_lines(path, self.cwd)
+            except VFSError as e:
+                self.error(str(e))
+
+
+def _getopt(ctx: CommandContext, args: List[str], shortopts: str) -> Optional[Tuple[Dict[str, str], List[str]]]:
+    """GNU-style option parsing; reports invalid options on ctx and returns None."""
+    try:
+        opts, operands = getopt.gnu_getopt(args, shortopts)
+    except getopt.GetoptError as e:
+        ctx.error(f"invalid option -- '{e.opt}'" if e.opt else e.msg, status=2)
+        return None
+    options: Dict[str, str] = {}
+    for flag, value in opts:
+        options[flag] = value
+    return options, operands
+
+
+def _numeric_count(args: List[str]) -> List[str]:
+    # head -5 / tail -5 are shorthand for -n 5
+    if args and re.fullmatch(r'-\d+', args[0]):
+        return ['-n', args[0][1:]] + args[1:]
+    return args
+
+
+def _ensure_newline(line: str) -> str:
+    return line if line.endswith('\n') else line + '\n'
+
+
+class VirtualShell:
+    """One playground session: filesystem view, cwd, environment and history."""
+
+    def __init__(self, fs: Optional[VirtualFilesystem] = None, username: str = 'user',
+                 hostname: str = 'linux-playground', home: str = HOME,
+                 history_limit: int = HISTORY_LIMIT):
+        """
+        Initialize the shell.
+
+        Args:
+            fs: Filesystem view (default: a new copy-on-write view of the template)
+            username: Login name shown by whoami and the prompt
+            hostname: Host name shown by hostname and the prompt
+            home: Home directory (created on first write if missing)
+            history_limit: Commands kept in the history ring buffer
+        """
+        self.fs = fs or VirtualFilesystem()
+        self.username = username
+        self.hostname = hostname
+        self.home = home
+        self.cwd = home if self.fs.is_dir(home) else '/'
+        self.env: Dict[str, str] = {
+            'HOME': home, 'USER': username, 'LOGNAME': username, 'HOSTNAME': hostname,
+            'SHELL': '/bin/bash', 'PATH': '/usr/local/bin:/usr/bin:/bin', 'PWD': self.cwd,
+            'OLDPWD': self.cwd, 'TERM': 'xterm-256color', 'LANG': 'C.UTF-8',
+        }
+        self.history: deque = deque(maxlen=history_limit)
+        self.history_count = 0  # Commands ever entered; numbers the ring buffer like bash
+        self.last_status = 0
+        self.help_text = "Type a command, e.g. ls, cat sample.txt | grep -i linux"
+        self._clear_requested = False
+        self.commands: Dict[str, CommandFunc] = {
+            name[5:].replace('_', '-'): getattr(self, name)
+            for name in dir(self) if name.startswith('_cmd_')
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def register(self, name: str, func: CommandFunc) -> None:
+        """Add a streaming command: func(ctx, args) yields output lines."""
+        self.commands[name] = func
+
+    def register_text_command(self, name: str, func: Callable[[List[str]], str]) -> None:
+        """Add a command whose whole output is produced by func(args) as one string."""
+        def command(ctx: CommandContext, args: List[str]) -> Iterator[str]:
+            text = func(args)
+            if text:
+                yield from (line + '\n' for line in text.split('\n'))
+        self.commands[name] = command
+
+    def clear_history(self) -> None:
+        """Forget all history entries (history -c)."""
+        self.history.clear()
+        self.history_count = 0
+
+    def snapshot(self, include_fs: bool = True) -> Dict[str, Any]:
+        """
+        Serializable session state: cwd, environment, history and the
+        filesystem overlay (see VirtualFilesystem.snapshot).
+
+        Args:
+            include_fs: Leave out the 'fs' entry when the caller serializes it separately
+        """
+        state: Dict[str, Any] = {
+            'version': SNAPSHOT_VERSION,
+            'cwd': self.cwd,
+            'env': dict(self.env),
+            'history': list(self.history),
+            'history_count': self.history_count,
+            'last_status': self.last_status,
+        }
+        if include_fs:
+            state['fs'] = self.fs.snapshot()
+        return state
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """
+        Load state produced by snapshot() into this shell.
+
+        Raises:
+            ValueError: If the snapshot format is not supported
+        """
+        if state.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported CLI session snapshot version: {state.get('version')}")
+        self.fs = VirtualFilesystem.from_snapshot(state['fs'], self.fs.template)
+        self.env = dict(state.get('env', self.env))
+        self.history = deque(state.get('history', []), maxlen=self.history.maxlen)
+        self.history_count = max(state.get('history_count', 0), len(self.history))
+        self.last_status = state.get('last_status', 0)
+        cwd = state.get('cwd', self.home)
+        self.cwd = cwd if self.fs.is_dir(cwd) else (self.home if self.fs.is_dir(self.home) else '/')
+
+    def prompt(self) -> str:
+        """bash-style prompt, e.g. user@linux-playground:~/docs$"""
+        cwd = self.cwd
+        if cwd == self.home or cwd.startswith(self.home + '/'):
+            cwd = '~' + cwd[len(self.home):]
+        return f"{self.username}@{self.hostname}:{cwd}$ "
+
+    def run(self, line: str) -> Dict[str, Any]:
+        """
+        Execute one command line.
+
+        Args:
+            line: Command line as typed
+
+        Returns:
+            Dict with output (stdout), error (stderr), status (exit code) and cwd
+        """
+        line = line.strip()
+        if not line:
+            return {'output': '', 'error': '', 'status': self.last_status, 'cwd': self.cwd}
+        self.history.append(line)
+        self.history_count += 1
+        self._clear_requested = False
+
+        out: List[str] = []
+        err: List[str] = []
+        try:
+            sequence = parse(tokenize(line))
+        except ShellSyntaxError as e:
+            self.last_status = 2
+            return {'output': '', 'error': f"-bash: {e}", 'status': 2, 'cwd': self.cwd}
+
+        for connector, pipeline in sequence:
+            if connector == '&&' and self.last_status != 0:
+                continue
+            if connector == '||' and self.last_status == 0:
+                continue
+            try:
+                self.last_status = self._run_pipeline(pipeline, out, err)
+            except OutputLimitExceeded:
+                err.append(f"-bash: output limit exceeded ({MAX_PIPELINE_LINES} lines); command stopped\n")
+                self.last_status = 1
+
+        output = ''.join(out)
+        if len(out) >= MAX_OUTPUT_LINES:
+            output += f"... output truncated after {MAX_OUTPUT_LINES} lines\n"
+        if self._clear_requested and not output:
+            output = 'CLEAR_SCREEN'
+        return {
+            'output': output.rstrip('\n'),
+            'error': ''.join(err).rstrip('\n'),
+            'status': self.last_status,
+            'cwd': self.cwd,
+        }
+
+    # ------------------------------------------------------------------
+    # Expansion
+    # ------------------------------------------------------------------
+    def _expand_vars(self, text: str) -> str:
+        def replace(match):
+            name = match.group(1).strip('{}')
+            if name == '?':
+                return str(self.last_status)
+            return self.env.get(name, '')
+        return _VAR_PATTERN.sub(replace, text) if '$' in text else text
+
+    def _expand_word(self, word: Word) -> List[str]:
+        texts: List[str] = []
+        pattern: List[str] = []
+        globbing = False
+        quoted = False
+        for index, (segment, quote) in enumerate(word):
+            if quote != "'":
+                segment = self._expand_vars(segment)
+            if quote == '' and index == 0 and (segment == '~' or segment.startswith('~/')):
+                segment = self.home + segment[1:]
+            texts.append(segment)
+            if quote == '':
+                pattern.append(segment)
+                globbing = globbing or any(ch in segment for ch in '*?[')
+            else:
+                quoted = True
+                pattern.append(escape_glob(segment))
+        text = ''.join(texts)
+        if globbing:
+            matches = self.fs.glob(''.join(pattern), self.cwd)
+            if matches:
+                return matches
+        if not text and not quoted:
+            return []
+        return [text]
+
+    def _expand_words(self, words: List[Word]) -> List[str]:
+        argv: List[str] = []
+        for word in words:
+            argv.extend(self._expand_word(word))
+        return argv
+
+    # ------------------------------------------------------------------
+    # Pipelines
+    # ------------------------------------------------------------------
+    def _run_pipeline(self, pipeline: List[SimpleCommand], out: List[str], err: List[str]) -> int:
+        moved = [0]
+
+        def metered(lines: Iterator[str]) -> Iterator[str]:
+            for line in lines:
+                moved[0] += 1
+                if moved[0] > MAX_PIPELINE_LINES:
+                    raise OutputLimitExceeded()
+                yield line
+
+        stream: Iterator[str] = iter(())
+        contexts: List[CommandContext] = []
+        stderr_sinks: List[Tuple[CommandContext, Optional[str], bool]] = []
+        last = len(pipeline) - 1
+
+        for index, command in enumerate(pipeline):
+            argv = self._expand_words(command.words)
+            redirected_out = any(op in ('>', '>>') for op, _ in command.redirects)
+            ctx = CommandContext(self, argv[0] if argv else 'bash', stream, index == last and not redirected_out)
+            contexts.append(ctx)
+
+            stdout_target: Optional[Tuple[str, bool]] = None
+            stderr_target: Optional[str] = None
+            stderr_append = False
+            merge_stderr = False
+            failed = False
+            for op, target_word in command.redirects:
+                if op == '2>&1':
+                    merge_stderr = True
+                    continue
+                targets = self._expand_word(target_word) if target_word else []
+                if len(targets) != 1:
+                    err.append(f"-bash: {''.join(s for s, _ in target_word or [])}: ambiguous redirect\n")
+                    failed = True
+                    break
+                target = targets[0]
+                if op == '<':
+                    try:
+                        ctx.stdin = self.fs.iter_lines(target, self.cwd)
+                    except VFSError as e:
+                        err.append(f"-bash: {e}\n")
+                        failed = True
+                        break
+                elif op in ('>', '>>'):
+                    if target != '/dev/null' and op == '>':
+                        # Like bash, truncate before the command runs
+                        try:
+                            self.fs.write(target, '', self.cwd)
+                        except VFSError as e:
+                            err.append(f"-bash: {e}\n")
+                            failed = True
+                            break
+                    stdout_target = (target, True)
+                else:
+                    stderr_target, stderr_append = target, op == '2>>'
+
+            if failed:
+                ctx.status = 1
+                stream = iter(())
+                continue
+
+            if not argv:
+                # Only assignments and/or redirections
+                stream = iter(())
+                continue
+            if all(_ASSIGNMENT.match(arg) for arg in argv):
+                for assignment in argv:
+                    name, _, value = assignment.partition('=')
+                    self.env[name] = value
+                stream = iter(())
+                continue
+            while argv and _ASSIGNMENT.match(argv[0]):
+                name, _, value = argv.pop(0).partition('=')
+                self.env[name] = value
+            ctx.name = argv[0]
+
+            func = self.commands.get(argv[0])
+            if func is None:
+                ctx.error("command not found", status=127)
+                lines: Iterator[str] = iter(())
+            else:
+                lines = self._guard(ctx, func(ctx, argv[1:]))
+            if merge_stderr:
+                lines = self._merge_stderr(ctx, lines)
+            lines = metered(lines)
+            if stdout_target is not None:
+                lines = self._write_through(ctx, lines, stdout_target[0])
+            stream = lines
+            stderr_sinks.append((ctx, stderr_target, stderr_append))
+
+        # Drive the pipeline from the last stage
+        for line in stream:
+            if len(out) >= MAX_OUTPUT_LINES:
+                break
+            out.append(line)
+        close = getattr(stream, 'close', None)
+        if close is not None:
+            close()
+
+        for ctx, target, append in stderr_sinks:
+            if not ctx.stderr:
+                continue
+            if target is None:
+                err.extend(ctx.stderr)
+            elif target != '/dev/null':
+                try:
+                    self.fs.write(target, ''.join(ctx.stderr), self.cwd, append=append)
+                except VFSError as e:
+                    err.append(f"-bash: {e}\n")
+        sunk = {id(sink[0]) for sink in stderr_sinks}
+        for ctx in contexts:
+            if id(ctx) not in sunk and ctx.stderr:
+                err.extend(ctx.stderr)
+        return contexts[-1].status if contexts else 0
+
+    @staticmethod
+    def _guard(ctx: CommandContext, lines: Iterator[str]) -> Iterator[str]:
+        try:
+            yield from lines
+        except VFSError as e:
+            ctx.error(str(e))
+        except (ValueError, re.error) as e:
+            ctx.error(str(e), status=2)
+
+    @staticmethod
+    def _merge_stderr(ctx: CommandContext, lines: Iterator[str]) -> Iterator[str]:
+        for line in lines:
+            while ctx.stderr:
+                yield ctx.stderr.popleft()
+            yield line
+        while ctx.stderr:
+            yield ctx.stderr.popleft()
+
+    def _write_through(self, ctx: CommandContext, lines: Iterator[str], target: str) -> Iterator[str]:
+        chunks = list(lines)
+        if target != '/dev/null' and chunks:
+            try:
+                self.fs.write(target, ''.join(chunks), self.cwd, append=True)
+            except VFSError as e:
+                ctx.error(str(e))
+        return
+        yield  # generator: output went to the file
+
+    # ------------------------------------------------------------------
+    # Shell builtins
+    # ------------------------------------------------------------------
+    def _cmd_cd(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        target = args[0] if args else self.home
+        if target == '-':
+            target = self.env.get('OLDPWD', self.cwd)
+            yield target + '\n'
+        new_cwd = self.fs.normalize(target, self.cwd)
+        if not self.fs.exists(new_cwd):
+            ctx.error(f"{target}: No such file or directory")
+            return
+        if not self.fs.is_dir(new_cwd):
+            ctx.error(f"{target}: Not a directory")
+            return
+        self.env['OLDPWD'], self.cwd = self.cwd, new_cwd
+        self.env['PWD'] = new_cwd
+
+    def _cmd_pwd(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        yield self.cwd + '\n'
+
+    def _cmd_echo(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        newline, escapes = True, False
+        while args and re.fullmatch(r'-[neE]+', args[0]):
+            flags = args.pop(0)
+            newline = newline and 'n' not in flags
+            escapes = ('e' in flags) or (escapes and 'E' not in flags)
+        text = ' '.join(args)
+        if escapes:
+            text = text.replace('\\n', '\n').replace('\\t', '\t').replace('\\\\', '\\')
+        yield text + ('\n' if newline else '')
+
+    def _cmd_export(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        if not args:
+            for name in sorted(self.env):
+                yield f'declare -x {name}="{self.env[name]}"\n'
+        for arg in args:
+            name, sep, value = arg.partition('=')
+            if sep:
+                self.env[name] = value
+            else:
+                self.env.setdefault(name, '')
+
+    def _cmd_unset(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        for name in args:
+            self.env.pop(name, None)
+        return iter(())
+
+    def _cmd_env(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        for name in sorted(self.env):
+            yield f"{name}={self.env[name]}\n"
+
+    def _cmd_printenv(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        if not args:
+            yield from self._cmd_env(ctx, args)
+            return
+        for name in args:
+            if name in self.env:
+                yield self.env[name] + '\n'
+            else:
+                ctx.status = 1
+
+    def _cmd_history(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        if args and args[0] == '-c':
+            self.clear_history()
+            return
+        entries = list(self.history)
+        first_number = self.history_count - len(entries) + 1
+        start = max(0, len(entries) - (int(args[0]) if args and args[0].isdigit() else len(entries)))
+        for number, entry in enumerate(entries[start:], first_number + start):
+            yield f"{number:5d}  {entry}\n"
+
+    def _cmd_clear(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        self._clear_requested = True
+        return iter(())
+
+    def _cmd_help(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        yield self.help_text.rstrip('\n') + '\n'
+
+    def _cmd_true(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        return iter(())
+
+    def _cmd_false(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        ctx.status = 1
+        return iter(())
+
+    def _cmd_which(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        for name in args:
+            if name in self.commands:
+                yield f"/usr/bin/{name}\n"
+            else:
+                ctx.status = 1
+
+    def _cmd_type(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        builtins = {'cd', 'pwd', 'echo', 'export', 'unset', 'history', 'type', 'true', 'false', 'help'}
+        for name in args:
+            if name in builtins:
+                yield f"{name} is a shell builtin\n"
+            elif name in self.commands:
+                yield f"{name} is /usr/bin/{name}\n"
+            else:
+                ctx.error(f"{name}: not found")
+
+    # ------------------------------------------------------------------
+    # System information
+    # ------------------------------------------------------------------
+    def _cmd_whoami(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        yield self.username + '\n'
+
+    def _cmd_hostname(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        yield self.hostname + '\n'
+
+    def _cmd_id(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        yield f"uid=1000({self.username}) gid=1000({self.username}) groups=1000({self.username}),27(sudo)\n"
+
+    def _cmd_date(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        now = datetime.now().astimezone()
+        if args and args[0].startswith('+'):
+            yield now.strftime(args[0][1:]) + '\n'
+        else:
+            yield now.strftime('%a %b %d %H:%M:%S %Z %Y') + '\n'
+
+    def _cmd_uname(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        fields = {
+            's': 'Linux', 'n': self.hostname, 'r': '5.15.0-58-generic',
+            'v': '#64-Ubuntu SMP Thu Jan 5 11:43:13 UTC 2023', 'm': 'x86_64', 'o': 'GNU/Linux',
+        }
+        flags = ''.join(arg.lstrip('-') for arg in args) or 's'
+        if 'a' in flags:
+            flags = 'snrvmo'
+        yield ' '.join(fields[flag] for flag in 'snrvmo' if flag in flags) + '\n'
+
+    # ------------------------------------------------------------------
+    # File operations
+    # ------------------------------------------------------------------
+    def _cmd_ls(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        parsed = _getopt(ctx, args, 'laA1dhFR')
+        if parsed is None:
+            return
+        options, paths = parsed
+        show_all, almost_all = '-a' in options, '-A' in options
+        long_format, classify, human = '-l' in options, '-F' in options, '-h' in options
+        one_per_line = '-1' in options or not ctx.is_tty
+
+        def suffix(node) -> str:
+            if not classify:
+                return ''
+            if node.is_dir:
+                return '/'
+            return '*' if node.mode & 0o111 else ''
+
+        def render(entries: List[Tuple[str, Any]], where: str) -> Iterator[str]:
+            if long_format:
+                abs_where = self.fs.normalize(where, self.cwd)
+                home_owned = abs_where == self.home or abs_where.startswith(self.home + '/')
+                width = max((len(self._size_text(node, human)) for _, node in entries), default=1)
+                for name, node in entries:
+                    owner = self.username if home_owned or node.owner is not None else 'root'
+                    yield self._long_entry(name, node, owner, width, human) + suffix(node) + '\n'
+            elif one_per_line:
+                for name, node in entries:
+                    yield name + suffix(node) + '\n'
+            elif entries:
+                yield '  '.join(name + suffix(node) for name, node in entries) + '\n'
+
+        def directory_entries(path: str, node) -> List[Tuple[str, Any]]:
+            entries = []
+            if show_all:
+                entries.append(('.', node))
+                entries.append(('..', self.fs.stat(posixpath.dirname(self.fs.normalize(path, self.cwd)))))
+            for name in sorted(node.data):
+                if name.startswith('.') and not (show_all or almost_all):
+                    continue
+                entries.append((name, node.data[name]))
+            return entries
+
+        targets = paths or ['.']
+        files: List[Tuple[str, Any]] = []
+        directories: List[Tuple[str, Any]] = []
+        for path in targets:
+            try:
+                node = self.fs.stat(path, self.cwd)
+            except VFSError:
+                ctx.error(f"cannot access '{path}': No such file or directory", status=2)
+                continue
+            if node.is_dir and '-d' not in options:
+                directories.append((path, node))
+            else:
+                files.append((path, node))
+
+        yield from render(files, '.')
+        show_headers = len(targets) > 1 or '-R' in options
+        pending = list(directories)
+        first = not files
+        while pending:
+            path, node = pending.pop(0)
+            entries = directory_entries(path, node)
+            if show_headers:
+                yield ('' if first else '\n') + f"{path}:\n"
+            first = False
+            if long_format:
+                blocks = sum(4 * math.ceil(child.size / 4096) for _, child in entries)
+                yield f"total {blocks}\n"
+            yield from render(entries, path)
+            if '-R' in options:
+                pending[0:0] = [(posixpath.join(path, name), child) for name, child in entries
+                                if child.is_dir and name not in ('.', '..')]
+
+    def _size_text(self, node, human: bool) -> str:
+        size = node.size
+        if not human or size < 1024:
+            return str(size)
+        for unit in 'KMG':
+            size /= 1024.0
+            if size < 1024:
+                return f"{size:.1f}{unit}" if size < 10 else f"{size:.0f}{unit}"
+        return f"{size:.0f}T"
+
+    def _long_entry(self, name: str, node, owner: str, width: int, human: bool) -> str:
+        links = 2 + sum(1 for child in node.data.values() if child.is_dir) if node.is_dir else 1
+        mtime = datetime.fromtimestamp(node.mtime)
+        stamp = f"{mtime:%b} {mtime.day:>2} {mtime:%H:%M}"
+        return (f"{format_mode(node)} {links} {owner} {owner} "
+                f"{self._size_text(node, human):>{width}} {stamp} {name}")
+
+    def _cmd_cat(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        parsed = _getopt(ctx, args, 'n')
+        if parsed is None:
+            return
+        options, paths = parsed
+        number = 0
+        for _, lines in ctx.inputs(paths):
+            for line in lines:
+                if '-n' in options:
+                    number += 1
+                    yield f"{number:6d}\t{line}"
+                else:
+                    yield line
+
+    def _cmd_touch(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        if not args:
+            ctx.error("missing file operand")
+        for path in args:
+            try:
+                self.fs.touch(path, self.cwd)
+            except VFSError as e:
+                ctx.error(f"cannot touch {e}")
+        return iter(())
+
+    def _cmd_mkdir(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        parsed = _getopt(ctx, args, 'pv')
+        if parsed is None:
+            return
+        options, paths = parsed
+        if not paths:
+            ctx.error("missing operand")
+        for path in paths:
+            try:
+                self.fs.mkdir(path, self.cwd, parents='-p' in options)
+                if '-v' in options:
+                    yield f"mkdir: created directory '{path}'\n"
+            except VFSError as e:
+                ctx.error(f"cannot create directory {e}")
+
+    def _cmd_rmdir(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        if not args:
+            ctx.error("missing operand")
+        for path in args:
+            try:
+                self.fs.remove(path, self.cwd, directory_only=True)
+            except VFSError as e:
+                ctx.error(f"failed to remove {e}")
+        return iter(())
+
+    def _cmd_rm(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        parsed = _getopt(ctx, args, 'rRfiv')
+        if parsed is None:
+            return
+        options, paths = parsed
+        force = '-f' in options
+        recursive = '-r' in options or '-R' in options
+        if not paths and not force:
+            ctx.error("missing operand")
+        for path in paths:
+            if self.fs.normalize(path, self.cwd) == '/':
+                ctx.error("it is dangerous to operate recursively on '/'")
+                continue
+            try:
+                self.fs.remove(path, self.cwd, recursive=recursive)
+                if '-v' in options:
+                    yield f"removed '{path}'\n"
+            except VFSError as e:
+                if force and e.reason == "No such file or directory":
+                    continue
+                if e.reason == "Is a directory":
+                    ctx.error(f"cannot remove '{path}': Is a directory")
+                else:
+                    ctx.error(f"cannot remove {e}")
+
+    def _transfer(self, ctx: CommandContext, args: List[str], move: bool) -> Iterator[str]:
+        parsed = _getopt(ctx, args, 'rRafv' if not move else 'fv')
+        if parsed is None:
+            return
+        options, paths = parsed
+        if len(paths) < 2:
+            ctx.error(f"missing destination file operand after '{paths[0]}'" if paths else "missing file operand")
+            return
+        *sources, destination = paths
+        if len(sources) > 1 and not self.fs.is_dir(destination, self.cwd):
+            ctx.error(f"target '{destination}' is not a directory")
+            return
+        recursive = any(flag in options for flag in ('-r', '-R', '-a'))
+        for source in sources:
+            try:
+                if move:
+                    self.fs.move(source, destination, self.cwd)
+                else:
+                    self.fs.copy(source, destination, self.cwd, recursive=recursive)
+                if '-v' in options:
+                    yield f"'{source}' -> '{destination}'\n"
+            except VFSError as e:
+                if e.reason.startswith('-r not specified'):
+                    ctx.error(f"-r not specified; omitting directory '{source}'")
+                else:
+                    ctx.error(f"cannot stat {e}" if not self.fs.exists(source, self.cwd) else str(e))
+
+    def _cmd_cp(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        return self._transfer(ctx, args, move=False)
+
+    def _cmd_mv(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        return self._transfer(ctx, args, move=True)
+
+    def _cmd_chmod(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        if len(args) < 2:
+            ctx.error("missing operand")
+            return iter(())
+        spec, paths = args[0], args[1:]
+        for path in paths:
+            try:
+                node = self.fs.stat(path, self.cwd)
+                self.fs.chmod(path, _apply_mode(spec, node.mode), self.cwd)
+            except VFSError as e:
+                ctx.error(f"cannot access {e}")
+            except ValueError:
+                ctx.error(f"invalid mode: '{spec}'")
+                break
+        return iter(())
+
+    def _cmd_find(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        starts = []
+        while args and not args[0].startswith('-') and args[0] not in ('!', '('):
+            starts.append(args.pop(0))
+        tests: List[Callable[[str, Any, int], bool]] = []
+        max_depth, min_depth = None, 0
+        negate = False
+        while args:
+            option = args.pop(0)
+            if option in ('!', '-not'):
+                negate = True
+                continue
+            if option == '-print':
+                continue
+            if option in ('-name', '-iname', '-type', '-maxdepth', '-mindepth') and not args:
+                ctx.error(f"missing argument to `{option}'")
+                return
+            if option == '-maxdepth':
+                max_depth = int(args.pop(0))
+                continue
+            if option == '-mindepth':
+                min_depth = int(args.pop(0))
+                continue
+            if option == '-name':
+                pattern = args.pop(0)
+                test = (lambda p: lambda path, node, depth: _fnmatch(posixpath.basename(path) or path, p))(pattern)
+            elif option == '-iname':
+                pattern = args.pop(0).lower()
+                test = (lambda p: lambda path, node, depth: _fnmatch((posixpath.basename(path) or path).lower(), p))(pattern)
+            elif option == '-type':
+                kind = args.pop(0)
+                if kind not in ('f', 'd'):
+                    ctx.error(f"Unknown argument to -type: {kind}")
+                    return
+                test = (lambda k: lambda path, node, depth: node.is_dir == (k == 'd'))(kind)
+            elif option == '-empty':
+                test = lambda path, node, depth: not node.data
+            else:
+                ctx.error(f"unknown predicate `{option}'")
+                return
+            if negate:
+                test = (lambda t: lambda path, node, depth: not t(path, node, depth))(test)
+                negate = False
+            tests.append(test)
+
+        for start in starts or ['.']:
+            try:
+                root = self.fs.stat(start, self.cwd)
+            except VFSError:
+                ctx.error(f"'{start}': No such file or directory")
+                continue
+            stack = [(start, root, 0)]
+            while stack:
+                path, node, depth = stack.pop()
+                if depth >= min_depth and all(test(path, node, depth) for test in tests):
+                    yield path + '\n'
+                if node.is_dir and (max_depth is None or depth < max_depth):
+                    for name in sorted(node.data, reverse=True):
+                        stack.append((posixpath.join(path, name), node.data[name], depth + 1))
+
+    def _cmd_basename(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        if not args:
+            ctx.error("missing operand")
+            return
+        name = posixpath.basename(args[0].rstrip('/')) or '/'
+        if len(args) > 1 and name.endswith(args[1]) and name != args[1]:
+            name = name[:-len(args[1])]
+        yield name + '\n'
+
+    def _cmd_dirname(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        if not args:
+            ctx.error("missing operand")
+            return
+        yield (posixpath.dirname(args[0].rstrip('/')) or '.') + '\n'
+
+    # ------------------------------------------------------------------
+    # Text processing (streaming)
+    # ------------------------------------------------------------------
+    def _cmd_head(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        parsed = _getopt(ctx, _numeric_count(args), 'n:')
+        if parsed is None:
+            return
+        options, paths = parsed
+        count = int(options.get('-n', '10'))
+        headers = len(paths) > 1
+        for index, (name, lines) in enumerate(ctx.inputs(paths)):
+            if headers:
+                yield ('\n' if index else '') + f"==> {name} <==\n"
+            yield from islice(lines, max(count, 0))
+
+    def _cmd_tail(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        parsed = _getopt(ctx, _numeric_count(args), 'n:')
+        if parsed is None:
+            return
+        options, paths = parsed
+        spec = options.get('-n', '10')
+        headers = len(paths) > 1
+        for index, (name, lines) in enumerate(ctx.inputs(paths)):
+            if headers:
+                yield ('\n' if index else '') + f"==> {name} <==\n"
+            if spec.startswith('+'):
+                yield from islice(lines, max(int(spec[1:]) - 1, 0), None)
+            else:
+                yield from deque(lines, maxlen=int(spec))
+
+    def _cmd_grep(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        parsed = _getopt(ctx, args, 'ivncloEFwrRHhqe:')
+        if parsed is None:
+            return
+        options, operands = parsed
+        if '-e' in options:
+            pattern = options['-e']
+        elif operands:
+            pattern = operands.pop(0)
+        else:
+            ctx.error("Usage: grep [OPTION]... PATTERNS [FILE]...", status=2)
+            return
+        if '-F' in options:
+            expression = re.escape(pattern)
+        elif '-E' in options:
+            expression = pattern
+        else:
+            expression = _bre_to_python(pattern)
+        if '-w' in options:
+            expression = rf'(?<!\w)(?:{expression})(?!\w)'
+        regex = re.compile(expression, re.IGNORECASE if '-i' in options else 0)
+
+        recursive = '-r' in options or '-R' in options
+        paths = operands or (['.'] if recursive else [])
+        if recursive:
+            files = []
+            for path in paths:
+                if self.fs.is_dir(path, self.cwd):
+                    files.extend(p for p, node in self.fs.walk(path, self.cwd) if not node.is_dir)
+                else:
+                    files.append(path)
+            paths = files
+        show_names = ('-H' in options or len(paths) > 1 or recursive) and '-h' not in options
+        invert = '-v' in options
+        matched_any = False
+
+        for name, lines in ctx.inputs(paths):
+            label = '(standard input)' if name == '-' else name
+            matches = 0
+            for number, line in enumerate(lines, 1):
+                found = regex.search(line) is not None
+                if found == invert:
+                    continue
+                matches += 1
+                matched_any = True
+                if '-q' in options:
+                    return
+                if '-l' in options:
+                    yield label + '\n'
+                    break
+                if '-c' in options:
+                    continue
+                prefix = (f"{label}:" if show_names else '') + (f"{number}:" if '-n' in options else '')
+                if '-o' in options and not invert:
+                    for match in regex.finditer(line.rstrip('\n')):
+                        if match.group(0):
+                            yield prefix + match.group(0) + '\n'
+                else:
+                    yield prefix + _ensure_newline(line)
+            if '-c' in options:
+                yield (f"{label}:" if show_names else '') + f"{matches}\n"
+        if ctx.status == 0 and not matched_any:
+            ctx.status = 1
+        elif ctx.status == 1:
+            ctx.status = 2
+
+    def _cmd_wc(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        parsed = _getopt(ctx, args, 'lwcm')
+        if parsed is None:
+            return
+        options, paths = parsed
+        columns = [flag for flag in ('-l', '-w', '-m', '-c') if flag in options] or ['-l', '-w', '-c']
+        rows = []
+        for name, lines in ctx.inputs(paths):
+            counts = {'-l': 0, '-w': 0, '-m': 0, '-c': 0}
+            for line in lines:
+                counts['-l'] += line.count('\n')
+                counts['-w'] += len(line.split())
+                counts['-m'] += len(line)
+                counts['-c'] += len(line.encode('utf-8'))
+            rows.append((name, counts))
+        if len(rows) > 1:
+            total = {key: sum(counts[key] for _, counts in rows) for key in ('-l', '-w', '-m', '-c')}
+            rows.append(('total', total))
+        if not rows:
+            return
+        reads_stdin = any(name == '-' for name, _ in rows)
+        if len(columns) == 1 and len(rows) == 1:
+            width = 1
+        elif reads_stdin:
+            width = 7
+        else:
+            width = max(len(str(counts[key])) for _, counts in rows for key in columns)
+        for name, counts in rows:
+            numbers = ' '.join(f"{counts[key]:>{width}}" for key in columns)
+            yield numbers + ('' if name == '-' else f" {name}") + '\n'
+
+    def _cmd_sort(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        parsed = _getopt(ctx, args, 'rnufk:t:')
+        if parsed is None:
+            return
+        options, paths = parsed
+        separator = options.get('-t')
+        key_spec = options.get('-k')
+
+        def key_text(line: str) -> str:
+            text = line.rstrip('\n')
+            if key_spec:
+                start, _, end = key_spec.partition(',')
+                fields = text.split(separator) if separator else text.split()
+                first = int(re.match(r'\d+', start).group(0)) - 1
+                last = int(re.match(r'\d+', end).group(0)) if end else len(fields)
+                text = (separator or ' ').join(fields[first:last])
+            return text.lower() if '-f' in options else text
+
+        def numeric(line: str) -> Tuple[float, str]:
+            match = re.match(r'\s*(-?\d+(?:\.\d+)?)', key_text(line))
+            return (float(match.group(1)) if match else 0.0, line)
+
+        lines = [_ensure_newline(line) for _, stream in ctx.inputs(paths) for line in stream]
+        if '-n' in options:
+            lines.sort(key=numeric, reverse='-r' in options)
+        else:
+            lines.sort(key=lambda line: (key_text(line), line), reverse='-r' in options)
+        if '-u' in options:
+            seen = set()
+            for line in lines:
+                key = key_text(line)
+                if key not in seen:
+                    seen.add(key)
+                    yield line
+        else:
+            yield from lines
+
+    def _cmd_uniq(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        parsed = _getopt(ctx, args, 'cdui')
+        if parsed is None:
+            return
+        options, paths = parsed
+        fold = '-i' in options
+
+        def emit(line: Optional[str], count: int) -> Iterator[str]:
+            if line is None:
+                return
+            if '-d' in options and count < 2:
+                return
+            if '-u' in options and count > 1:
+                return
+            yield (f"{count:7d} " if '-c' in options else '') + line
+
+        previous, previous_key, count = None, None, 0
+        for _, lines in ctx.inputs(paths[:1]):
+            for line in lines:
+                line = _ensure_newline(line)
+                key = line.lower() if fold else line
+                if key == previous_key:
+                    count += 1
+                    continue
+                yield from emit(previous, count)
+                previous, previous_key, count = line, key, 1
+        yield from emit(previous, count)
+
+    def _cmd_cut(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        parsed = _getopt(ctx, args, 'd:f:c:s')
+        if parsed is None:
+            return
+        options, paths = parsed
+        if '-f' not in options and '-c' not in options:
+            ctx.error("you must specify a list of bytes, characters, or fields")
+            return
+        selected = _parse_ranges(options.get('-f') or options.get('-c'))
+        delimiter = options.get('-d', '\t')
+        for _, lines in ctx.inputs(paths):
+            for line in lines:
+                text = line.rstrip('\n')
+                if '-c' in options:
+                    yield ''.join(ch for index, ch in enumerate(text, 1) if selected(index)) + '\n'
+                    continue
+                if delimiter not in text:
+                    if '-s' not in options:
+                        yield text + '\n'
+                    continue
+                fields = text.split(delimiter)
+                yield delimiter.join(field for index, field in enumerate(fields, 1) if selected(index)) + '\n'
+
+    def _cmd_tr(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        parsed = _getopt(ctx, args, 'ds')
+        if parsed is None:
+            return
+        options, sets = parsed
+        if not sets:
+            ctx.error("missing operand")
+            return
+        source = _expand_tr_set(sets[0])
+        target = _expand_tr_set(sets[1]) if len(sets) > 1 else ''
+        delete = '-d' in options
+        if not delete and not target and '-s' not in options:
+            ctx.error(f"missing operand after '{sets[0]}'")
+            return
+        table: Dict[int, Optional[str]] = {}
+        if delete:
+            table = {ord(ch): None for ch in source}
+        elif target:
+            padded = target + target[-1] * max(0, len(source) - len(target))
+            table = {ord(ch): padded[index] for index, ch in enumerate(source)}
+        squeeze = set(target if (target and not delete) else (sets[1] if delete and len(sets) > 1 else source)) \
+            if '-s' in options else set()
+        last = None
+        for line in ctx.stdin:
+            translated = line.translate(table)
+            if squeeze:
+                chars = []
+                for ch in translated:
+                    if ch in squeeze and ch == last:
+                        continue
+                    chars.append(ch)
+                    last = ch
+                translated = ''.join(chars)
+            if translated:
+                yield translated
+
+    def _cmd_tee(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        parsed = _getopt(ctx, args, 'a')
+        if parsed is None:
+            return
+        options, paths = parsed
+        collected = []
+        for line in ctx.stdin:
+            collected.append(line)
+            yield line
+        for path in paths:
+            try:
+                self.fs.write(path, ''.join(collected), self.cwd, append='-a' in options)
+            except VFSError as e:
+                ctx.error(str(e))
+
+    def _cmd_seq(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        try:
+            numbers = [int(arg) for arg in args]
+        except ValueError:
+            ctx.error(f"invalid argument: {' '.join(args)}")
+            return
+        if not 1 <= len(numbers) <= 3:
+            ctx.error("missing operand")
+            return
+        first, step, last = (1, 1, numbers[0]) if len(numbers) == 1 else \
+            (numbers[0], 1, numbers[1]) if len(numbers) == 2 else tuple(numbers)
+        if step == 0:
+            ctx.error("invalid Zero increment value: '0'")
+            return
+        for value in range(first, last + (1 if step > 0 else -1), step):
+            yield f"{value}\n"
+
+    def _cmd_nl(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        number = 0
+        for _, lines in ctx.inputs(args):
+            for line in lines:
+                if line.strip():
+                    number += 1
+                    yield f"{number:6d}\t{line}"
+                else:
+                    yield line
+
+    def _cmd_rev(self, ctx: CommandContext, args: List[str]) -> Iterator[str]:
+        for _, lines in ctx.inputs(args):
+            for line in lines:
+                yield line.rstrip('\n')[::-1] + '\n'
+
+
+# --- Helpers ---------------------------------------------------------------
+
+def _fnmatch(name: str, pattern: str) -> bool:
+    return fnmatch.fnmatchcase(name, pattern)
+
+
+def _bre_to_python(pattern: str) -> str:
+    """Translate a POSIX basic regex to Python syntax (\\( \\) \\| \\+ \\? \\{ \\} are the operators)."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '\\' and i + 1 < len(pattern):
+            nxt = pattern[i + 1]
+            out.append(nxt if nxt in '()|+?{}' else '\\' + nxt)
+            i += 2
+            continue
+        out.append('\\' + ch if ch in '()|+?{}' else ch)
+        i += 1
+    return ''.join(out)
+
+
+def _parse_ranges(spec: str) -> Callable[[int], bool]:
+    """Parse a cut list such as 1,3-5,7- into a predicate over 1-based positions."""
+    ranges = []
+    for part in spec.split(','):
+        if '-' in part:
+            start, _, end = part.partition('-')
+            ranges.append((int(start) if start else 1, int(end) if end else None))
+        else:
+            ranges.append((int(part), int(part)))
+    return lambda index: any(start <= index and (end is None or index <= end) for start, end in ranges)
+
+
+_TR_CLASSES = {
+    '[:lower:]': 'abcdefghijklmnopqrstuvwxyz',
+    '[:upper:]': 'ABCDEFGHIJKLMNOPQRSTUVWXYZ',
+    '[:digit:]': '0123456789',
+    '[:space:]': ' \t\n\r\f\v',
+    '[:blank:]': ' \t',
+}
+_TR_CLASSES['[:alpha:]'] = _TR_CLASSES['[:lower:]'] + _TR_CLASSES['[:upper:]']
+_TR_CLASSES['[:alnum:]'] = _TR_CLASSES['[:alpha:]'] + _TR_CLASSES['[:digit:]']
+_TR_CLASSES['[:punct:]'] = '!"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~'
+
+
+def _expand_tr_set(spec: str) -> str:
+    for name, chars in _TR_CLASSES.items():
+        spec = spec.replace(name, chars)
+    spec = spec.replace('\\n', '\n').replace('\\t', '\t').replace('\\\\', '\\')
+    out = []
+    i = 0
+    while i < len(spec):
+        if i + 2 < len(spec) and spec[i + 1] == '-':
+            out.extend(chr(code) for code in range(ord(spec[i]), ord(spec[i + 2]) + 1))
+            i += 3
+        else:
+            out.append(spec[i])
+            i += 1
+    return ''.join(out)
+
+
+def _apply_mode(spec: str, mode: int) -> int:
+    """Apply an octal (755) or symbolic (u+x,go-w) chmod spec to mode."""
+    if re.fullmatch(r'[0-7]{3,4}', spec):
+        return int(spec, 8) & 0o777
+    for clause in spec.split(','):
+        match = re.fullmatch(r'([ugoa]*)([+\-=])([rwx]*)', clause)
+        if not match:
+            raise ValueError(spec)
+        who, op, perms = match.groups()
+        who = who or 'a'
+        bits = 0
+        for target, shift in (('u', 6), ('g', 3), ('o', 0)):
+            if target in who or 'a' in who:
+                for perm, value in (('r', 4), ('w', 2), ('x', 1)):
+                    if perm in perms:
+                        bits |= value << shift
+        if op == '+':
+            mode |= bits
+        elif op == '-':
+            mode &= ~bits
+        else:
+            mask = 0
+            for target, shift in (('u', 6), ('g', 3), ('o', 0)):
+                if target in who or 'a' in who:
+                    mask |= 0o7 << shift
+            mode = (mode & ~mask) | bits
+    return mode
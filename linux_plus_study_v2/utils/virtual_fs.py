@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+Virtual Filesystem for the CLI Playground
+
+An in-memory inode tree that each playground session gets its own view of.
+All sessions start from one shared, read-only template tree; a session only
+copies the directories on the path it modifies (copy-on-write), so creating
+a session is O(1) and untouched sample files are never duplicated.
+"""
+
+import fnmatch
+import io
+import posixpath
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DIR_SIZE = 4096
+MAX_FILE_BYTES = 1024 * 1024
+
+
+class VFSError(Exception):
+    """Filesystem error carrying the path and a coreutils-style reason."""
+
+    def __init__(self, path: str, reason: str):
+        self.path = path
+        self.reason = reason
+        super().__init__(f"{path}: {reason}")
+
+
+def _enoent(path: str) -> VFSError:
+    return VFSError(path, "No such file or directory")
+
+
+class Inode:
+    """A file or directory node. Nodes without an owner belong to the template."""
+
+    __slots__ = ('kind', 'mode', 'mtime', 'data', 'owner')
+
+    def __init__(self, kind: str, mode: int, data, mtime: Optional[float] = None, owner: Optional[object] = None):
+        self.kind = kind
+        self.mode = mode
+        self.mtime = mtime if mtime is not None else time.time()
+        self.data = data  # str for files, Dict[str, Inode] for directories
+        self.owner = owner
+
+    @property
+    def is_dir(self) -> bool:
+        return self.kind == 'dir'
+
+    @property
+    def size(self) -> int:
+        return DIR_SIZE if self.is_dir else len(self.data.encode('utf-8'))
+
+    def clone(self, owner: object) -> 'Inode':
+        """Shallow copy owned by owner; directory children stay shared."""
+        data = dict(self.data) if self.is_dir else self.data
+        return Inode(self.kind, self.mode, data, self.mtime, owner)
+
+    def deep_copy(self, owner: object) -> 'Inode':
+        if not self.is_dir:
+            return Inode(self.kind, self.mode, self.data, time.time(), owner)
+        children = {name: child.deep_copy(owner) for name, child in self.data.items()}
+        return Inode(self.kind, self.mode, children, time.time(), owner)
+
+
+def make_file(content: str, mode: int = 0o644) -> Inode:
+    return Inode('file', mode, content)
+
+
+def make_dir(children: Optional[Dict[str, Inode]] = None, mode: int = 0o755) -> Inode:
+    return Inode('dir', mode, dict(children or {}))
+
+
+def format_mode(node: Inode) -> str:
+    """Render a node's mode like ls -l (e.g. drwxr-xr-x)."""
+    bits = ''.join(
+        flag if node.mode & (1 << (8 - i)) else '-'
+        for i, flag in enumerate('rwxrwxrwx')
+    )
+    return ('d' if node.is_dir else '-') + bits
+
+
+class VirtualFilesystem:
+    """A session's copy-on-write view of a template inode tree."""
+
+    def __init__(self, template_root: Optional[Inode] = None):
+        """
+        Initialize the filesystem.
+
+        Args:
+            template_root: Shared read-only tree to start from (default playground template)
+        """
+        self._token = object()
+        self.template = template_root if template_root is not None else get_template_root()
+        self.root = self.template
+        self.generation = 0  # Bumped on every mutation
+
+    # ------------------------------------------------------------------
+    # Path helpers
+    # ------------------------------------------------------------------
+    @staticmethod
+    def normalize(path: str, cwd: str = '/') -> str:
+        """Absolute, normalized form of path relative to cwd."""
+        joined = posixpath.join(cwd, path) if path else cwd
+        normalized = posixpath.normpath(joined)
+        # normpath keeps a leading '//' (POSIX allows it); the playground does not
+        return '/' + normalized.lstrip('/')
+
+    @staticmethod
+    def _parts(abs_path: str) -> List[str]:
+        return [part for part in abs_path.split('/') if part]
+
+    def _lookup(self, abs_path: str) -> Optional[Inode]:
+        node = self.root
+        for name in self._parts(abs_path):
+            if not node.is_dir:
+                return None
+            node = node.data.get(name)
+            if node is None:
+                return None
+        return node
+
+    def _mutable_dir(self, abs_path: str) -> Inode:
+        """Return the directory at abs_path, copying it and its ancestors into this session first."""
+        self.generation += 1
+        if self.root.owner is not self._token:
+            self.root = self.root.clone(self._token)
+        node = self.root
+        for name in self._parts(abs_path):
+            child = node.data.get(name)
+            if child is None:
+                raise _enoent(abs_path)
+            if not child.is_dir:
+                raise VFSError(abs_path, "Not a directory")
+            if child.owner is not self._token:
+                child = child.clone(self._token)
+                node.data[name] = child
+            node = child
+        return node
+
+    def _parent_and_name(self, path: str, cwd: str) -> Tuple[Inode, str, str]:
+        abs_path = self.normalize(path, cwd)
+        if abs_path == '/':
+            raise VFSError(path, "Operation not permitted")
+        parent_path, name = posixpath.split(abs_path)
+        parent = self._lookup(parent_path)
+        if parent is None:
+            raise _enoent(path)
+        if not parent.is_dir:
+            raise VFSError(path, "Not a directory")
+        return self._mutable_dir(parent_path), name, abs_path
+
+    def _share(self, node: Inode) -> Inode:
+        # Template nodes are immutable and can be linked from several places;
+        # nodes this session owns are mutated in place and must be copied.
+        return node if node.owner is None else node.deep_copy(self._token)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def stat(self, path: str, cwd: str = '/') -> Inode:
+        """Return the node at path or raise VFSError."""
+        node = self._lookup(self.normalize(path, cwd))
+        if node is None:
+            raise _enoent(path)
+        return node
+
+    def exists(self, path: str, cwd: str = '/') -> bool:
+        return self._lookup(self.normalize(path, cwd)) is not None
+
+    def is_dir(self, path: str, cwd: str = '/') -> bool:
+        node = self._lookup(self.normalize(path, cwd))
+        return node is not None and node.is_dir
+
+    def listdir(self, path: str, cwd: str = '/') -> List[str]:
+        node = self.stat(path, cwd)
+        if not node.is_dir:
+            raise VFSError(path, "Not a directory")
+        return sorted(node.data)
+
+    def read(self, path: str, cwd: str = '/') -> str:
+        node = self.stat(path, cwd)
+        if node.is_dir:
+            raise VFSError(path, "Is a directory")
+        return node.data
+
+    def iter_lines(self, path: str, cwd: str = '/') -> Iterator[str]:
+        """Stream a file's lines (with their newlines) without splitting it up front."""
+        return iter(io.StringIO(self.read(path, cwd)))
+
+    def walk(self, path: str, cwd: str = '/') -> Iterator[Tuple[str, Inode]]:
+        """Yield (path, node) for path and everything below it, depth first, sorted."""
+        node = self.stat(path, cwd)
+        stack = [(path, node)]
+        while stack:
+            current, current_node = stack.pop()
+            yield current, current_node
+            if current_node.is_dir:
+                for name in sorted(current_node.data, reverse=True):
+                    stack.append((posixpath.join(current, name), current_node.data[name]))
+
+    def glob(self, pattern: str, cwd: str = '/') -> List[str]:
+        """
+        Expand a shell glob pattern (*, ?, [...]) against the tree.
+
+        Returns paths in the same relative/absolute form as the pattern,
+        sorted; an empty list if nothing matches.
+        """
+        absolute = pattern.startswith('/')
+        parts = [part for part in pattern.split('/') if part]
+        candidates = [('/' if absolute else '', '/' if absolute else cwd)]
+        for index, part in enumerate(parts):
+            last = index == len(parts) - 1
+            next_candidates = []
+            for shown, real in candidates:
+                node = self._lookup(real)
+                if node is None or not node.is_dir:
+                    continue
+                if any(ch in part for ch in '*?['):
+                    names = [name for name in sorted(node.data)
+                             if fnmatch.fnmatchcase(name, part) and (part.startswith('.') or not name.startswith('.'))]
+                else:
+                    literal = _unescape_glob(part)
+                    names = [literal] if literal in node.data or literal in ('.', '..') else []
+                for name in names:
+                    child_real = posixpath.normpath(posixpath.join(real, name))
+                    if not last and not self.is_dir(child_real):
+                        continue
+                    next_candidates.append((posixpath.join(shown, name) if shown else name, child_real))
+            candidates = next_candidates
+            if not candidates:
+                return []
+        return sorted(shown for shown, _ in candidates)
+
+    # ------------------------------------------------------------------
+    # Mutations (copy-on-write)
+    # ------------------------------------------------------------------
+    def write(self, path: str, content: str, cwd: str = '/', append: bool = False) -> None:
+        """Create or replace (or append to) a regular file."""
+        parent, name, _ = self._parent_and_name(path, cwd)
+        existing = parent.data.get(name)
+        if existing is not None and existing.is_dir:
+            raise VFSError(path, "Is a directory")
+        if append and existing is not None:
+            content = existing.data + content
+        if len(content) > MAX_FILE_BYTES:
+            raise VFSError(path, "File too large")
+        mode = existing.mode if existing is not None else 0o644
+        parent.data[name] = Inode('file', mode, content, owner=self._token)
+        parent.mtime = time.time()
+
+    def touch(self, path: str, cwd: str = '/') -> None:
+        parent, name, _ = self._parent_and_name(path, cwd)
+        existing = parent.data.get(name)
+        if existing is None:
+            parent.data[name] = Inode('file', 0o644, '', owner=self._token)
+        else:
+            updated = existing.clone(self._token) if existing.owner is not self._token else existing
+            updated.mtime = time.time()
+            parent.data[name] = updated
+
+    def chmod(self, path: str, mode: int, cwd: str = '/') -> None:
+        parent, name, _ = self._parent_and_name(path, cwd)
+        existing = parent.data.get(name)
+        if existing is None:
+            raise _enoent(path)
+        updated = existing.clone(self._token) if existing.owner is not self._token else existing
+        updated.mode = mode & 0o7777
+        parent.data[name] = updated
+
+    def mkdir(self, path: str, cwd: str = '/', parents: bool = False) -> None:
+        abs_path = self.normalize(path, cwd)
+        if parents:
+            current = '/'
+            for name in self._parts(abs_path):
+                current = posixpath.join(current, name)
+                node = self._lookup(current)
+                if node is None:
+                    self._mutable_dir(posixpath.dirname(current)).data[name] = Inode(
+                        'dir', 0o755, {}, owner=self._token)
+                elif not node.is_dir:
+                    raise VFSError(path, "Not a directory")
+            return
+        parent, name, _ = self._parent_and_name(path, cwd)
+        if name in parent.data:
+            raise VFSError(path, "File exists")
+        parent.data[name] = Inode('dir', 0o755, {}, owner=self._token)
+
+    def remove(self, path: str, cwd: str = '/', recursive: bool = False, directory_only: bool = False) -> None:
+        """Remove a file, an empty directory (directory_only) or a tree (recursive)."""
+        parent, name, _ = self._parent_and_name(path, cwd)
+        node = parent.data.get(name)
+        if node is None:
+            raise _enoent(path)
+        if directory_only:
+            if not node.is_dir:
+                raise VFSError(path, "Not a directory")
+            if node.data:
+                raise VFSError(path, "Directory not empty")
+        elif node.is_dir and not recursive:
+            raise VFSError(path, "Is a directory")
+        del parent.data[name]
+
+    def copy(self, src: str, dst: str, cwd: str = '/', recursive: bool = False) -> None:
+        node = self.stat(src, cwd)
+        if node.is_dir and not recursive:
+            raise VFSError(src, "-r not specified; omitting directory")
+        target = self._resolve_target(src, dst, cwd)
+        if node.is_dir and target.startswith(self.normalize(src, cwd) + '/'):
+            raise VFSError(dst, "cannot copy a directory into itself")
+        parent, name, _ = self._parent_and_name(target, '/')
+        parent.data[name] = self._share(node)
+
+    def move(self, src: str, dst: str, cwd: str = '/') -> None:
+        src_abs = self.normalize(src, cwd)
+        node = self.stat(src_abs)
+        target = self._resolve_target(src, dst, cwd)
+        if target == src_abs:
+            return
+        if node.is_dir and target.startswith(src_abs + '/'):
+            raise VFSError(dst, "cannot move a directory into itself")
+        parent, name, _ = self._parent_and_name(target, '/')
+        parent.data[name] = node
+        src_parent, src_name, _ = self._parent_and_name(src_abs, '/')
+        del src_parent.data[src_name]
+
+    def _resolve_target(self, src: str, dst: str, cwd: str) -> str:
+        target = self.normalize(dst, cwd)
+        if self.is_dir(target):
+            target = posixpath.join(target, posixpath.basename(self.normalize(src, cwd)))
+        return target
+
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+    def snapshot(self) -> list:
+        """
+        Compact, JSON-serializable form of this view.
+
+        Subtrees still shared with the template are written as ['t', path]
+        references, so an untouched session serializes to a single entry.
+        """
+        index = _template_index(self.template)
+
+        def encode(node: Inode) -> list:
+            if node.owner is None and id(node) in index:
+                return ['t', index[id(node)]]
+            if node.is_dir:
+                return ['d', node.mode, round(node.mtime, 3),
+                        {name: encode(child) for name, child in node.data.items()}]
+            return ['f', node.mode, round(node.mtime, 3), node.data]
+
+        return encode(self.root)
+
+    @classmethod
+    def from_snapshot(cls, data: list, template_root: Optional[Inode] = None) -> 'VirtualFilesystem':
+        """
+        Rebuild a view from snapshot() output.
+
+        Template references that no longer exist (the template changed since the
+        snapshot was taken) are dropped.
+        """
+        fs = cls(template_root)
+        template = VirtualFilesystem(fs.template)
+
+        def decode(item: list) -> Optional[Inode]:
+            if item[0] == 't':
+                return template._lookup(item[1])
+            if item[0] == 'd':
+                children = {}
+                for name, child in item[3].items():
+                    node = decode(child)
+                    if node is not None:
+                        children[name] = node
+                return Inode('dir', item[1], children, item[2], fs._token)
+            return Inode('file', item[1], item[3], item[2], fs._token)
+
+        root = decode(data)
+        if root is not None and root.is_dir:
+            fs.root = root
+        return fs
+
+
+_template_indexes: Dict[int, Dict[int, str]] = {}
+
+
+def _template_index(template_root: Inode) -> Dict[int, str]:
+    """Map id(node) -> path for every node of a template tree (cached per template)."""
+    index = _template_indexes.get(id(template_root))
+    if index is None:
+        index = {}
+        stack = [('/', template_root)]
+        while stack:
+            path, node = stack.pop()
+            index[id(node)] = path
+            if node.is_dir:
+                stack.extend((posixpath.join(path, name), child) for name, child in node.data.items())
+        _template_indexes[id(template_root)] = index
+    return index
+
+
+def _unescape_glob(part: str) -> str:
+    """Turn [*] style escapes (used for quoted glob characters) back into literals."""
+    out = []
+    i = 0
+    while i < len(part):
+        if part[i] == '[' and i + 2 < len(part) and part[i + 2] == ']':
+            out.append(part[i + 1])
+            i += 3
+        else:
+            out.append(part[i])
+            i += 1
+    return ''.join(out)
+
+
+def escape_glob(text: str) -> str:
+    """Escape glob metacharacters so fnmatch treats them literally."""
+    return ''.join(f'[{ch}]' if ch in '*?[' else ch for ch in text)
+
+
+# --- Shared template -------------------------------------------------------
+
+HOME = '/home/user'
+
+_TEMPLATE_FILES = {
+    'home/user/sample.txt': (
+        "Hello Linux Plus student!\n"
+        "This is a sample text file.\n"
+        "It contains multiple lines.\n"
+        "Practice your command line skills here.\n"
+        "Good luck with your certification!\n"
+    ),
+    'home/user/log.txt': (
+        "INFO: System started\n"
+        "ERROR: Failed to connect\n"
+        "INFO: Retrying connection\n"
+        "WARNING: Low disk space\n"
+        "ERROR: Connection failed\n"
+        "INFO: Connection established\n"
+        "INFO: Process completed\n"
+    ),
+    'home/user/data.csv': (
+        "name,age,city\n"
+        "John,25,New York\n"
+        "Jane,30,Los Angeles\n"
+        "Bob,35,Chicago\n"
+        "Alice,28,Boston\n"
+    ),
+    'home/user/config.conf': (
+        "[database]\nhost=localhost\nport=5432\nname=mydb\n\n"
+        "[logging]\nlevel=INFO\nfile=/var/log/app.log\n"
+    ),
+    'home/user/notes.md': (
+        "# Linux Study Notes\n\n## Commands\n"
+        "- ls: list files\n- cat: display file contents\n- grep: search text\n"
+    ),
+    'home/user/documents/study_notes.md': (
+        "# Linux+ Objectives\n\n1. System Management\n2. Security\n"
+        "3. Scripting, Containers and Automation\n4. Troubleshooting\n"
+    ),
+    'home/user/documents/configs/sshd_config': (
+        "Port 22\nPermitRootLogin no\nPasswordAuthentication no\nPubkeyAuthentication yes\n"
+    ),
+    'home/user/scripts/backup.sh': (
+        "#!/bin/bash\n# Simple backup script\ntar -czf /tmp/backup.tar.gz \"$HOME/documents\"\n"
+    ),
+    'etc/hostname': "linux-playground\n",
+    'etc/hosts': "127.0.0.1   localhost\n127.0.1.1   linux-playground\n",
+    'etc/passwd': (
+        "root:x:0:0:root:/root:/bin/bash\n"
+        "daemon:x:1:1:daemon:/usr/sbin:/usr/sbin/nologin\n"
+        "sshd:x:110:65534::/run/sshd:/usr/sbin/nologin\n"
+        "user:x:1000:1000:Playground User:/home/user:/bin/bash\n"
+    ),
+    'etc/group': "root:x:0:\nsudo:x:27:user\nuser:x:1000:\n",
+    'etc/os-release': 'NAME="Ubuntu"\nVERSION="22.04 LTS (Jammy Jellyfish)"\nID=ubuntu\n',
+    'var/log/syslog': (
+        "Jun  4 10:30:15 linux-playground systemd[1]: Starting System Logging Service...\n"
+        "Jun  4 10:30:15 linux-playground systemd[1]: Started System Logging Service.\n"
+        "Jun  4 14:20:00 linux-playground sshd[1234]: Accepted publickey for user from 192.168.1.100\n"
+        "Jun  4 14:22:41 linux-playground sshd[1301]: Failed password for invalid user admin from 10.0.0.5\n"
+        "Jun  4 14:25:30 linux-playground kernel: CPU0: Temperature above threshold\n"
+    ),
+}
+_TEMPLATE_DIRS = ['tmp', 'root', 'home/user/Desktop', 'var/tmp', 'usr/bin']
+_EXECUTABLE_FILES = {'home/user/scripts/backup.sh'}
+
+_template_root: Optional[Inode] = None
+
+
+def build_template() -> Inode:
+    """Build the read-only playground template tree."""
+    root = make_dir()
+    for dir_path in _TEMPLATE_DIRS:
+        node = root
+        for name in dir_path.split('/'):
+            node = node.data.setdefault(name, make_dir())
+    for file_path, content in _TEMPLATE_FILES.items():
+        *dirs, name = file_path.split('/')
+        node = root
+        for dir_name in dirs:
+            node = node.data.setdefault(dir_name, make_dir())
+        node.data[name] = make_file(content, 0o755 if file_path in _EXECUTABLE_FILES else 0o644)
+    root.data['tmp'].mode = 0o777
+    return root
+
+
+def get_template_root() -> Inode:
+    """Get the shared template tree (built once per process)."""
+    global _template_root
+    if _template_root is None:
+        _template_root = build_template()
+    return _template_root
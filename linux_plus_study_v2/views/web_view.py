@@ -19,9 +19,7 @@ import time
 import logging
 import traceback
 import atexit
-from utils.cli_playground import get_cli_playground
-import subprocess
-import shlex
+from utils.cli_sessions import get_cli_session_manager
 import re  # Add the missing import for regular expressions
 try:
     from vm_integration.utils.vm_manager import VMManager
@@ -89,7 +87,7 @@ class ExportDataDict(TypedDict):
     metadata: ExportMetadataDict
     questions: List[QuestionExportDict]
 
-cli_playground = get_cli_playground()
+cli_sessions = get_cli_session_manager()
 
 def setup_database_for_web() -> Optional["DatabasePoolManager"]:
     """Initialize database connection pooling for web mode."""
@@ -142,7 +140,6 @@ class LinuxPlusStudyWeb:
         self.window = None
         
         # Initialize with proper type annotations
-        self.cli_history: List[str] = []
         self.current_category_filter: Optional[str] = None
         self.current_question_data: Any = None
         self.current_question_index: int = -1
@@ -326,8 +323,14 @@ class LinuxPlusStudyWeb:
     def setup_cli_playground_routes(self, app: Flask) -> None:
         """Setup CLI playground API routes"""
         
-        # Store command history in memory with proper type annotation
-        self.cli_history = []
+        def cli_session_id() -> str:
+            """Key of the caller's playground session (created on first use)."""
+            session_id = session.get('cli_session_id')
+            if not session_id:
+                import secrets
+                session_id = secrets.token_urlsafe(18)
+                session['cli_session_id'] = session_id
+            return session_id
         
         @app.route('/api/cli/execute', methods=['POST'])
         def execute_cli_command():
@@ -338,41 +341,17 @@ class LinuxPlusStudyWeb:
                 if not command:
                     return jsonify({'success': False, 'error': 'No command provided'})
                 
-                # Add to history
-                self.cli_history.append(command)
-                
-                # Handle built-in commands
-                if command == 'clear':
-                    return jsonify({'success': True, 'output': 'CLEAR_SCREEN'})
-                
-                if command == 'help':
-                    help_text = self._get_help_text()
-                    return jsonify({'success': True, 'output': help_text})
-                
-                # Handle simulated file system commands
-                output = self._simulate_command(command)
-                if output is not None:
-                    return jsonify({'success': True, 'output': output})
-                
-                # For real system commands (restricted set)
-                allowed_commands = ['ls', 'pwd', 'whoami', 'date', 'echo', 'cat', 'grep', 'find', 'wc', 'head', 'tail']
-                cmd_parts = shlex.split(command)
-                
-                if not cmd_parts or cmd_parts[0] not in allowed_commands:
-                    return jsonify({
-                        'success': False, 
-                        'error': f'Command "{cmd_parts[0] if cmd_parts else command}" not available in this sandbox environment.\nType "help" to see available commands.'
-                    })
-                
-                # Execute safe command
-                try:
-                    result = subprocess.run(cmd_parts, capture_output=True, text=True, timeout=10)
-                    output = result.stdout if result.returncode == 0 else result.stderr
-                    return jsonify({'success': True, 'output': output})
-                except subprocess.TimeoutExpired:
-                    return jsonify({'success': False, 'error': 'Command timed out'})
-                except Exception as e:
-                    return jsonify({'success': False, 'error': f'Error: {str(e)}'})
+                # Everything runs in this session's virtual shell; nothing
+                # is executed on the host
+                result = cli_sessions.execute(cli_session_id(), command)
+                if result['error'] and not result['output']:
+                    return jsonify({'success': False, 'error': result['error'],
+                                    'exit_code': result['exit_code'], 'cwd': result['cwd']})
+                output = result['output']
+                if result['error']:
+                    output = f"{output}\n{result['error']}"
+                return jsonify({'success': True, 'output': output,
+                                'exit_code': result['exit_code'], 'cwd': result['cwd']})
                     
             except Exception as e:
                 return jsonify({'success': False, 'error': f'Server error: {str(e)}'})
@@ -384,7 +363,7 @@ class LinuxPlusStudyWeb:
         def clear_cli_history():
             """Clear CLI command history"""
             try:
-                self.cli_history = []
+                cli_sessions.clear_history(cli_session_id())
                 
                 return jsonify({
                     'success': True,
@@ -404,8 +383,7 @@ class LinuxPlusStudyWeb:
         def get_available_commands():
             """Get list of available CLI commands"""
             try:
-                commands = list(cli_playground.safe_commands.keys())
-                commands.sort()
+                commands = cli_sessions.available_commands()
                 
                 command_descriptions = {
                     # Basic File Operations
@@ -498,7 +476,7 @@ class LinuxPlusStudyWeb:
             try:
                 return jsonify({
                     'success': True,
-                    'history': self.cli_history
+                    'history': cli_sessions.history(cli_session_id())
                 })
                 
             except Exception as e:
@@ -1400,104 +1378,6 @@ class LinuxPlusStudyWeb:
         except Exception as e:
             print(f"Error adding question to pool: {str(e)}")
             return False
-    def _simulate_command(self, command: str) -> Optional[str]:
-        """Simulate common commands with educational examples"""
-        
-        # Create sample files content
-        sample_files = {
-            'sample.txt': 'Hello Linux Plus student!\nThis is a sample text file.\nPractice your command line skills here.\nGood luck with your certification!',
-            'log.txt': 'INFO: System started\nERROR: Failed to connect\nINFO: Retrying connection\nWARNING: Low disk space\nINFO: Connection established',
-            'log.txt': 'INFO: System started\nERROR: Failed to connect\nINFO: Retrying connection\nWARNING: Low disk space\nINFO: Connection established',
-            'data.csv': 'name,age,city\nJohn,25,New York\nJane,30,Los Angeles\nBob,35,Chicago',
-            'config.conf': '[database]\nhost=localhost\nport=5432\nname=mydb\n\n[logging]\nlevel=INFO\nfile=/var/log/app.log'
-        }
-        
-        cmd_parts = command.split()
-        if not cmd_parts:
-            return None
-        
-        base_cmd = cmd_parts[0]
-        
-        # Simulate ls command
-        if base_cmd == 'ls':
-            if len(cmd_parts) == 1:
-                return 'sample.txt  log.txt  data.csv  config.conf  docs/  scripts/'
-            else:
-                return 'sample.txt  log.txt  data.csv  config.conf'
-        
-        # Simulate cat command
-        elif base_cmd == 'cat' and len(cmd_parts) > 1:
-            filename = cmd_parts[1]
-            if filename in sample_files:
-                return sample_files[filename]
-            else:
-                return f'cat: {filename}: No such file or directory'
-        
-        # Simulate grep command
-        elif base_cmd == 'grep' and len(cmd_parts) >= 3:
-            pattern = cmd_parts[1].strip('"\'')
-            filename = cmd_parts[2]
-            if filename in sample_files:
-                lines = sample_files[filename].split('\n')
-                matches = [line for line in lines if pattern.lower() in line.lower()]
-                return '\n'.join(matches) if matches else f'grep: no matches found for "{pattern}"'
-            else:
-                return f'grep: {filename}: No such file or directory'
-        
-        # Simulate wc command
-        elif base_cmd == 'wc' and len(cmd_parts) > 1:
-            filename = cmd_parts[1]
-            if filename in sample_files:
-                content = sample_files[filename]
-                lines = len(content.split('\n'))
-                words = len(content.split())
-                chars = len(content)
-                return f'{lines:8} {words:8} {chars:8} {filename}'
-            else:
-                return f'wc: {filename}: No such file or directory'
-        
-        return None  # Command not simulated, try real execution
-
-    def _get_help_text(self) -> str:
-        """Get comprehensive help text"""
-        return """Linux Plus CLI Playground - Available Commands:
-
-    FILE OPERATIONS:
-    ls                    - List files and directories
-    cat <file>           - Display file contents
-    head <file>          - Show first 10 lines of file
-    tail <file>          - Show last 10 lines of file
-
-    TEXT PROCESSING:
-    grep <pattern> <file> - Search for pattern in file
-    wc <file>            - Count lines, words, and characters
-
-    SYSTEM INFO:
-    pwd                  - Show current directory path
-    whoami              - Display current username
-    date                - Show current date and time
-
-    UTILITIES:
-    echo "text"         - Display text
-    find . -name "*.txt" - Find files by pattern
-    clear               - Clear terminal screen
-    help                - Show this help message
-
-    SAMPLE FILES AVAILABLE:
-    sample.txt          - Basic text file
-    log.txt             - Log file with different message types
-    data.csv            - CSV data file
-    config.conf         - Configuration file
-
-    EXAMPLES:
-    cat sample.txt              - View sample file
-    grep "ERROR" log.txt        - Find error messages
-    wc data.csv                 - Count lines in CSV
-    echo "Hello World"          - Print text
-    find . -name "*.txt"        - Find all .txt files
-
-    This is a safe educational environment. Not all Linux commands are available.
-    Type commands above to practice Linux command line skills!"""
     def reset_quiz_state(self) -> None:
         """Reset quiz state variables."""
         self.quiz_active = False
@@ -2598,80 +2478,23 @@ class LinuxPlusStudyWeb:
                         'error': f'Failed to initialize VM manager: {str(e)}'
                     })
                 
-                # Try to connect to libvirt
+                # Try to connect to libvirt (shared connection, reopened if it dropped)
                 try:
-                    conn = vm_manager.connect_libvirt()
+                    vm_manager.connect_libvirt()
                 except Exception as e:
                     return jsonify({
                         'success': False,
                         'error': f'Failed to connect to libvirt: {str(e)}. Make sure libvirt is running.'
                     })
                 
-                vms: List[Dict[str, Any]] = []
+                # Answered from the event-driven domain cache and the IP TTL cache
                 try:
-                    # Get defined VMs with proper type annotation
-                    defined_vms: List[str] = cast(List[str], conn.listDefinedDomains())
-                    
-                    # Get running VMs with proper type annotation
-                    running_vm_ids = cast(List[int], conn.listDomainsID())
-                    running_vms: List[str] = []
-                    for vm_id in running_vm_ids:
-                        try:
-                            # Add proper type annotation for libvirt function
-                            domain = cast(Any, conn).lookupByID(vm_id)
-                            running_vms.append(str(domain.name()))
-                        except Exception as e:
-                            if hasattr(self, 'logger'):
-                                self.logger.warning(f"Could not get running VM with ID {vm_id}: {e}")
-            
-                    # Combine all VMs with proper typing
-                    all_vm_names: Set[str] = set(defined_vms + running_vms)
-            
-                    for vm_name in all_vm_names:
-                        try:
-                            # Add proper type annotation for libvirt function
-                            domain = cast(Any, conn).lookupByName(vm_name)
-                            is_active = bool(domain.isActive())
-                            
-                            vm_info: Dict[str, Any] = {
-                                'name': vm_name,
-                                'status': 'running' if is_active else 'stopped',
-                                'id': domain.ID() if is_active else None
-                            }
-                            
-                            # Try to get IP if running
-                            if is_active:
-                                try:
-                                    vm_info['ip'] = vm_manager.get_vm_ip(vm_name)
-                                except Exception as e:
-                                    if hasattr(self, 'logger'):
-                                        self.logger.debug(f"Could not get IP for VM {vm_name}: {e}")
-                                    vm_info['ip'] = 'Unknown'
-                            else:
-                                vm_info['ip'] = 'Not running'
-                            
-                            vms.append(vm_info)
-                            
-                        except Exception as e:
-                            if hasattr(self, 'logger'):
-                                self.logger.warning(f"Error processing VM {vm_name}: {e}")
-                            # Add error VM entry
-                            vms.append({
-                                'name': vm_name,
-                                'status': 'error',
-                                'error': str(e)
-                            })
-            
+                    vms: List[Dict[str, Any]] = vm_manager.list_vms()
                 except Exception as e:
                     return jsonify({
                         'success': False,
                         'error': f'Error listing VMs: {str(e)}'
                     })
-                finally:
-                    try:
-                        conn.close()
-                    except:
-                        pass
             
                 return jsonify({
                     'success': True, 
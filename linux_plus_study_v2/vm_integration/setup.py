@@ -35,7 +35,6 @@ setup(
     package_data={
         'lpem': [
             'challenges/*.yaml',
-            'cli_sandbox/*',
             'templates/*.html',
             'static/css/*.css',
             'static/js/*.js',
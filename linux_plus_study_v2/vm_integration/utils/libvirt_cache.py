@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+Shared libvirt Connection and Domain Metadata Cache
+
+Keeps one long-lived libvirt connection per URI for the whole process and
+answers VM list/status queries from memory:
+
+- The connection is opened once, kept alive with libvirt keepalives and
+  reopened transparently after libvirtd restarts or the socket drops.
+- Domain state (name, status, id) is loaded once and then kept current by
+  libvirt lifecycle events dispatched on a background event loop thread,
+  so listing VMs never polls libvirt. If the driver cannot deliver events
+  the state is re-read at most every VM_STATE_FALLBACK_TTL_SECONDS.
+- IP lookups (guest agent, then DHCP leases) are cached with a TTL. Expired
+  entries are served while a background refresh runs, so only the very
+  first lookup for a running VM waits on the guest. Lifecycle events
+  invalidate a VM's cached IP.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import libvirt  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Configuration via environment
+VM_IP_CACHE_TTL_SECONDS = float(os.getenv('VM_IP_CACHE_TTL_SECONDS', '60'))
+VM_IP_NEGATIVE_TTL_SECONDS = float(os.getenv('VM_IP_NEGATIVE_TTL_SECONDS', '5'))
+VM_STATE_FALLBACK_TTL_SECONDS = float(os.getenv('VM_STATE_FALLBACK_TTL_SECONDS', '5'))
+LIBVIRT_KEEPALIVE_INTERVAL = int(os.getenv('LIBVIRT_KEEPALIVE_INTERVAL', '5'))
+LIBVIRT_KEEPALIVE_COUNT = int(os.getenv('LIBVIRT_KEEPALIVE_COUNT', '3'))
+
+# Lifecycle event types (values from libvirt's virDomainEventType)
+_EVENT_DEFINED = getattr(libvirt, 'VIR_DOMAIN_EVENT_DEFINED', 0)
+_EVENT_UNDEFINED = getattr(libvirt, 'VIR_DOMAIN_EVENT_UNDEFINED', 1)
+_EVENT_STARTED = getattr(libvirt, 'VIR_DOMAIN_EVENT_STARTED', 2)
+_EVENT_SUSPENDED = getattr(libvirt, 'VIR_DOMAIN_EVENT_SUSPENDED', 3)
+_EVENT_RESUMED = getattr(libvirt, 'VIR_DOMAIN_EVENT_RESUMED', 4)
+_EVENT_STOPPED = getattr(libvirt, 'VIR_DOMAIN_EVENT_STOPPED', 5)
+_EVENT_PMSUSPENDED = getattr(libvirt, 'VIR_DOMAIN_EVENT_PMSUSPENDED', 7)
+_RUNNING_EVENTS = (_EVENT_STARTED, _EVENT_SUSPENDED, _EVENT_RESUMED, _EVENT_PMSUSPENDED)
+
+_event_loop_lock = threading.Lock()
+_event_loop_thread: Optional[threading.Thread] = None
+
+
+def _run_event_loop() -> None:
+    while True:
+        try:
+            libvirt.virEventRunDefaultImpl()
+        except Exception as e:
+            logger.warning(f"libvirt event loop error: {e}")
+            time.sleep(1)
+
+
+def start_event_loop() -> bool:
+    """
+    Register libvirt's default event implementation and run it on a daemon thread.
+
+    Must happen before a connection is opened for that connection to deliver
+    events and keepalives. Safe to call repeatedly.
+
+    Returns:
+        bool: True if the event loop is running
+    """
+    global _event_loop_thread
+    with _event_loop_lock:
+        if _event_loop_thread is None:
+            try:
+                libvirt.virEventRegisterDefaultImpl()
+            except Exception as e:
+                logger.warning(f"libvirt event loop unavailable, falling back to polling: {e}")
+                return False
+            _event_loop_thread = threading.Thread(target=_run_event_loop, name='libvirt-events', daemon=True)
+            _event_loop_thread.start()
+    return True
+
+
+class TTLCache:
+    """Thread-safe TTL cache that can still hand out expired values."""
+
+    def __init__(self, ttl: float, negative_ttl: float):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Lifetime of a cached value in seconds
+            negative_ttl: Lifetime of a cached miss (None value) in seconds
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[Optional[str], float]] = {}
+
+    def lookup(self, key: str) -> Tuple[bool, Optional[str], bool]:
+        """
+        Look up a key.
+
+        Returns:
+            Tuple of (found, value, fresh)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return False, None, False
+        value, expires = entry
+        return True, value, time.monotonic() < expires
+
+    def set(self, key: str, value: Optional[str]) -> None:
+        """Store a value; None is cached as a miss with the shorter TTL."""
+        ttl = self.ttl if value is not None else self.negative_ttl
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one key, or everything when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+class _SharedConnection:
+    """
+    Proxy for the shared virConnect handed to callers.
+
+    Existing code closes the connections it gets back; closing the proxy is a
+    no-op so one caller cannot tear down the connection everyone shares.
+    """
+
+    def __init__(self, conn: libvirt.virConnect):
+        self._conn = conn
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def close(self) -> int:
+        return 0
+
+
+class LibvirtConnectionManager:
+    """Long-lived libvirt connection with an event-driven domain state cache."""
+
+    def __init__(self, uri: str,
+                 ip_ttl: float = VM_IP_CACHE_TTL_SECONDS,
+                 ip_negative_ttl: float = VM_IP_NEGATIVE_TTL_SECONDS,
+                 state_fallback_ttl: float = VM_STATE_FALLBACK_TTL_SECONDS):
+        """
+        Initialize the connection manager.
+
+        Args:
+            uri: libvirt connection URI
+            ip_ttl: Seconds a resolved IP address stays fresh
+            ip_negative_ttl: Seconds a failed IP lookup is remembered
+            state_fallback_ttl: Seconds between state reloads when events are unavailable
+        """
+        self.uri = uri
+        self.state_fallback_ttl = state_fallback_ttl
+        self.ip_cache = TTLCache(ip_ttl, ip_negative_ttl)
+        self._conn: Optional[libvirt.virConnect] = None
+        self._proxy: Optional[_SharedConnection] = None
+        self._connection_lost = False
+        self._events_enabled = False
+        self._callback_ids: List[int] = []
+        self._conn_lock = threading.RLock()
+        self._state_lock = threading.Lock()
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._domains: Dict[str, libvirt.virDomain] = {}
+        self._touched: Dict[str, float] = {}
+        self._synced_at = 0.0
+        self._refreshing: Set[str] = set()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='vm-ip-refresh')
+        self.stats = {'connects': 0, 'resyncs': 0, 'events': 0, 'ip_hits': 0, 'ip_misses': 0, 'ip_refreshes': 0}
+
+    # ------------------------------------------------------------------
+    # Connection lifecycle
+    # ------------------------------------------------------------------
+    def get_connection(self) -> _SharedConnection:
+        """
+        Return the shared connection, reconnecting if it was lost.
+
+        Raises:
+            libvirt.libvirtError: If libvirt cannot be reached
+        """
+        proxy = self._proxy
+        if proxy is not None and not self._connection_lost and self._is_alive():
+            return proxy
+        with self._conn_lock:
+            if self._proxy is None or self._connection_lost or not self._is_alive():
+                self._open()
+            return self._proxy  # type: ignore
+
+    def _is_alive(self) -> bool:
+        try:
+            return bool(self._conn is not None and self._conn.isAlive())
+        except libvirt.libvirtError:
+            return False
+
+    def _open(self) -> None:
+        self._discard_connection()
+        events_available = start_event_loop()
+
+        conn = libvirt.open(self.uri)
+        if conn is None:
+            raise libvirt.libvirtError(f"Failed to open connection to {self.uri}")
+
+        self._conn = conn
+        self._proxy = _SharedConnection(conn)
+        self._connection_lost = False
+        self.stats['connects'] += 1
+
+        if events_available:
+            try:
+                conn.setKeepAlive(LIBVIRT_KEEPALIVE_INTERVAL, LIBVIRT_KEEPALIVE_COUNT)
+            except libvirt.libvirtError as e:
+                logger.debug(f"libvirt keepalive not supported for {self.uri}: {e}")
+            try:
+                conn.registerCloseCallback(self._on_close, None)
+            except libvirt.libvirtError as e:
+                logger.debug(f"libvirt close callback not supported for {self.uri}: {e}")
+        self._events_enabled = events_available and self._register_events(conn)
+
+        self.ip_cache.invalidate()
+        self._resync()
+        mode = 'event-driven' if self._events_enabled else f'polling every {self.state_fallback_ttl:.0f}s'
+        logger.info(f"Connected to libvirt at {self.uri} (domain state {mode})")
+
+    def _register_events(self, conn: libvirt.virConnect) -> bool:
+        try:
+            callback_id = conn.domainEventRegisterAny(
+                None, libvirt.VIR_DOMAIN_EVENT_ID_LIFECYCLE, self._on_lifecycle_event, None
+            )
+        except (libvirt.libvirtError, AttributeError) as e:
+            logger.warning(f"libvirt lifecycle events unavailable, falling back to polling: {e}")
+            return False
+        self._callback_ids = [callback_id]
+        return True
+
+    def _discard_connection(self) -> None:
+        conn, self._conn, self._proxy = self._conn, None, None
+        if conn is None:
+            return
+        for callback_id in self._callback_ids:
+            try:
+                conn.domainEventDeregisterAny(callback_id)
+            except Exception:
+                pass
+        self._callback_ids = []
+        try:
+            conn.unregisterCloseCallback()
+        except Exception:
+            pass
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _on_close(self, conn: libvirt.virConnect, reason: int, opaque: Any) -> None:
+        # Runs on the event loop thread; the next caller reconnects
+        logger.warning(f"libvirt connection to {self.uri} closed (reason {reason}); will reconnect")
+        self._connection_lost = True
+
+    def close(self) -> None:
+        """Close the shared connection (process shutdown)."""
+        with self._conn_lock:
+            self._discard_connection()
+        self._refresh_pool.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # Domain state
+    # ------------------------------------------------------------------
+    def _resync(self) -> None:
+        """Reload every domain's state from libvirt."""
+        started = time.monotonic()
+        conn = self._conn
+        if conn is None:
+            return
+        states: Dict[str, Dict[str, Any]] = {}
+        domains: Dict[str, libvirt.virDomain] = {}
+        for domain in conn.listAllDomains():
+            name = domain.name()
+            active = bool(domain.isActive())
+            states[name] = {'name': name, 'status': 'running' if active else 'stopped',
+                            'id': domain.ID() if active else None}
+            domains[name] = domain
+
+        with self._state_lock:
+            # Keep entries that lifecycle events updated while we were listing
+            for name, touched in self._touched.items():
+                if touched >= started:
+                    if name in self._states:
+                        states[name] = self._states[name]
+                        domains[name] = self._domains[name]
+                    else:
+                        states.pop(name, None)
+                        domains.pop(name, None)
+            self._states = states
+            self._domains = domains
+            self._touched = {}
+            self._synced_at = time.monotonic()
+        self.stats['resyncs'] += 1
+
+    def _on_lifecycle_event(self, conn: libvirt.virConnect, domain: libvirt.virDomain,
+                            event: int, detail: int, opaque: Any) -> None:
+        # Runs on the event loop thread: only local accessors (name, ID), no RPCs
+        name = domain.name()
+        self.stats['events'] += 1
+        with self._state_lock:
+            self._touched[name] = time.monotonic()
+            if event == _EVENT_UNDEFINED:
+                self._states.pop(name, None)
+                self._domains.pop(name, None)
+            elif event in _RUNNING_EVENTS:
+                self._states[name] = {'name': name, 'status': 'running', 'id': domain.ID()}
+                self._domains[name] = domain
+            elif event == _EVENT_STOPPED:
+                self._states[name] = {'name': name, 'status': 'stopped', 'id': None}
+                self._domains[name] = domain
+            elif event == _EVENT_DEFINED:
+                self._states.setdefault(name, {'name': name, 'status': 'stopped', 'id': None})
+                self._domains[name] = domain
+        # Any lifecycle change (shutdown, crash, restart) may change the address
+        self.ip_cache.invalidate(name)
+
+    def _ensure_fresh(self) -> None:
+        self.get_connection()
+        if not self._events_enabled and time.monotonic() - self._synced_at > self.state_fallback_ttl:
+            with self._conn_lock:
+                if time.monotonic() - self._synced_at > self.state_fallback_ttl:
+                    self._resync()
+
+    def list_domains(self) -> List[Dict[str, Any]]:
+        """
+        Return the cached state of every defined domain.
+
+        Returns:
+            List of dicts with name, status and id, sorted by name
+        """
+        self._ensure_fresh()
+        with self._state_lock:
+            states = [dict(state) for state in self._states.values()]
+        return sorted(states, key=lambda x: x['name'])
+
+    def get_state(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the cached state of one domain, or None if it is not defined."""
+        self._ensure_fresh()
+        with self._state_lock:
+            state = self._states.get(name)
+        return dict(state) if state is not None else None
+
+    def get_domain(self, name: str) -> libvirt.virDomain:
+        """
+        Return the virDomain for a name without a lookup round trip when cached.
+
+        Raises:
+            libvirt.libvirtError: If the domain does not exist
+        """
+        conn = self.get_connection()
+        with self._state_lock:
+            domain = self._domains.get(name)
+        if domain is None:
+            domain = conn.lookupByName(name)
+            with self._state_lock:
+                self._domains[name] = domain
+        return domain
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """
+        Forget cached IPs (and, without events, cached state) after an operation.
+
+        Args:
+            name: Domain to invalidate, or None for all domains
+        """
+        self.ip_cache.invalidate(name)
+        if not self._events_enabled:
+            self._synced_at = 0.0
+
+    # ------------------------------------------------------------------
+    # IP addresses
+    # ------------------------------------------------------------------
+    def get_ip(self, name: str, resolver: Callable[[], Optional[str]]) -> Optional[str]:
+        """
+        Return a domain's IP address from the cache.
+
+        Fresh entries are returned directly. Expired entries are returned while
+        resolver runs in the background. Only a cold miss calls resolver inline.
+
+        Args:
+            name: Domain name
+            resolver: Performs the real lookup; returns None if no address is known
+
+        Returns:
+            Optional[str]: IP address, or None if it could not be determined
+        """
+        found, value, fresh = self.ip_cache.lookup(name)
+        if found and fresh:
+            self.stats['ip_hits'] += 1
+            return value
+        if found and value is not None:
+            self.stats['ip_hits'] += 1
+            self._schedule_refresh(name, resolver)
+            return value
+        self.stats['ip_misses'] += 1
+        return self._resolve(name, resolver)
+
+    def _resolve(self, name: str, resolver: Callable[[], Optional[str]]) -> Optional[str]:
+        try:
+            value = resolver()
+        except Exception as e:
+            logger.debug(f"IP lookup for {name} failed: {e}")
+            value = None
+        self.ip_cache.set(name, value)
+        return value
+
+    def _schedule_refresh(self, name: str, resolver: Callable[[], Optional[str]]) -> None:
+        with self._state_lock:
+            if name in self._refreshing:
+                return
+            self._refreshing.add(name)
+
+        def refresh() -> None:
+            try:
+                self._resolve(name, resolver)
+                self.stats['ip_refreshes'] += 1
+            finally:
+                with self._state_lock:
+                    self._refreshing.discard(name)
+
+        try:
+            self._refresh_pool.submit(refresh)
+        except RuntimeError:
+            # Pool shut down at exit
+            with self._state_lock:
+                self._refreshing.discard(name)
+
+
+# Global instances, one per URI
+_managers: Dict[str, LibvirtConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_libvirt_connection_manager(uri: str) -> LibvirtConnectionManager:
+    """Get the shared connection manager for a libvirt URI."""
+    manager = _managers.get(uri)
+    if manager is None:
+        with _managers_lock:
+            manager = _managers.get(uri)
+            if manager is None:
+                manager = LibvirtConnectionManager(uri)
+                _managers[uri] = manager
+    return manager
@@ -48,6 +48,9 @@ except ImportError:
           file=sys.stderr)
     sys.exit(1)
 
+# Local modules
+from .libvirt_cache import get_libvirt_connection_manager
+
 # Rich library for enhanced terminal output
 try:
     import rich.console
@@ -156,8 +159,9 @@ class LPEMManager:
         self.logger = logging.getLogger(__name__)
         self._setup_logging()
         
-        # Initialize connection
+        # Shared libvirt connection and domain/IP cache (one per process)
         self.conn: Optional[libvirt.virConnect] = None
+        self.libvirt_cache = get_libvirt_connection_manager(Config.LIBVIRT_URI)
         
     def _setup_logging(self):
         """Setup logging configuration."""
@@ -173,75 +177,59 @@ class LPEMManager:
 
     # --- Libvirt Helper Functions ---
     def connect_libvirt(self) -> libvirt.virConnect:
-        """Connect to libvirt specified by Config.LIBVIRT_URI."""
+        """Return the shared libvirt connection for Config.LIBVIRT_URI, reconnecting if needed."""
         try:
-            if self.conn and self.conn.isAlive():
-                return self.conn
-            
-            self.conn = libvirt.open(Config.LIBVIRT_URI)  # type: ignore
-            if not self.conn:
-                raise LibvirtConnectionError(f"Failed to connect to libvirt at {Config.LIBVIRT_URI}")
-            
-            self.logger.info(f"Connected to libvirt at {Config.LIBVIRT_URI}")
-            return self.conn
-            
+            self.conn = self.libvirt_cache.get_connection()  # type: ignore
+            return self.conn  # type: ignore
         except libvirt.libvirtError as e:
             raise LibvirtConnectionError(f"Libvirt connection error: {e}")
 
     def find_vm(self, vm_name: str) -> libvirt.virDomain:
         """Find a VM domain by name."""
-        conn = self.connect_libvirt()
+        self.connect_libvirt()
         try:
-            domain = conn.lookupByName(vm_name)  # type: ignore
-            return domain
+            return self.libvirt_cache.get_domain(vm_name)
         except libvirt.libvirtError as e:
             if e.get_error_code() == VIR_ERR_NO_DOMAIN:
                 raise VMNotFoundError(f"VM '{vm_name}' not found in libvirt")
             else:
                 raise PracticeToolError(f"Error looking up VM '{vm_name}': {e}")
 
+    def get_vm_state(self, vm_name: str) -> Dict[str, Any]:
+        """Get a VM's cached status and id without querying libvirt."""
+        self.connect_libvirt()
+        state = self.libvirt_cache.get_state(vm_name)
+        if state is None:
+            raise VMNotFoundError(f"VM '{vm_name}' not found in libvirt")
+        return state
+
     def close_libvirt(self):
-        """Safely close the libvirt connection."""
-        if self.conn:
-            try:
-                self.conn.close()
-                self.conn = None
-                self.logger.info("Libvirt connection closed")
-            except Exception as e:
-                self.logger.warning(f"Error closing libvirt connection: {e}")
+        """Release the libvirt connection; the shared connection itself stays open."""
+        self.conn = None
 
     # --- Core VM Operations ---
     def list_vms(self) -> List[Dict[str, Any]]:
-        """List all defined VMs (active and inactive)."""
-        conn = self.connect_libvirt()
+        """List all defined VMs (active and inactive) from the domain cache."""
+        self.connect_libvirt()
         vms: List[Dict[str, Any]] = []
 
         try:
-            # Get all domains (defined and running)
-            all_domains = conn.listAllDomains()
-            
-            for domain in all_domains:
-                vm_info: Dict[str, Any] = {
-                    'name': domain.name(),
-                    'status': 'running' if domain.isActive() else 'stopped',  # Changed from 'state' to 'status'
-                    'id': domain.ID() if domain.isActive() else None
-                }
-                
+            for vm_info in self.libvirt_cache.list_domains():
                 # Try to get IP if running
-                if domain.isActive():
+                if vm_info['status'] == 'running':
                     try:
-                        vm_info['ip'] = self.get_vm_ip(domain)
+                        vm_info['ip'] = self.get_vm_ip(self.libvirt_cache.get_domain(vm_info['name']))
                     except Exception:
                         vm_info['ip'] = 'Unknown'
                 else:
                     vm_info['ip'] = 'Not running'
-                
+
                 vms.append(vm_info)
 
         except libvirt.libvirtError as e:
             raise PracticeToolError(f"Error listing VMs: {e}")
 
-        return sorted(vms, key=lambda x: x['name'])
+        return vms
 
     def start_vm(self, vm_name: str) -> bool:
         """Start the specified VM."""
@@ -256,6 +244,7 @@ class LPEMManager:
                 console.print(f":rocket: Starting VM '{vm_name}'...")
             
             domain.create()
+            self.libvirt_cache.invalidate(vm_name)
             
             if RICH_AVAILABLE:
                 console.print(f":white_check_mark: VM '{vm_name}' started successfully", style="green")
@@ -298,6 +287,7 @@ class LPEMManager:
             if domain.isActive():
                 self.logger.warning(f"VM '{vm_name}' didn't shutdown gracefully, forcing...")
                 domain.destroy()
+            self.libvirt_cache.invalidate(vm_name)
             
             if RICH_AVAILABLE:
                 console.print(f":white_check_mark: VM '{vm_name}' stopped successfully", style="green")
@@ -378,10 +368,20 @@ class LPEMManager:
 
     # --- Network and SSH Functions ---
     def get_vm_ip(self, domain: libvirt.virDomain) -> str:
-        """Get the VM IP address using multiple methods."""
-        if not domain.isActive():
+        """Get the VM IP address, served from the shared IP cache when possible."""
+        vm_name = domain.name()
+        state = self.libvirt_cache.get_state(vm_name)
+        is_active = state['status'] == 'running' if state is not None else domain.isActive()
+        if not is_active:
             raise NetworkError("VM is not running")
 
+        ip = self.libvirt_cache.get_ip(vm_name, lambda: self._lookup_vm_ip(domain))
+        if not ip:
+            raise NetworkError("Could not determine VM IP address")
+        return ip
+
+    def _lookup_vm_ip(self, domain: libvirt.virDomain) -> Optional[str]:
+        """Look up the VM IP address using multiple methods (uncached)."""
         # Try Agent method first
         ip = self._get_vm_ip_address_agent(domain)
         if ip:
@@ -396,7 +396,7 @@ class LPEMManager:
                 console.print(f":satellite: VM IP obtained via DHCP: [magenta]{ip}[/]")
             return ip
 
-        raise NetworkError("Could not determine VM IP address")
+        return None
 
     def _get_vm_ip_address_agent(self, domain: libvirt.virDomain) -> Optional[str]:
         """Get the VM IP address using the QEMU Guest Agent."""
@@ -1045,6 +1045,7 @@ class LPEMManager:
             # Define the VM in libvirt
             try:
                 conn.defineXML(vm_xml)  # type: ignore
+                self.libvirt_cache.invalidate(vm_name)
                 
                 # Attach ISO if provided
                 if iso_path and os.path.exists(iso_path):
@@ -1146,6 +1147,7 @@ class LPEMManager:
             # Undefine (delete) the VM
             try:
                 domain.undefine()
+                self.libvirt_cache.invalidate(vm_name)
                 self.logger.info(f"Deleted VM '{vm_name}' from libvirt")
             except Exception as e:
                 self.logger.error(f"Failed to delete VM {vm_name}: {e}")
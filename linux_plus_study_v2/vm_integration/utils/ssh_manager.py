@@ -6,10 +6,19 @@ Comprehensive SSH connection and command execution management for VM operations.
 Provides secure SSH connectivity with key-based authentication and robust error handling.
 """
 
+import io
+import os
 import sys
+import gzip
+import json
 import time
+import shlex
 import socket
+import hashlib
+import contextlib
 import logging
+import tarfile
+import posixpath
 from typing import Dict, Any, Optional, Union, List
 from pathlib import Path
 import stat
@@ -40,6 +49,13 @@ except ImportError:
     
     console = FallbackConsole()
 
+# Optional zstd support for bulk transfers (gzip is used without it)
+try:
+    import zstandard  # type: ignore
+    _zstd_available = True
+except ImportError:
+    _zstd_available = False
+
 from .exceptions import SSHCommandError, NetworkError
 
 class SSHManager:
@@ -49,7 +65,13 @@ class SSHManager:
     Provides secure SSH connectivity with comprehensive error handling,
     key validation, and command execution capabilities.
     """
-    
+
+    # Bulk transfer tuning (class attributes, so they can be overridden per instance)
+    LARGE_FILE_BYTES: int = 8 * 1024 * 1024  # Files this big go over pipelined SFTP instead of the tar stream
+    TRANSFER_WINDOW_BYTES: int = 16 * 1024 * 1024  # Channel window for transfers (paramiko default: 2 MiB)
+    TRANSFER_CHUNK_BYTES: int = 1024 * 1024  # Read size for hashing, tar streaming and SFTP writes
+    MANIFEST_NAME: str = ".lpem-manifest.json"  # Content-hash manifest kept in the remote directory
+
     def __init__(self, debug: bool = False):
         """
         Initialize SSH Manager.
@@ -409,9 +431,12 @@ class SSHManager:
 
     def copy_file_to_remote(self, host: str, username: str, key_path: Path,
                            local_path: Path, remote_path: str,
-                           create_dirs: bool = True) -> bool:
+                           create_dirs: bool = True, skip_unchanged: bool = False) -> bool:
         """
         Copy a file to a remote host via SFTP.
+
+        The file is written with pipelined SFTP requests over a channel with a
+        larger window, so big files are not throttled by per-request round trips.
         
         Args:
             host: Target hostname or IP address
@@ -420,9 +445,10 @@ class SSHManager:
             local_path: Local file path
             remote_path: Remote file path
             create_dirs: Create remote directories if they don't exist
+            skip_unchanged: Skip the upload if the remote file has the same SHA-256 hash
             
         Returns:
-            True if copy successful, False otherwise
+            True if copy successful (or skipped as unchanged), False otherwise
         """
         key_path = self._validate_ssh_key(key_path)
         
@@ -439,28 +465,29 @@ class SSHManager:
             else:
                 print(msg)
 
-            ssh_client = paramiko.SSHClient()
-            ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            ssh_client.connect(
-                hostname=host,
-                username=username,
-                key_filename=str(key_path),
-                timeout=10
-            )
+            ssh_client = self._connect_client(host, username, key_path)
 
-            sftp_client = ssh_client.open_sftp()
-            
-            # Create remote directories if requested
+            # Directory creation and the hash check share one round trip
+            remote_commands = []
             if create_dirs:
-                remote_dir = str(Path(remote_path).parent)
-                try:
-                    self._create_remote_directories(sftp_client, remote_dir)
-                except Exception as e:
-                    self.logger.warning(f"Could not create remote directories: {e}")
+                remote_commands.append(f"mkdir -p -- {shlex.quote(posixpath.dirname(remote_path) or '.')} || exit 1")
+            if skip_unchanged:
+                remote_commands.append(f"sha256sum -- {shlex.quote(remote_path)} 2>/dev/null")
+            if remote_commands:
+                result = self._exec_on_client(ssh_client, "; ".join(remote_commands + ["exit 0"]), timeout=30)
+                if result['exit_status'] != 0:
+                    self.logger.warning(f"Could not create remote directories: {result['stderr'].strip()}")
+                remote_hash = result['stdout'].split(' ', 1)[0] if skip_unchanged else ''
+                if remote_hash and remote_hash == self._file_sha256(local_path):
+                    msg = "✅ Remote file is unchanged, skipped"
+                    if _rich_available:
+                        console.print(msg)
+                    else:
+                        print(msg)
+                    return True
 
-            # Copy the file
-            sftp_client.put(str(local_path), remote_path)
+            sftp_client = self._open_transfer_sftp(ssh_client)
+            self._sftp_put_pipelined(sftp_client, local_path, remote_path)
             
             msg = "✅ File copied successfully"
             if _rich_available:
@@ -486,6 +513,268 @@ class SSHManager:
             if ssh_client:
                 ssh_client.close()
 
+    def copy_tree_to_remote(self, host: str, username: str, key_path: Path,
+                            local_dir: Path, remote_dir: str, compression: str = "auto",
+                            skip_unchanged: bool = True, timeout: int = 300) -> Dict[str, Any]:
+        """
+        Copy a directory tree to a remote host over a single SSH connection.
+
+        Regular files are streamed as one tar archive (zstd or gzip compressed)
+        into ``tar -x`` on the remote host, so an asset tree costs one channel
+        instead of a round trip per file and directory. Files of at least
+        LARGE_FILE_BYTES go over pipelined SFTP instead.
+
+        A content-hash manifest is written into the remote directory after each
+        successful transfer, and files whose hash, mode and type match it are
+        skipped on the next run. The manifest only records what was sent: files
+        edited on the remote host are not detected, so pass skip_unchanged=False
+        to force a full copy.
+
+        Args:
+            host: Target hostname or IP address
+            username: SSH username
+            key_path: Path to SSH private key
+            local_dir: Local directory to copy
+            remote_dir: Remote directory to extract into (created if missing)
+            compression: "auto" (zstd if both ends support it, else gzip), "zstd", "gzip" or "none"
+            skip_unchanged: Skip files recorded as unchanged in the remote manifest
+            timeout: Timeout in seconds for each remote command
+
+        Returns:
+            Dict containing sent and skipped (relative paths), bytes_sent,
+            compression and error info (None on success)
+
+        Raises:
+            SSHCommandError: If local_dir is not a directory or compression is unknown
+        """
+        key_path = self._validate_ssh_key(key_path)
+
+        if not local_dir.is_dir():
+            raise SSHCommandError(f"Local directory does not exist: {local_dir}")
+        if compression not in ("auto", "zstd", "gzip", "none"):
+            raise SSHCommandError(f"Unknown compression '{compression}' (expected auto, zstd, gzip or none)")
+        if compression == "zstd" and not _zstd_available:
+            raise SSHCommandError("zstd compression requires the 'zstandard' package (pip install zstandard)")
+
+        result: Dict[str, Any] = {'sent': [], 'skipped': [], 'bytes_sent': 0, 'compression': None, 'error': None}
+        ssh_client = None
+        sftp_client = None
+
+        try:
+            msg = f"📦 Copying tree {local_dir} to {username}@{host}:{remote_dir}"
+            if _rich_available:
+                console.print(msg)
+            else:
+                print(msg)
+
+            local_manifest = self._build_manifest(local_dir)
+            large_files = [name for name, entry in local_manifest.items()
+                           if entry['type'] == 'file' and entry['size'] >= self.LARGE_FILE_BYTES]
+
+            ssh_client = self._connect_client(host, username, key_path)
+
+            # One round trip: create the target directories, detect zstd and read the old manifest
+            dirs = {remote_dir} | {posixpath.dirname(posixpath.join(remote_dir, name)) for name in large_files}
+            manifest_path = posixpath.join(remote_dir, self.MANIFEST_NAME)
+            probe = self._exec_on_client(
+                ssh_client,
+                f"mkdir -p -- {' '.join(shlex.quote(d) for d in sorted(dirs))} || exit 1; "
+                f"if command -v zstd >/dev/null 2>&1; then echo zstd; else echo -; fi; "
+                f"cat -- {shlex.quote(manifest_path)} 2>/dev/null; exit 0",
+                timeout,
+            )
+            if probe['exit_status'] != 0:
+                raise SSHCommandError(f"Could not create {remote_dir}: {probe['stderr'].strip()}")
+            remote_zstd, _, manifest_text = probe['stdout'].partition('\n')
+            remote_manifest = self._parse_manifest(manifest_text) if skip_unchanged else {}
+
+            changed = [name for name, entry in local_manifest.items() if remote_manifest.get(name) != entry]
+            result['skipped'] = [name for name in local_manifest if name not in changed]
+            if not changed and remote_manifest == local_manifest:
+                msg = f"✅ Remote tree is up to date ({len(result['skipped'])} entries unchanged)"
+                if _rich_available:
+                    console.print(msg)
+                else:
+                    print(msg)
+                return result
+
+            # Large files first: the manifest is only written once everything it lists is in place
+            changed_large = [name for name in changed if name in large_files]
+            if changed_large:
+                sftp_client = self._open_transfer_sftp(ssh_client)
+                for name in changed_large:
+                    self._sftp_put_pipelined(sftp_client, local_dir / name, posixpath.join(remote_dir, name),
+                                             mode=local_manifest[name]['mode'])
+                    result['bytes_sent'] += local_manifest[name]['size']
+
+            if compression == "auto":
+                compression = "zstd" if _zstd_available and remote_zstd.strip() == "zstd" else "gzip"
+            result['compression'] = compression
+            streamed = [name for name in changed if name not in large_files]
+            manifest_bytes = json.dumps({'version': 1, 'files': local_manifest}, indent=1, sort_keys=True).encode('utf-8')
+            extract_commands = {
+                'zstd': "zstd -dcq | tar -xf - -C {dir}",
+                'gzip': "tar -xzf - -C {dir}",
+                'none': "tar -xf - -C {dir}",
+            }
+            extract = self._exec_on_client(
+                ssh_client,
+                extract_commands[compression].format(dir=shlex.quote(remote_dir)),
+                timeout,
+                stdin_writer=lambda channel: self._stream_tar(channel, local_dir, streamed, manifest_bytes, compression),
+            )
+            if extract['exit_status'] != 0:
+                raise SSHCommandError(f"Remote tar extraction failed (exit {extract['exit_status']}): {extract['stderr'].strip()}")
+            result['bytes_sent'] += sum(local_manifest[name].get('size', 0) for name in streamed)
+            result['sent'] = changed
+
+            msg = (f"✅ Tree copied: {len(changed)} sent, {len(result['skipped'])} unchanged "
+                   f"({result['bytes_sent'] / (1024 ** 2):.1f} MiB, {compression})")
+            if _rich_available:
+                console.print(msg)
+            else:
+                print(msg)
+
+        except Exception as e:
+            error_msg = f"Failed to copy tree: {e}"
+            result['error'] = error_msg
+            self.logger.error(error_msg)
+            msg = f"❌ {error_msg}"
+            if _rich_available:
+                console.print(msg)
+            else:
+                print(msg)
+
+        finally:
+            if sftp_client:
+                sftp_client.close()
+            if ssh_client:
+                ssh_client.close()
+
+        return result
+
+    def _connect_client(self, host: str, username: str, key_path: Path) -> Any:
+        """Open an SSH connection for file transfers."""
+        ssh_client = paramiko.SSHClient()
+        ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            ssh_client.connect(
+                hostname=host,
+                username=username,
+                key_filename=str(key_path),
+                timeout=10
+            )
+        except Exception:
+            ssh_client.close()
+            raise
+        return ssh_client
+
+    def _exec_on_client(self, ssh_client: Any, command: str, timeout: int,
+                        stdin_writer: Optional[Any] = None) -> Dict[str, Any]:
+        """
+        Run a command on an open connection, optionally streaming its stdin.
+
+        stdin_writer is called with the channel before stdout is read; the
+        large channel window lets the remote side buffer its output meanwhile.
+        """
+        transport = ssh_client.get_transport()
+        if transport is None:
+            raise SSHCommandError("Failed to get SSH transport")
+        channel = transport.open_session(window_size=self.TRANSFER_WINDOW_BYTES)
+        try:
+            channel.settimeout(timeout)
+            channel.exec_command(command)
+            if stdin_writer is not None:
+                stdin_writer(channel)
+            channel.shutdown_write()
+            stdout = channel.makefile('rb').read()
+            stderr = channel.makefile_stderr('rb').read()
+            return {
+                'stdout': stdout.decode('utf-8', errors='replace'),
+                'stderr': stderr.decode('utf-8', errors='replace'),
+                'exit_status': channel.recv_exit_status(),
+            }
+        finally:
+            channel.close()
+
+    def _open_transfer_sftp(self, ssh_client: Any) -> Any:
+        """Open an SFTP session with the transfer window size."""
+        transport = ssh_client.get_transport()
+        if transport is None:
+            raise SSHCommandError("Failed to get SSH transport")
+        return paramiko.SFTPClient.from_transport(transport, window_size=self.TRANSFER_WINDOW_BYTES)
+
+    def _sftp_put_pipelined(self, sftp_client: Any, local_path: Path, remote_path: str,
+                            mode: Optional[int] = None) -> None:
+        """Upload a file without waiting for each write to be acknowledged."""
+        with open(local_path, 'rb') as source, sftp_client.open(remote_path, 'wb') as target:
+            target.set_pipelined(True)
+            while True:
+                chunk = source.read(self.TRANSFER_CHUNK_BYTES)
+                if not chunk:
+                    break
+                target.write(chunk)
+        # Closing the file waited for all outstanding write acknowledgements
+        if mode is not None:
+            sftp_client.chmod(remote_path, mode)
+
+    def _file_sha256(self, path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.TRANSFER_CHUNK_BYTES), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _build_manifest(self, local_dir: Path) -> Dict[str, Dict[str, Any]]:
+        """Describe every entry under local_dir by relative POSIX path (files by content hash)."""
+        manifest: Dict[str, Dict[str, Any]] = {}
+        for path in sorted(local_dir.rglob('*')):
+            name = path.relative_to(local_dir).as_posix()
+            if name == self.MANIFEST_NAME:
+                continue
+            info = path.lstat()
+            mode = stat.S_IMODE(info.st_mode)
+            if stat.S_ISLNK(info.st_mode):
+                manifest[name] = {'type': 'link', 'target': os.readlink(path)}
+            elif stat.S_ISDIR(info.st_mode):
+                manifest[name] = {'type': 'dir', 'mode': mode}
+            elif stat.S_ISREG(info.st_mode):
+                manifest[name] = {'type': 'file', 'mode': mode, 'size': info.st_size, 'sha256': self._file_sha256(path)}
+        return manifest
+
+    def _parse_manifest(self, text: str) -> Dict[str, Dict[str, Any]]:
+        """Parse a remote manifest; a missing or unreadable one means nothing is known to be up to date."""
+        if not text.strip():
+            return {}
+        try:
+            data = json.loads(text)
+        except ValueError:
+            self.logger.warning("Ignoring unreadable remote transfer manifest")
+            return {}
+        if not isinstance(data, dict) or data.get('version') != 1 or not isinstance(data.get('files'), dict):
+            return {}
+        return data['files']
+
+    def _stream_tar(self, channel: Any, local_dir: Path, names: List[str],
+                    manifest_bytes: bytes, compression: str) -> None:
+        """Write a tar archive of names (plus the manifest, last) to the channel."""
+        writer = _ChannelWriter(channel)
+        if compression == 'zstd':
+            sink = zstandard.ZstdCompressor(level=3).stream_writer(writer)
+        elif compression == 'gzip':
+            sink = gzip.GzipFile(fileobj=writer, mode='wb', compresslevel=6)
+        else:
+            sink = contextlib.nullcontext(writer)
+        with sink as stream:
+            with tarfile.open(fileobj=stream, mode='w|', bufsize=self.TRANSFER_CHUNK_BYTES) as tar:
+                for name in names:
+                    tar.add(str(local_dir / name), arcname=name, recursive=False)
+                info = tarfile.TarInfo(self.MANIFEST_NAME)
+                info.size = len(manifest_bytes)
+                info.mtime = int(time.time())
+                info.mode = 0o644
+                tar.addfile(info, io.BytesIO(manifest_bytes))
+
     def _validate_ssh_key(self, key_path: Path) -> Path:
         """Validate SSH private key existence and permissions."""
         resolved_path = key_path.expanduser().resolve()
@@ -510,27 +799,23 @@ class SSHManager:
 
         return resolved_path
 
-    def _create_remote_directories(self, sftp_client: Any, remote_path: str) -> None:
-        """Recursively create remote directories."""
-        dirs_to_create: List[str] = []
-        current_path = remote_path
-        
-        # Walk up the path to find which directories need to be created
-        while current_path and current_path != '/':
-            try:
-                sftp_client.stat(current_path)
-                break  # Directory exists
-            except FileNotFoundError:
-                dirs_to_create.append(current_path)
-                current_path = str(Path(current_path).parent)
-        
-        # Create directories from top to bottom
-        for dir_path in reversed(dirs_to_create):
-            try:
-                sftp_client.mkdir(dir_path)
-                self.logger.debug(f"Created remote directory: {dir_path}")
-            except Exception as e:
-                self.logger.warning(f"Could not create remote directory {dir_path}: {e}")
+
+class _ChannelWriter:
+    """Minimal writable file object that sends everything to an SSH channel."""
+
+    def __init__(self, channel: Any):
+        self.channel = channel
+
+    def write(self, data: bytes) -> int:
+        self.channel.sendall(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass  # The channel is closed by its owner
+
 
 # Legacy function wrapper for backward compatibility
 def run_ssh_command(host: str, username: str, key_path: Path, command: str, 
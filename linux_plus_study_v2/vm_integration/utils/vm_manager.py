@@ -73,6 +73,10 @@ class VMManager:
         """Find a VM by name."""
         return self.lpem.find_vm(vm_name)
 
+    def get_vm_state(self, vm_name: str) -> Dict[str, Any]:
+        """Get a VM's cached status and id."""
+        return self.lpem.get_vm_state(vm_name)
+
     def start_vm(self, vm_name: Union[str, libvirt.virDomain]) -> bool:
         """Start a VM by name or domain object."""
         if isinstance(vm_name, str):
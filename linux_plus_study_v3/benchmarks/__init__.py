@@ -0,0 +1 @@
+"""Benchmark suite for quiz hot paths."""
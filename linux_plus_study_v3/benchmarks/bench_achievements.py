@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for per-answer achievement evaluation with many custom achievements.
+"""
+
+import pytest
+
+CUSTOM_COUNTS = [10, 1_000]
+CONDITION_TYPES = ["questions", "points", "streaks", "days"]
+
+
+@pytest.fixture(params=CUSTOM_COUNTS, ids=lambda n: f"{n}_custom")
+def achievement_system(request, isolated_data_dir):
+    """AchievementSystem with the given number of locked custom achievements."""
+    from models.achievements import AchievementSystem
+
+    system = AchievementSystem(isolated_data_dir / "achievements.json")
+    for i in range(request.param):
+        condition_type = CONDITION_TYPES[i % len(CONDITION_TYPES)]
+        # Thresholds far above what the benchmark reaches, so every rule stays pending
+        system.create_custom_achievement(f"custom_{i}", "benchmark", condition_type, 1_000_000 + i, 10)
+    return system
+
+
+@pytest.mark.benchmark(group="achievements")
+def bench_check_achievements_per_answer(benchmark, achievement_system):
+    """update_points + check_achievements + check_custom_achievements for one answer."""
+    counter = {"i": 0}
+
+    def answer():
+        counter["i"] += 1
+        achievement_system.update_points(10)
+        achievement_system.check_achievements(True, counter["i"] % 7)
+        return achievement_system.check_custom_achievements()
+
+    assert benchmark(answer) == []
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for SimpleAnalyticsManager.update_quiz_results and get_dashboard_stats.
+"""
+
+import json
+
+import pytest
+
+from benchmarks.data_generators import generate_analytics_data
+
+USER_COUNTS = [1, 100, 1_000]
+
+
+@pytest.fixture(params=USER_COUNTS, ids=lambda n: f"{n}_users")
+def analytics_manager(request, isolated_data_dir):
+    """SimpleAnalyticsManager over a synthetic analytics file."""
+    from services.simple_analytics import SimpleAnalyticsManager
+
+    data_file = isolated_data_dir / "data" / "bench_analytics.json"
+    with open(data_file, "w", encoding="utf-8") as f:
+        json.dump(generate_analytics_data(user_count=request.param), f)
+    return SimpleAnalyticsManager(str(data_file))
+
+
+@pytest.mark.benchmark(group="analytics")
+def bench_update_quiz_results(benchmark, analytics_manager):
+    """One answered question: full load, update and save of the analytics file."""
+    counter = {"i": 0}
+
+    def record_answer():
+        counter["i"] += 1
+        analytics_manager.update_quiz_results(
+            user_id="anonymous",
+            correct=counter["i"] % 4 != 0,
+            topic="Security",
+            difficulty="intermediate",
+        )
+
+    benchmark.pedantic(record_answer, rounds=20, warmup_rounds=1)
+
+
+@pytest.mark.benchmark(group="analytics")
+def bench_get_dashboard_stats(benchmark, analytics_manager):
+    """Dashboard aggregation for the default user."""
+    stats = benchmark.pedantic(analytics_manager.get_dashboard_stats, args=("anonymous",),
+                               rounds=20, warmup_rounds=1)
+    assert isinstance(stats, dict)
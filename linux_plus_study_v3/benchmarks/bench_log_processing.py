@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for log classification and log file ingestion.
+"""
+
+import pytest
+
+from benchmarks.data_generators import generate_log_lines
+
+LINE_COUNTS = [10_000, 100_000]
+
+
+@pytest.fixture(scope="module")
+def error_lines():
+    """Error/warning lines only, as they reach the classifier."""
+    return generate_log_lines(5_000, error_fraction=1.0)
+
+
+@pytest.fixture(params=LINE_COUNTS, ids=lambda n: f"{n}_lines")
+def log_file(request, tmp_path):
+    """Synthetic application log with 10% error lines."""
+    path = tmp_path / "app.log"
+    path.write_text("\n".join(generate_log_lines(request.param)) + "\n", encoding="utf-8")
+    return path
+
+
+@pytest.mark.benchmark(group="log_processing")
+def bench_classify_error_lines(benchmark, error_lines):
+    """LogClassifier.classify over 5k error lines."""
+    from services.log_classifier import LogClassifier
+
+    classifier = LogClassifier()
+    result = benchmark(lambda: [classifier.classify(line) for line in error_lines])
+    assert "database_error" in result
+
+
+@pytest.mark.benchmark(group="log_processing")
+def bench_scan_log_file(benchmark, log_file):
+    """Memory-mapped scan of a whole log file in one process (no database writes)."""
+    from services.log_classifier import scan_log_chunk, complete_lines_end
+
+    end = complete_lines_end(str(log_file), log_file.stat().st_size)
+    result = benchmark(scan_log_chunk, str(log_file), 0, end)
+    assert result["lines"] > 0
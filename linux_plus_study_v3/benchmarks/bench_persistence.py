@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for GameState.update_history and save_all_data with large histories.
+"""
+
+import pytest
+
+from benchmarks.data_generators import generate_question_tuples, generate_study_history
+
+HISTORY_SIZES = [1_000, 10_000]
+
+
+@pytest.fixture(params=HISTORY_SIZES, ids=lambda n: f"{n // 1000}k_questions")
+def history_game_state(request, make_game_state):
+    """GameState whose history covers the given number of questions."""
+    questions = generate_question_tuples(request.param)
+    history = generate_study_history(questions, attempts_per_question=10)
+    game_state = make_game_state(history=history)
+    game_state.bench_questions = questions
+    return game_state
+
+
+@pytest.mark.benchmark(group="update_history")
+def bench_update_history(benchmark, history_game_state):
+    """In-memory history update for one answered question."""
+    questions = history_game_state.bench_questions
+    counter = {"i": 0}
+
+    def answer_next():
+        text, _, _, category, _ = questions[counter["i"] % len(questions)]
+        counter["i"] += 1
+        history_game_state.update_history(text, category, counter["i"] % 3 != 0)
+
+    benchmark(answer_next)
+    assert history_game_state.study_history["total_attempts"] > 0
+
+
+@pytest.mark.benchmark(group="save_all_data")
+def bench_save_all_data(benchmark, history_game_state):
+    """Full history + achievements save through the persistence manager."""
+    assert benchmark.pedantic(history_game_state.save_all_data, rounds=10, warmup_rounds=1)
+
+
+@pytest.mark.benchmark(group="save_all_data")
+def bench_answer_then_save(benchmark, history_game_state):
+    """update_history followed by save_all_data, the per-answer write path."""
+    text, _, _, category, _ = history_game_state.bench_questions[0]
+
+    def answer_and_save():
+        history_game_state.update_history(text, category, True)
+        return history_game_state.save_all_data()
+
+    assert benchmark.pedantic(answer_and_save, rounds=10, warmup_rounds=1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the analytics database queries, before and after the SQLite tuning.
+
+Each query runs against the same synthetic database twice:
+
+- "legacy" keeps only the single-column indexes of the original schema, on
+  one shared StaticPool connection in rollback-journal mode.
+- "tuned" adds the composite indexes from
+  migrations/add_analytics_performance_indexes.py, using the pooled
+  engine and the pragmas from DatabasePoolManager.
+
+The SQLite query plan of every statement a service method executes is
+recorded in the benchmark's extra_info.
+"""
+
+import shutil
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.data_generators import generate_analytics_rows
+
+ROW_COUNT = 50_000
+USER_COUNT = 10
+NEW_INDEXES = ["ix_analytics_user_created", "ix_analytics_activity_created",
+               "ix_analytics_user_activity_daily", "ix_analytics_created_at"]
+
+
+@pytest.fixture(scope="module")
+def analytics_db(tmp_path_factory):
+    """Template database with the tuned schema; profiles get a copy each."""
+    from models.analytics import Base, Analytics
+
+    path = tmp_path_factory.mktemp("analytics") / "template.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Analytics.__table__.insert(), generate_analytics_rows(ROW_COUNT, user_count=USER_COUNT))
+    engine.dispose()
+    return path
+
+
+@pytest.fixture(params=["legacy", "tuned"])
+def analytics_session(request, analytics_db, tmp_path):
+    """Session on a copy of the template database with the given profile."""
+    from utils.database import apply_sqlite_pragmas
+
+    path = tmp_path / f"{request.param}.db"
+    shutil.copy(analytics_db, path)
+    if request.param == "legacy":
+        engine = create_engine(f"sqlite:///{path}", poolclass=StaticPool,
+                               connect_args={"check_same_thread": False})
+        with engine.begin() as conn:
+            for name in NEW_INDEXES:
+                conn.exec_driver_sql(f"DROP INDEX {name}")
+    else:
+        engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        event.listen(engine, "connect", lambda dbapi_connection, _record: apply_sqlite_pragmas(dbapi_connection))
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+    session = sessionmaker(bind=engine)()
+    yield request.param, session
+    session.close()
+    engine.dispose()
+
+
+def _query_plans(session, call):
+    """Run call() once and return the query plan of every statement it executes."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    raw = session.connection().connection.dbapi_connection
+    plans = []
+    for statement, parameters in statements:
+        rows = raw.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        plans.append(" | ".join(row[3] for row in rows))
+    return plans
+
+
+@pytest.mark.benchmark(group="query_plans")
+def bench_daily_activity_query(benchmark, analytics_session):
+    """AnalyticsService.get_daily_activity_for_user (activity heatmap)."""
+    from services.analytics_service import AnalyticsService
+
+    profile, session = analytics_session
+    service = AnalyticsService(session)
+    call = lambda: service.get_daily_activity_for_user("demo_user_001")
+
+    plans = _query_plans(session, call)
+    benchmark.extra_info["query_plans"] = plans
+    if profile == "tuned":
+        assert any("COVERING INDEX ix_analytics_user_activity_daily" in plan for plan in plans)
+
+    result = benchmark(call)
+    assert len(result) == 365
+
+
+@pytest.mark.benchmark(group="query_plans")
+def bench_activity_overview_query(benchmark, analytics_session):
+    """AnalyticsService.get_user_activity_overview (system overview)."""
+    from services.analytics_service import AnalyticsService
+
+    profile, session = analytics_session
+    service = AnalyticsService(session)
+    call = service.get_user_activity_overview
+
+    plans = _query_plans(session, call)
+    benchmark.extra_info["query_plans"] = plans
+    if profile == "tuned":
+        assert any("ix_analytics_created_at (created_at>?)" in plan for plan in plans)
+
+    result = benchmark(call)
+    assert result["total_sessions"] == ROW_COUNT
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for question papers: drawing a blueprint-stratified exam paper,
+starting an exam from the pre-generated pool versus drawing inline, and
+serving the next question from a paper versus weighted selection.
+"""
+
+import random
+
+import pytest
+
+from services.question_paper_service import QuestionPaperPool, generate_paper
+from utils.config import EXAM_BLUEPRINT, EXAM_MODE_QUESTIONS
+
+POOL_SIZES = [1_000, 10_000]
+
+
+@pytest.fixture(params=POOL_SIZES, ids=lambda n: f"{n // 1000}k_questions")
+def exam_controller(request, make_game_state):
+    """QuizController over a synthetic pool, with an exam session started."""
+    from controllers.quiz_controller import QuizController
+
+    controller = QuizController(make_game_state(question_count=request.param))
+    # An empty pool that never refills keeps the background thread out of the timings
+    controller._exam_papers = QuestionPaperPool(controller._build_exam_paper, size=0)
+    controller.start_quiz_session(mode="exam")
+    return controller
+
+
+@pytest.mark.benchmark(group="question_paper")
+def bench_generate_exam_paper(benchmark, exam_controller):
+    """One exam paper, stratified by EXAM_BLUEPRINT and weighted by history."""
+    game_state = exam_controller.game_state
+    rng = random.Random(7)
+
+    paper = benchmark.pedantic(
+        lambda: generate_paper(game_state.question_manager, game_state.study_history.get("questions", {}),
+                               EXAM_MODE_QUESTIONS, blueprint=EXAM_BLUEPRINT, rng=rng),
+        rounds=20, warmup_rounds=1
+    )
+    assert len(set(paper)) == EXAM_MODE_QUESTIONS
+
+
+@pytest.mark.benchmark(group="question_paper")
+@pytest.mark.parametrize("pre_generated", [False, True], ids=["inline", "pool"])
+def bench_start_exam(benchmark, exam_controller, pre_generated):
+    """start_quiz_session(mode="exam"), drawing the paper inline or taking one from the pool."""
+    papers = exam_controller._exam_papers
+    fingerprint = exam_controller.game_state.question_manager.pool_fingerprint()
+    ready = exam_controller._build_exam_paper()
+
+    def setup():
+        papers._papers.clear()
+        if pre_generated:
+            papers._papers.append((fingerprint, list(ready[1])))
+        return (), {}
+
+    benchmark.pedantic(lambda: exam_controller.start_quiz_session(mode="exam"),
+                       setup=setup, rounds=20, warmup_rounds=1)
+    assert len(exam_controller.question_paper) == EXAM_MODE_QUESTIONS
+    benchmark.extra_info["pool_hits"] = papers.hits
+
+
+@pytest.mark.benchmark(group="question_paper_next")
+@pytest.mark.parametrize("source", ["paper", "weighted"])
+def bench_next_exam_question(benchmark, exam_controller, source):
+    """get_next_question mid-exam: the next paper entry versus a weighted draw over the pool."""
+    def setup():
+        if source == "paper":
+            exam_controller.paper_position = EXAM_MODE_QUESTIONS // 2
+        else:
+            exam_controller.question_paper = None
+            exam_controller.game_state.question_manager.reset_session()
+        return (), {}
+
+    question = benchmark.pedantic(exam_controller.get_next_question, setup=setup, rounds=50, warmup_rounds=1)
+    assert question is not None
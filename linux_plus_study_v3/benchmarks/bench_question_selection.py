@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for QuestionManager.select_question at 1k/10k/100k questions.
+"""
+
+import random
+
+import pytest
+
+from benchmarks.data_generators import generate_question_tuples, generate_study_history
+
+POOL_SIZES = [1_000, 10_000, 100_000]
+ANSWERED_THIS_SESSION = 50
+
+
+@pytest.fixture(params=POOL_SIZES, ids=lambda n: f"{n // 1000}k")
+def loaded_game_state(request, make_game_state):
+    """GameState with a synthetic pool and a matching study history."""
+    count = request.param
+    history = generate_study_history(generate_question_tuples(count), attempts_per_question=3)
+    return make_game_state(question_count=count, history=history)
+
+
+def _mid_session_setup(question_manager, answered: int = ANSWERED_THIS_SESSION):
+    """Return a setup callable that puts the session at a fixed mid-quiz point."""
+    rng = random.Random(7)
+    answered_indices = rng.sample(range(len(question_manager.questions)), answered)
+
+    def setup():
+        question_manager.answered_indices_session = list(answered_indices)
+
+    return setup
+
+
+@pytest.mark.benchmark(group="select_question")
+def bench_select_question_weighted(benchmark, loaded_game_state):
+    """Weighted selection with full history, as used by GameState.select_question."""
+    question_manager = loaded_game_state.question_manager
+    history = {"questions": loaded_game_state.study_history.get("questions", {})}
+
+    question, index = benchmark.pedantic(
+        question_manager.select_question,
+        args=(None, history),
+        setup=_mid_session_setup(question_manager),
+        rounds=20,
+        warmup_rounds=1,
+    )
+    assert question is not None and index >= 0
+
+
+@pytest.mark.benchmark(group="select_question")
+def bench_select_question_category_filter(benchmark, loaded_game_state):
+    """Weighted selection restricted to a single category."""
+    question_manager = loaded_game_state.question_manager
+    history = {"questions": loaded_game_state.study_history.get("questions", {})}
+    category = sorted(question_manager.categories)[0]
+
+    question, _ = benchmark.pedantic(
+        question_manager.select_question,
+        args=(category, history),
+        setup=_mid_session_setup(question_manager),
+        rounds=20,
+        warmup_rounds=1,
+    )
+    assert question is not None and question.category == category
+
+
+@pytest.mark.benchmark(group="select_question")
+def bench_game_state_select_question(benchmark, loaded_game_state):
+    """GameState.select_question including the tuple conversion."""
+    question_manager = loaded_game_state.question_manager
+
+    question_data, index = benchmark.pedantic(
+        loaded_game_state.select_question,
+        setup=_mid_session_setup(question_manager),
+        rounds=20,
+        warmup_rounds=1,
+    )
+    assert question_data is not None and index >= 0
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the per-request quiz session round trip: export + encode
+after a request, decode + load before the next one, and the stores'
+save/load. The encoded size is recorded in extra_info.
+"""
+
+import pytest
+
+from services.quiz_session_store import (
+    MemorySessionStore, SQLiteSessionStore, decode_session_state, encode_session_state
+)
+
+POOL_SIZES = [1_000, 10_000]
+ANSWERED = 45  # Halfway through an exam simulation
+
+
+@pytest.fixture(params=POOL_SIZES, ids=lambda n: f"{n // 1000}k_questions")
+def mid_exam_controller(request, make_game_state):
+    """QuizController halfway through an exam, with the next question cached."""
+    from controllers.quiz_controller import QuizController
+
+    controller = QuizController(make_game_state(question_count=request.param))
+    controller.start_quiz_session(mode="exam")
+    for i in range(ANSWERED):
+        question = controller.get_next_question()
+        controller.submit_answer(question["question_data"], i % 4, question["original_index"])
+    controller.get_next_question()
+    return controller
+
+
+@pytest.mark.benchmark(group="session_state")
+def bench_export_session_state(benchmark, mid_exam_controller):
+    """End of a request: export the session and encode it."""
+    data = benchmark.pedantic(lambda: encode_session_state(mid_exam_controller.export_session_state()),
+                              rounds=50, warmup_rounds=1)
+    benchmark.extra_info["state_bytes"] = len(data)
+
+
+@pytest.mark.benchmark(group="session_state")
+def bench_load_session_state(benchmark, mid_exam_controller):
+    """Start of a request: decode a stored session and load it into the controller."""
+    expected = mid_exam_controller.export_session_state()
+    data = encode_session_state(expected)
+
+    benchmark.pedantic(lambda: mid_exam_controller.load_session_state(decode_session_state(data)),
+                       rounds=50, warmup_rounds=1)
+    assert mid_exam_controller.export_session_state() == expected
+    assert mid_exam_controller.session_total == ANSWERED
+
+
+@pytest.mark.benchmark(group="session_store")
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def bench_store_save_load(benchmark, isolated_data_dir, kind):
+    """One save and one load of a ~1 KB state."""
+    store = MemorySessionStore() if kind == "memory" else SQLiteSessionStore(isolated_data_dir / "sessions.db")
+    data = b"{" + b"x" * 1024 + b"}"
+
+    def round_trip():
+        store.save("bench-session", data)
+        return store.load("bench-session")
+
+    assert benchmark.pedantic(round_trip, rounds=200, warmup_rounds=5) == data
+    store.close()
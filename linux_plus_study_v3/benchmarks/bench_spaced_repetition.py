@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the spaced review scheduler at 1k/10k/100k cards, and the
+retention-per-review simulation against the legacy weighted selection.
+"""
+
+import random
+
+import pytest
+
+from benchmarks.data_generators import generate_question_tuples
+from benchmarks.retention_simulation import SimulationConfig, run_simulation
+from models.spaced_repetition import DAY, ReviewScheduler
+
+POOL_SIZES = [1_000, 10_000, 100_000]
+NOW = 1_000 * DAY
+
+
+@pytest.fixture(params=POOL_SIZES, ids=lambda n: f"{n // 1000}k")
+def loaded_scheduler(request):
+    """Scheduler where 90% of the cards have a review state and a third of those are due."""
+    rng = random.Random(7)
+    store = {"cards": {}}
+    questions = generate_question_tuples(request.param)
+    for text, _, _, _, _ in questions[: request.param * 9 // 10]:
+        due = NOW + rng.uniform(-10, 20) * DAY
+        store["cards"][text] = [due, rng.uniform(1, 30), rng.uniform(1.3, 2.8),
+                                rng.randint(1, 8), rng.randint(0, 3), due - 5 * DAY]
+    scheduler = ReviewScheduler(store)
+    scheduler.sync((q[0], q[3]) for q in questions)
+    return scheduler
+
+
+@pytest.mark.benchmark(group="spaced_review")
+def bench_scheduler_take_next_due(benchmark, loaded_scheduler):
+    """Check out and return the most overdue card (O(log n) per call)."""
+    def take_and_release():
+        key = loaded_scheduler.take(NOW)
+        loaded_scheduler.release(key)
+        return key
+
+    key = benchmark(take_and_release)
+    assert key is not None and loaded_scheduler.cards[key].due <= NOW
+
+
+@pytest.mark.benchmark(group="spaced_review")
+def bench_scheduler_session_reschedule(benchmark, loaded_scheduler):
+    """Take a daily 20-question session and reschedule it in one batch."""
+    clock = {"now": NOW}
+
+    def session():
+        clock["now"] += DAY
+        loaded_scheduler.begin_session()
+        keys = [loaded_scheduler.take(clock["now"]) for _ in range(20)]
+        results = [(key, i % 4 != 0, clock["now"]) for i, key in enumerate(keys) if key is not None]
+        return loaded_scheduler.reschedule(results)
+
+    updated = benchmark(session)
+    assert 0 < len(updated) <= 20
+
+
+@pytest.mark.benchmark(group="spaced_review")
+def bench_retention_simulation(benchmark, isolated_data_dir):
+    """Spaced review vs weighted selection on a simulated learner (30 days, 500 cards)."""
+    config = SimulationConfig(cards=500, days=30, reviews_per_day=30)
+
+    def simulate():
+        return {policy: run_simulation(policy, config) for policy in ("spaced", "weighted")}
+
+    results = benchmark.pedantic(simulate, rounds=1, iterations=1)
+    for policy, result in results.items():
+        benchmark.extra_info[f"{policy}_reviews"] = result["reviews"]
+        benchmark.extra_info[f"{policy}_retention_per_100_reviews"] = round(result["retention_per_100_reviews"], 3)
+        benchmark.extra_info[f"{policy}_mean_retention"] = round(result["mean_retention"], 4)
+    assert results["spaced"]["retention_per_100_reviews"] > results["weighted"]["retention_per_100_reviews"]
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmarks through the Flask test client, plus the question
+import duplicate detection that lives on LinuxPlusStudyWeb.
+"""
+
+import pytest
+
+from benchmarks.data_generators import generate_import_payload
+
+QUESTIONS_PER_QUIZ = 5
+
+
+@pytest.fixture
+def web_app(make_game_state):
+    """LinuxPlusStudyWeb over a 1k-question synthetic pool."""
+    from views.web_view import LinuxPlusStudyWeb
+
+    game_state = make_game_state(question_count=1_000)
+    web = LinuxPlusStudyWeb(game_state, debug=False)
+    web.app.config["TESTING"] = True
+    return web
+
+
+def _run_quiz(client, question_count: int = QUESTIONS_PER_QUIZ) -> int:
+    """Drive start -> (get_question -> submit_answer)* -> end; return answered count."""
+    response = client.post("/api/start_quiz", json={"mode": "standard", "num_questions": question_count})
+    assert response.get_json().get("success"), response.get_json()
+
+    answered = 0
+    for _ in range(question_count):
+        question = client.get("/api/get_question").get_json()
+        if question.get("quiz_complete"):
+            break
+        result = client.post("/api/submit_answer", json={"answer_index": 0}).get_json()
+        assert "error" not in result, result
+        answered += 1
+
+    assert client.post("/api/end_quiz").get_json().get("success")
+    return answered
+
+
+@pytest.mark.benchmark(group="web_flow")
+def bench_quiz_flow(benchmark, web_app):
+    """Full quiz session through the HTTP layer."""
+    client = web_app.app.test_client()
+    answered = benchmark.pedantic(_run_quiz, args=(client,), rounds=5, warmup_rounds=1)
+    assert answered > 0
+
+
+@pytest.mark.benchmark(group="web_flow")
+def bench_dashboard(benchmark, web_app):
+    """Dashboard API after a completed quiz."""
+    client = web_app.app.test_client()
+    _run_quiz(client)
+    response = benchmark.pedantic(client.get, args=("/api/dashboard",), rounds=20, warmup_rounds=1)
+    assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group="duplicates")
+@pytest.mark.parametrize("import_size", [100, 500], ids=lambda n: f"{n}_imported")
+def bench_detect_and_eliminate_duplicates(benchmark, web_app, import_size):
+    """Duplicate detection of an import payload against the 1k-question pool."""
+    payload = generate_import_payload(import_size, duplicate_fraction=0.2,
+                                      existing=web_app.game_state.questions)
+
+    unique, report = benchmark.pedantic(web_app._detect_and_eliminate_duplicates, args=(payload,),
+                                        rounds=3, warmup_rounds=0)
+    assert report["total_processed"] == import_size
+    assert report["duplicates_found"] > 0
+    assert len(unique) == report["unique_added"]
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Compare benchmark results against the committed baseline.
+
+Usage:
+    python -m pytest benchmarks --benchmark-json=benchmarks/.results.json
+    python benchmarks/check_regressions.py benchmarks/.results.json
+    python benchmarks/check_regressions.py benchmarks/.results.json --update
+
+Exits with status 1 when any benchmark median is slower than its baseline
+by more than the tolerance (default taken from baseline.json).
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any
+
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+DEFAULT_TOLERANCE = 0.25
+
+
+def load_results(results_file: Path) -> Dict[str, float]:
+    """
+    Load median timings from a pytest-benchmark JSON file.
+
+    Args:
+        results_file: Path to --benchmark-json output
+
+    Returns:
+        dict: Benchmark name -> median seconds
+    """
+    with open(results_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {bench["name"]: bench["stats"]["median"] for bench in data.get("benchmarks", [])}
+
+
+def load_baseline(baseline_file: Path = BASELINE_FILE) -> Dict[str, Any]:
+    """Load the baseline file, returning an empty baseline if it does not exist."""
+    if not baseline_file.exists():
+        return {"tolerance": DEFAULT_TOLERANCE, "benchmarks": {}}
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, Any], tolerance: float) -> Dict[str, Any]:
+    """
+    Compare results with the baseline.
+
+    Args:
+        results: Benchmark name -> median seconds
+        baseline: Loaded baseline data
+        tolerance: Allowed slowdown as a fraction (0.25 = 25%)
+
+    Returns:
+        dict: Lists of regressions, improvements, unchanged and new benchmarks
+    """
+    report: Dict[str, Any] = {"regressions": [], "improvements": [], "unchanged": [], "new": []}
+    baseline_medians = {name: entry["median"] for name, entry in baseline.get("benchmarks", {}).items()}
+
+    for name, median in sorted(results.items()):
+        if name not in baseline_medians:
+            report["new"].append((name, median))
+            continue
+        reference = baseline_medians[name]
+        ratio = median / reference if reference else 1.0
+        entry = (name, reference, median, ratio)
+        if ratio > 1.0 + tolerance:
+            report["regressions"].append(entry)
+        elif ratio < 1.0 - tolerance:
+            report["improvements"].append(entry)
+        else:
+            report["unchanged"].append(entry)
+    return report
+
+
+def write_baseline(results: Dict[str, float], tolerance: float, baseline_file: Path = BASELINE_FILE) -> None:
+    """Write results as the new baseline."""
+    payload = {
+        "updated": datetime.now().strftime("%Y-%m-%d"),
+        "tolerance": tolerance,
+        "unit": "seconds (median)",
+        "benchmarks": {name: {"median": round(median, 6)} for name, median in sorted(results.items())},
+    }
+    with open(baseline_file, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+        f.write("\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check benchmark results for regressions")
+    parser.add_argument("results", type=Path, help="pytest-benchmark JSON output")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="Allowed slowdown fraction (defaults to the baseline's value)")
+    parser.add_argument("--update", action="store_true", help="Overwrite the baseline with these results")
+    args = parser.parse_args()
+
+    results = load_results(args.results)
+    baseline = load_baseline(args.baseline)
+    tolerance = args.tolerance if args.tolerance is not None else baseline.get("tolerance", DEFAULT_TOLERANCE)
+
+    if args.update:
+        write_baseline(results, tolerance, args.baseline)
+        print(f"✓ Baseline updated with {len(results)} benchmarks: {args.baseline}")
+        return 0
+
+    report = compare(results, baseline, tolerance)
+
+    for name, reference, median, ratio in report["regressions"]:
+        print(f"❌ REGRESSION {name}: {reference * 1000:.3f} ms -> {median * 1000:.3f} ms ({ratio:.2f}x)")
+    for name, reference, median, ratio in report["improvements"]:
+        print(f"✅ faster     {name}: {reference * 1000:.3f} ms -> {median * 1000:.3f} ms ({ratio:.2f}x)")
+    for name, median in report["new"]:
+        print(f"ℹ️  new        {name}: {median * 1000:.3f} ms (not in baseline)")
+    print(f"\n{len(report['unchanged'])} unchanged, {len(report['improvements'])} faster, "
+          f"{len(report['regressions'])} regressed, {len(report['new'])} new "
+          f"(tolerance {tolerance:.0%})")
+
+    return 1 if report["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Shared fixtures for the benchmark suite.
+
+Every benchmark runs against an isolated temporary data directory so the
+real history, achievements and analytics files are never touched. When
+pytest-benchmark is not installed a minimal compatible ``benchmark`` fixture
+is provided so the suite still runs and still writes --benchmark-json output.
+"""
+
+import gc
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+try:
+    import pytest_benchmark  # noqa: F401
+    HAS_PYTEST_BENCHMARK = True
+except ImportError:
+    HAS_PYTEST_BENCHMARK = False
+
+
+# ----------------------------------------------------------------------
+# Isolated data directory
+# ----------------------------------------------------------------------
+@pytest.fixture
+def isolated_data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point every persistence singleton at a fresh temporary directory."""
+    from benchmarks.environment import isolate_data_dir
+
+    monkeypatch.chdir(tmp_path)
+    isolate_data_dir(tmp_path, patch=monkeypatch.setattr)
+    yield tmp_path
+
+    from utils.persistence_manager import get_persistence_manager
+    get_persistence_manager().clear_cache()
+
+
+@pytest.fixture
+def make_game_state(isolated_data_dir: Path) -> Callable[..., Any]:
+    """Factory returning a GameState backed by the isolated data directory."""
+    from benchmarks.environment import create_game_state
+
+    def _make(question_count: int = 0, history: Optional[Dict[str, Any]] = None) -> Any:
+        return create_game_state(isolated_data_dir, question_count=question_count, history=history)
+
+    return _make
+
+
+# ----------------------------------------------------------------------
+# Fallback benchmark fixture (used only without pytest-benchmark)
+# ----------------------------------------------------------------------
+class _FallbackBenchmark:
+    """Subset of the pytest-benchmark fixture API: __call__, pedantic and extra_info."""
+
+    def __init__(self, name: str, fullname: str, group: Optional[str]):
+        self.name = name
+        self.fullname = fullname
+        self.group = group
+        self.timings: List[float] = []
+        self.extra_info: Dict[str, Any] = {}
+
+    def __call__(self, target: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        # Calibrate so each round lasts roughly 10ms, capped at ~1s total
+        start = time.perf_counter()
+        result = target(*args, **kwargs)
+        single = max(time.perf_counter() - start, 1e-7)
+        iterations = max(1, min(1000, int(0.01 / single)))
+        rounds = max(5, min(100, int(1.0 / (single * iterations))))
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                result = target(*args, **kwargs)
+            self.timings.append((time.perf_counter() - start) / iterations)
+        return result
+
+    def pedantic(self, target: Callable[..., Any], args: tuple = (), kwargs: Optional[Dict[str, Any]] = None,
+                 setup: Optional[Callable[[], Any]] = None, rounds: int = 1, iterations: int = 1,
+                 warmup_rounds: int = 0) -> Any:
+        kwargs = kwargs or {}
+        result = None
+        for round_index in range(warmup_rounds + rounds):
+            call_args, call_kwargs = args, kwargs
+            if setup is not None:
+                prepared = setup()
+                if prepared is not None:
+                    call_args, call_kwargs = prepared
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    result = target(*call_args, **call_kwargs)
+                elapsed = (time.perf_counter() - start) / iterations
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+            if round_index >= warmup_rounds:
+                self.timings.append(elapsed)
+        return result
+
+    def as_json(self) -> Dict[str, Any]:
+        timings = self.timings or [0.0]
+        mean = statistics.mean(timings)
+        return {
+            "name": self.name,
+            "fullname": self.fullname,
+            "group": self.group,
+            "extra_info": self.extra_info,
+            "stats": {
+                "min": min(timings),
+                "max": max(timings),
+                "mean": mean,
+                "median": statistics.median(timings),
+                "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+                "rounds": len(self.timings),
+                "ops": 1.0 / mean if mean else 0.0,
+            },
+        }
+
+
+if not HAS_PYTEST_BENCHMARK:
+    _fallback_results: List[_FallbackBenchmark] = []
+
+    def pytest_addoption(parser: pytest.Parser) -> None:
+        parser.addoption("--benchmark-json", action="store", default=None,
+                         help="Write benchmark results to this JSON file")
+
+    def pytest_configure(config: pytest.Config) -> None:
+        config.addinivalue_line("markers", "benchmark(group): benchmark grouping (pytest-benchmark compatible)")
+
+    @pytest.fixture
+    def benchmark(request: pytest.FixtureRequest) -> _FallbackBenchmark:
+        marker = request.node.get_closest_marker("benchmark")
+        group = marker.kwargs.get("group") if marker else None
+        bench = _FallbackBenchmark(request.node.name, request.node.nodeid, group)
+        yield bench
+        _fallback_results.append(bench)
+
+    def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+        output = session.config.getoption("--benchmark-json")
+        if not output or not _fallback_results:
+            return
+        payload = {
+            "machine_info": {"python_version": sys.version.split()[0], "runner": "fallback"},
+            "datetime": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "benchmarks": [bench.as_json() for bench in _fallback_results],
+        }
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+
+    def pytest_terminal_summary(terminalreporter: Any) -> None:
+        if not _fallback_results:
+            return
+        terminalreporter.section("benchmark (fallback runner)")
+        for bench in _fallback_results:
+            stats = bench.as_json()["stats"]
+            terminalreporter.write_line(
+                f"{bench.name:<60} median {stats['median'] * 1000:9.3f} ms  "
+                f"mean {stats['mean'] * 1000:9.3f} ms  rounds {stats['rounds']}"
+            )
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Synthetic Data Generators for Benchmarks
+
+Builds deterministic question pools, study histories, analytics files and
+database rows, import payloads and application logs at arbitrary sizes so hot paths can be measured at 1k, 10k
+and 100k questions without touching the real data files.
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Tuple
+
+from utils.config import QUESTION_CATEGORIES
+
+QuestionTuple = Tuple[str, List[str], int, str, str]
+
+_VERBS = ["configure", "inspect", "restart", "mount", "archive", "schedule",
+          "partition", "encrypt", "compress", "monitor", "audit", "troubleshoot"]
+_OBJECTS = ["the network interface", "a systemd unit", "an LVM volume", "the firewall",
+            "a cron job", "SELinux contexts", "the bootloader", "a container image",
+            "kernel modules", "user quotas", "SSH keys", "a RAID array"]
+_COMMANDS = ["systemctl", "ip", "lvextend", "firewall-cmd", "crontab", "restorecon",
+             "grub2-install", "podman", "modprobe", "setquota", "ssh-keygen", "mdadm",
+             "journalctl", "nmcli", "tar", "rsync", "chmod", "chown", "find", "awk"]
+
+
+def generate_question_tuples(count: int, seed: int = 42) -> List[QuestionTuple]:
+    """
+    Generate unique question tuples spread across the Linux+ categories.
+
+    Args:
+        count: Number of questions to generate
+        seed: Random seed for reproducibility
+
+    Returns:
+        list: Question tuples (text, options, correct_index, category, explanation)
+    """
+    rng = random.Random(seed)
+    questions: List[QuestionTuple] = []
+    for i in range(count):
+        verb = _VERBS[i % len(_VERBS)]
+        obj = _OBJECTS[(i // len(_VERBS)) % len(_OBJECTS)]
+        options = rng.sample(_COMMANDS, 4)
+        correct_index = rng.randrange(4)
+        category = QUESTION_CATEGORIES[i % len(QUESTION_CATEGORIES)]
+        text = f"Q{i}: Which command would you use to {verb} {obj} in scenario {i}?"
+        explanation = f"`{options[correct_index]}` is used to {verb} {obj}."
+        questions.append((text, options, correct_index, category, explanation))
+    return questions
+
+
+def generate_questions(count: int, seed: int = 42) -> List[Any]:
+    """
+    Generate Question objects for QuestionManager.
+
+    Args:
+        count: Number of questions to generate
+        seed: Random seed for reproducibility
+
+    Returns:
+        list: Question instances
+    """
+    from models.question import Question
+    return [Question.from_tuple(q) for q in generate_question_tuples(count, seed)]
+
+
+def generate_study_history(questions: List[QuestionTuple], attempts_per_question: int = 5,
+                           answered_fraction: float = 0.8, seed: int = 42) -> Dict[str, Any]:
+    """
+    Generate a study history in the linux_plus_history.json format.
+
+    Args:
+        questions: Question tuples the history refers to
+        attempts_per_question: History entries per answered question
+        answered_fraction: Fraction of questions that have been attempted
+        seed: Random seed for reproducibility
+
+    Returns:
+        dict: Study history with per-question and per-category stats
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    history: Dict[str, Any] = {
+        "questions": {},
+        "categories": {},
+        "sessions": [],
+        "total_correct": 0,
+        "total_attempts": 0,
+        "incorrect_review": [],
+        "leaderboard": [],
+        "settings": {},
+        "export_metadata": {},
+        "achievements": {},
+    }
+
+    for text, _, _, category, _ in questions:
+        if rng.random() > answered_fraction:
+            continue
+        entries: List[Dict[str, Any]] = []
+        correct = 0
+        for n in range(attempts_per_question):
+            is_correct = rng.random() < 0.7
+            correct += int(is_correct)
+            timestamp = start + timedelta(minutes=rng.randrange(60 * 24 * 180))
+            entries.append({"timestamp": timestamp.isoformat(), "correct": is_correct})
+        history["questions"][text] = {
+            "correct": correct,
+            "attempts": attempts_per_question,
+            "history": entries,
+        }
+        cat_stats = history["categories"].setdefault(category, {"correct": 0, "attempts": 0})
+        cat_stats["correct"] += correct
+        cat_stats["attempts"] += attempts_per_question
+        history["total_correct"] += correct
+        history["total_attempts"] += attempts_per_question
+        if correct < attempts_per_question // 2:
+            history["incorrect_review"].append(text)
+
+    return history
+
+
+def generate_analytics_data(user_count: int = 1, days_of_history: int = 30,
+                            topics_per_user: int = 6, seed: int = 42) -> Dict[str, Any]:
+    """
+    Generate a user_analytics.json payload for SimpleAnalyticsManager.
+
+    Args:
+        user_count: Number of users; the first one is always "anonymous"
+        days_of_history: Daily history entries per user
+        topics_per_user: Topics with recorded stats per user
+        seed: Random seed for reproducibility
+
+    Returns:
+        dict: Analytics data keyed by user id
+    """
+    rng = random.Random(seed)
+    today = datetime.now()
+    data: Dict[str, Any] = {}
+
+    for u in range(user_count):
+        user_id = "anonymous" if u == 0 else f"bench_user_{u}"
+        total = rng.randrange(100, 5000)
+        correct = int(total * rng.uniform(0.5, 0.95))
+        daily_history: Dict[str, Any] = {}
+        for d in range(1, days_of_history + 1):
+            date_str = (today - timedelta(days=d)).strftime("%Y-%m-%d")
+            answered = rng.randrange(0, 60)
+            daily_history[date_str] = {
+                "date": date_str,
+                "correct_answers": int(answered * 0.7),
+                "total_questions": answered,
+                "quiz_time": answered * 12,
+                "study_time": answered * 15,
+            }
+        today_str = today.strftime("%Y-%m-%d")
+        data[user_id] = {
+            "total_questions": total,
+            "correct_answers": correct,
+            "incorrect_answers": total - correct,
+            "accuracy": round(correct / total * 100, 2),
+            "total_study_time": total * 12,
+            "total_sessions": total // 10,
+            "study_streak": rng.randrange(0, 30),
+            "current_streak": 0,
+            "longest_streak": rng.randrange(0, 50),
+            "questions_to_review": rng.randrange(0, 10),
+            "level": correct * 10 // 100 + 1,
+            "xp": correct * 10,
+            "achievements": [],
+            "session_history": [
+                {
+                    "date": (today - timedelta(days=s)).isoformat(),
+                    "duration": rng.randrange(60, 1800),
+                    "questions_answered": rng.randrange(1, 30),
+                    "questions_correct": rng.randrange(0, 20),
+                }
+                for s in range(15)
+            ],
+            "last_activity": today.isoformat(),
+            "topics_studied": {
+                QUESTION_CATEGORIES[t % len(QUESTION_CATEGORIES)]: {
+                    "correct": correct // topics_per_user,
+                    "total": total // topics_per_user,
+                    "questions": total // topics_per_user,
+                }
+                for t in range(topics_per_user)
+            },
+            "difficulty_progress": {"beginner": total // 3, "intermediate": total // 3, "advanced": total // 3},
+            "daily_data": {
+                "last_reset_date": today_str,
+                "today": {"date": today_str, "correct_answers": 0, "total_questions": 0,
+                          "quiz_time": 0, "study_time": 0},
+                "yesterday": {"date": "", "correct_answers": 0, "total_questions": 0,
+                              "quiz_time": 0, "study_time": 0},
+                "daily_history": daily_history,
+            },
+        }
+    return data
+
+
+_ACTIVITY_TYPES = ["quiz", "practice", "study", "vm_lab", "cli_playground", "error_tracking"]
+
+
+def generate_analytics_rows(count: int, user_count: int = 20, days_of_history: int = 730,
+                            seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generate rows for the SQLAlchemy analytics table.
+
+    Args:
+        count: Number of rows
+        user_count: Distinct user ids (demo_user_000, demo_user_001, ...)
+        days_of_history: Rows are spread over this many days before now
+        seed: Random seed for reproducibility
+
+    Returns:
+        list: Column -> value dicts with every NOT NULL column filled
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+    rows = []
+    for i in range(count):
+        created = now - timedelta(minutes=rng.randrange(days_of_history * 24 * 60))
+        attempted = rng.randint(0, 20)
+        correct = rng.randint(0, attempted)
+        rows.append({
+            "user_id": f"demo_user_{rng.randrange(user_count):03d}",
+            "session_id": f"bench_session_{i}",
+            "session_start": created,
+            "session_duration": float(rng.randint(60, 3600)),
+            "activity_type": rng.choice(_ACTIVITY_TYPES),
+            "created_at": created,
+            "updated_at": created,
+            "questions_attempted": attempted,
+            "questions_correct": correct,
+            "questions_incorrect": attempted - correct,
+            "content_pages_viewed": 0, "time_on_content": 0.0, "practice_commands_executed": 0,
+            "vm_sessions_started": 0, "cli_playground_usage": 0, "study_streak_days": 0,
+            "return_sessions": 0, "help_requests": 0, "hint_usage": 0, "review_sessions": 0,
+            "learning_goals_met": 0, "certification_progress": 0.0, "error_count": 0,
+            "vm_uptime": 0.0, "vm_commands_executed": 0, "lab_exercises_completed": 0,
+            "lab_exercises_attempted": 0, "vm_errors_encountered": 0, "active_learning_time": 0.0,
+        })
+    return rows
+
+
+def generate_import_payload(count: int, duplicate_fraction: float = 0.2,
+                            existing: List[QuestionTuple] = None, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generate an import payload for duplicate detection.
+
+    Args:
+        count: Number of questions in the payload
+        duplicate_fraction: Fraction copied (with case/whitespace noise) from existing questions
+        existing: Existing question tuples to draw duplicates from
+        seed: Random seed for reproducibility
+
+    Returns:
+        list: Question dicts in the import format (question/options/category/...)
+    """
+    rng = random.Random(seed)
+    existing = existing or []
+    fresh = generate_question_tuples(count, seed=seed + 1)
+    payload: List[Dict[str, Any]] = []
+    for i, (text, options, correct_index, category, explanation) in enumerate(fresh):
+        if existing and rng.random() < duplicate_fraction:
+            text = "  " + existing[rng.randrange(len(existing))][0].upper() + " "
+        else:
+            text = text.replace(f"Q{i}:", f"Imported {i}:")
+        payload.append({
+            "question": text,
+            "options": options,
+            "correct_answer_index": correct_index,
+            "category": category,
+            "explanation": explanation,
+        })
+    return payload
+
+
+_LOG_MESSAGES = [
+    ("INFO", "werkzeug", "127.0.0.1 - - \"GET /api/get_question HTTP/1.1\" 200 -"),
+    ("INFO", "controllers.quiz_controller", "Quiz session started for user {i}"),
+    ("DEBUG", "utils.persistence_manager", "Saved history file in {i} ms"),
+    ("ERROR", "utils.database", "Database session error: (sqlite3.OperationalError) database is locked [SQL: SELECT * FROM analytics WHERE id = {i}]"),
+    ("WARNING", "views.web_view", "VM management features not available - vm_integration module not found"),
+    ("ERROR", "services.analytics_integration", "Error tracking activity for user {i}: Analytics update failed"),
+    ("ERROR", "views.web_view", "Unexpected error rendering template for request {i}"),
+    ("CRITICAL", "main", "Request to /api/submit_answer failed after {i} retries"),
+]
+
+
+def generate_log_lines(count: int, error_fraction: float = 0.1, seed: int = 42) -> List[str]:
+    """
+    Generate application log lines in the format written by the app loggers.
+
+    Args:
+        count: Number of lines
+        error_fraction: Fraction of WARNING/ERROR/CRITICAL lines
+        seed: Random seed for reproducibility
+
+    Returns:
+        list: Log lines without trailing newlines
+    """
+    rng = random.Random(seed)
+    info = [m for m in _LOG_MESSAGES if m[0] in ("INFO", "DEBUG")]
+    errors = [m for m in _LOG_MESSAGES if m[0] not in ("INFO", "DEBUG")]
+    start = datetime(2025, 8, 5, 18, 0, 0)
+    lines = []
+    for i in range(count):
+        level, logger_name, message = rng.choice(errors if rng.random() < error_fraction else info)
+        timestamp = (start + timedelta(milliseconds=i * 37)).strftime("%Y-%m-%d %H:%M:%S,%f")[:-3]
+        lines.append(f"{timestamp} - {logger_name} - {level} - {message.format(i=i)}")
+    return lines
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Isolated runtime environment for benchmarks and load tests.
+
+Redirects the persistence, analytics, time-tracking and leaderboard
+singletons to a temporary directory so runs are reproducible and never
+touch real data.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Callable
+
+SetAttr = Callable[[Any, str, Any], None]
+
+
+def isolate_data_dir(root: Path, patch: SetAttr = setattr) -> Path:
+    """
+    Point every persistence singleton at a directory and chdir into it.
+
+    The working directory is switched because the question loader, the time
+    tracker and the SQLite URL all use paths relative to it.
+
+    Args:
+        root: Directory to hold the isolated data (created if missing)
+        patch: Attribute setter; pass monkeypatch.setattr to undo after a test
+
+    Returns:
+        Path: The data directory inside root
+    """
+    data_dir = root / "data"
+    (data_dir / "backups").mkdir(parents=True, exist_ok=True)
+    os.chdir(root)
+
+    from utils.persistence_manager import get_persistence_manager
+    persistence = get_persistence_manager()
+    patch(persistence, "history_file", root / "linux_plus_history.json")
+    patch(persistence, "achievements_file", root / "linux_plus_achievements.json")
+    patch(persistence, "settings_file", root / "web_settings.json")
+    patch(persistence, "backup_dir", data_dir / "backups")
+    persistence.clear_cache()
+
+    import services.simple_analytics as simple_analytics
+    patch(simple_analytics, "_analytics_manager",
+          simple_analytics.SimpleAnalyticsManager(str(data_dir / "user_analytics.json")))
+
+    import services.time_tracking_service as time_tracking_service
+    patch(time_tracking_service, "_time_tracker", None)
+
+    import services.leaderboard_service as leaderboard_service
+    patch(leaderboard_service, "_leaderboard_service", None)
+
+    return data_dir
+
+
+def create_game_state(root: Path, question_count: int = 0, history: Any = None) -> Any:
+    """
+    Create a GameState backed by an isolated directory.
+
+    Args:
+        root: Directory previously passed to isolate_data_dir
+        question_count: Replace the question pool with this many synthetic questions
+        history: Optional study history to seed the history file with
+
+    Returns:
+        GameState: Game state using the isolated files
+    """
+    import json
+    from models.game_state import GameState
+    from benchmarks.data_generators import generate_questions
+
+    history_file = root / "linux_plus_history.json"
+    if history is not None:
+        with open(history_file, "w", encoding="utf-8") as f:
+            json.dump(history, f)
+    game_state = GameState(history_file=str(history_file))
+    if question_count:
+        questions = generate_questions(question_count)
+        game_state.question_manager.questions = questions
+        game_state.question_manager.categories = {q.category for q in questions}
+        game_state.question_manager.reset_session()
+    return game_state
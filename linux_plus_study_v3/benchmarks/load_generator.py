@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Load Generator for the Linux+ Study Web API
+
+Simulates concurrent learners with asyncio + httpx. Each virtual user runs
+the learner flow
+
+    /api/start_quiz -> (/api/get_question -> think -> /api/submit_answer)*
+    -> /api/end_quiz -> /api/dashboard -> /api/heatmap
+
+with a configurable think time, and the run reports throughput, latency
+percentiles and error rates per endpoint.
+
+By default the Flask app is started in-process on a free port, over a
+temporary data directory seeded with synthetic questions, so runs are
+reproducible in CI. Pass --url to target an already running server instead.
+
+Examples:
+    python benchmarks/load_generator.py --users 20 --duration 60
+    python benchmarks/load_generator.py --users 50 --think-time 0 --json /tmp/load.json
+    python benchmarks/load_generator.py --url http://127.0.0.1:5000 --users 5
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+FLOW_ENDPOINTS = [
+    "/api/start_quiz",
+    "/api/get_question",
+    "/api/submit_answer",
+    "/api/end_quiz",
+    "/api/dashboard",
+    "/api/heatmap",
+]
+
+
+@dataclass
+class LoadTestConfig:
+    """Configuration for a load test run."""
+    users: int = 10
+    duration: float = 30.0
+    ramp_up: float = 5.0
+    think_time: float = 1.0
+    think_jitter: float = 0.5
+    questions_per_quiz: int = 5
+    question_pool: int = 1000
+    timeout: float = 30.0
+    seed: int = 42
+    url: Optional[str] = None
+
+
+@dataclass
+class EndpointStats:
+    """Latency samples and error counts for one endpoint."""
+    latencies: List[float] = field(default_factory=list)
+    http_errors: int = 0
+    app_errors: int = 0
+    transport_errors: int = 0
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies) + self.transport_errors
+
+    @property
+    def errors(self) -> int:
+        return self.http_errors + self.app_errors + self.transport_errors
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class LoadTestResults:
+    """Aggregated results across all virtual users."""
+
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointStats] = {path: EndpointStats() for path in FLOW_ENDPOINTS}
+        self.flows_completed = 0
+        self.flows_failed = 0
+        self.started_at = 0.0
+        self.finished_at = 0.0
+
+    def record(self, path: str, latency: Optional[float], status: Optional[int],
+               payload: Optional[Dict[str, Any]]) -> None:
+        stats = self.endpoints.setdefault(path, EndpointStats())
+        if latency is None:
+            stats.transport_errors += 1
+            return
+        stats.latencies.append(latency)
+        if status is None or status >= 400:
+            stats.http_errors += 1
+        elif _is_app_error(path, payload):
+            stats.app_errors += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = max(self.finished_at - self.started_at, 1e-9)
+        total_requests = sum(s.requests for s in self.endpoints.values())
+        total_errors = sum(s.errors for s in self.endpoints.values())
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "total_requests": total_requests,
+            "throughput_rps": round(total_requests / elapsed, 2),
+            "error_rate": round(total_errors / total_requests, 4) if total_requests else 0.0,
+            "flows_completed": self.flows_completed,
+            "flows_failed": self.flows_failed,
+            "endpoints": {
+                path: {
+                    "requests": s.requests,
+                    "rps": round(s.requests / elapsed, 2),
+                    "p50_ms": round(s.percentile(0.50) * 1000, 2),
+                    "p95_ms": round(s.percentile(0.95) * 1000, 2),
+                    "p99_ms": round(s.percentile(0.99) * 1000, 2),
+                    "max_ms": round(max(s.latencies) * 1000, 2) if s.latencies else 0.0,
+                    "http_errors": s.http_errors,
+                    "app_errors": s.app_errors,
+                    "transport_errors": s.transport_errors,
+                    "error_rate": round(s.errors / s.requests, 4) if s.requests else 0.0,
+                }
+                for path, s in self.endpoints.items()
+            },
+        }
+
+
+def _is_app_error(path: str, payload: Optional[Dict[str, Any]]) -> bool:
+    """Detect errors the API reports in a 200 response body."""
+    if not isinstance(payload, dict):
+        return True
+    if payload.get("success") is False:
+        return True
+    # get_question reports failures as {'error': ..., 'quiz_complete': True}
+    return "error" in payload and path != "/api/end_quiz"
+
+
+class VirtualLearner:
+    """One simulated learner running quiz flows until the deadline."""
+
+    def __init__(self, user_index: int, config: LoadTestConfig, results: LoadTestResults, deadline: float):
+        self.user_index = user_index
+        self.config = config
+        self.results = results
+        self.deadline = deadline
+        self.rng = random.Random(config.seed + user_index)
+
+    async def _request(self, client: "httpx.AsyncClient", method: str, path: str,
+                       body: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body)
+        except httpx.HTTPError:
+            self.results.record(path, None, None, None)
+            return None
+        latency = time.perf_counter() - start
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = None
+        self.results.record(path, latency, response.status_code, payload)
+        return payload
+
+    async def _think(self) -> None:
+        if self.config.think_time <= 0:
+            return
+        jitter = self.config.think_time * self.config.think_jitter
+        await asyncio.sleep(max(0.0, self.rng.uniform(self.config.think_time - jitter,
+                                                      self.config.think_time + jitter)))
+
+    async def run_flow(self, client: "httpx.AsyncClient") -> bool:
+        """Run a single learner flow; return True when it completed cleanly."""
+        started = await self._request(client, "POST", "/api/start_quiz", {
+            "mode": "standard",
+            "num_questions": self.config.questions_per_quiz,
+        })
+        if not started or not started.get("success"):
+            return False
+
+        for _ in range(self.config.questions_per_quiz):
+            question = await self._request(client, "GET", "/api/get_question")
+            if not question or question.get("quiz_complete") or "options" not in question:
+                break
+            await self._think()
+            answer_index = self.rng.randrange(len(question["options"]))
+            result = await self._request(client, "POST", "/api/submit_answer", {"answer_index": answer_index})
+            if not result or "error" in result:
+                return False
+
+        ended = await self._request(client, "POST", "/api/end_quiz")
+        await self._request(client, "GET", "/api/dashboard")
+        await self._request(client, "GET", "/api/heatmap")
+        return bool(ended and ended.get("success"))
+
+    async def run(self, base_url: str, start_delay: float) -> None:
+        await asyncio.sleep(start_delay)
+        async with httpx.AsyncClient(base_url=base_url, timeout=self.config.timeout) as client:
+            while time.perf_counter() < self.deadline:
+                if await self.run_flow(client):
+                    self.results.flows_completed += 1
+                else:
+                    self.results.flows_failed += 1
+                await self._think()
+
+
+async def run_load_test(config: LoadTestConfig, base_url: str) -> LoadTestResults:
+    """
+    Drive the configured number of virtual learners against a server.
+
+    Args:
+        config: Load test configuration
+        base_url: Base URL of the server under test
+
+    Returns:
+        LoadTestResults: Aggregated results
+    """
+    results = LoadTestResults()
+    results.started_at = time.perf_counter()
+    deadline = results.started_at + config.ramp_up + config.duration
+    step = config.ramp_up / config.users if config.users else 0.0
+
+    learners = [VirtualLearner(i, config, results, deadline) for i in range(config.users)]
+    await asyncio.gather(*(learner.run(base_url, i * step) for i, learner in enumerate(learners)))
+
+    results.finished_at = time.perf_counter()
+    return results
+
+
+def start_local_server(config: LoadTestConfig, data_root: Path) -> Tuple[str, Any]:
+    """
+    Start the Flask app in a background thread over an isolated data directory.
+
+    Args:
+        config: Load test configuration (question_pool is used)
+        data_root: Temporary directory to hold all app data
+
+    Returns:
+        tuple: (base_url, werkzeug server) - call server.shutdown() when done
+    """
+    from werkzeug.serving import make_server
+    from benchmarks.environment import isolate_data_dir, create_game_state
+    from views.web_view import LinuxPlusStudyWeb
+
+    isolate_data_dir(data_root)
+    game_state = create_game_state(data_root, question_count=config.question_pool)
+    web = LinuxPlusStudyWeb(game_state, debug=False)
+
+    # Per-request access logs would dominate the output
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, web.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name="load-test-server", daemon=True)
+    thread.start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def print_report(results: LoadTestResults, config: LoadTestConfig) -> None:
+    """Print a human-readable summary of a load test run."""
+    summary = results.to_dict()
+    print("\n" + "=" * 96)
+    print(f"Load test: {config.users} users, {config.duration:.0f}s (+{config.ramp_up:.0f}s ramp-up), "
+          f"think time {config.think_time}s ±{config.think_jitter:.0%}")
+    print("=" * 96)
+    print(f"{'Endpoint':<22}{'Requests':>10}{'RPS':>9}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'max ms':>10}{'Errors':>9}{'Err %':>8}")
+    print("-" * 96)
+    for path, stats in summary["endpoints"].items():
+        errors = stats["http_errors"] + stats["app_errors"] + stats["transport_errors"]
+        print(f"{path:<22}{stats['requests']:>10}{stats['rps']:>9.1f}{stats['p50_ms']:>10.1f}"
+              f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}"
+              f"{errors:>9}{stats['error_rate'] * 100:>7.1f}%")
+    print("-" * 96)
+    print(f"Total requests: {summary['total_requests']}  |  Throughput: {summary['throughput_rps']} req/s  |  "
+          f"Error rate: {summary['error_rate'] * 100:.2f}%")
+    print(f"Flows completed: {summary['flows_completed']}  |  Flows failed: {summary['flows_failed']}")
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Simulate concurrent learners against the web API")
+    parser.add_argument("--users", type=int, default=10, help="Number of concurrent virtual learners")
+    parser.add_argument("--duration", type=float, default=30.0, help="Steady-state duration in seconds")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Seconds over which users are started")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean think time between actions (seconds)")
+    parser.add_argument("--think-jitter", type=float, default=0.5,
+                        help="Think time jitter as a fraction of the mean (0.5 = ±50%%)")
+    parser.add_argument("--questions", type=int, default=5, help="Questions answered per quiz")
+    parser.add_argument("--question-pool", type=int, default=1000,
+                        help="Synthetic questions loaded into the local server")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--url", help="Target an already running server instead of starting one")
+    parser.add_argument("--json", type=Path, help="Write the results summary to this JSON file")
+    return parser
+
+
+def main() -> int:
+    if not HTTPX_AVAILABLE:
+        print("Error: httpx is required for the load generator. Install with: pip install httpx")
+        return 1
+
+    args = create_argument_parser().parse_args()
+    config = LoadTestConfig(
+        users=args.users,
+        duration=args.duration,
+        ramp_up=args.ramp_up,
+        think_time=args.think_time,
+        think_jitter=args.think_jitter,
+        questions_per_quiz=args.questions,
+        question_pool=args.question_pool,
+        timeout=args.timeout,
+        seed=args.seed,
+        url=args.url,
+    )
+
+    server = None
+    temp_dir = None
+    try:
+        if config.url:
+            base_url = config.url.rstrip("/")
+        else:
+            temp_dir = tempfile.TemporaryDirectory(prefix="linuxplus_load_")
+            base_url, server = start_local_server(config, Path(temp_dir.name))
+            print(f"🌐 Local server started at {base_url} (data: {temp_dir.name})")
+
+        results = asyncio.run(run_load_test(config, base_url))
+        print_report(results, config)
+
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"config": config.__dict__, "results": results.to_dict()}, f, indent=2)
+            print(f"Results written to {args.json}")
+        return 0
+    finally:
+        if server is not None:
+            server.shutdown()
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
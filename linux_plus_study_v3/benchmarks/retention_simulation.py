@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Retention Simulation for Question Selection Policies
+
+Replays a synthetic learner over a number of study days and measures how
+much each review buys. The learner has a hidden memory per question
+(exponential forgetting, difficulty-dependent growth, a spacing effect and
+a guessing floor for four options) that neither policy can see; policies
+only observe right/wrong answers, as in the app.
+
+Policies:
+    spaced    ReviewScheduler in spaced review mode: due cards first, new
+              cards capped per session, one batch reschedule per session
+    weighted  QuestionManager.select_question with the legacy accuracy and
+              attempts weighting over the running study history
+
+Each day runs one session of at most --reviews-per-day questions; the
+spaced policy stops early when nothing is due. The report gives reviews
+spent, recall rate at review time, mean recall over the pool at the end,
+and retention per review (expected cards remembered at the end per 100
+reviews).
+
+Examples:
+    python benchmarks/retention_simulation.py
+    python benchmarks/retention_simulation.py --cards 2000 --days 90 --reviews-per-day 60
+    python benchmarks/retention_simulation.py --json /tmp/retention.json
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from models.spaced_repetition import DAY, ReviewScheduler  # noqa: E402
+from utils.config import SPACED_REVIEW_NEW_CARDS, SPACED_REVIEW_TARGET_RETENTION  # noqa: E402
+
+POLICIES = ("spaced", "weighted")
+GUESS_PROBABILITY = 0.25  # Four answer options
+SECONDS_PER_ANSWER = 20.0
+
+
+@dataclass
+class SimulationConfig:
+    """Parameters for one simulation run."""
+    cards: int = 500
+    days: int = 30
+    reviews_per_day: int = 30
+    new_cards_per_session: int = SPACED_REVIEW_NEW_CARDS
+    target_retention: float = SPACED_REVIEW_TARGET_RETENTION
+    seed: int = 42
+
+
+class SimulatedLearner:
+    """Hidden memory model the policies are evaluated against."""
+
+    def __init__(self, cards: int, seed: int):
+        self.rng = random.Random(seed)
+        self.difficulty = [self.rng.uniform(0.5, 1.5) for _ in range(cards)]
+        self.stability = [0.0] * cards  # days; 0 = never studied
+        self.last_seen = [0.0] * cards
+
+    def recall_probability(self, card: int, now: float) -> float:
+        """Memory-only recall probability (no guessing)."""
+        if self.stability[card] <= 0:
+            return 0.0
+        return math.exp(-((now - self.last_seen[card]) / DAY) / self.stability[card])
+
+    def answer(self, card: int, now: float) -> bool:
+        """Answer a question and learn from the explanation shown afterwards."""
+        recall = self.recall_probability(card, now)
+        correct = self.rng.random() < GUESS_PROBABILITY + (1 - GUESS_PROBABILITY) * recall
+        difficulty = self.difficulty[card]
+        if self.stability[card] <= 0:
+            self.stability[card] = 1.0 / difficulty
+        elif correct:
+            # Spacing effect: recalling a half-forgotten card strengthens it most
+            self.stability[card] *= 1.1 + (2.0 / difficulty) * (1 - recall)
+        else:
+            self.stability[card] = max(0.5 / difficulty, self.stability[card] * 0.4)
+        self.last_seen[card] = now
+        return correct
+
+
+def _run_spaced(config: SimulationConfig, learner: SimulatedLearner, texts: List[str]) -> List[bool]:
+    scheduler = ReviewScheduler(target_retention=config.target_retention,
+                                new_cards_per_session=config.new_cards_per_session)
+    scheduler.sync((text, "sim") for text in texts)
+    positions = {text: i for i, text in enumerate(texts)}
+    outcomes: List[bool] = []
+    for day in range(config.days):
+        now = day * DAY
+        scheduler.begin_session()
+        results = []
+        for _ in range(config.reviews_per_day):
+            key = scheduler.take(now)
+            if key is None:
+                break
+            correct = learner.answer(positions[key], now)
+            results.append((key, correct, now))
+            outcomes.append(correct)
+            now += SECONDS_PER_ANSWER
+        scheduler.reschedule(results)
+    return outcomes
+
+
+def _run_weighted(config: SimulationConfig, learner: SimulatedLearner, texts: List[str]) -> List[bool]:
+    from models.question import Question, QuestionManager
+
+    manager = QuestionManager()
+    manager.questions = [Question(text, ["a", "b", "c", "d"], 0, "sim") for text in texts]
+    manager.categories = {"sim"}
+    manager.reset_session()
+    positions = {text: i for i, text in enumerate(texts)}
+    history: Dict[str, Dict[str, int]] = {}
+    outcomes: List[bool] = []
+    random.seed(config.seed)  # select_question draws from the module-level RNG
+    for day in range(config.days):
+        now = day * DAY
+        manager.reset_session()
+        for _ in range(config.reviews_per_day):
+            question, _ = manager.select_question(None, {"questions": history})
+            if question is None:
+                break
+            correct = learner.answer(positions[question.text], now)
+            stats = history.setdefault(question.text, {"correct": 0, "attempts": 0})
+            stats["attempts"] += 1
+            stats["correct"] += int(correct)
+            outcomes.append(correct)
+            now += SECONDS_PER_ANSWER
+    return outcomes
+
+
+def run_simulation(policy: str, config: SimulationConfig) -> Dict[str, Any]:
+    """
+    Simulate one policy.
+
+    Args:
+        policy: "spaced" or "weighted"
+        config: Simulation parameters
+
+    Returns:
+        dict: reviews, recall_at_review, mean_retention, retained_cards,
+        retention_per_100_reviews and cards_studied
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy {policy!r}; expected one of {POLICIES}")
+    learner = SimulatedLearner(config.cards, config.seed)
+    texts = [f"Simulated question {i}" for i in range(config.cards)]
+    run = _run_spaced if policy == "spaced" else _run_weighted
+    outcomes = run(config, learner, texts)
+
+    end = config.days * DAY
+    retained = math.fsum(learner.recall_probability(i, end) for i in range(config.cards))
+    reviews = len(outcomes)
+    return {
+        "policy": policy,
+        "reviews": reviews,
+        "cards_studied": sum(1 for s in learner.stability if s > 0),
+        "recall_at_review": (sum(outcomes) / reviews) if reviews else 0.0,
+        "mean_retention": retained / config.cards if config.cards else 0.0,
+        "retained_cards": retained,
+        "retention_per_100_reviews": (100.0 * retained / reviews) if reviews else 0.0,
+    }
+
+
+def print_report(results: List[Dict[str, Any]], config: SimulationConfig) -> None:
+    """Print a comparison table."""
+    print(f"\nRetention simulation: {config.cards} cards, {config.days} days, "
+          f"up to {config.reviews_per_day} reviews/day (seed {config.seed})")
+    print(f"{'policy':<10} {'reviews':>8} {'studied':>8} {'recall@rev':>11} "
+          f"{'retention':>10} {'retained':>9} {'per 100 rev':>12}")
+    for r in results:
+        print(f"{r['policy']:<10} {r['reviews']:>8} {r['cards_studied']:>8} {r['recall_at_review']:>10.1%} "
+              f"{r['mean_retention']:>9.1%} {r['retained_cards']:>9.1f} {r['retention_per_100_reviews']:>12.2f}")
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    """Create the command line parser."""
+    defaults = SimulationConfig()
+    parser = argparse.ArgumentParser(description="Simulate learner retention per review for selection policies")
+    parser.add_argument("--cards", type=int, default=defaults.cards, help="Questions in the pool")
+    parser.add_argument("--days", type=int, default=defaults.days, help="Study days to simulate")
+    parser.add_argument("--reviews-per-day", type=int, default=defaults.reviews_per_day,
+                        help="Maximum questions per daily session")
+    parser.add_argument("--new-cards", type=int, default=defaults.new_cards_per_session,
+                        help="New cards per spaced review session")
+    parser.add_argument("--target-retention", type=float, default=defaults.target_retention,
+                        help="Recall probability the scheduler aims for")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Random seed")
+    parser.add_argument("--policy", choices=POLICIES, action="append",
+                        help="Policy to run (repeatable; default all)")
+    parser.add_argument("--json", metavar="PATH", help="Write results as JSON")
+    return parser
+
+
+def main() -> int:
+    """Command line entry point."""
+    args = create_argument_parser().parse_args()
+    config = SimulationConfig(cards=args.cards, days=args.days, reviews_per_day=args.reviews_per_day,
+                              new_cards_per_session=args.new_cards,
+                              target_retention=args.target_retention, seed=args.seed)
+    results = [run_simulation(policy, config) for policy in (args.policy or POLICIES)]
+    print_report(results, config)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": asdict(config), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,9 +11,12 @@ import hashlib
 from datetime import datetime
 from typing import Optional, Dict, Any, Union, List, Tuple
 from utils.config import *
-from utils.game_values import get_game_value_manager
+from utils.game_values import GameValuesSnapshot, get_game_value_manager, get_game_values
 from services.simple_analytics import get_analytics_manager
 from services.time_tracking_service import get_time_tracker
+from utils.unit_of_work import unit_of_work, UnitOfWork
+from services.leaderboard_service import get_leaderboard_service
+from services.question_paper_service import QuestionPaperPool, generate_paper
 
 class QuizController:
     """Handles quiz logic and session management."""
@@ -29,6 +32,40 @@ class QuizController:
     quick_fire_duration: Optional[float]    # Duration of quick fire mode session
     last_question: Optional[Dict[str, Any]]  # Cache for the last processed question
 
+    # Per-session attributes and their fresh-session values (see
+    # export_session_state); the current question, verify answers and spaced
+    # review results are exported separately as pool keys (question_paper
+    # already holds pool keys)
+    SESSION_FIELDS: Dict[str, Any] = {
+        'current_quiz_mode': QUIZ_MODE_STANDARD,
+        'quiz_active': False,
+        'category_filter': None,
+        'custom_question_limit': None,
+        'current_user_id': "anonymous",
+        'session_score': 0,
+        'session_total': 0,
+        'current_streak': 0,
+        'questions_since_break': 0,
+        'session_start_time': None,
+        'last_session_results': None,
+        'quick_fire_active': False,
+        'quick_fire_start_time': None,
+        'quick_fire_questions_answered': 0,
+        'timed_mode_active': False,
+        'timed_mode_start_time': None,
+        'time_per_question': TIMED_CHALLENGE_TIME_PER_QUESTION,
+        'current_question_start_time': None,
+        'survival_mode_active': False,
+        'survival_lives': SURVIVAL_MODE_LIVES,
+        'exam_mode_active': False,
+        'exam_start_time': None,
+        'spaced_review_total': 0,
+        'question_paper': None,
+        'paper_position': 0,
+        'daily_challenge_completed': False,
+        'last_daily_challenge_date': None,
+    }
+
     def __init__(self, game_state: Any):
         """
         Initialize the quiz controller.
@@ -54,6 +91,7 @@ class QuizController:
         self.session_score = 0
         self.session_total = 0
         self.session_answers = []  # For verify mode
+        self.current_user_id = "anonymous"  # Profile credited on the global leaderboard
         
         # Daily challenge
         self.daily_challenge_completed = False
@@ -68,14 +106,16 @@ class QuizController:
         # Custom question limit for web interface
         self.custom_question_limit: Optional[int] = None
         
-        # Initialize scoring settings from game values
-        game_values = get_game_value_manager()
-        self.points_per_question: int = game_values.get_value('scoring', 'points_per_correct', 10)
-        self.points_per_incorrect: int = game_values.get_value('scoring', 'points_per_incorrect', 0)
-        self.streak_bonus: int = game_values.get_value('scoring', 'streak_bonus', 5)
-        self.max_streak_bonus: int = game_values.get_value('scoring', 'max_streak_bonus', 50)
-        self.hint_penalty: int = game_values.get_value('scoring', 'hint_penalty', 5)
-        self.speed_bonus: int = game_values.get_value('scoring', 'speed_bonus', 5)
+        # Initialize scoring settings from game values; later changes are
+        # pushed to refresh_game_values by the manager
+        self.points_per_question: int
+        self.points_per_incorrect: int
+        self.streak_bonus: int
+        self.max_streak_bonus: int
+        self.hint_penalty: int
+        self.speed_bonus: int
+        self.refresh_game_values()
+        get_game_value_manager().subscribe(self.refresh_game_values)
         self.debug_mode: bool = False
         
         # Timed mode attributes
@@ -95,6 +135,18 @@ class QuizController:
         self.exam_mode_active = False
         self.exam_start_time: Optional[float] = None
         
+        # Spaced review mode attributes; results are rescheduled in one batch
+        # when the session ends
+        self.spaced_review_total = 0
+        self.spaced_review_results: List[Tuple[str, bool, float]] = []
+        self.spaced_review_pending: Optional[str] = None
+        
+        # Question paper of fixed-length modes: pool keys drawn when the
+        # session starts, asked in order (see services.question_paper_service)
+        self.question_paper: Optional[List[int]] = None
+        self.paper_position = 0
+        self._exam_papers: Optional[QuestionPaperPool] = None
+        
         # Session timing
         self.session_start_time: Optional[float] = None
 
@@ -120,13 +172,107 @@ class QuizController:
     def has_cached_question(self) -> bool:
         """Check if there's a cached current question."""
         return hasattr(self, '_current_question_cache') and self._current_question_cache is not None
-    
+
+    def export_session_state(self) -> Dict[str, Any]:
+        """
+        Export the current quiz session for services.quiz_session_store.
+
+        Attributes still at their SESSION_FIELDS values are left out, and
+        questions are referenced by pool key, so a state is typically under
+        1 KB.
+
+        Returns:
+            dict: {'pool': fingerprint, 'quiz': {...}, 'game': {...}}; empty for a fresh session
+        """
+        quiz: Dict[str, Any] = {}
+        for name, default in self.SESSION_FIELDS.items():
+            value = getattr(self, name, default)
+            if value != default:
+                quiz[name] = value
+
+        question_manager = self.game_state.question_manager
+        cached = self._current_question_cache if self.has_cached_question() else None
+        if cached is not None:
+            question = {k: v for k, v in cached.items() if k != 'question_data'}
+            question['original_index'] = next(iter(question_manager.to_pool_keys([cached['original_index']])), -1)
+            quiz['question'] = question
+        if self.session_answers:
+            quiz['answers'] = [[question_manager.pool_key_of(question_data[0]), answer, correct]
+                               for question_data, answer, correct in self.session_answers]
+        if self.spaced_review_results:
+            quiz['review'] = [[question_manager.pool_key_of(text), correct, answered_at]
+                              for text, correct, answered_at in self.spaced_review_results]
+        if self.spaced_review_pending is not None:
+            quiz['review_pending'] = question_manager.pool_key_of(self.spaced_review_pending)
+
+        game = self.game_state.export_session_state()
+        if not quiz and not game:
+            return {}
+        return {'pool': question_manager.pool_fingerprint(), 'quiz': quiz, 'game': game}
+
+    def load_session_state(self, state: Optional[Dict[str, Any]]) -> None:
+        """
+        Replace the current quiz session with an exported one.
+
+        When the state comes from a pool with different content (questions
+        were added or removed in between), the references to questions are
+        dropped and the rest of the session is kept.
+
+        Args:
+            state (dict, optional): Output of export_session_state (None for a fresh session)
+        """
+        state = state or {}
+        quiz: Dict[str, Any] = state.get('quiz', {})
+        question_manager = self.game_state.question_manager
+        same_pool = bool(state) and state.get('pool') == question_manager.pool_fingerprint()
+        if state and not same_pool:
+            print("Warning: Question pool changed since the quiz session was saved; dropping its question references")
+
+        for name, default in self.SESSION_FIELDS.items():
+            setattr(self, name, quiz.get(name, default))
+        if not same_pool:
+            self.question_paper = None
+            self.paper_position = 0
+        self.session_answers = []
+        self.spaced_review_results = []
+        self.spaced_review_pending = None
+        self.last_question = None
+        self.clear_current_question_cache()
+
+        if same_pool:
+            questions = question_manager.questions
+
+            def question_at(key: int) -> Optional[Any]:
+                indices = question_manager.from_pool_keys([key])
+                return questions[indices[0]] if indices else None
+
+            cached = quiz.get('question')
+            if cached is not None:
+                indices = question_manager.from_pool_keys([cached['original_index']])
+                if indices:
+                    self.cache_current_question({**cached,
+                                                 'original_index': indices[0],
+                                                 'question_data': questions[indices[0]].to_tuple()})
+            for key, answer, correct in quiz.get('answers', []):
+                question = question_at(key)
+                if question is not None:
+                    self.session_answers.append((question.to_tuple(), answer, correct))
+            for key, correct, answered_at in quiz.get('review', []):
+                question = question_at(key)
+                if question is not None:
+                    self.spaced_review_results.append((question.text, correct, answered_at))
+            if 'review_pending' in quiz:
+                question = question_at(quiz['review_pending'])
+                self.spaced_review_pending = question.text if question is not None else None
+
+        self.game_state.load_session_state(state.get('game'), same_pool=same_pool)
+
     def start_quiz_session(self, mode: str = QUIZ_MODE_STANDARD, category_filter: Optional[str] = None) -> dict[str, Any]:
         """
         Start a new quiz session.
         
         Args:
-            mode (str): Quiz mode (standard, verify, quick_fire, timed, survival, category, exam)
+            mode (str): Quiz mode (standard, verify, quick_fire, timed, survival, category, exam, spaced_review)
             category_filter (str): Category to filter questions by
             
         Returns:
@@ -143,6 +289,12 @@ class QuizController:
         self.current_streak = 0
         self.questions_since_break = 0
         
+        # Open (and on first run seed) the global leaderboard before any results are recorded
+        try:
+            get_leaderboard_service()
+        except Exception as e:
+            print(f"Warning: Global leaderboard unavailable: {e}")
+        
         # Track session start time for real duration measurement
         self.session_start_time = time.time()
         
@@ -154,25 +306,32 @@ class QuizController:
         self.timed_mode_active = False
         self.survival_mode_active = False
         self.exam_mode_active = False
+        self.question_paper = None
+        self.paper_position = 0
         
         # Handle special modes
         if mode == "quick_fire":
             self.start_quick_fire_mode()
             total_questions = QUICK_FIRE_QUESTIONS
+            self._draw_question_paper(total_questions, category_filter)
         elif mode == "mini_quiz":
             total_questions = min(MINI_QUIZ_QUESTIONS, self._get_available_questions_count(category_filter))
+            self._draw_question_paper(total_questions, category_filter)
         elif mode == QUIZ_MODE_TIMED:
             self.start_timed_mode()
             total_questions = self.custom_question_limit if self.custom_question_limit else TIMED_CHALLENGE_QUESTIONS
+            self._draw_question_paper(total_questions, category_filter)
         elif mode == QUIZ_MODE_SURVIVAL:
             self.start_survival_mode()
             total_questions = float('inf')  # Unlimited questions until death
         elif mode == QUIZ_MODE_EXAM:
             self.start_exam_mode()
-            total_questions = EXAM_MODE_QUESTIONS
+            total_questions = self._draw_exam_paper(category_filter)
         elif mode == QUIZ_MODE_CATEGORY_FOCUS:
             # Category focus mode - use all questions from selected category
             total_questions = self._get_available_questions_count(category_filter)
+        elif mode == QUIZ_MODE_SPACED_REVIEW:
+            total_questions = self.start_spaced_review_mode(category_filter)
         else:
             # Standard mode - check for custom question limit first
             if self.custom_question_limit:
@@ -230,8 +389,14 @@ class QuizController:
         if self.current_quiz_mode == "daily_challenge":
             return self.get_daily_challenge_question()
         
-        # Regular question selection
-        question_result = self.game_state.select_question(category_filter)
+        # Spaced review asks whatever the scheduler has due, fixed-length modes
+        # their question paper; other modes use weighted selection
+        if self.current_quiz_mode == QUIZ_MODE_SPACED_REVIEW:
+            question_result = self._select_spaced_review_question(category_filter)
+        elif self.question_paper is not None:
+            question_result = self._next_paper_question()
+        else:
+            question_result = self.game_state.select_question(category_filter)
         question_data, original_index = question_result
         
         if question_data is not None:
@@ -255,6 +420,8 @@ class QuizController:
                 total_questions = EXAM_MODE_QUESTIONS
             elif self.current_quiz_mode == QUIZ_MODE_SURVIVAL:
                 total_questions = None  # Unlimited until death
+            elif self.current_quiz_mode == QUIZ_MODE_SPACED_REVIEW:
+                total_questions = self.spaced_review_total
             elif self.current_quiz_mode in ["daily_challenge", "pop_quiz"]:
                 total_questions = 1
             else:
@@ -263,6 +430,8 @@ class QuizController:
                     total_questions = self.custom_question_limit
                 else:
                     total_questions = self._get_available_questions_count(self.category_filter)
+            if self.question_paper is not None:
+                total_questions = len(self.question_paper)
             
             result: Dict[str, Any] = {
                 'question_data': question_data,
@@ -349,6 +518,9 @@ class QuizController:
         accuracy = (self.session_score / self.session_total * 100) if self.session_total > 0 else 0.0
         session_points = getattr(self.game_state, 'session_points', 0)
         
+        # Reschedule answered spaced review cards so the save includes them
+        self._finish_spaced_review()
+        
         # Save progress before clearing session state
         if self.session_total > 0:  # Only save if there was actual activity
             try:
@@ -405,8 +577,10 @@ class QuizController:
         if self.quick_fire_active:
             self.end_quick_fire_mode()
         
-        # Clear question cache
+        # Clear question cache and paper
         self.clear_current_question_cache()
+        self.question_paper = None
+        self.paper_position = 0
         
         # Clear category filter
         if hasattr(self, 'category_filter'):
@@ -427,6 +601,10 @@ class QuizController:
         """
         Process a submitted answer.
         
+        Runs inside a unit of work (joining the caller's if one is active), so
+        history, achievements, time tracking and analytics are written in one
+        batch at the end and rolled back together if processing fails.
+        
         Args:
             question_data (tuple): Question data tuple
             user_answer_index (int, optional): User's selected answer index (None for timeout)
@@ -435,6 +613,37 @@ class QuizController:
         Returns:
             dict: Answer processing results
         """
+        with unit_of_work("submit_answer") as uow:
+            self._snapshot_answer_state(uow)
+            return self._process_answer(question_data, user_answer_index, original_index)
+    
+    def _snapshot_answer_state(self, uow: UnitOfWork) -> None:
+        """
+        Register the in-memory state an answer may mutate for rollback.
+        
+        Only what _process_answer (and end_session, when the answer completes
+        the session) changes is copied, so the cost does not grow with the
+        rest of the controller and achievement state.
+        """
+        uow.snapshot_attrs(self, 'quiz_active', 'current_quiz_mode', 'session_score', 'session_total',
+                           'current_streak', 'questions_since_break', 'session_answers',
+                           'survival_mode_active', 'survival_lives', 'survival_high_score',
+                           'survival_high_score_xp', 'timed_mode_active', 'exam_mode_active',
+                           'quick_fire_active', 'quick_fire_questions_answered', 'question_paper',
+                           'paper_position', 'custom_question_limit', 'session_start_time',
+                           'spaced_review_results', 'spaced_review_pending',
+                           'last_session_results', 'last_question')
+        uow.snapshot_attrs(self.game_state, 'score', 'total_questions_session',
+                           'session_points', 'answered_indices_session')
+        achievement_system = self.game_state.achievement_system
+        uow.snapshot_attrs(achievement_system, 'session_points', 'leaderboard')
+        uow.snapshot_items(achievement_system.achievements, 'questions_answered', 'points_earned',
+                           'badges', 'days_studied', 'streaks_achieved', 'leaderboard',
+                           'survival_high_score', 'survival_high_score_xp')
+        uow.snapshot_items(self.game_state.study_history, 'leaderboard')
+    
+    def _process_answer(self, question_data: tuple[str, list[str], int, str, str], user_answer_index: Optional[int], original_index: int) -> dict[str, Any]:
+        """Apply a submitted answer; see submit_answer."""
         if not self.quiz_active or len(question_data) < 5:
             return {'error': 'Invalid quiz state or question data'}
         
@@ -478,9 +687,14 @@ class QuizController:
         self.game_state.update_points(points_earned)
         
         # Update history
-        if 0 <= original_index < len(self.game_state.questions):
-            original_question_text = self.game_state.questions[original_index][0]
+        questions = self.game_state.question_manager.questions
+        if 0 <= original_index < len(questions):
+            original_question_text = questions[original_index].text
             self.game_state.update_history(original_question_text, category, is_correct)
+            if (self.current_quiz_mode == QUIZ_MODE_SPACED_REVIEW and
+                    original_question_text == self.spaced_review_pending):
+                self.spaced_review_results.append((original_question_text, is_correct, time.time()))
+                self.spaced_review_pending = None
         
         # Check achievements
         new_badges = self.game_state.check_achievements(is_correct, self.current_streak)
@@ -649,6 +863,9 @@ class QuizController:
         if self.quick_fire_active:
             self.quick_fire_active = False
         
+        # Reschedule this session's spaced review answers in one batch
+        spaced_review_rescheduled = self._finish_spaced_review()
+        
         # Track quiz time in the time tracking service
         try:
             time_tracker = get_time_tracker()
@@ -677,6 +894,18 @@ class QuizController:
         except Exception as e:
             print(f"Warning: Failed to save progress during session end: {e}")
         
+        # Credit the session on the cross-profile leaderboard (once per session)
+        if self.session_total > 0:
+            try:
+                get_leaderboard_service().record_session(
+                    self.current_user_id,
+                    points=max(0, self.game_state.session_points),
+                    correct=self.session_score,
+                    total=self.session_total
+                )
+            except Exception as e:
+                print(f"Warning: Failed to update global leaderboard: {e}")
+        
         session_results: Dict[str, Any] = {
             'session_score': self.session_score,
             'session_total': self.session_total,
@@ -685,7 +914,8 @@ class QuizController:
             'total_points': self.game_state.achievements.get('points_earned', 0),
             'mode': self.current_quiz_mode,
             'session_duration': session_duration,  # Actual time spent in seconds
-            'verify_answers': self.session_answers if self.current_quiz_mode == QUIZ_MODE_VERIFY else None
+            'verify_answers': self.session_answers if self.current_quiz_mode == QUIZ_MODE_VERIFY else None,
+            'spaced_review_rescheduled': spaced_review_rescheduled if self.current_quiz_mode == QUIZ_MODE_SPACED_REVIEW else None
         }
         
         # Save results for API retrieval
@@ -710,6 +940,8 @@ class QuizController:
         self.survival_high_score_xp = self.game_state.achievement_system.get_survival_high_score_xp()
         self.timed_mode_active = False
         self.exam_mode_active = False
+        self.question_paper = None
+        self.paper_position = 0
         
         return session_results
     
@@ -762,6 +994,108 @@ class QuizController:
             'time_limit': EXAM_MODE_TIME_LIMIT,
             'total_questions': EXAM_MODE_QUESTIONS
         }
+
+    def _draw_question_paper(self, size: int, category_filter: Optional[str] = None,
+                             blueprint: Optional[Dict[str, Dict[str, Any]]] = None) -> int:
+        """
+        Draw the session's question paper.
+
+        Returns:
+            int: Number of questions on the paper
+        """
+        self.question_paper = generate_paper(
+            self.game_state.question_manager,
+            self.game_state.study_history.get('questions', {}),
+            size,
+            blueprint=blueprint,
+            category_filter=category_filter
+        )
+        self.paper_position = 0
+        return len(self.question_paper)
+
+    def _draw_exam_paper(self, category_filter: Optional[str] = None) -> int:
+        """
+        Set up an exam paper following EXAM_BLUEPRINT, pre-generated when possible.
+
+        Returns:
+            int: Number of exam questions (fewer than EXAM_MODE_QUESTIONS on a small pool)
+        """
+        if category_filter is None:
+            if self._exam_papers is None:
+                self._exam_papers = QuestionPaperPool(self._build_exam_paper)
+            paper = self._exam_papers.take(self.game_state.question_manager.pool_fingerprint())
+            if paper is not None:
+                self.question_paper = paper
+                self.paper_position = 0
+                return len(paper)
+        return self._draw_question_paper(EXAM_MODE_QUESTIONS, category_filter, blueprint=EXAM_BLUEPRINT)
+
+    def _build_exam_paper(self) -> Tuple[str, List[int]]:
+        """Build one exam paper for the background pool: (pool fingerprint, paper)."""
+        question_manager = self.game_state.question_manager
+        fingerprint = question_manager.pool_fingerprint()
+        return fingerprint, generate_paper(
+            question_manager,
+            self.game_state.study_history.get('questions', {}),
+            EXAM_MODE_QUESTIONS,
+            blueprint=EXAM_BLUEPRINT
+        )
+
+    def _next_paper_question(self) -> Tuple[Optional[Tuple[str, List[str], int, str, str]], int]:
+        """Next question on the paper: (question_data, original_index), or (None, -1) when it is used up."""
+        question_manager = self.game_state.question_manager
+        while self.question_paper is not None and self.paper_position < len(self.question_paper):
+            key = self.question_paper[self.paper_position]
+            self.paper_position += 1
+            indices = question_manager.from_pool_keys([key])
+            if indices:
+                return question_manager.questions[indices[0]].to_tuple(), indices[0]
+        return None, -1
+
+    def start_spaced_review_mode(self, category_filter: Optional[str] = None) -> int:
+        """
+        Initialize spaced review mode.
+        
+        Args:
+            category_filter (str, optional): Category to review
+            
+        Returns:
+            int: Number of questions in the session (due cards plus new cards, capped)
+        """
+        # Results of a session that was never ended still count
+        self._finish_spaced_review()
+        scheduler = self.game_state.review_scheduler
+        scheduler.release_all()
+        scheduler.begin_session()
+        limit = self.custom_question_limit if self.custom_question_limit else SPACED_REVIEW_QUESTIONS
+        self.spaced_review_total = scheduler.session_size(time.time(), category_filter, limit)
+        return self.spaced_review_total
+    
+    def _select_spaced_review_question(self, category_filter: Optional[str] = None) -> Tuple[Optional[Tuple[str, List[str], int, str, str]], int]:
+        """Check out the next due card, returning a previously fetched but unanswered one first."""
+        if self.session_total >= self.spaced_review_total:
+            return None, -1
+        if self.spaced_review_pending is not None:
+            self.game_state.review_scheduler.release(self.spaced_review_pending)
+            self.spaced_review_pending = None
+        question_data, original_index = self.game_state.select_due_question(category_filter)
+        if question_data is not None:
+            self.spaced_review_pending = question_data[0]
+        return question_data, original_index
+    
+    def _finish_spaced_review(self) -> int:
+        """Batch-reschedule the session's spaced review answers; returns how many cards moved."""
+        if not self.spaced_review_results and self.spaced_review_pending is None:
+            return 0
+        try:
+            rescheduled = self.game_state.reschedule_reviews(self.spaced_review_results)
+        except Exception as e:
+            print(f"Warning: Failed to reschedule spaced review cards: {e}")
+            rescheduled = []
+        self.spaced_review_results = []
+        self.spaced_review_pending = None
+        return len(rescheduled)
+    
     def _end_quick_fire_mode_internal(self, time_up: bool) -> None:
         """
         End Quick Fire mode and save results (internal implementation).
@@ -1072,9 +1406,7 @@ class QuizController:
                 points = int(points * bonus_multiplier)
             
             # Apply XP multiplier
-            game_values = get_game_value_manager()
-            xp_multiplier = game_values.get_value('scoring', 'xp_multiplier', 1.0)
-            points = int(points * xp_multiplier)
+            points = int(points * get_game_values().scoring.xp_multiplier)
             
             return points
         else:
@@ -1083,11 +1415,11 @@ class QuizController:
     
     def _get_available_questions_count(self, category_filter: Optional[str] = None) -> int:
         """Get count of available questions for the filter."""
+        questions = self.game_state.question_manager.questions
         if category_filter is None:
-            return len(self.game_state.questions)
+            return len(questions)
         else:
-            return sum(1 for q in self.game_state.questions 
-                      if len(q) > 3 and q[3] == category_filter)
+            return sum(1 for q in questions if q.category == category_filter)
     
     def _get_quick_fire_remaining(self) -> Optional[Dict[str, Union[float, int]]]:
         """Get remaining Quick Fire questions and time."""
@@ -1135,12 +1467,23 @@ class QuizController:
             print(f"DEBUG: Exam simulation complete")
             return True
         
+        # Question paper used up (fixed-length modes on a small pool)
+        if self.question_paper is not None and self.paper_position >= len(self.question_paper):
+            print(f"DEBUG: Question paper complete")
+            return True
+        
         # Check exam mode time limit
         if (self.exam_mode_active and self.exam_start_time and 
             (time.time() - self.exam_start_time) >= EXAM_MODE_TIME_LIMIT):
             print(f"DEBUG: Exam time limit reached")
             return True
         
+        # Spaced review completion (session size fixed at start)
+        if (self.current_quiz_mode == QUIZ_MODE_SPACED_REVIEW and
+            self.session_total >= self.spaced_review_total):
+            print(f"DEBUG: Spaced review complete")
+            return True
+        
         # Mini quiz completion
         if (self.current_quiz_mode == "mini_quiz" and 
             self.session_total >= MINI_QUIZ_QUESTIONS):
@@ -1208,12 +1551,18 @@ class QuizController:
                 int(self.current_streak_bonus), int(self.max_streak_bonus)
             )
     
-    def refresh_game_values(self) -> None:
-        """Refresh settings from the game values manager."""
-        game_values = get_game_value_manager()
-        self.points_per_question = game_values.get_value('scoring', 'points_per_correct', 10)
-        self.points_per_incorrect = game_values.get_value('scoring', 'points_per_incorrect', 0)
-        self.streak_bonus = game_values.get_value('scoring', 'streak_bonus', 5)
-        self.max_streak_bonus = game_values.get_value('scoring', 'max_streak_bonus', 50)
-        self.hint_penalty = game_values.get_value('scoring', 'hint_penalty', 5)
-        self.speed_bonus = game_values.get_value('scoring', 'speed_bonus', 5)
\ No newline at end of file
+    def refresh_game_values(self, snapshot: Optional[GameValuesSnapshot] = None) -> None:
+        """
+        Refresh settings from a game values snapshot.
+        
+        Args:
+            snapshot: Snapshot to apply (default: the current one). The game
+                value manager calls this with each new snapshot.
+        """
+        scoring = (snapshot or get_game_values()).scoring
+        self.points_per_question = scoring.points_per_correct
+        self.points_per_incorrect = scoring.points_per_incorrect
+        self.streak_bonus = scoring.streak_bonus
+        self.max_streak_bonus = scoring.max_streak_bonus
+        self.hint_penalty = scoring.hint_penalty
+        self.speed_bonus = scoring.speed_bonus
\ No newline at end of file
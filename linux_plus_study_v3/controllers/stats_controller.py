@@ -496,33 +496,8 @@ class StatsController:
             session_total (int): Total questions answered in session  
             session_points (int): Points earned in session
         """
-        if session_total == 0:
-            return
-        
-        accuracy = (session_score / session_total) * 100
-        entry: LeaderboardEntry = {
-            "date": datetime.now().isoformat(),
-            "score": session_score,
-            "total": session_total,
-            "accuracy": accuracy,
-            "points": session_points
-        }
-        
-        # Use the achievement system's leaderboard instead of direct property access
-        self.game_state.achievement_system.leaderboard.append(entry)
-        
-        # Keep only top 10 sessions, sorted by accuracy then points
-        def sort_key(entry: LeaderboardEntry) -> Tuple[float, int]:
-            return (float(entry["accuracy"]), int(entry["points"]))
-            
-        self.game_state.achievement_system.leaderboard.sort(
-            key=sort_key, 
-            reverse=True
-        )
-        self.game_state.achievement_system.leaderboard = self.game_state.achievement_system.leaderboard[:10]
-        
-        # Update in history
-        self.game_state.study_history["leaderboard"] = self.game_state.achievement_system.leaderboard
+        # Single code path: AchievementSystem owns the per-install top 10
+        self.game_state.update_leaderboard(session_score, session_total, session_points)
     
     def get_review_questions_data(self) -> ReviewQuestionsData:
         """
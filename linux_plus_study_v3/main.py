@@ -24,6 +24,7 @@ from models.game_state import GameState
 from controllers.quiz_controller import QuizController
 from controllers.stats_controller import StatsController
 from services.analytics_integration import WebAnalyticsTracker
+from utils.performance_metrics import PerformanceMetrics, timed, COMPONENT_STARTUP
 # Ensure Python 3.8+ compatibility
 if sys.version_info < (3, 8):
     print("Linux Plus Study System requires Python 3.8+. Please upgrade your Python installation.")
@@ -141,7 +142,8 @@ class LinuxPlusStudySystem:
             from controllers.stats_controller import StatsController
             
             # Initialize game state first
-            game_state = GameState()
+            with timed(COMPONENT_STARTUP):
+                game_state = GameState()
             
             # Initialize controllers with game_state
             quiz_controller = QuizController(game_state)
@@ -340,7 +342,8 @@ class LinuxPlusStudySystem:
         """
         try:
             # Initialize web view with game_state and controllers
-            web_view = LinuxPlusStudyWeb(game_state, debug=self.debug)
+            with timed(COMPONENT_STARTUP):
+                web_view = LinuxPlusStudyWeb(game_state, debug=self.debug)
             
             # The web_view already has a configured Flask app with routes
             app = web_view.app
@@ -352,6 +355,9 @@ class LinuxPlusStudySystem:
             # Initialize analytics tracking
             analytics_tracker = WebAnalyticsTracker(app)
             
+            # Opt-in performance metrics (/metrics, /debug/profile)
+            PerformanceMetrics(app)
+            
             # Add analytics routes
             self._setup_analytics_routes(app)
             
@@ -0,0 +1,36 @@
+"""Add composite analytics indexes for time range queries
+
+Revision ID: analytics_v2_indexes
+Revises: analytics_v1
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = 'analytics_v2_indexes'
+down_revision = 'analytics_v1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create composite indexes used by the dashboard, overview and heatmap queries."""
+    # WHERE user_id = ? AND created_at >= ? ORDER BY created_at
+    op.create_index('ix_analytics_user_created', 'analytics', ['user_id', 'created_at'], unique=False)
+    # WHERE activity_type IN (...) AND created_at >= ?
+    op.create_index('ix_analytics_activity_created', 'analytics', ['activity_type', 'created_at'], unique=False)
+    # Covering index for get_daily_activity_for_user: GROUP BY date(created_at)
+    # reads every selected column from the index instead of the table
+    op.create_index(
+        'ix_analytics_user_activity_daily', 'analytics',
+        ['user_id', 'activity_type', 'created_at', 'questions_attempted', 'session_duration'],
+        unique=False
+    )
+
+
+def downgrade():
+    """Drop the composite indexes."""
+    op.drop_index('ix_analytics_user_activity_daily', table_name='analytics')
+    op.drop_index('ix_analytics_activity_created', table_name='analytics')
+    op.drop_index('ix_analytics_user_created', table_name='analytics')
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Achievement Rule Engine for Linux+ Study Game
+
+Incremental evaluation of threshold achievements. Each rule declares the
+counter it depends on (questions answered, points, days studied, ...).
+Pending rules are kept per counter in a threshold index sorted by the
+condition value. When a counter changes, only that counter's index is
+consulted, and the newly crossed rules are found with a single bisect.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+# Counters rules can depend on
+COUNTER_QUESTIONS = "questions_answered"
+COUNTER_POINTS = "points_earned"
+COUNTER_STREAKS = "streaks_achieved"
+COUNTER_DAYS = "days_studied"
+COUNTER_CURRENT_STREAK = "current_streak"
+
+ALL_COUNTERS = (COUNTER_QUESTIONS, COUNTER_POINTS, COUNTER_STREAKS, COUNTER_DAYS, COUNTER_CURRENT_STREAK)
+
+# Custom achievement condition types mapped to the counter they read
+CUSTOM_CONDITION_COUNTERS = {
+    "questions": COUNTER_QUESTIONS,
+    "points": COUNTER_POINTS,
+    "streaks": COUNTER_STREAKS,
+    "days": COUNTER_DAYS,
+}
+
+
+class BadgeSet(list):
+    """
+    Earned badges: a list in earning order backed by a set.
+
+    Membership tests are O(1) and appending a badge twice is a no-op. It
+    is still a list, so JSON serialization and existing callers keep working.
+    """
+
+    def __init__(self, badges: Iterable[str] = ()):
+        super().__init__()
+        self._members: Set[str] = set()
+        self.extend(badges)
+
+    def __contains__(self, badge: object) -> bool:
+        return badge in self._members
+
+    def __reduce__(self) -> Any:
+        return (BadgeSet, (list(self),))
+
+    def add(self, badge: str) -> bool:
+        """Add a badge; returns True if it was not already earned."""
+        if badge in self._members:
+            return False
+        self._members.add(badge)
+        super().append(badge)
+        return True
+
+    def append(self, badge: str) -> None:
+        self.add(badge)
+
+    def extend(self, badges: Iterable[str]) -> None:
+        for badge in badges:
+            self.add(badge)
+
+    def __iadd__(self, badges: Iterable[str]) -> "BadgeSet":
+        self.extend(badges)
+        return self
+
+    def insert(self, index: int, badge: str) -> None:
+        if badge not in self._members:
+            self._members.add(badge)
+            super().insert(index, badge)
+
+    def remove(self, badge: str) -> None:
+        super().remove(badge)
+        self._members.discard(badge)
+
+    def discard(self, badge: str) -> None:
+        if badge in self._members:
+            self.remove(badge)
+
+    def pop(self, index: int = -1) -> str:
+        badge = super().pop(index)
+        self._members.discard(badge)
+        return badge
+
+    def clear(self) -> None:
+        super().clear()
+        self._members.clear()
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        super().__setitem__(index, value)
+        self._members = set(self)
+
+    def __delitem__(self, index: Any) -> None:
+        super().__delitem__(index)
+        self._members = set(self)
+
+
+@dataclass
+class AchievementRule:
+    """A threshold achievement: unlocked once `counter` reaches `threshold`."""
+    name: str
+    counter: str
+    threshold: int
+    xp_reward: int = 0
+    order: int = 0
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+class ThresholdIndex:
+    """Pending rules for one counter, sorted by threshold."""
+
+    def __init__(self):
+        self._thresholds: List[Any] = []
+        self._rules: List[AchievementRule] = []
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def add(self, rule: AchievementRule) -> None:
+        position = bisect_right(self._thresholds, rule.threshold)
+        self._thresholds.insert(position, rule.threshold)
+        self._rules.insert(position, rule)
+
+    def remove(self, name: str) -> Optional[AchievementRule]:
+        for position, rule in enumerate(self._rules):
+            if rule.name == name:
+                del self._thresholds[position]
+                del self._rules[position]
+                return rule
+        return None
+
+    def pop_crossed(self, value: Any) -> List[AchievementRule]:
+        """Remove and return every rule whose threshold is <= value."""
+        position = bisect_right(self._thresholds, value)
+        if position == 0:
+            return []
+        crossed = self._rules[:position]
+        del self._thresholds[:position]
+        del self._rules[:position]
+        return crossed
+
+    def next_threshold(self) -> Optional[Any]:
+        return self._thresholds[0] if self._thresholds else None
+
+
+class AchievementRuleEngine:
+    """Evaluates pending threshold rules for counters that changed."""
+
+    def __init__(self, rules: Iterable[AchievementRule] = ()):
+        self._indexes: Dict[str, ThresholdIndex] = {}
+        self._pending: Dict[str, AchievementRule] = {}
+        self._dirty: Set[str] = set()
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_rule(self, rule: AchievementRule) -> None:
+        """Register a pending rule; it is checked on the next evaluation."""
+        if rule.name in self._pending:
+            self.remove_rule(rule.name)
+        self._pending[rule.name] = rule
+        self._indexes.setdefault(rule.counter, ThresholdIndex()).add(rule)
+        self._dirty.add(rule.counter)
+
+    def remove_rule(self, name: str) -> bool:
+        rule = self._pending.pop(name, None)
+        if rule is None:
+            return False
+        self._indexes[rule.counter].remove(name)
+        return True
+
+    def has_rule(self, name: str) -> bool:
+        return name in self._pending
+
+    def pending_rules(self) -> List[AchievementRule]:
+        return list(self._pending.values())
+
+    def mark_changed(self, *counters: str) -> None:
+        """Flag counters whose value changed since the last evaluation."""
+        self._dirty.update(counters)
+
+    def mark_all_changed(self) -> None:
+        self._dirty.update(self._indexes.keys())
+
+    def evaluate(self, get_value: Callable[[str], Any],
+                 on_unlock: Optional[Callable[[AchievementRule], None]] = None) -> List[AchievementRule]:
+        """
+        Unlock rules whose counter crossed their threshold.
+
+        Only counters marked as changed are looked at. `on_unlock` may change
+        further counters (e.g. awarding XP); those are evaluated in the same call.
+
+        Args:
+            get_value: Returns the current value of a counter
+            on_unlock: Called for each newly unlocked rule
+
+        Returns:
+            list: Newly unlocked rules in registration order
+        """
+        unlocked: List[AchievementRule] = []
+        while self._dirty:
+            counter = self._dirty.pop()
+            index = self._indexes.get(counter)
+            if not index:
+                continue
+            for rule in index.pop_crossed(get_value(counter)):
+                del self._pending[rule.name]
+                unlocked.append(rule)
+                if on_unlock is not None:
+                    on_unlock(rule)
+        unlocked.sort(key=lambda rule: rule.order)
+        return unlocked
@@ -7,11 +7,21 @@ Manages badges, progress tracking, and achievement calculations.
 
 import json
 import time
+from bisect import bisect_right
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple, Set, TypedDict, cast
 from datetime import datetime, date
-from utils.game_values import get_game_value_manager
+from utils.game_values import get_game_values
 from utils.config import ACHIEVEMENTS_FILE
+from utils.unit_of_work import get_current_unit_of_work
+from models.achievement_rules import (
+    AchievementRule, AchievementRuleEngine, BadgeSet, CUSTOM_CONDITION_COUNTERS,
+    COUNTER_QUESTIONS, COUNTER_POINTS, COUNTER_STREAKS, COUNTER_DAYS, COUNTER_CURRENT_STREAK,
+)
+
+
+# Sessions kept on the per-install leaderboard
+LEADERBOARD_SIZE = 10
 
 
 class LeaderboardEntry(TypedDict):
@@ -53,6 +63,11 @@ class AchievementSystem:
         self.achievements = self.load_achievements()
         self.leaderboard = self.load_leaderboard()
         self.session_points = 0
+        
+        # Rule engines are built lazily and rebuilt when the underlying data is replaced
+        self._builtin_rules: Optional[AchievementRuleEngine] = None
+        self._custom_rules: Optional[AchievementRuleEngine] = None
+        self._rules_source: Tuple[Any, ...] = ()
     
     def load_achievements(self) -> Dict[str, Any]:
         """
@@ -70,13 +85,7 @@ class AchievementSystem:
             for key, default_value in default_achievements.items():
                 achievements.setdefault(key, default_value)
             
-            # Convert days_studied to set if it's a list (for backwards compatibility)
-            if isinstance(achievements.get("days_studied"), list):
-                achievements["days_studied"] = set(achievements["days_studied"])
-            elif not isinstance(achievements.get("days_studied"), set):
-                achievements["days_studied"] = set()
-            
-            return achievements
+            return self._normalize_achievements(achievements)
             
         except (FileNotFoundError, json.JSONDecodeError):
             return self._get_default_achievements()
@@ -84,13 +93,42 @@ class AchievementSystem:
             print(f"Error loading achievements: {e}")
             return self._get_default_achievements()
     
+    @staticmethod
+    def _normalize_achievements(achievements: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Bring in-memory collection types to their canonical form.
+        
+        days_studied is always a set and badges always a BadgeSet in memory;
+        both are stored as lists on disk (see _serialize_achievements).
+        """
+        days_studied = achievements.get("days_studied")
+        if not isinstance(days_studied, set):
+            achievements["days_studied"] = set(days_studied or [])
+        badges = achievements.get("badges")
+        if not isinstance(badges, BadgeSet):
+            achievements["badges"] = BadgeSet(badges or [])
+        return achievements
+    
+    @staticmethod
+    def _serialize_achievements(achievements: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a JSON-ready shallow copy with sets stored as sorted lists."""
+        achievements_copy = achievements.copy()
+        days_studied = achievements_copy.get("days_studied")
+        if isinstance(days_studied, (set, frozenset)):
+            achievements_copy["days_studied"] = sorted(days_studied)
+        if isinstance(achievements_copy.get("badges"), BadgeSet):
+            achievements_copy["badges"] = list(achievements_copy["badges"])
+        return achievements_copy
+    
     def save_achievements(self) -> None:
         """Save achievements to file."""
         try:
-            # Convert set to list for JSON serialization
-            achievements_copy = self.achievements.copy()
-            if isinstance(achievements_copy.get("days_studied"), set):
-                achievements_copy["days_studied"] = list(achievements_copy["days_studied"])
+            achievements_copy = self._serialize_achievements(self.achievements)
+            
+            uow = get_current_unit_of_work()
+            if uow is not None:
+                uow.stage_json(self.achievements_file, achievements_copy, indent=2)
+                return
             
             with open(self.achievements_file, 'w', encoding='utf-8') as f:
                 json.dump(achievements_copy, f, indent=2)
@@ -131,6 +169,7 @@ class AchievementSystem:
         # Only add positive points to total earned
         if final_points > 0:
             self.achievements["points_earned"] = self.achievements.get("points_earned", 0) + final_points
+            self._mark_counters_changed(COUNTER_POINTS)
     
     def check_achievements(self, is_correct: bool, streak_count: int, questions_answered: Optional[int] = None) -> List[str]:
         """
@@ -144,14 +183,14 @@ class AchievementSystem:
         Returns:
             list: List of newly earned badge names
         """
-        new_badges: List[str] = []
         today = datetime.now().date().isoformat()
+        changed = [COUNTER_QUESTIONS, COUNTER_CURRENT_STREAK]
         
         # Add today to days studied
-        if not isinstance(self.achievements.get("days_studied"), set):
-            self.achievements["days_studied"] = set()
-        days_studied = cast(Set[str], self.achievements["days_studied"])
-        days_studied.add(today)
+        days_studied = self._days_studied()
+        if today not in days_studied:
+            days_studied.add(today)
+            changed.append(COUNTER_DAYS)
         
         # Update questions answered
         if questions_answered is not None:
@@ -159,38 +198,107 @@ class AchievementSystem:
         else:
             self.achievements["questions_answered"] = self.achievements.get("questions_answered", 0) + 1
         
-        # Check for streak master achievement
-        if (streak_count >= 5 and 
-            "streak_master" not in self.achievements["badges"]):
-            new_badges.append("streak_master")
-            self.achievements["badges"].append("streak_master")
-            self.achievements["streaks_achieved"] = self.achievements.get("streaks_achieved", 0) + 1
-        
-        # Check for dedicated learner achievement
-        days_studied = cast(Set[str], self.achievements["days_studied"])
-        game_values = get_game_value_manager()
-        daily_streak_threshold = game_values.get_value('streaks', 'daily_streak_threshold', 3)
-        
-        if (len(days_studied) >= daily_streak_threshold and 
-            "dedicated_learner" not in self.achievements["badges"]):
-            new_badges.append("dedicated_learner")
-            self.achievements["badges"].append("dedicated_learner")
-        
-        # Check for century club achievement (configurable question threshold)
-        question_threshold = game_values.get_value('scoring', 'achievement_question_threshold', 100)
-        if (self.achievements["questions_answered"] >= question_threshold and 
-            "century_club" not in self.achievements["badges"]):
-            new_badges.append("century_club")
-            self.achievements["badges"].append("century_club")
-        
-        # Check for point collector achievement (configurable point threshold)
-        point_threshold = game_values.get_value('scoring', 'achievement_point_threshold', 500)
-        if (self.achievements["points_earned"] >= point_threshold and 
-            "point_collector" not in self.achievements["badges"]):
-            new_badges.append("point_collector")
-            self.achievements["badges"].append("point_collector")
-        
-        return new_badges
+        # Only rules depending on a changed counter are re-evaluated
+        engine = self._get_builtin_rules()
+        self._mark_counters_changed(*changed)
+        badges = self._badges()
+        awarded: Set[str] = set()
+        
+        def unlock(rule: AchievementRule) -> None:
+            if not badges.add(rule.name):
+                return
+            awarded.add(rule.name)
+            if rule.name == "streak_master":
+                self.achievements["streaks_achieved"] = self.achievements.get("streaks_achieved", 0) + 1
+                self._mark_counters_changed(COUNTER_STREAKS)
+        
+        unlocked = engine.evaluate(lambda counter: self._counter_value(counter, streak_count), unlock)
+        return [rule.name for rule in unlocked if rule.name in awarded]
+    
+    # ------------------------------------------------------------------
+    # Rule engine plumbing
+    # ------------------------------------------------------------------
+    def _badges(self) -> BadgeSet:
+        """Earned badges, converting a plain list assigned from outside."""
+        badges = self.achievements.get("badges")
+        if not isinstance(badges, BadgeSet):
+            badges = BadgeSet(badges or [])
+            self.achievements["badges"] = badges
+        return badges
+    
+    def _days_studied(self) -> Set[str]:
+        days_studied = self.achievements.get("days_studied")
+        if not isinstance(days_studied, set):
+            days_studied = set(days_studied or [])
+            self.achievements["days_studied"] = days_studied
+        return days_studied
+    
+    def _counter_value(self, counter: str, streak_count: int = 0) -> int:
+        if counter == COUNTER_DAYS:
+            return len(self._days_studied())
+        if counter == COUNTER_CURRENT_STREAK:
+            return streak_count
+        return self.achievements.get(counter, 0)
+    
+    def _mark_counters_changed(self, *counters: str) -> None:
+        if self._builtin_rules is not None:
+            self._builtin_rules.mark_changed(*counters)
+        if self._custom_rules is not None:
+            self._custom_rules.mark_changed(*counters)
+    
+    def _builtin_thresholds(self) -> Tuple[int, ...]:
+        game_values = get_game_values()
+        return (
+            game_values.streaks.daily_streak_threshold,
+            game_values.scoring.achievement_question_threshold,
+            game_values.scoring.achievement_point_threshold,
+        )
+    
+    def _ensure_rule_engines(self) -> None:
+        """(Re)build both engines if achievements were replaced or thresholds changed."""
+        badges = self._badges()
+        custom_achievements = self.achievements.get("custom_achievements")
+        thresholds = self._builtin_thresholds()
+        if (self._builtin_rules is not None and self._rules_source
+                and self._rules_source[0] is badges
+                and self._rules_source[1] is custom_achievements
+                and self._rules_source[2] == thresholds):
+            return
+        self._rules_source = (badges, custom_achievements, thresholds)
+        daily_threshold, question_threshold, point_threshold = thresholds
+        builtin = [
+            AchievementRule("streak_master", COUNTER_CURRENT_STREAK, 5, order=0),
+            AchievementRule("dedicated_learner", COUNTER_DAYS, daily_threshold, order=1),
+            AchievementRule("century_club", COUNTER_QUESTIONS, question_threshold, order=2),
+            AchievementRule("point_collector", COUNTER_POINTS, point_threshold, order=3),
+        ]
+        self._builtin_rules = AchievementRuleEngine(rule for rule in builtin if rule.name not in badges)
+        self._custom_rules = AchievementRuleEngine()
+        for order, achievement in enumerate(custom_achievements or []):
+            rule = self._custom_rule(achievement, order)
+            if rule is not None and not achievement.get("unlocked", False):
+                self._custom_rules.add_rule(rule)
+        # Current streak is only known during check_achievements
+        self._builtin_rules.mark_changed(COUNTER_QUESTIONS, COUNTER_POINTS, COUNTER_STREAKS, COUNTER_DAYS)
+        self._custom_rules.mark_all_changed()
+    
+    def _get_builtin_rules(self) -> AchievementRuleEngine:
+        self._ensure_rule_engines()
+        return cast(AchievementRuleEngine, self._builtin_rules)
+    
+    def _get_custom_rules(self) -> AchievementRuleEngine:
+        self._ensure_rule_engines()
+        return cast(AchievementRuleEngine, self._custom_rules)
+    
+    @staticmethod
+    def _custom_rule(achievement: Dict[str, Any], order: int) -> Optional[AchievementRule]:
+        counter = CUSTOM_CONDITION_COUNTERS.get(achievement.get("condition_type", ""))
+        if counter is None:
+            return None
+        return AchievementRule(
+            achievement["name"], counter, achievement["condition_value"],
+            xp_reward=achievement.get("xp_reward", 0), order=order, data=achievement,
+        )
     
     def award_badge(self, badge_name: str) -> bool:
         """
@@ -202,10 +310,7 @@ class AchievementSystem:
         Returns:
             bool: True if badge was newly awarded, False if already had it
         """
-        if badge_name not in self.achievements["badges"]:
-            self.achievements["badges"].append(badge_name)
-            return True
-        return False
+        return self._badges().add(badge_name)
     
     def check_perfect_session(self, session_score: int, session_total: int) -> bool:
         """
@@ -220,9 +325,8 @@ class AchievementSystem:
         """
         if (session_total >= 3 and 
             session_score == session_total and 
-            "perfect_session" not in self.achievements["badges"]):
+            self._badges().add("perfect_session")):
             
-            self.achievements["badges"].append("perfect_session")
             self.achievements["perfect_sessions"] = self.achievements.get("perfect_sessions", 0) + 1
             return True
         return False
@@ -250,12 +354,7 @@ class AchievementSystem:
             daily_dates.append(today_iso)
         
         # Award badge if criteria met
-        if ("daily_warrior" not in self.achievements["badges"] and 
-            len(daily_dates) >= 1):
-            self.achievements["badges"].append("daily_warrior")
-            return True
-        
-        return False
+        return len(daily_dates) >= 1 and self._badges().add("daily_warrior")
     
     def complete_quick_fire(self) -> bool:
         """
@@ -276,10 +375,10 @@ class AchievementSystem:
         Returns:
             str: Formatted description with emoji
         """
-        game_values = get_game_value_manager()
-        question_threshold = game_values.get_value('scoring', 'achievement_question_threshold', 100)
-        point_threshold = game_values.get_value('scoring', 'achievement_point_threshold', 500)
-        daily_streak_threshold = game_values.get_value('streaks', 'daily_streak_threshold', 3)
+        game_values = get_game_values()
+        question_threshold = game_values.scoring.achievement_question_threshold
+        point_threshold = game_values.scoring.achievement_point_threshold
+        daily_streak_threshold = game_values.streaks.daily_streak_threshold
         
         descriptions = {
             "streak_master": "🔥 Streak Master - Answered 5 questions in a row correctly!",
@@ -300,10 +399,10 @@ class AchievementSystem:
         Returns:
             dict: Achievement names mapped to requirements descriptions
         """
-        game_values = get_game_value_manager()
-        question_threshold = game_values.get_value('scoring', 'achievement_question_threshold', 100)
-        point_threshold = game_values.get_value('scoring', 'achievement_point_threshold', 500)
-        daily_streak_threshold = game_values.get_value('streaks', 'daily_streak_threshold', 3)
+        game_values = get_game_values()
+        question_threshold = game_values.scoring.achievement_question_threshold
+        point_threshold = game_values.scoring.achievement_point_threshold
+        daily_streak_threshold = game_values.streaks.daily_streak_threshold
         
         return {
             "streak_master": "Answer 5 questions correctly in a row",
@@ -323,15 +422,12 @@ class AchievementSystem:
             dict: Progress data for each unearned achievement
         """
         progress: Dict[str, Dict[str, Any]] = {}
-        unlocked_badges = set(self.achievements.get("badges", []))
+        unlocked_badges = self._badges()
         
-        from utils.game_values import get_game_value_manager
-        game_values = get_game_value_manager()
-        # Reload settings to get latest values
-        game_values._settings = game_values._load_settings()
-        question_threshold = game_values.get_value('scoring', 'achievement_question_threshold', 100)
-        point_threshold = game_values.get_value('scoring', 'achievement_point_threshold', 500)
-        daily_streak_threshold = game_values.get_value('streaks', 'daily_streak_threshold', 3)
+        game_values = get_game_values()
+        question_threshold = game_values.scoring.achievement_question_threshold
+        point_threshold = game_values.scoring.achievement_point_threshold
+        daily_streak_threshold = game_values.streaks.daily_streak_threshold
         
         # Questions progress (century club)
         if "century_club" not in unlocked_badges:
@@ -383,14 +479,14 @@ class AchievementSystem:
             "points": session_points
         }
         
-        self.leaderboard.append(entry)
-        
-        # Keep only top 10 sessions, sorted by accuracy then points
-        self.leaderboard.sort(
-            key=lambda x: (x["accuracy"], x["points"]), 
-            reverse=True
-        )
-        self.leaderboard = self.leaderboard[:10]
+        # Keep only top 10 sessions, sorted by accuracy then points. The list is
+        # already sorted, so insert at the right spot instead of re-sorting.
+        keys = [(-float(e["accuracy"]), -int(e["points"])) for e in self.leaderboard]
+        position = bisect_right(keys, (-accuracy, -session_points))
+        if position >= LEADERBOARD_SIZE:
+            return
+        self.leaderboard.insert(position, entry)
+        del self.leaderboard[LEADERBOARD_SIZE:]
         
         # Store in achievements for persistence
         self.achievements["leaderboard"] = self.leaderboard
@@ -498,7 +594,7 @@ class AchievementSystem:
         Returns:
             bool: True if badge has been earned
         """
-        return badge_name in self.achievements.get("badges", [])
+        return badge_name in self._badges()
     
     def get_badges(self) -> List[str]:
         """
@@ -507,7 +603,7 @@ class AchievementSystem:
         Returns:
             list: List of earned badge names
         """
-        return self.achievements.get("badges", []).copy()
+        return list(self._badges())
     
     def get_survival_high_score(self) -> int:
         """
@@ -566,6 +662,8 @@ class AchievementSystem:
         self.achievements = self._get_default_achievements()
         self.leaderboard = []
         self.session_points = 0
+        self._builtin_rules = None
+        self._custom_rules = None
     
     def _get_default_achievements(self) -> Dict[str, Any]:
         """
@@ -575,7 +673,7 @@ class AchievementSystem:
             dict: Default achievement data structure
         """
         return {
-            "badges": [],
+            "badges": BadgeSet(),
             "points_earned": 0,
             "days_studied": set(),
             "questions_answered": 0,
@@ -624,6 +722,10 @@ class AchievementSystem:
         }
         
         custom_achievements.append(achievement)
+        if self._custom_rules is not None:
+            rule = self._custom_rule(achievement, len(custom_achievements) - 1)
+            if rule is not None:
+                self._custom_rules.add_rule(rule)
         return True
     
     def check_custom_achievements(self) -> List[str]:
@@ -636,39 +738,15 @@ class AchievementSystem:
         if "custom_achievements" not in self.achievements:
             return []
         
-        newly_unlocked = []
-        custom_achievements = cast(List[Dict[str, Any]], self.achievements["custom_achievements"])
-        
-        for achievement in custom_achievements:
-            if achievement.get("unlocked", False):
-                continue
-            
-            condition_met = False
-            condition_type = achievement["condition_type"]
-            condition_value = achievement["condition_value"]
-            
-            if condition_type == "questions":
-                condition_met = self.achievements.get("questions_answered", 0) >= condition_value
-            elif condition_type == "points":
-                condition_met = self.achievements.get("points_earned", 0) >= condition_value
-            elif condition_type == "streaks":
-                condition_met = self.achievements.get("streaks_achieved", 0) >= condition_value
-            elif condition_type == "days":
-                days_studied = self.achievements.get("days_studied", set())
-                if isinstance(days_studied, set):
-                    condition_met = len(days_studied) >= condition_value
-                else:
-                    condition_met = len(days_studied) >= condition_value
-            
-            if condition_met:
-                achievement["unlocked"] = True
-                achievement["unlock_date"] = datetime.now().isoformat()
-                newly_unlocked.append(achievement["name"])
-                
-                # Award XP (without applying multiplier again since this is a reward, not earned points)
-                self.update_points(achievement["xp_reward"], apply_multiplier=False)
+        def unlock(rule: AchievementRule) -> None:
+            achievement = rule.data
+            achievement["unlocked"] = True
+            achievement["unlock_date"] = datetime.now().isoformat()
+            # Award XP (without applying multiplier again since this is a reward, not earned points)
+            self.update_points(rule.xp_reward, apply_multiplier=False)
         
-        return newly_unlocked
+        unlocked = self._get_custom_rules().evaluate(self._counter_value, unlock)
+        return [rule.name for rule in unlocked]
     
     def get_custom_achievements(self) -> List[Dict[str, Any]]:
         """
@@ -698,6 +776,8 @@ class AchievementSystem:
         for i, achievement in enumerate(custom_achievements):
             if achievement["name"] == name:
                 custom_achievements.pop(i)
+                if self._custom_rules is not None:
+                    self._custom_rules.remove_rule(name)
                 return True
         
         return False
@@ -712,9 +792,4 @@ class AchievementSystem:
         Returns:
             int: Points after applying multiplier
         """
-        from utils.game_values import get_game_value_manager
-        game_values = get_game_value_manager()
-        # Reload settings from file to get latest values
-        game_values._settings = game_values._load_settings()
-        multiplier = game_values.get_value('scoring', 'xp_multiplier', 1.0)
-        return int(base_points * multiplier)
\ No newline at end of file
+        return int(base_points * get_game_values().scoring.xp_multiplier)
\ No newline at end of file
@@ -5,7 +5,7 @@ Enhanced model with SQLAlchemy ORM support and
 backward compatibility with JSON-based storage.
 """
 
-from sqlalchemy import Integer, DateTime, String, Float, Text, JSON
+from sqlalchemy import Integer, DateTime, String, Float, Text, JSON, Index
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
@@ -22,10 +22,19 @@ class Analytics(Base):
     """Enhanced analytics model with comprehensive tracking capabilities."""
     
     __tablename__ = 'analytics'
+    __table_args__ = (
+        # Composite indexes for the per-user and per-activity time range queries
+        # (see migrations/add_analytics_performance_indexes.py)
+        Index('ix_analytics_user_created', 'user_id', 'created_at'),
+        Index('ix_analytics_activity_created', 'activity_type', 'created_at'),
+        # Covers the heatmap query (get_daily_activity_for_user) without table lookups
+        Index('ix_analytics_user_activity_daily', 'user_id', 'activity_type', 'created_at',
+              'questions_attempted', 'session_duration'),
+    )
     
     # Primary key and timestamps
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(zoneinfo.ZoneInfo("America/Chicago")), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(zoneinfo.ZoneInfo("America/Chicago")), nullable=False, index=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(zoneinfo.ZoneInfo("America/Chicago")), onupdate=lambda: datetime.now(zoneinfo.ZoneInfo("America/Chicago")), nullable=False)
     
     # User and Session Tracking
@@ -14,7 +14,9 @@ from typing import Optional, Dict, List, Tuple, Any, TypedDict, Union, cast
 from utils.config import *
 from models.question import QuestionManager, GameHistory as QuestionGameHistory
 from models.achievements import AchievementSystem
+from models.spaced_repetition import ReviewResult, ReviewScheduler
 from utils.persistence_manager import get_persistence_manager
+from utils.unit_of_work import get_current_unit_of_work
 
 
 # Define types for better type checking
@@ -25,6 +27,7 @@ class GameStateHistory(TypedDict, total=False):
     total_correct: int
     total_attempts: int
     incorrect_review: List[str]
+    spaced_repetition: Dict[str, Any]
     leaderboard: List[Dict[str, Any]]
     settings: Dict[str, Any]
     export_metadata: Dict[str, Any]
@@ -81,6 +84,11 @@ class GameState:
         # Verify mode session storage
         self.verify_session_answers: List[VerifyAnswer] = []
         
+        # Spaced review scheduler (built on first use)
+        self._review_scheduler: Optional[ReviewScheduler] = None
+        self._review_pool_size = -1
+        self._question_positions: Dict[str, int] = {}
+        
         # Scoring settings
         self.points_per_question = 10
         self.streak_bonus = 5
@@ -140,6 +148,8 @@ class GameState:
                 history["sessions"] = []
             if not isinstance(history.get("incorrect_review"), list):
                 history["incorrect_review"] = []
+            if not isinstance(history.get("spaced_repetition"), dict):
+                history["spaced_repetition"] = {}
             
             return history
             
@@ -224,6 +234,12 @@ class GameState:
         timestamp = datetime.now().isoformat()
         history = self.study_history
         
+        uow = get_current_unit_of_work()
+        if uow is not None:
+            uow.snapshot_items(history, "total_attempts", "total_correct", "incorrect_review")
+            uow.snapshot_items(history.setdefault("questions", {}), question_text)
+            uow.snapshot_items(history.setdefault("categories", {}), category)
+        
         # Overall totals
         history["total_attempts"] = history.get("total_attempts", 0) + 1
         if is_correct:
@@ -292,6 +308,69 @@ class GameState:
         # Convert Question object back to tuple for backwards compatibility
         return question.to_tuple(), index
     
+    @property
+    def review_scheduler(self) -> ReviewScheduler:
+        """Spaced review scheduler over the current question pool and history."""
+        store = self.study_history.setdefault("spaced_repetition", {})
+        scheduler = self._review_scheduler
+        questions = self.question_manager.questions
+        # Rebuild when the history was replaced (reset/import) or the pool changed size
+        if scheduler is None or scheduler.store is not store or self._review_pool_size != len(questions):
+            scheduler = ReviewScheduler(
+                store,
+                target_retention=SPACED_REVIEW_TARGET_RETENTION,
+                new_cards_per_session=SPACED_REVIEW_NEW_CARDS
+            )
+            scheduler.sync((q.text, q.category) for q in questions)
+            self._review_scheduler = scheduler
+            self._review_pool_size = len(questions)
+        return scheduler
+    
+    def select_due_question(self, category_filter: Optional[str] = None,
+                            now: Optional[float] = None) -> Tuple[Optional[Tuple[str, List[str], int, str, str]], int]:
+        """
+        Check out the next question due for spaced review.
+        
+        Args:
+            category_filter (str, optional): Category to filter questions by
+            now (float, optional): Current timestamp (default time.time())
+            
+        Returns:
+            Tuple[Optional[Tuple[str, List[str], int, str, str]], int]: (question_data, original_index) or (None, -1) if nothing is due
+        """
+        key = self.review_scheduler.take(now if now is not None else time.time(), category_filter)
+        if key is None:
+            return None, -1
+        
+        # The pool may have been reshuffled since the positions were indexed
+        questions = self.question_manager.questions
+        index = self._question_positions.get(key, -1)
+        if not (0 <= index < len(questions) and questions[index].text == key):
+            self._question_positions = {q.text: i for i, q in enumerate(questions)}
+            index = self._question_positions.get(key, -1)
+        if index < 0:
+            self.review_scheduler.release(key)
+            return None, -1
+        return questions[index].to_tuple(), index
+    
+    def reschedule_reviews(self, results: List[ReviewResult]) -> List[str]:
+        """
+        Apply a session's spaced review results in one batch.
+        
+        Args:
+            results (List[ReviewResult]): (question text, correct, answered_at) tuples
+            
+        Returns:
+            List[str]: Question texts that were rescheduled
+        """
+        scheduler = self.review_scheduler
+        uow = get_current_unit_of_work()
+        if uow is not None:
+            uow.snapshot_items(scheduler.store["cards"], *{text for text, _, _ in results})
+        updated = scheduler.reschedule(results)
+        scheduler.release_all()
+        return updated
+    
     def reset_session(self):
         """Reset session-specific data."""
         self.score = 0
@@ -301,7 +380,50 @@ class GameState:
         self.verify_session_answers = []
         self.question_manager.reset_session()
         self.achievement_system.reset_session_points()
-    
+
+    def export_session_state(self) -> Dict[str, Any]:
+        """
+        Session counters in compact form (see services.quiz_session_store).
+
+        Questions answered this session are exported as pool keys, which are
+        valid in any process whose pool has the same fingerprint.
+
+        Returns:
+            Dict[str, Any]: Only the counters that differ from a fresh session
+        """
+        state: Dict[str, Any] = {}
+        if self.score:
+            state['score'] = self.score
+        if self.total_questions_session:
+            state['total'] = self.total_questions_session
+        if self.session_points:
+            state['points'] = self.session_points
+        answered = self.question_manager.answered_indices_session
+        if answered:
+            state['answered'] = self.question_manager.to_pool_keys(answered)
+        return state
+
+    def load_session_state(self, state: Optional[Dict[str, Any]], same_pool: bool = True) -> None:
+        """
+        Replace the session counters with an exported state.
+
+        Args:
+            state (dict, optional): Output of export_session_state (None for a fresh session)
+            same_pool (bool): Whether the state was exported from a pool with the
+                same fingerprint; if not, the answered questions are dropped
+        """
+        self.reset_session()
+        if not state:
+            return
+        self.score = state.get('score', 0)
+        self.total_questions_session = state.get('total', 0)
+        self.session_points = state.get('points', 0)
+        self.achievement_system.session_points = self.session_points
+        if same_pool:
+            self.question_manager.answered_indices_session = self.question_manager.from_pool_keys(
+                state.get('answered', [])
+            )
+
     def start_quick_fire_mode(self) -> Dict[str, Any]:
         """
         Initialize Quick Fire mode.
@@ -458,7 +580,7 @@ class GameState:
     
     def update_leaderboard(self, session_score: int, session_total: int, session_points: int):
         """
-        Update leaderboard with session performance.
+        Update the per-install leaderboard with session performance.
         
         Args:
             session_score (int): Number of correct answers
@@ -466,6 +588,7 @@ class GameState:
             session_points (int): Points earned in session
         """
         self.achievement_system.update_leaderboard(session_score, session_total, session_points)
+        self.study_history["leaderboard"] = self.achievement_system.leaderboard
     
     def get_question_count(self, category_filter: Optional[str] = None) -> int:
         """
@@ -622,6 +745,7 @@ class GameState:
             "total_correct": 0,
             "total_attempts": 0,
             "incorrect_review": [],
+            "spaced_repetition": {},
             "leaderboard": [],
             "settings": {},
             "export_metadata": {},
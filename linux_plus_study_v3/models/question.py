@@ -9,10 +9,12 @@ and intelligent question selection with weighting.
 import json
 import random
 import os
+import hashlib
 from datetime import datetime
 from typing import List, Tuple, Optional, Dict, Any, TypeVar, Union, cast, Set, TypedDict
 
 from utils.config import SAMPLE_QUESTIONS
+from utils.performance_metrics import timed, COMPONENT_QUESTION_SELECTION
 
 # Define a type alias for the question tuple structure
 QuestionTuple = Tuple[str, List[str], int, str, str]
@@ -26,6 +28,27 @@ class QuestionStats(TypedDict, total=False):
 class GameHistory(TypedDict, total=False):
     questions: Dict[str, QuestionStats]
 
+
+def question_weight(q_stats: QuestionStats) -> float:
+    """
+    Selection weight of a question: favor incorrect answers and less attempted questions.
+    
+    Args:
+        q_stats (dict): The question's history entry (correct/attempts)
+        
+    Returns:
+        float: Weight, at least 0.1
+    """
+    attempts: int = q_stats.get("attempts", 0)
+    correct: int = q_stats.get("correct", 0)
+    
+    # Calculate accuracy (default to 50% for unasked questions)
+    accuracy: float = (correct / attempts) if attempts > 0 else 0.5
+    
+    # Higher weight for lower accuracy and fewer attempts
+    weight: float = (1.0 - accuracy) * 10 + (1.0 / (attempts + 1)) * 3
+    return max(0.1, weight)  # Ensure minimum weight
+
 class Question:
     """Represents a single quiz question."""
     
@@ -191,6 +214,9 @@ class QuestionManager:
         self.categories: Set[str] = set()
         self.answered_indices_session: List[int] = []
         
+        # Pool keys (see pool_fingerprint), rebuilt whenever the pool changes
+        self._pool_keys: Optional[Tuple[Tuple[int, int], List[int], List[int], Dict[str, int], str]] = None
+        
         # Load questions from various sources
         self.load_questions()
     
@@ -267,6 +293,7 @@ class QuestionManager:
         
         # Shuffle questions once on load for variety
         random.shuffle(self.questions)
+        self._pool_keys = None
         
         # Update categories set
         self.categories = set(q.category for q in self.questions)
@@ -368,6 +395,12 @@ class QuestionManager:
         Returns:
             Tuple[Optional[Question], int]: Selected question and its index, or (None, -1) if none available
         """
+        with timed(COMPONENT_QUESTION_SELECTION):
+            return self._select_question(category_filter, game_history)
+    
+    def _select_question(self, category_filter: Optional[str],
+                         game_history: Optional[GameHistory]) -> Tuple[Optional[Question], int]:
+        """Selection logic for select_question (timed by the caller)."""
         # Get possible question indices
         possible_indices = [
             idx for idx, q in enumerate(self.questions)
@@ -389,6 +422,7 @@ class QuestionManager:
             self.reset_session()
             # Re-shuffle questions for variety
             random.shuffle(self.questions)
+            self._pool_keys = None
             # Use all possible indices again
             available_indices = possible_indices.copy()
         
@@ -425,17 +459,7 @@ class QuestionManager:
             
             question = self.questions[q_idx]
             q_stats: QuestionStats = question_history.get(question.text, {"correct": 0, "attempts": 0})
-            
-            attempts: int = q_stats.get("attempts", 0)
-            correct: int = q_stats.get("correct", 0)
-            
-            # Calculate accuracy (default to 50% for unasked questions)
-            accuracy: float = (correct / attempts) if attempts > 0 else 0.5
-            
-            # Weight calculation: favor incorrect answers and less attempted questions
-            # Higher weight for lower accuracy and fewer attempts
-            weight: float = (1.0 - accuracy) * 10 + (1.0 / (attempts + 1)) * 3
-            weights.append(max(0.1, weight))  # Ensure minimum weight
+            weights.append(question_weight(q_stats))
         
         # Weighted random selection
         try:
@@ -450,6 +474,69 @@ class QuestionManager:
         """Reset the session-specific answered questions list."""
         self.answered_indices_session = []
     
+    def _pool_order(self) -> Tuple[List[int], List[int], Dict[str, int], str]:
+        """(index -> pool key, pool key -> index, text -> pool key, fingerprint), cached until the pool changes."""
+        marker = (id(self.questions), len(self.questions))
+        if self._pool_keys is None or self._pool_keys[0] != marker:
+            by_text = sorted(range(len(self.questions)),
+                             key=lambda i: (self.questions[i].text, self.questions[i].options))
+            keys = [0] * len(by_text)
+            text_keys: Dict[str, int] = {}
+            digest = hashlib.blake2b(digest_size=8)
+            for key, index in enumerate(by_text):
+                text = self.questions[index].text
+                keys[index] = key
+                text_keys.setdefault(text, key)
+                digest.update(text.encode('utf-8'))
+                digest.update(b'\0')
+            self._pool_keys = (marker, keys, by_text, text_keys, digest.hexdigest())
+        return self._pool_keys[1:]
+    
+    def pool_fingerprint(self) -> str:
+        """
+        Fingerprint of the question pool's content, independent of its order.
+        
+        Every process shuffles its pool differently, so indices are only
+        meaningful within one process. Pool keys (a question's position in
+        text order) are the same in every process whose pool has the same
+        fingerprint.
+        
+        Returns:
+            str: 16 hex digits
+        """
+        return self._pool_order()[3]
+    
+    def to_pool_keys(self, indices: List[int]) -> List[int]:
+        """Convert pool indices to pool keys (invalid indices are dropped)."""
+        keys = self._pool_order()[0]
+        return [keys[i] for i in indices if 0 <= i < len(keys)]
+    
+    def from_pool_keys(self, keys: List[int]) -> List[int]:
+        """Convert pool keys back to indices into this process's pool (invalid keys are dropped)."""
+        indices = self._pool_order()[1]
+        return [indices[k] for k in keys if 0 <= k < len(indices)]
+    
+    def pool_keys_for(self, questions: List[Question]) -> List[int]:
+        """
+        Pool keys of a snapshot of this pool (index into the snapshot -> pool key).
+
+        Unlike pool_key_of, questions sharing a text keep distinct keys. The
+        snapshot must hold the same questions as the pool, in any order.
+        """
+        current = self.questions
+        if len(questions) == len(current) and all(a is b for a, b in zip(questions, current)):
+            return list(self._pool_order()[0])
+        # Reordered since the snapshot was taken: rank it the way _pool_order does
+        keys = [0] * len(questions)
+        for key, index in enumerate(sorted(range(len(questions)),
+                                           key=lambda i: (questions[i].text, questions[i].options))):
+            keys[index] = key
+        return keys
+    
+    def pool_key_of(self, text: str) -> int:
+        """Pool key of the question with this text, or -1."""
+        return self._pool_order()[2].get(text, -1)
+    
     def get_question_by_index(self, index: int) -> Optional[Question]:
         """
         Get a question by its index.
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Spaced Repetition Scheduler for Linux+ Study Game
+
+Keeps a review card per question (due time, stability, ease, repetitions,
+lapses) and decides what to ask next in spaced review mode.
+
+Scheduling follows SM-2 for the ease factor and interval growth, with the
+FSRS power forgetting curve for recall probability: a card's stability is
+the interval after which recall drops to 90%. Reviews taken before the card
+is due grow stability less than reviews taken on time.
+
+Cards with a review state sit in one min-heap per category keyed by due
+time, so the next due card is found in O(log n) (times the number of
+categories when no filter is set). Stale heap entries are skipped lazily
+and compacted away once they outnumber the live ones. Cards never reviewed
+wait in a per-category FIFO and are mixed in at most new_cards_per_session
+at a time.
+"""
+
+import heapq
+import itertools
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+DAY = 86400.0
+
+STORE_VERSION = 1
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+MAX_EASE = 3.5
+LAPSE_EASE_PENALTY = 0.2
+
+FIRST_INTERVAL_DAYS = 1.0
+SECOND_INTERVAL_DAYS = 6.0
+MIN_STABILITY_DAYS = 0.1
+MAX_INTERVAL_DAYS = 365.0
+LAPSE_STABILITY_FACTOR = 0.3
+RELEARN_DELAY = 600.0  # seconds before a forgotten card is due again
+
+# FSRS power forgetting curve: R(t) = (1 + FACTOR * t / S) ** DECAY, R(S) = 0.9
+FORGETTING_DECAY = -0.5
+FORGETTING_FACTOR = 0.9 ** (1 / FORGETTING_DECAY) - 1
+
+QUALITY_CORRECT = 4
+QUALITY_INCORRECT = 1
+
+# (text, correct, reviewed_at) tuples passed to ReviewScheduler.reschedule
+ReviewResult = Tuple[str, bool, float]
+
+
+def retrievability(elapsed_days: float, stability_days: float) -> float:
+    """
+    Probability of recalling a card.
+
+    Args:
+        elapsed_days (float): Days since the last review
+        stability_days (float): Card stability in days
+
+    Returns:
+        float: Recall probability between 0 and 1
+    """
+    if elapsed_days <= 0:
+        return 1.0
+    return (1 + FORGETTING_FACTOR * elapsed_days / max(stability_days, MIN_STABILITY_DAYS)) ** FORGETTING_DECAY
+
+
+def interval_for_retention(stability_days: float, target_retention: float) -> float:
+    """
+    Days until recall probability falls to the target retention.
+
+    Args:
+        stability_days (float): Card stability in days
+        target_retention (float): Desired recall probability (0-1)
+
+    Returns:
+        float: Interval in days, capped at MAX_INTERVAL_DAYS
+    """
+    days = stability_days / FORGETTING_FACTOR * (target_retention ** (1 / FORGETTING_DECAY) - 1)
+    return min(max(days, MIN_STABILITY_DAYS), MAX_INTERVAL_DAYS)
+
+
+class ReviewCard:
+    """Review state of one question."""
+
+    __slots__ = ('key', 'category', 'due', 'stability', 'ease', 'reps', 'lapses', 'last_review', 'seq')
+
+    def __init__(self, key: str, category: str, due: float = 0.0, stability: float = 0.0,
+                 ease: float = DEFAULT_EASE, reps: int = 0, lapses: int = 0, last_review: float = 0.0):
+        self.key = key
+        self.category = category
+        self.due = due
+        self.stability = stability
+        self.ease = ease
+        self.reps = reps
+        self.lapses = lapses
+        self.last_review = last_review
+        self.seq = -1  # Sequence number of the card's live heap entry
+
+    @property
+    def is_new(self) -> bool:
+        """True if the card has never been reviewed."""
+        return self.last_review <= 0
+
+    def retrievability(self, now: float) -> float:
+        """Current recall probability (only meaningful once the card was reviewed)."""
+        return retrievability((now - self.last_review) / DAY, self.stability)
+
+    def review(self, quality: int, now: float, target_retention: float) -> None:
+        """
+        Apply a review and schedule the next one.
+
+        Args:
+            quality (int): SM-2 response quality 0-5 (3 and above counts as recalled)
+            now (float): Review timestamp
+            target_retention (float): Recall probability to schedule for
+        """
+        quality = min(max(quality, 0), 5)
+        if quality >= 3:
+            if self.reps == 0:
+                self.stability = max(self.stability, FIRST_INTERVAL_DAYS)
+            elif self.reps == 1:
+                self.stability = max(self.stability, SECOND_INTERVAL_DAYS)
+            else:
+                # Early reviews earn proportionally less growth
+                elapsed = max(0.0, (now - self.last_review) / DAY)
+                scheduled = interval_for_retention(self.stability, target_retention)
+                timing = min(1.0, elapsed / scheduled) if scheduled > 0 else 1.0
+                self.stability *= 1 + (self.ease - 1) * timing
+            self.ease += 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+            self.reps += 1
+            self.due = now + interval_for_retention(self.stability, target_retention) * DAY
+        elif self.is_new:
+            # Not knowing a card on first sight is not forgetting it
+            self.stability = MIN_STABILITY_DAYS
+            self.due = now + RELEARN_DELAY
+        else:
+            self.lapses += 1
+            self.reps = 0
+            self.ease -= LAPSE_EASE_PENALTY
+            self.stability = max(MIN_STABILITY_DAYS, self.stability * LAPSE_STABILITY_FACTOR)
+            self.due = now + RELEARN_DELAY
+        self.ease = min(max(self.ease, MIN_EASE), MAX_EASE)
+        self.last_review = now
+
+    def to_list(self) -> List[float]:
+        """Compact form stored in the study history."""
+        return [round(self.due, 3), round(self.stability, 4), round(self.ease, 3),
+                self.reps, self.lapses, round(self.last_review, 3)]
+
+    def load_list(self, data: List[Any]) -> None:
+        """Restore state written by to_list."""
+        due, stability, ease, reps, lapses, last_review = data[:6]
+        self.due = float(due)
+        self.stability = float(stability)
+        self.ease = float(ease)
+        self.reps = int(reps)
+        self.lapses = int(lapses)
+        self.last_review = float(last_review)
+
+
+class ReviewScheduler:
+    """Priority queue of review cards indexed by due time."""
+
+    def __init__(self, store: Optional[Dict[str, Any]] = None, target_retention: float = 0.9,
+                 new_cards_per_session: int = 10):
+        """
+        Initialize the scheduler.
+
+        Args:
+            store (dict, optional): Persisted state ({"version", "cards"}); updated in place
+            target_retention (float): Recall probability reviews are scheduled for
+            new_cards_per_session (int): Never-reviewed cards introduced per session
+        """
+        self.store: Dict[str, Any] = store if store is not None else {}
+        self.store.setdefault("version", STORE_VERSION)
+        if not isinstance(self.store.get("cards"), dict):
+            self.store["cards"] = {}
+        self.target_retention = target_retention
+        self.new_cards_per_session = new_cards_per_session
+
+        self.cards: Dict[str, ReviewCard] = {}
+        self._heaps: Dict[str, List[Tuple[float, int, str]]] = {}
+        self._new: Dict[str, Deque[str]] = {}
+        self._in_flight: Dict[str, ReviewCard] = {}
+        self._new_taken = 0
+        self._stale = 0
+        self._seq = itertools.count()
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+    def sync(self, questions: Iterable[Tuple[str, str]]) -> int:
+        """
+        Build the queues for a question pool.
+
+        Stored states of questions no longer in the pool stay in the store
+        untouched, so they come back if the question does.
+
+        Args:
+            questions: (question text, category) pairs
+
+        Returns:
+            int: Number of cards scheduled
+        """
+        stored = self.store["cards"]
+        self.cards = {}
+        self._heaps = {}
+        self._new = {}
+        self._in_flight = {}
+        self._stale = 0
+        for text, category in questions:
+            if text in self.cards:
+                continue
+            card = ReviewCard(text, category)
+            state = stored.get(text)
+            if state:
+                try:
+                    card.load_list(state)
+                except (TypeError, ValueError):
+                    card = ReviewCard(text, category)
+            self.cards[text] = card
+            if card.is_new:
+                self._new.setdefault(category, deque()).append(text)
+            else:
+                card.seq = next(self._seq)
+                self._heaps.setdefault(category, []).append((card.due, card.seq, text))
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
+        return len(self.cards)
+
+    # ------------------------------------------------------------------
+    # Session API
+    # ------------------------------------------------------------------
+    def begin_session(self) -> None:
+        """Reset the per-session new card allowance."""
+        self._new_taken = 0
+
+    def take(self, now: float, category: Optional[str] = None, allow_new: bool = True) -> Optional[str]:
+        """
+        Remove and return the most overdue card, or a new card if nothing is due.
+
+        The card stays checked out until it is rescheduled or released.
+
+        Args:
+            now (float): Current timestamp
+            category (str, optional): Restrict to one category
+            allow_new (bool): Fall back to never-reviewed cards
+
+        Returns:
+            str: Question text of the card, or None if nothing is due
+        """
+        heap_key = self._earliest_heap(category)
+        if heap_key is not None and self._heaps[heap_key][0][0] <= now:
+            _, _, key = heapq.heappop(self._heaps[heap_key])
+            card = self.cards[key]
+            card.seq = -1
+            self._in_flight[key] = card
+            return key
+
+        if allow_new and self._new_taken < self.new_cards_per_session:
+            queues = [self._new.get(category)] if category is not None else list(self._new.values())
+            for queue in queues:
+                while queue:
+                    key = queue.popleft()
+                    card = self.cards.get(key)
+                    if card is not None and card.is_new and key not in self._in_flight:
+                        self._in_flight[key] = card
+                        self._new_taken += 1
+                        return key
+        return None
+
+    def release(self, key: str) -> None:
+        """Return a checked-out card unchanged (e.g. the question was never answered)."""
+        card = self._in_flight.pop(key, None)
+        if card is None:
+            return
+        if card.is_new:
+            self._new.setdefault(card.category, deque()).appendleft(key)
+            self._new_taken = max(0, self._new_taken - 1)
+        else:
+            self._push(card)
+
+    def release_all(self) -> None:
+        """Return every checked-out card unchanged."""
+        for key in list(self._in_flight):
+            self.release(key)
+
+    def reschedule(self, results: Iterable[ReviewResult]) -> List[str]:
+        """
+        Apply a batch of review results and requeue the cards.
+
+        Args:
+            results: (question text, correct, reviewed_at) tuples in answer order
+
+        Returns:
+            List[str]: Question texts whose state changed
+        """
+        updated: Dict[str, ReviewCard] = {}
+        for key, correct, reviewed_at in results:
+            card = self._in_flight.pop(key, None) or updated.get(key) or self.cards.get(key)
+            if card is None:
+                continue
+            if card.seq >= 0:
+                self._stale += 1  # Its current heap entry is superseded
+                card.seq = -1
+            card.review(QUALITY_CORRECT if correct else QUALITY_INCORRECT, reviewed_at, self.target_retention)
+            updated[key] = card
+
+        stored = self.store["cards"]
+        for key, card in updated.items():
+            stored[key] = card.to_list()
+            self._push(card)
+        self._maybe_compact()
+        return list(updated)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def next_due(self, category: Optional[str] = None) -> Optional[float]:
+        """Due time of the earliest scheduled card, or None if none are scheduled."""
+        heap_key = self._earliest_heap(category)
+        return self._heaps[heap_key][0][0] if heap_key is not None else None
+
+    def due_count(self, now: float, category: Optional[str] = None) -> int:
+        """Number of scheduled cards due at `now` (O(n) scan; use for summaries)."""
+        heaps = [self._heaps.get(category, [])] if category is not None else self._heaps.values()
+        return sum(1 for heap in heaps for due, seq, key in heap
+                   if due <= now and self.cards[key].seq == seq)
+
+    def new_count(self, category: Optional[str] = None) -> int:
+        """Number of never-reviewed cards waiting to be introduced."""
+        queues = [self._new.get(category, ())] if category is not None else self._new.values()
+        return sum(len(queue) for queue in queues)
+
+    def session_size(self, now: float, category: Optional[str] = None, limit: Optional[int] = None) -> int:
+        """
+        Questions a session started now can ask.
+
+        Args:
+            now (float): Current timestamp
+            category (str, optional): Category filter
+            limit (int, optional): Session length cap
+
+        Returns:
+            int: Due cards plus the new card allowance, capped by limit
+        """
+        size = self.due_count(now, category) + min(self.new_cards_per_session, self.new_count(category))
+        return min(size, limit) if limit is not None else size
+
+    def get_stats(self, now: float) -> Dict[str, Any]:
+        """Summary counts and mean predicted recall of reviewed cards."""
+        reviewed = [card for card in self.cards.values() if not card.is_new]
+        recall = [card.retrievability(now) for card in reviewed]
+        return {
+            'cards': len(self.cards),
+            'new': sum(1 for card in self.cards.values() if card.is_new),
+            'due': self.due_count(now),
+            'lapses': sum(card.lapses for card in reviewed),
+            'mean_retrievability': (math.fsum(recall) / len(recall)) if recall else None,
+            'next_due': self.next_due(),
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _push(self, card: ReviewCard) -> None:
+        card.seq = next(self._seq)
+        heapq.heappush(self._heaps.setdefault(card.category, []), (card.due, card.seq, card.key))
+
+    def _clean_top(self, heap: List[Tuple[float, int, str]]) -> None:
+        while heap:
+            _, seq, key = heap[0]
+            card = self.cards.get(key)
+            if card is not None and card.seq == seq:
+                return
+            heapq.heappop(heap)
+            self._stale = max(0, self._stale - 1)
+
+    def _earliest_heap(self, category: Optional[str]) -> Optional[str]:
+        """Category whose heap holds the earliest live entry."""
+        candidates = [category] if category is not None else list(self._heaps)
+        best: Optional[str] = None
+        for name in candidates:
+            heap = self._heaps.get(name)
+            if not heap:
+                continue
+            self._clean_top(heap)
+            if heap and (best is None or heap[0] < self._heaps[best][0]):
+                best = name
+        return best
+
+    def _maybe_compact(self) -> None:
+        live = len(self.cards)
+        if self._stale <= live // 2 + 64:
+            return
+        for name, heap in self._heaps.items():
+            kept = [entry for entry in heap
+                    if entry[2] in self.cards and self.cards[entry[2]].seq == entry[1]]
+            heapq.heapify(kept)
+            self._heaps[name] = kept
+        self._stale = 0
@@ -17,12 +17,14 @@ from typing import Dict, List, Any
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from services.error_tracking import process_log_file, error_tracker
+from services.log_classifier import get_log_classifier
 from models.analytics import Analytics, AnalyticsService
 from utils.database import get_db_session
 
 def process_terminal_log_content(log_content: str) -> List[Dict[str, Any]]:
     """Process the terminal log content provided by the user."""
     errors = []
+    classifier = get_log_classifier()
     lines = log_content.split('\n')
     
     for line_num, line in enumerate(lines, 1):
@@ -30,27 +32,11 @@ def process_terminal_log_content(log_content: str) -> List[Dict[str, Any]]:
         if not line:
             continue
             
-        # Skip non-error lines
-        if not any(level in line for level in ['ERROR', 'WARNING', 'CRITICAL']):
+        # Skip non-error lines; parse and classify in one pass
+        record = classifier.parse_line(line)
+        if record is None:
             continue
-        
-        # Extract timestamp
-        timestamp_match = re.search(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', line)
-        timestamp = timestamp_match.group(1) if timestamp_match else None
-        
-        # Extract logger name
-        logger_match = re.search(r' - ([^-]+) - ', line)
-        logger_name = logger_match.group(1).strip() if logger_match else 'unknown'
-        
-        # Extract error level
-        level_match = re.search(r' - (ERROR|WARNING|CRITICAL)', line)
-        error_level = level_match.group(1) if level_match else 'ERROR'
-        
-        # Classify error type
-        error_type = classify_error_from_line(line)
-        
-        # Extract error message
-        error_message = line.split(' - ')[-1] if ' - ' in line else line
+        error_message = record['error_message']
         
         # Extract SQL details for database errors
         sql_query = None
@@ -66,10 +52,10 @@ def process_terminal_log_content(log_content: str) -> List[Dict[str, Any]]:
         
         error_info = {
             'line_number': line_num,
-            'timestamp': timestamp,
-            'logger_name': logger_name,
-            'error_level': error_level,
-            'error_type': error_type,
+            'timestamp': record['timestamp'],
+            'logger_name': record['logger_name'],
+            'error_level': record['error_level'],
+            'error_type': record['error_type'],
             'error_message': error_message[:500],  # Truncate long messages
             'sql_query': sql_query[:200] if sql_query else None,
             'sql_parameters': sql_parameters,
@@ -81,23 +67,8 @@ def process_terminal_log_content(log_content: str) -> List[Dict[str, Any]]:
     return errors
 
 def classify_error_from_line(line: str) -> str:
-    """Classify error type based on line content."""
-    line_lower = line.lower()
-    
-    if 'no such table' in line_lower or 'sqlite3.operationalerror' in line_lower:
-        return 'database_error'
-    elif 'session' in line_lower and 'rollback' in line_lower:
-        return 'session_error'
-    elif 'analytics' in line_lower:
-        return 'analytics_error'
-    elif 'vm' in line_lower or 'virtual' in line_lower:
-        return 'vm_error'
-    elif 'import' in line_lower or 'module' in line_lower:
-        return 'import_error'
-    elif 'http' in line_lower and any(code in line for code in ['404', '500', '400', '403']):
-        return 'http_error'
-    else:
-        return 'general_error'
+    """Classify error type based on line content (same rules as the error tracker)."""
+    return get_log_classifier().classify(line)
 
 def create_error_analytics_entries(errors: List[Dict[str, Any]]) -> int:
     """Create analytics entries for extracted errors."""
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Error Sink for the Error Tracking Service
+
+Collects tracked errors off the request path and writes them to the
+analytics table in batches, so error tracking can never amplify an outage:
+
+- Errors are deduplicated by fingerprint (type + normalized message +
+  endpoint) within a time window. Repeats only increment a counter.
+- Pending fingerprints are bounded. New fingerprints beyond the bound or
+  beyond the token-bucket rate limit are dropped and counted.
+- A daemon thread bulk-inserts one row per fingerprint per window, using
+  one connection and one transaction per flush. After a failed write it
+  backs off exponentially instead of retrying on every error.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Configuration via environment
+ERROR_SINK_WINDOW_SECONDS = float(os.getenv('ERROR_SINK_WINDOW_SECONDS', '5'))
+ERROR_SINK_MAX_PENDING = int(os.getenv('ERROR_SINK_MAX_PENDING', '500'))
+ERROR_SINK_RATE_PER_SECOND = float(os.getenv('ERROR_SINK_RATE_PER_SECOND', '20'))
+ERROR_SINK_BURST = int(os.getenv('ERROR_SINK_BURST', '50'))
+ERROR_SINK_MAX_BACKOFF_SECONDS = 300.0
+
+_INSERT_COLUMNS = (
+    'user_id', 'session_id', 'session_start', 'activity_type', 'activity_subtype',
+    'error_count', 'custom_metrics', 'created_at', 'updated_at',
+)
+
+_NORMALIZE_PATTERNS = [
+    (re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.IGNORECASE), '<uuid>'),
+    (re.compile(r'0x[0-9a-f]+', re.IGNORECASE), '<hex>'),
+    (re.compile(r'\'[^\']*\'|"[^"]*"'), '<str>'),
+    (re.compile(r'\d+(\.\d+)?'), '<n>'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def normalize_message(message: str) -> str:
+    """Strip variable parts (ids, numbers, quoted values) from an error message."""
+    normalized = (message or '')[:500]
+    for pattern, replacement in _NORMALIZE_PATTERNS:
+        normalized = pattern.sub(replacement, normalized)
+    return normalized.strip().lower()[:200]
+
+
+def error_fingerprint(error_type: str, message: str, endpoint: Optional[str]) -> str:
+    """Stable fingerprint for grouping identical errors."""
+    key = f"{error_type}|{normalize_message(message)}|{endpoint or ''}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+class _TokenBucket:
+    """Token bucket limiting how many new fingerprints are accepted."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class ErrorSink:
+    """Bounded, deduplicating, asynchronous writer for tracked errors."""
+
+    def __init__(self,
+                 window_seconds: float = ERROR_SINK_WINDOW_SECONDS,
+                 max_pending: int = ERROR_SINK_MAX_PENDING,
+                 rate_per_second: Optional[float] = ERROR_SINK_RATE_PER_SECOND,
+                 burst: int = ERROR_SINK_BURST,
+                 connection_factory: Optional[Any] = None):
+        """
+        Initialize the error sink.
+
+        Args:
+            window_seconds: Deduplication window and flush interval
+            max_pending: Maximum distinct fingerprints held between flushes
+            rate_per_second: New fingerprints accepted per second (sustained); None disables the limit
+            burst: New fingerprints accepted in a burst
+            connection_factory: Callable returning a DB-API connection (default get_db_connection)
+        """
+        self.window_seconds = window_seconds
+        self.max_pending = max_pending
+        self._bucket = _TokenBucket(rate_per_second, burst) if rate_per_second is not None else None
+        self._connection_factory = connection_factory
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._window_start = datetime.now()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._write_lock = threading.Lock()
+        self._backoff_until = 0.0
+        self._backoff = 0.0
+        self._dropped_in_window = 0
+        self._zero_columns: Optional[List[str]] = None
+        self.stats = {'accepted': 0, 'deduplicated': 0, 'dropped': 0, 'rows_written': 0, 'write_failures': 0}
+
+    # ------------------------------------------------------------------
+    # Producer side (request threads)
+    # ------------------------------------------------------------------
+    def submit(self, error_details: Dict[str, Any], occurrences: int = 1) -> bool:
+        """
+        Queue an error without blocking on I/O.
+
+        Args:
+            error_details: Error details from ErrorTracker
+            occurrences: How many times the error occurred (pre-aggregated log lines)
+
+        Returns:
+            bool: True if this is a new fingerprint for the current window
+        """
+        error_type = error_details.get('error_type', 'unknown')
+        message = error_details.get('error_message', '')
+        endpoint = error_details.get('endpoint')
+        fingerprint = error_fingerprint(error_type, message, endpoint)
+        now = datetime.now()
+
+        with self._lock:
+            aggregate = self._pending.get(fingerprint)
+            if aggregate is not None:
+                aggregate['count'] += occurrences
+                aggregate['last_seen'] = now
+                self.stats['deduplicated'] += occurrences
+                return False
+            if len(self._pending) >= self.max_pending or (self._bucket is not None and not self._bucket.take()):
+                self.stats['dropped'] += 1
+                self._dropped_in_window += 1
+                return False
+            self._pending[fingerprint] = {
+                'fingerprint': fingerprint,
+                'error_type': error_type,
+                'user_id': error_details.get('user_id') or 'system',
+                'endpoint': endpoint,
+                'count': occurrences,
+                'first_seen': now,
+                'last_seen': now,
+                'sample': {
+                    'message': message[:1000],
+                    'exception_type': error_details.get('exception_type'),
+                    'stack_trace': (error_details.get('traceback') or '')[:2000],
+                    'request_info': {
+                        'url': error_details.get('request_url'),
+                        'method': error_details.get('request_method'),
+                    },
+                    'context': {k: v for k, v in error_details.items()
+                                if k not in ('error_message', 'traceback', 'timestamp')},
+                },
+            }
+            self.stats['accepted'] += 1
+            self.stats['deduplicated'] += occurrences - 1
+            self._ensure_worker()
+        return True
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='error-sink', daemon=True)
+            self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Consumer side (background thread)
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.wait(self.window_seconds)
+            self._wakeup.clear()
+            if time.monotonic() >= self._backoff_until:
+                self._flush_pending()
+
+    def flush(self) -> int:
+        """
+        Write pending errors now (used by scripts and at exit).
+
+        Returns:
+            int: Rows written
+        """
+        return self._flush_pending()
+
+    def _flush_pending(self) -> int:
+        with self._lock:
+            dropped, self._dropped_in_window = self._dropped_in_window, 0
+            if not self._pending:
+                return 0
+            batch = list(self._pending.values())
+            window_start = self._window_start
+            self._pending = {}
+            self._window_start = datetime.now()
+
+        if dropped:
+            logger.warning(f"Error tracking rate limit reached: dropped {dropped} new errors in the last window")
+
+        try:
+            with self._write_lock:
+                written = self._write_batch(batch, window_start)
+            self._backoff = 0.0
+            self.stats['rows_written'] += written
+            return written
+        except Exception as e:
+            self.stats['write_failures'] += 1
+            self._backoff = min(ERROR_SINK_MAX_BACKOFF_SECONDS, max(self.window_seconds, self._backoff * 2))
+            self._backoff_until = time.monotonic() + self._backoff
+            total = sum(item['count'] for item in batch)
+            # One line per failed batch; the batch is dropped rather than retried
+            logging.getLogger('error_tracking_fallback').error(
+                f"Failed to record {len(batch)} error groups ({total} errors) in analytics: {e}; "
+                f"backing off {self._backoff:.1f}s"
+            )
+            return 0
+
+    def _connect(self) -> Any:
+        if self._connection_factory is not None:
+            return self._connection_factory()
+        from utils.database import get_db_connection
+        return get_db_connection()
+
+    def _write_batch(self, batch: List[Dict[str, Any]], window_start: datetime) -> int:
+        session_id = f"error_window_{window_start.strftime('%Y%m%d%H%M%S')}"
+        now_iso = datetime.now().isoformat()
+        rows = []
+        for item in batch:
+            custom_metrics = {
+                'error_batch': {
+                    'session_id': session_id,
+                    'fingerprint': item['fingerprint'],
+                    'timestamp': item['first_seen'].isoformat(),
+                    'first_seen': item['first_seen'].isoformat(),
+                    'last_seen': item['last_seen'].isoformat(),
+                    'error_count': item['count'],
+                    'endpoint': item['endpoint'],
+                    'errors': [dict(item['sample'], type=item['error_type'])],
+                }
+            }
+            rows.append([
+                item['user_id'], session_id, window_start.isoformat(),
+                'error_tracking', item['error_type'], item['count'],
+                json.dumps(custom_metrics, default=str), now_iso, now_iso,
+            ])
+
+        conn = self._connect()
+        try:
+            zero_columns = self._get_zero_columns(conn)
+            columns = list(_INSERT_COLUMNS) + zero_columns
+            placeholders = ', '.join('?' for _ in columns)
+            padding = [0] * len(zero_columns)
+            conn.executemany(
+                f"INSERT INTO analytics ({', '.join(columns)}) VALUES ({placeholders})",
+                [row + padding for row in rows],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return len(rows)
+
+    def _get_zero_columns(self, conn: Any) -> List[str]:
+        """Required analytics columns without a default; error rows store 0 there."""
+        if self._zero_columns is None:
+            self._zero_columns = [
+                row[1] for row in conn.execute("PRAGMA table_info(analytics)")
+                if row[3] and row[4] is None and not row[5] and row[1] not in _INSERT_COLUMNS
+            ]
+        return self._zero_columns
+
+    def close(self) -> None:
+        """Flush remaining errors and stop the background thread."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._flush_pending()
+
+
+# Global instance
+_error_sink = None
+_error_sink_lock = threading.Lock()
+
+
+def get_error_sink() -> ErrorSink:
+    """Get the global error sink instance."""
+    global _error_sink
+    if _error_sink is None:
+        with _error_sink_lock:
+            if _error_sink is None:
+                _error_sink = ErrorSink()
+                atexit.register(_error_sink.close)
+    return _error_sink
@@ -12,13 +12,18 @@ import json
 import sys
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List, Union
-from flask import g, request, session
+from flask import g, request, session, has_request_context
 import re
 import os
 
 from models.analytics import Analytics
 from services.analytics_integration import track_activity
 from utils.database import get_db_session
+from services.error_sink import ErrorSink, get_error_sink, ERROR_SINK_MAX_PENDING
+from services.log_classifier import (
+    get_log_classifier, LogCheckpoint, complete_lines_end, split_log_chunks, iter_scanned_chunks,
+    LOG_INGEST_CHECKPOINT, LOG_INGEST_PARALLEL_MIN_BYTES, LOG_INGEST_WORKERS
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,39 +31,8 @@ class ErrorTracker:
     """Enhanced error tracking for comprehensive analytics."""
     
     def __init__(self):
-        self.error_patterns = {
-            'database_error': [
-                r'sqlite3\.OperationalError',
-                r'no such table',
-                r'database.*locked',
-                r'constraint.*failed'
-            ],
-            'session_error': [
-                r'Session.*rollback',
-                r'DetachedInstanceError',
-                r'transaction.*rolled back'
-            ],
-            'http_error': [
-                r'HTTP.*[4-5]\d{2}',
-                r'Request.*failed',
-                r'Connection.*error'
-            ],
-            'analytics_error': [
-                r'Error tracking',
-                r'Analytics.*failed',
-                r'Could not.*analytics'
-            ],
-            'vm_error': [
-                r'VM.*error',
-                r'Virtual machine',
-                r'vm_integration.*not found'
-            ],
-            'import_error': [
-                r'ModuleNotFoundError',
-                r'ImportError',
-                r'module.*not found'
-            ]
-        }
+        self.classifier = get_log_classifier()
+        self.error_patterns = self.classifier.patterns
     
     def track_error(self, 
                    error_type: str,
@@ -82,11 +56,12 @@ class ErrorTracker:
             if additional_context:
                 error_details.update(additional_context)
             
-            # Track in analytics
-            self._record_in_analytics(error_details)
+            # Track in analytics; repeats of the same error are only counted
+            is_new = self._record_in_analytics(error_details)
             
-            # Log structured error
-            self._log_structured_error(error_details)
+            # Log structured error once per fingerprint and window
+            if is_new:
+                self._log_structured_error(error_details)
             
         except Exception as tracking_error:
             # Don't let error tracking itself cause issues
@@ -165,46 +140,77 @@ class ErrorTracker:
     
     def process_log_line(self, log_line: str) -> None:
         """Process a log line and extract error information."""
-        # Skip if not an error line
-        if not any(level in log_line for level in ['ERROR', 'WARNING', 'CRITICAL']):
+        # Skip if not an error line; classification is a single regex pass
+        record = self.classifier.parse_line(log_line)
+        if record is None:
             return
         
-        # Extract error type based on patterns
-        error_type = self._classify_error(log_line)
-        
-        # Extract timestamp if present
-        timestamp_match = re.search(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', log_line)
-        timestamp = timestamp_match.group(1) if timestamp_match else None
-        
-        # Extract logger name
-        logger_match = re.search(r' - ([^-]+) - ', log_line)
-        logger_name = logger_match.group(1).strip() if logger_match else 'unknown'
-        
         # Track the error
         context = {
-            'log_timestamp': timestamp,
-            'logger_name': logger_name,
+            'log_timestamp': record['timestamp'],
+            'logger_name': record['logger_name'],
             'log_line': log_line[:1000]  # Truncate very long lines
         }
         
         self.track_error(
-            error_type=error_type,
-            error_message=log_line.split(' - ')[-1] if ' - ' in log_line else log_line,
+            error_type=record['error_type'],
+            error_message=record['error_message'],
             additional_context=context
         )
     
+    def ingest_log_groups(self, groups: Dict[str, Dict[str, Any]], sink: ErrorSink) -> int:
+        """
+        Record pre-aggregated log errors (see scan_log_chunk) in a sink.
+        
+        Historical lines are already in the log files, so no STRUCTURED_ERROR
+        entry is written for them.
+        
+        Args:
+            groups: Fingerprint -> {'count', 'record'} from a scanned chunk
+            sink: Sink receiving the errors
+            
+        Returns:
+            int: Number of groups submitted
+        """
+        submitted = 0
+        for group in groups.values():
+            record = group['record']
+            error_details = self._extract_error_details(record['error_type'], record['error_message'], None)
+            error_details.update({
+                'log_timestamp': record['timestamp'],
+                'logger_name': record['logger_name'],
+                'log_line': record['log_line']
+            })
+            sink.submit(error_details, occurrences=group['count'])
+            submitted += 1
+            if submitted % ERROR_SINK_MAX_PENDING == 0:
+                sink.flush()
+        return submitted
+    
     def _extract_error_details(self, error_type: str, error_message: str, exception: Optional[Exception]) -> Dict[str, Any]:
         """Extract comprehensive error details."""
         details = {
             'error_type': error_type,
             'error_message': error_message[:1000],  # Truncate long messages
             'timestamp': datetime.now(timezone.utc).isoformat(),
-            'request_url': request.url if request else None,
-            'request_method': request.method if request else None,
-            'user_id': session.get('user_id') if session else None,
-            'session_id': getattr(g, 'analytics_session_id', None) if hasattr(g, 'analytics_session_id') else None
+            'request_url': None,
+            'request_method': None,
+            'endpoint': None,
+            'user_id': None,
+            'session_id': None
         }
         
+        # Log ingestion and scripts run without a request
+        if has_request_context():
+            details.update({
+                'request_url': request.url,
+                'request_method': request.method,
+                # Route template, not the URL: query strings and path values must not split the fingerprint
+                'endpoint': request.url_rule.rule if request.url_rule else request.path,
+                'user_id': session.get('user_id'),
+                'session_id': getattr(g, 'analytics_session_id', None)
+            })
+        
         if exception:
             details.update({
                 'exception_type': type(exception).__name__,
@@ -216,104 +222,16 @@ class ErrorTracker:
     
     def _classify_error(self, log_line: str) -> str:
         """Classify error based on log content."""
-        log_lower = log_line.lower()
-        
-        for error_type, patterns in self.error_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, log_line, re.IGNORECASE):
-                    return error_type
-        
-        return 'general_error'
+        return self.classifier.classify(log_line)
     
-    def _record_in_analytics(self, error_details: Dict[str, Any]) -> None:
-        """Record error tracking information in analytics database."""
-        try:
-            # Generate a unique session ID for error tracking
-            import uuid
-            session_id = f"error_session_{uuid.uuid4().hex[:8]}"
-            
-            # Get the current user or use a default
-            user_id = error_details.get('user_id') or 'system'
-            
-            # Prepare analytics data focused on error tracking
-            analytics_data = {
-                'user_id': user_id,
-                'session_id': session_id,
-                'session_start': datetime.now(),
-                'activity_type': 'error_tracking',
-                'activity_subtype': error_details.get('error_type', 'unknown_error'),
-                'error_count': 1,
-                'custom_metrics': json.dumps({
-                    'error_batch': {
-                        'session_id': session_id,
-                        'timestamp': error_details.get('timestamp', datetime.now().isoformat()),
-                        'error_count': 1,
-                        'errors': [{
-                            'message': error_details.get('error_message', 'Unknown error'),
-                            'type': error_details.get('error_type', 'unknown'),
-                            'context': error_details.get('additional_context', {}),
-                            'stack_trace': error_details.get('stack_trace', ''),
-                            'request_info': {
-                                'url': error_details.get('request_url'),
-                                'method': error_details.get('request_method'),
-                                'user_agent': error_details.get('user_agent')
-                            }
-                        }]
-                    }
-                })
-            }
-            
-            # Use a simplified database approach to avoid recursion
-            from utils.database import get_db_connection
-            
-            # Create analytics entry without triggering error handlers
-            import sqlite3
-            
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Insert directly into analytics table
-            cursor.execute("""
-                INSERT INTO analytics (
-                    user_id, session_id, session_start, activity_type, activity_subtype, 
-                    error_count, custom_metrics, created_at, updated_at,
-                    questions_attempted, questions_correct, questions_incorrect
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                analytics_data['user_id'],
-                analytics_data['session_id'], 
-                analytics_data['session_start'].isoformat(),
-                analytics_data['activity_type'],
-                analytics_data['activity_subtype'],
-                analytics_data['error_count'],
-                analytics_data['custom_metrics'],
-                datetime.now().isoformat(),
-                datetime.now().isoformat(),
-                0,  # questions_attempted
-                0,  # questions_correct 
-                0   # questions_incorrect
-            ))
-            
-            conn.commit()
-            conn.close()
-                
-        except Exception as e:
-            # Log to file instead of database to avoid recursion
-            try:
-                import logging
-                logging.basicConfig(
-                    filename='logs/error_tracking_fallback.log',
-                    level=logging.ERROR,
-                    format='%(asctime)s - ERROR TRACKING FALLBACK - %(message)s'
-                )
-                logger = logging.getLogger('error_tracking_fallback')
-                logger.error(f"Failed to record error in analytics: {e}")
-                logger.error(f"Original error details: {error_details}")
-            except:
-                # Last resort - print to console
-                print(f"CRITICAL: Error tracking failed completely: {e}")
-                print(f"Original error: {error_details}")
-                pass
+    def _record_in_analytics(self, error_details: Dict[str, Any]) -> bool:
+        """
+        Hand the error to the background sink.
+        
+        Returns:
+            bool: True if this is the first occurrence of the error in the current window
+        """
+        return get_error_sink().submit(error_details)
     
     def _log_structured_error(self, error_details: Dict[str, Any]) -> None:
         """Log error in structured format."""
@@ -363,19 +281,57 @@ def track_vm_error(vm_operation: str, error_message: str) -> None:
     """Convenience function to track VM errors."""
     error_tracker.track_vm_error(vm_operation, error_message)
 
-def process_log_file(log_file_path: str) -> Dict[str, int]:
-    """Process an entire log file and track all errors found."""
-    error_counts = {}
+def process_log_file(log_file_path: str,
+                     resume: bool = True,
+                     workers: Optional[int] = None,
+                     checkpoint_path: str = LOG_INGEST_CHECKPOINT) -> Dict[str, int]:
+    """
+    Process a log file and track all errors found.
+    
+    The file is memory-mapped and scanned in chunks. Files larger than
+    LOG_INGEST_PARALLEL_MIN_BYTES are scanned in parallel worker processes.
+    With resume enabled, only lines after the last checkpointed offset are
+    processed. A trailing line without a newline is left for the next run.
+    
+    Args:
+        log_file_path: Log file to process
+        resume: Continue from the checkpointed byte offset
+        workers: Worker processes (default LOG_INGEST_WORKERS)
+        checkpoint_path: File holding the byte offsets already ingested
+        
+    Returns:
+        dict: Error counts by type for the processed range
+    """
+    error_counts: Dict[str, int] = {}
     
     try:
-        with open(log_file_path, 'r') as f:
-            for line in f:
-                error_tracker.process_log_line(line.strip())
+        checkpoint = LogCheckpoint(checkpoint_path) if resume else None
+        start = checkpoint.get_offset(log_file_path) if checkpoint else 0
+        end = complete_lines_end(log_file_path, os.path.getsize(log_file_path))
+        if end <= start:
+            return error_counts
+        
+        if workers is None:
+            workers = LOG_INGEST_WORKERS if end - start >= LOG_INGEST_PARALLEL_MIN_BYTES else 1
+        
+        # Historical errors are not rate limited; the sink is flushed per chunk
+        sink = ErrorSink(rate_per_second=None)
+        try:
+            for result in iter_scanned_chunks(log_file_path, split_log_chunks(log_file_path, start, end), workers):
+                for error_type, count in result['counts'].items():
+                    error_counts[error_type] = error_counts.get(error_type, 0) + count
                 
-                # Count error types
-                error_type = error_tracker._classify_error(line)
-                if 'error' in error_type.lower():
-                    error_counts[error_type] = error_counts.get(error_type, 0) + 1
+                # Counted before ingesting: ingest_log_groups flushes large chunks itself
+                failures = sink.stats['write_failures']
+                error_tracker.ingest_log_groups(result['groups'], sink)
+                sink.flush()
+                if sink.stats['write_failures'] != failures:
+                    # Keep the checkpoint so the chunk is retried next run
+                    break
+                if checkpoint:
+                    checkpoint.set_offset(log_file_path, result['end'])
+        finally:
+            sink.close()
     
     except Exception as e:
         logger.error(f"Could not process log file {log_file_path}: {e}")
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Global Leaderboard Service for Linux+ Study System
+
+Ranks every profile against each other across daily, weekly and all-time
+windows. Scores are kept per (window, period, user) in an indexed SQLite
+table, so they are durable and top-K reads use the index. For each period
+that is in use, an in-memory sorted rank index is built on first use and
+then updated incrementally. Rank-of-user lookups are a binary search over
+that index. The indexes are dropped and rebuilt whenever another connection
+(e.g. another worker process) has written to the database since they were
+last used, which SQLite reports through PRAGMA data_version.
+
+The leaderboard is updated once per finished quiz session (see
+QuizController.end_session).
+"""
+
+import sqlite3
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.game_values import get_game_values
+from utils.unit_of_work import get_current_unit_of_work
+
+WINDOW_DAILY = "daily"
+WINDOW_WEEKLY = "weekly"
+WINDOW_ALL_TIME = "all_time"
+LEADERBOARD_WINDOWS = (WINDOW_DAILY, WINDOW_WEEKLY, WINDOW_ALL_TIME)
+
+# How many past periods are kept before old rows are pruned
+RETAINED_PERIODS = {WINDOW_DAILY: 31, WINDOW_WEEKLY: 12}
+
+RankKey = Tuple[int, int, str]
+
+
+class _RankIndex:
+    """Sorted (-points, -correct, user_id) keys for one window period."""
+
+    def __init__(self, rows: List[Tuple[str, int, int]]):
+        self._keys: List[RankKey] = sorted((-points, -correct, user_id) for user_id, points, correct in rows)
+        self._by_user: Dict[str, RankKey] = {key[2]: key for key in self._keys}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def update(self, user_id: str, points: int, correct: int) -> None:
+        old_key = self._by_user.get(user_id)
+        if old_key is not None:
+            del self._keys[bisect_left(self._keys, old_key)]
+        new_key = (-points, -correct, user_id)
+        insort(self._keys, new_key)
+        self._by_user[user_id] = new_key
+
+    def rank(self, user_id: str) -> Optional[int]:
+        key = self._by_user.get(user_id)
+        if key is None:
+            return None
+        return bisect_left(self._keys, key) + 1
+
+    def top(self, limit: int) -> List[str]:
+        return [key[2] for key in self._keys[:limit]]
+
+
+class LeaderboardService:
+    """Cross-profile leaderboard with daily, weekly and all-time windows."""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Initialize the leaderboard service.
+
+        Args:
+            db_path: SQLite file holding the scores (default data/leaderboard.db)
+        """
+        self.db_path = Path(db_path or Path("data/leaderboard.db"))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.created = not self.db_path.exists()
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._indexes: Dict[Tuple[str, str], _RankIndex] = {}
+        self._create_schema()
+        self._data_version = self._read_data_version()
+
+    def _create_schema(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS leaderboard_scores (
+                    time_window TEXT NOT NULL,
+                    period TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    display_name TEXT,
+                    points INTEGER NOT NULL DEFAULT 0,
+                    correct INTEGER NOT NULL DEFAULT 0,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    sessions INTEGER NOT NULL DEFAULT 0,
+                    best_accuracy REAL NOT NULL DEFAULT 0,
+                    updated_at TEXT,
+                    PRIMARY KEY (time_window, period, user_id)
+                )
+            """)
+            self._conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_leaderboard_rank
+                ON leaderboard_scores (time_window, period, points DESC, correct DESC, user_id)
+            """)
+
+    # ------------------------------------------------------------------
+    # Periods
+    # ------------------------------------------------------------------
+    @staticmethod
+    def period_for(window: str, when: Optional[datetime] = None) -> str:
+        """Return the period key of a window for a point in time."""
+        when = when or datetime.now()
+        if window == WINDOW_DAILY:
+            return when.strftime("%Y-%m-%d")
+        if window == WINDOW_WEEKLY:
+            year, week, _ = when.isocalendar()
+            return f"{year}-W{week:02d}"
+        if window == WINDOW_ALL_TIME:
+            return "all"
+        raise ValueError(f"Unknown leaderboard window: {window}")
+
+    def _oldest_retained_period(self, window: str, when: datetime) -> Optional[str]:
+        keep = RETAINED_PERIODS.get(window)
+        if not keep:
+            return None
+        step = timedelta(days=1) if window == WINDOW_DAILY else timedelta(weeks=1)
+        return self.period_for(window, when - step * (keep - 1))
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def record_session(self, user_id: str, points: int, correct: int, total: int,
+                       display_name: Optional[str] = None, when: Optional[datetime] = None) -> Dict[str, Optional[int]]:
+        """
+        Add a finished session to every window.
+
+        Inside a unit of work the update runs only after the unit commits.
+
+        Args:
+            user_id: Profile that played the session
+            points: Points earned in the session
+            correct: Correct answers in the session
+            total: Questions answered in the session
+            display_name: Optional name shown on the leaderboard
+            when: Session time (default now)
+
+        Returns:
+            dict: New rank per window (empty when deferred to a unit of work)
+        """
+        uow = get_current_unit_of_work()
+        if uow is not None:
+            uow.on_commit(lambda: self.record_session(user_id, points, correct, total, display_name, when))
+            return {}
+
+        when = when or datetime.now()
+        accuracy = (correct / total * 100) if total > 0 else 0.0
+        ranks: Dict[str, Optional[int]] = {}
+        try:
+            with self._lock:
+                with self._conn:
+                    for window in LEADERBOARD_WINDOWS:
+                        self._upsert(window, self.period_for(window, when), user_id, display_name,
+                                     points, correct, total, 1, accuracy, when)
+                    self._prune(datetime.now())
+                for window in LEADERBOARD_WINDOWS:
+                    ranks[window] = self._refresh_index_entry(window, self.period_for(window, when), user_id)
+        except sqlite3.Error as e:
+            print(f"Error updating leaderboard: {e}")
+        return ranks
+
+    def _upsert(self, window: str, period: str, user_id: str, display_name: Optional[str],
+                points: int, correct: int, total: int, sessions: int, accuracy: float, when: datetime) -> None:
+        self._conn.execute("""
+            INSERT INTO leaderboard_scores
+                (time_window, period, user_id, display_name, points, correct, total, sessions, best_accuracy, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (time_window, period, user_id) DO UPDATE SET
+                display_name = COALESCE(excluded.display_name, display_name),
+                points = points + excluded.points,
+                correct = correct + excluded.correct,
+                total = total + excluded.total,
+                sessions = sessions + excluded.sessions,
+                best_accuracy = MAX(best_accuracy, excluded.best_accuracy),
+                updated_at = excluded.updated_at
+        """, (window, period, user_id, display_name, points, correct, total, sessions, accuracy, when.isoformat()))
+
+    def _prune(self, when: datetime) -> None:
+        for window in RETAINED_PERIODS:
+            oldest = self._oldest_retained_period(window, when)
+            cursor = self._conn.execute(
+                "DELETE FROM leaderboard_scores WHERE time_window = ? AND period < ?", (window, oldest)
+            )
+            if cursor.rowcount:
+                for key in [k for k in self._indexes if k[0] == window and k[1] < oldest]:
+                    del self._indexes[key]
+
+    def _read_data_version(self) -> int:
+        # Changes when another connection commits; this connection's own commits leave it alone
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _sync_indexes(self) -> None:
+        """Drop the rank indexes if another connection changed the scores since they were built."""
+        version = self._read_data_version()
+        if version != self._data_version:
+            self._indexes.clear()
+            self._data_version = version
+
+    def _refresh_index_entry(self, window: str, period: str, user_id: str) -> Optional[int]:
+        self._sync_indexes()
+        index = self._indexes.get((window, period))
+        if index is None:
+            # Loading the period reads the fresh row as well
+            return self._get_index(window, period).rank(user_id)
+        row = self._conn.execute(
+            "SELECT points, correct FROM leaderboard_scores WHERE time_window = ? AND period = ? AND user_id = ?",
+            (window, period, user_id),
+        ).fetchone()
+        if row is not None:
+            index.update(user_id, row["points"], row["correct"])
+        return index.rank(user_id)
+
+    def _get_index(self, window: str, period: str) -> _RankIndex:
+        self._sync_indexes()
+        index = self._indexes.get((window, period))
+        if index is None:
+            rows = self._conn.execute(
+                "SELECT user_id, points, correct FROM leaderboard_scores WHERE time_window = ? AND period = ?",
+                (window, period),
+            ).fetchall()
+            index = _RankIndex([(row["user_id"], row["points"], row["correct"]) for row in rows])
+            self._indexes[(window, period)] = index
+        return index
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def get_top(self, window: str = WINDOW_ALL_TIME, limit: int = 10,
+                period: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the top entries of a window.
+
+        Args:
+            window: daily, weekly or all_time
+            limit: Number of entries
+            period: Specific period key (default: the current one)
+
+        Returns:
+            list: Entries with rank, user_id, display_name, points, accuracy, sessions
+        """
+        period = period or self.period_for(window)
+        try:
+            with self._lock:
+                rows = self._conn.execute("""
+                    SELECT user_id, display_name, points, correct, total, sessions, best_accuracy
+                    FROM leaderboard_scores
+                    WHERE time_window = ? AND period = ?
+                    ORDER BY points DESC, correct DESC, user_id
+                    LIMIT ?
+                """, (window, period, limit)).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error reading leaderboard: {e}")
+            return []
+        return [self._format_row(rank, row) for rank, row in enumerate(rows, 1)]
+
+    def get_rank(self, user_id: str, window: str = WINDOW_ALL_TIME,
+                 period: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get a user's rank in a window.
+
+        Args:
+            user_id: Profile to look up
+            window: daily, weekly or all_time
+            period: Specific period key (default: the current one)
+
+        Returns:
+            dict: rank, total_ranked and the user's entry, or None if unranked
+        """
+        period = period or self.period_for(window)
+        try:
+            with self._lock:
+                index = self._get_index(window, period)
+                rank = index.rank(user_id)
+                if rank is None:
+                    return None
+                row = self._conn.execute("""
+                    SELECT user_id, display_name, points, correct, total, sessions, best_accuracy
+                    FROM leaderboard_scores WHERE time_window = ? AND period = ? AND user_id = ?
+                """, (window, period, user_id)).fetchone()
+                total_ranked = len(index)
+        except sqlite3.Error as e:
+            print(f"Error reading leaderboard rank: {e}")
+            return None
+        if row is None:
+            return None
+        entry = self._format_row(rank, row)
+        entry["total_ranked"] = total_ranked
+        return entry
+
+    @staticmethod
+    def _format_row(rank: int, row: sqlite3.Row) -> Dict[str, Any]:
+        total = row["total"]
+        return {
+            "rank": rank,
+            "user_id": row["user_id"],
+            "display_name": row["display_name"] or row["user_id"].replace("_", " ").title(),
+            "points": row["points"],
+            "correct": row["correct"],
+            "total": total,
+            "accuracy": round(row["correct"] / total * 100, 1) if total else 0.0,
+            "best_accuracy": round(row["best_accuracy"], 1),
+            "sessions": row["sessions"],
+        }
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def seed_from_profiles(self, profiles: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Seed the all-time window from existing analytics profiles.
+
+        Only profiles without an all-time entry are added, so this is safe to
+        call repeatedly. Profiles do not record session points (their xp is
+        the analytics measure), so each correct answer is credited with the
+        base points a session awards for it; streak and speed bonuses from
+        before the leaderboard existed are not counted.
+
+        Args:
+            profiles: Output of SimpleAnalyticsManager.get_all_profiles (loaded if omitted)
+
+        Returns:
+            int: Number of profiles added
+        """
+        if profiles is None:
+            from services.simple_analytics import get_analytics_manager
+            profiles = get_analytics_manager().get_all_profiles()
+
+        scoring = get_game_values().scoring
+        points_per_correct = int(scoring.points_per_correct * scoring.xp_multiplier)
+        now = datetime.now()
+        added = 0
+        try:
+            with self._lock:
+                with self._conn:
+                    for user_id, profile in profiles.items():
+                        if not profile.get("total_questions"):
+                            continue
+                        cursor = self._conn.execute("""
+                            INSERT OR IGNORE INTO leaderboard_scores
+                                (time_window, period, user_id, display_name, points, correct, total,
+                                 sessions, best_accuracy, updated_at)
+                            VALUES (?, 'all', ?, ?, ?, ?, ?, ?, ?, ?)
+                        """, (WINDOW_ALL_TIME, user_id, profile.get("display_name"),
+                              int(profile.get("correct_answers", 0)) * points_per_correct,
+                              int(profile.get("correct_answers", 0)),
+                              int(profile.get("total_questions", 0)), int(profile.get("total_sessions", 0)),
+                              float(profile.get("accuracy", 0.0)), now.isoformat()))
+                        added += cursor.rowcount
+                self._indexes.pop((WINDOW_ALL_TIME, "all"), None)
+        except sqlite3.Error as e:
+            print(f"Error seeding leaderboard: {e}")
+        return added
+
+    def remove_user(self, user_id: str) -> None:
+        """Remove a profile from every window (e.g. after profile deletion)."""
+        try:
+            with self._lock:
+                with self._conn:
+                    self._conn.execute("DELETE FROM leaderboard_scores WHERE user_id = ?", (user_id,))
+                self._indexes.clear()
+        except sqlite3.Error as e:
+            print(f"Error removing user from leaderboard: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Global instance
+_leaderboard_service = None
+
+
+def get_leaderboard_service() -> LeaderboardService:
+    """
+    Get the global leaderboard service instance.
+    
+    On first run the all-time window is seeded from the existing analytics
+    profiles, so create the service before any session is recorded.
+    """
+    global _leaderboard_service
+    if _leaderboard_service is None:
+        _leaderboard_service = LeaderboardService()
+        if _leaderboard_service.created:
+            _leaderboard_service.seed_from_profiles()
+    return _leaderboard_service
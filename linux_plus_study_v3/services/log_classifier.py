@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Log Classifier and Ingestion for Error Analytics
+
+Single-pass classification of application log lines and fast ingestion of
+large log files:
+
+- Each category's patterns are compiled once into a single alternation.
+  Before a category regex runs, the lowercased line is checked for the
+  literal each pattern starts with (e.g. 'no such table', 'vm'). Most
+  lines are ruled out by a few substring checks and never reach a regex.
+- Lines are only parsed when they contain a level token (ERROR, WARNING,
+  CRITICAL). Log files are memory-mapped, and the level token is searched
+  across the raw bytes. Lines without one are never split or decoded.
+- Large files are split on line boundaries into chunks that are scanned
+  in parallel worker processes. Each chunk returns per-fingerprint
+  aggregates instead of individual lines.
+- A checkpoint file records the byte offset reached for each log file,
+  so the next run resumes where the last one stopped.
+"""
+
+import json
+import logging
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from services.error_sink import error_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Configuration via environment
+LOG_INGEST_CHUNK_BYTES = int(os.getenv('LOG_INGEST_CHUNK_BYTES', str(32 * 1024 * 1024)))
+LOG_INGEST_PARALLEL_MIN_BYTES = int(os.getenv('LOG_INGEST_PARALLEL_MIN_BYTES', str(64 * 1024 * 1024)))
+LOG_INGEST_WORKERS = int(os.getenv('LOG_INGEST_WORKERS', '0')) or (os.cpu_count() or 1)
+LOG_INGEST_CHECKPOINT = os.getenv('LOG_INGEST_CHECKPOINT', 'logs/.log_ingest_checkpoint.json')
+
+# Category patterns, checked in priority order
+ERROR_PATTERNS: Dict[str, List[str]] = {
+    'database_error': [
+        r'sqlite3\.OperationalError',
+        r'no such table',
+        r'database.*locked',
+        r'constraint.*failed'
+    ],
+    'session_error': [
+        r'Session.*rollback',
+        r'DetachedInstanceError',
+        r'transaction.*rolled back'
+    ],
+    'http_error': [
+        r'HTTP.*[4-5]\d{2}',
+        r'Request.*failed',
+        r'Connection.*error'
+    ],
+    'analytics_error': [
+        r'Error tracking',
+        r'Analytics.*failed',
+        r'Could not.*analytics'
+    ],
+    'vm_error': [
+        r'VM.*error',
+        r'Virtual machine',
+        r'vm_integration.*not found'
+    ],
+    'import_error': [
+        r'ModuleNotFoundError',
+        r'ImportError',
+        r'module.*not found'
+    ]
+}
+
+DEFAULT_ERROR_TYPE = 'general_error'
+
+LEVEL_TOKENS = ('ERROR', 'WARNING', 'CRITICAL')
+_LEVEL_TOKEN = re.compile('|'.join(LEVEL_TOKENS))
+_LEVEL_TOKEN_BYTES = re.compile('|'.join(LEVEL_TOKENS).encode('ascii'))
+_TIMESTAMP = re.compile(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})')
+_LOGGER_NAME = re.compile(r' - ([^-]+) - ')
+_LEVEL = re.compile(r' - (ERROR|WARNING|CRITICAL)')
+_REGEX_META = set('.^$*+?{}[]|()')
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Lowercased literal text every match of the pattern starts with ('' if none)."""
+    if '|' in pattern:
+        # Each branch of an alternation has its own prefix
+        return ''
+    literal = []
+    position = 0
+    while position < len(pattern):
+        char = pattern[position]
+        if char == '\\':
+            if position + 1 >= len(pattern) or pattern[position + 1].isalnum():
+                break
+            char, step = pattern[position + 1], 2
+        elif char in _REGEX_META:
+            break
+        else:
+            step = 1
+        # A quantified character is optional, so it is not part of the prefix
+        if position + step < len(pattern) and pattern[position + step] in '*?{':
+            break
+        literal.append(char)
+        position += step
+    return ''.join(literal).lower()
+
+
+class LogClassifier:
+    """Classifies log lines with precompiled, keyword-prefiltered category regexes."""
+
+    def __init__(self, patterns: Optional[Dict[str, List[str]]] = None):
+        """
+        Initialize the classifier.
+
+        Args:
+            patterns: Category name -> regex list, in priority order (default ERROR_PATTERNS)
+        """
+        self.patterns = patterns if patterns is not None else ERROR_PATTERNS
+        self._rules: List[Tuple[str, Optional[Tuple[str, ...]], Any]] = []
+        for category, regexes in self.patterns.items():
+            keywords = tuple(_literal_prefix(regex) for regex in regexes)
+            self._rules.append((
+                category,
+                None if '' in keywords else keywords,  # no prefilter if any pattern lacks a literal
+                re.compile('|'.join(f'(?:{regex})' for regex in regexes), re.IGNORECASE),
+            ))
+
+    def classify(self, line: str) -> str:
+        """
+        Return the highest-priority category matching anywhere in the line.
+
+        Args:
+            line: Log line
+
+        Returns:
+            str: Category name, or 'general_error' if nothing matches
+        """
+        lower = line.lower()
+        for category, keywords, regex in self._rules:
+            if keywords is not None and not any(keyword in lower for keyword in keywords):
+                continue
+            if regex.search(line):
+                return category
+        return DEFAULT_ERROR_TYPE
+
+    def parse_line(self, line: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse an error/warning log line.
+
+        Args:
+            line: Log line (without trailing newline)
+
+        Returns:
+            dict: timestamp, logger_name, error_level, error_type and error_message,
+                or None if the line has no level token
+        """
+        if not _LEVEL_TOKEN.search(line):
+            return None
+
+        timestamp_match = _TIMESTAMP.search(line)
+        logger_match = _LOGGER_NAME.search(line)
+        level_match = _LEVEL.search(line)
+        return {
+            'timestamp': timestamp_match.group(1) if timestamp_match else None,
+            'logger_name': logger_match.group(1).strip() if logger_match else 'unknown',
+            'error_level': level_match.group(1) if level_match else 'ERROR',
+            'error_type': self.classify(line),
+            'error_message': line.split(' - ')[-1] if ' - ' in line else line,
+        }
+
+
+# Global instance
+_log_classifier = None
+
+
+def get_log_classifier() -> LogClassifier:
+    """Get the global log classifier instance."""
+    global _log_classifier
+    if _log_classifier is None:
+        _log_classifier = LogClassifier()
+    return _log_classifier
+
+
+# ----------------------------------------------------------------------
+# Memory-mapped scanning
+# ----------------------------------------------------------------------
+def iter_level_lines(buffer: Any, start: int, end: int) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield (offset, line) for lines in buffer[start:end] that contain a level token.
+
+    Lines without a level token are skipped without being split out.
+
+    Args:
+        buffer: bytes or mmap
+        start: Offset of the first line
+        end: Offset just past the last line
+    """
+    search = _LEVEL_TOKEN_BYTES.search
+    position = start
+    while position < end:
+        match = search(buffer, position, end)
+        if match is None:
+            return
+        line_start = max(buffer.rfind(b'\n', start, match.start()) + 1, start)
+        line_end = buffer.find(b'\n', match.end(), end)
+        if line_end == -1:
+            line_end = end
+        yield line_start, buffer[line_start:line_end]
+        position = line_end + 1
+
+
+def scan_log_chunk(log_file_path: str, start: int, end: int) -> Dict[str, Any]:
+    """
+    Classify the error lines in one byte range of a log file.
+
+    Runs in worker processes for large files. Lines are grouped by error
+    fingerprint, so the result stays small however many lines repeat.
+
+    Args:
+        log_file_path: Log file
+        start: Chunk start (at a line boundary)
+        end: Chunk end (just past a newline)
+
+    Returns:
+        dict: end offset, error line count, counts per type and
+            fingerprint -> {'count', 'record'} groups
+    """
+    classifier = get_log_classifier()
+    counts: Dict[str, int] = {}
+    groups: Dict[str, Dict[str, Any]] = {}
+    lines = 0
+
+    with open(log_file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        for _, raw_line in iter_level_lines(buffer, start, end):
+            line = raw_line.decode('utf-8', errors='replace').strip()
+            record = classifier.parse_line(line)
+            if record is None:
+                continue
+            lines += 1
+            error_type = record['error_type']
+            counts[error_type] = counts.get(error_type, 0) + 1
+
+            fingerprint = error_fingerprint(error_type, record['error_message'], None)
+            group = groups.get(fingerprint)
+            if group is None:
+                record['log_line'] = line[:1000]
+                groups[fingerprint] = {'count': 1, 'record': record}
+            else:
+                group['count'] += 1
+
+    return {'end': end, 'lines': lines, 'counts': counts, 'groups': groups}
+
+
+def split_log_chunks(log_file_path: str, start: int, end: int,
+                     chunk_bytes: int = LOG_INGEST_CHUNK_BYTES) -> List[Tuple[int, int]]:
+    """
+    Split [start, end) into chunks that end on newlines.
+
+    Args:
+        log_file_path: Log file
+        start: First offset to process
+        end: Offset just past the last complete line
+        chunk_bytes: Target chunk size
+
+    Returns:
+        list: (start, end) byte ranges in file order
+    """
+    chunks = []
+    with open(log_file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        position = start
+        while position < end:
+            boundary = min(position + chunk_bytes, end)
+            if boundary < end:
+                newline = buffer.find(b'\n', boundary - 1, end)
+                boundary = end if newline == -1 else newline + 1
+            chunks.append((position, boundary))
+            position = boundary
+    return chunks
+
+
+def complete_lines_end(log_file_path: str, size: int) -> int:
+    """Offset just past the last newline; a trailing partial line is left for the next run."""
+    if size == 0:
+        return 0
+    with open(log_file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        return buffer.rfind(b'\n', 0, size) + 1
+
+
+def iter_scanned_chunks(log_file_path: str, chunks: List[Tuple[int, int]],
+                        workers: int = LOG_INGEST_WORKERS) -> Iterator[Dict[str, Any]]:
+    """
+    Scan chunks in file order, in parallel when there is more than one worker.
+
+    Args:
+        log_file_path: Log file
+        chunks: Byte ranges from split_log_chunks
+        workers: Worker processes (1 scans in this process)
+    """
+    if workers <= 1 or len(chunks) <= 1:
+        for start, end in chunks:
+            yield scan_log_chunk(log_file_path, start, end)
+        return
+
+    paths = [log_file_path] * len(chunks)
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        yield from executor.map(scan_log_chunk, paths,
+                                [start for start, _ in chunks], [end for _, end in chunks])
+
+
+# ----------------------------------------------------------------------
+# Checkpoints
+# ----------------------------------------------------------------------
+class LogCheckpoint:
+    """Byte offsets already ingested, per log file."""
+
+    def __init__(self, checkpoint_path: str = LOG_INGEST_CHECKPOINT):
+        self.checkpoint_path = Path(checkpoint_path)
+        self._entries: Dict[str, Dict[str, int]] = {}
+        try:
+            if self.checkpoint_path.exists():
+                with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable log checkpoint {self.checkpoint_path}: {e}")
+            self._entries = {}
+
+    def get_offset(self, log_file_path: str) -> int:
+        """
+        Offset to resume from, or 0 if the file was rotated or truncated.
+
+        Args:
+            log_file_path: Log file
+        """
+        entry = self._entries.get(str(Path(log_file_path).resolve()))
+        if not entry:
+            return 0
+        stat = os.stat(log_file_path)
+        if entry.get('inode') != stat.st_ino or stat.st_size < entry.get('offset', 0):
+            return 0
+        return entry.get('offset', 0)
+
+    def set_offset(self, log_file_path: str, offset: int) -> None:
+        """Record progress and persist it immediately."""
+        self._entries[str(Path(log_file_path).resolve())] = {
+            'offset': offset,
+            'inode': os.stat(log_file_path).st_ino,
+        }
+        try:
+            self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.checkpoint_path.with_name(self.checkpoint_path.name + '.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, indent=2)
+            temp_file.replace(self.checkpoint_path)
+        except OSError as e:
+            logger.warning(f"Could not save log checkpoint {self.checkpoint_path}: {e}")
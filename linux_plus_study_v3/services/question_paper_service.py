@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Question Paper Service for Linux+ Study System
+
+Fixed-length quiz modes (exam, timed, mini quiz, quick fire) draw their
+whole paper when the session starts, instead of running a weighted
+selection over the pool for every question. A paper is a list of pool keys
+(see QuestionManager.pool_fingerprint) kept in the session state, so
+fetching the next question is an index into that list.
+
+Exam papers are stratified by EXAM_BLUEPRINT: each domain gets its share of
+the questions, and questions within a domain are sampled by the same
+performance weighting as the other modes. Generating one walks the whole
+pool, so a QuestionPaperPool keeps a few exam papers ready and refills
+itself on a background thread.
+"""
+
+import heapq
+import logging
+import random
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from models.question import QuestionManager, question_weight
+from utils.config import EXAM_BLUEPRINT, EXAM_PAPER_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+Paper = List[int]  # Pool keys, in the order they are asked
+
+
+def domain_for_category(category: str, blueprint: Dict[str, Dict[str, Any]] = EXAM_BLUEPRINT) -> Optional[str]:
+    """Return the first blueprint domain with a keyword in the category, or None."""
+    lowered = category.lower()
+    for domain, spec in blueprint.items():
+        if any(keyword.lower() in lowered for keyword in spec.get("keywords", [])):
+            return domain
+    return None
+
+
+def allocate_quotas(weights: Dict[str, float], available: Dict[str, int], size: int) -> Dict[str, int]:
+    """
+    Split size questions across domains in proportion to their weights.
+
+    Uses largest remainders, and passes the share of a domain that runs out
+    of questions on to the others.
+
+    Args:
+        weights: Domain -> blueprint weight (domains with weight 0 get nothing)
+        available: Domain -> number of questions in the pool
+        size: Questions wanted in total
+
+    Returns:
+        Dict[str, int]: Domain -> number of questions to draw
+    """
+    quotas = {domain: 0 for domain in weights}
+    remaining = min(size, sum(available.get(domain, 0) for domain in weights if weights[domain] > 0))
+    while remaining > 0:
+        open_domains = [d for d in weights if weights[d] > 0 and quotas[d] < available.get(d, 0)]
+        if not open_domains:
+            break
+        weight_sum = sum(weights[d] for d in open_domains)
+        exact = {d: remaining * weights[d] / weight_sum for d in open_domains}
+        grant = {d: min(int(exact[d]), available[d] - quotas[d]) for d in open_domains}
+        leftover = remaining - sum(grant.values())
+        for d in sorted(open_domains, key=lambda d: exact[d] - int(exact[d]), reverse=True):
+            if leftover == 0:
+                break
+            if quotas[d] + grant[d] < available[d]:
+                grant[d] += 1
+                leftover -= 1
+        granted = sum(grant.values())
+        if not granted:
+            break
+        for d, count in grant.items():
+            quotas[d] += count
+        remaining -= granted
+    return quotas
+
+
+def _weighted_sample(indices: List[int], weights: List[float], count: int, rng: random.Random) -> List[int]:
+    """Draw count indices without replacement, each with probability proportional to its weight."""
+    if count >= len(indices):
+        return list(indices)
+    # Efraimidis-Spirakis: keep the count largest u ** (1 / w)
+    keyed = ((rng.random() ** (1.0 / weight), index) for index, weight in zip(indices, weights))
+    return [index for _, index in heapq.nlargest(count, keyed)]
+
+
+def generate_paper(question_manager: QuestionManager, question_history: Dict[str, Any], size: int,
+                   blueprint: Optional[Dict[str, Dict[str, Any]]] = None,
+                   category_filter: Optional[str] = None, rng: Optional[random.Random] = None) -> Paper:
+    """
+    Draw a paper of up to size distinct questions.
+
+    Args:
+        question_manager: Pool to draw from
+        question_history: Question text -> stats, for the performance weighting
+        size: Number of questions wanted (fewer if the pool is smaller)
+        blueprint: Stratify by these domains (e.g. EXAM_BLUEPRINT); None draws from the pool as a whole
+        category_filter: Only draw questions of this category
+        rng: Random source (default: a fresh random.Random)
+
+    Returns:
+        Paper: Pool keys in the order they are asked
+    """
+    rng = rng or random.Random()
+    # Snapshot: the pool may be reshuffled in place while a background paper is drawn
+    questions = list(question_manager.questions)
+    default_stats = {"correct": 0, "attempts": 0}
+    groups: Dict[Optional[str], Tuple[List[int], List[float]]] = {}
+    domains: Dict[str, Optional[str]] = {}  # Category -> domain; pools have a handful of categories
+    for index, question in enumerate(questions):
+        if category_filter is not None and question.category != category_filter:
+            continue
+        if question.category not in domains:
+            domains[question.category] = domain_for_category(question.category, blueprint) if blueprint else None
+        domain = domains[question.category]
+        indices, weights = groups.setdefault(domain, ([], []))
+        indices.append(index)
+        weights.append(question_weight(question_history.get(question.text, default_stats)))
+
+    quotas: Dict[Optional[str], int] = {}
+    if blueprint:
+        domain_weights = {domain: float(spec.get("weight", 0)) for domain, spec in blueprint.items()}
+        available = {domain: len(group[0]) for domain, group in groups.items() if domain is not None}
+        quotas.update(allocate_quotas(domain_weights, available, size))
+    # Questions outside the blueprint only fill what the domains could not
+    quotas[None] = size - sum(quotas.values())
+
+    paper: List[int] = []
+    for domain, (indices, weights) in groups.items():
+        paper.extend(_weighted_sample(indices, weights, quotas.get(domain, 0), rng))
+    rng.shuffle(paper)
+    keys = question_manager.pool_keys_for(questions)
+    return [keys[index] for index in paper]
+
+
+class QuestionPaperPool:
+    """
+    Exam papers generated ahead of time on a background thread, which runs
+    only while the pool is short of papers.
+
+    Papers are built from the study history as it was when they were
+    generated, and are tagged with the pool fingerprint; papers for an older
+    pool are discarded when taken.
+    """
+
+    def __init__(self, build: Callable[[], Tuple[str, Paper]], size: int = EXAM_PAPER_POOL_SIZE):
+        """
+        Initialize the pool.
+
+        Args:
+            build: Returns (pool fingerprint, paper) for one new paper
+            size: Papers to keep ready
+        """
+        self._build = build
+        self.size = size
+        self._papers: Deque[Tuple[str, Paper]] = deque()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+
+    def take(self, fingerprint: str) -> Optional[Paper]:
+        """
+        Take a ready paper for the pool with this fingerprint and schedule a refill.
+
+        Returns:
+            Paper or None: None when no matching paper is ready (generate one inline)
+        """
+        paper = None
+        with self._lock:
+            while self._papers:
+                paper_fingerprint, candidate = self._papers.popleft()
+                if paper_fingerprint == fingerprint:
+                    paper = candidate
+                    break
+            if paper is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        self.refill()
+        return paper
+
+    def refill(self) -> None:
+        """Top the pool up on a background thread (started only while papers are missing)."""
+        if self.size <= 0:
+            return
+        with self._lock:
+            if self._thread is None and len(self._papers) < self.size:
+                self._thread = threading.Thread(target=self._run, name="question-paper-pool", daemon=True)
+                self._thread.start()
+
+    def ready(self) -> int:
+        """Number of papers ready to take."""
+        with self._lock:
+            return len(self._papers)
+
+    def _run(self) -> None:
+        while True:
+            # Decided under the lock, so a paper taken meanwhile is always replaced
+            with self._lock:
+                if len(self._papers) >= self.size:
+                    self._thread = None
+                    return
+            try:
+                built = self._build()
+            except Exception as e:
+                logger.warning(f"Could not pre-generate an exam paper: {e}")
+                with self._lock:
+                    self._thread = None
+                return
+            with self._lock:
+                self._papers.append(built)
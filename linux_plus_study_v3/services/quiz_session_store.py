@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Quiz Session Store for Linux+ Study System
+
+Keeps each browser's quiz session (streak, lives, timers, the current
+question, questions answered so far) outside the worker process, so any
+worker can serve any request and a restart does not drop running quizzes.
+
+The web view loads the session into the quiz controller before each quiz
+request and saves it afterwards (see QuizController.export_session_state).
+States are small versioned documents: compact JSON, or msgpack when it is
+installed. Fields still at their fresh-session values are left out, and
+questions are referenced by pool key rather than copied.
+
+Stores:
+- memory: per-process dict (default; single worker)
+- sqlite: a shared SQLite file (several workers on one host)
+- redis: any Redis-compatible server (several hosts; needs redis-py)
+
+Configure with QUIZ_SESSION_STORE, QUIZ_SESSION_STORE_PATH,
+QUIZ_SESSION_REDIS_URL and QUIZ_SESSION_TTL_SECONDS.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import msgpack  # type: ignore
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+# Configuration via environment
+QUIZ_SESSION_STORE = os.getenv('QUIZ_SESSION_STORE', 'memory').lower()
+QUIZ_SESSION_STORE_PATH = os.getenv('QUIZ_SESSION_STORE_PATH', 'data/quiz_sessions.db')
+QUIZ_SESSION_REDIS_URL = os.getenv('QUIZ_SESSION_REDIS_URL', 'redis://localhost:6379/0')
+QUIZ_SESSION_TTL_SECONDS = int(os.getenv('QUIZ_SESSION_TTL_SECONDS', str(6 * 3600)))
+
+# Bump when the meaning of a stored field changes; older states are discarded
+SESSION_STATE_VERSION = 1
+
+# Expired rows are purged after this many saves (memory and SQLite stores)
+_PURGE_EVERY_SAVES = 500
+
+
+def encode_session_state(state: Dict[str, Any]) -> bytes:
+    """Serialize a session state, tagging it with SESSION_STATE_VERSION."""
+    document = {'v': SESSION_STATE_VERSION, **state}
+    if msgpack is not None:
+        return msgpack.packb(document, use_bin_type=True)
+    return json.dumps(document, separators=(',', ':')).encode('utf-8')
+
+
+def decode_session_state(data: Optional[bytes]) -> Optional[Dict[str, Any]]:
+    """
+    Deserialize a stored session state.
+
+    JSON and msgpack states are told apart by their first byte, so workers
+    with and without msgpack can share a store.
+
+    Returns:
+        dict or None: The state without its version tag; None when there is no
+        state or it has another version or cannot be decoded
+    """
+    if not data:
+        return None
+    try:
+        if data[:1] == b'{':
+            document = json.loads(data.decode('utf-8'))
+        elif msgpack is not None:
+            document = msgpack.unpackb(data, raw=False)
+        else:
+            logger.warning("Quiz session state is msgpack-encoded but msgpack is not installed")
+            return None
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Discarding undecodable quiz session state: {e}")
+        return None
+    if not isinstance(document, dict) or document.pop('v', None) != SESSION_STATE_VERSION:
+        return None
+    return document
+
+
+class QuizSessionStore:
+    """Session id -> encoded state, with expiry. Implementations must be thread-safe."""
+
+    def __init__(self, ttl_seconds: int = QUIZ_SESSION_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+
+    def load(self, session_id: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def save(self, session_id: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MemorySessionStore(QuizSessionStore):
+    """In-process store; sessions survive neither restarts nor a change of worker."""
+
+    def __init__(self, ttl_seconds: int = QUIZ_SESSION_TTL_SECONDS):
+        super().__init__(ttl_seconds)
+        self._lock = threading.Lock()
+        self._states: Dict[str, Tuple[float, bytes]] = {}
+        self._saves = 0
+
+    def load(self, session_id: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._states.get(session_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._states[session_id]
+                return None
+            return entry[1]
+
+    def save(self, session_id: str, data: bytes) -> None:
+        now = time.time()
+        with self._lock:
+            self._states[session_id] = (now + self.ttl_seconds, data)
+            self._saves += 1
+            if self._saves % _PURGE_EVERY_SAVES == 0:
+                for expired in [sid for sid, (expires, _) in self._states.items() if expires <= now]:
+                    del self._states[expired]
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._states.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+class SQLiteSessionStore(QuizSessionStore):
+    """Store in a SQLite file shared by every worker on the host."""
+
+    def __init__(self, db_path: Optional[Path] = None, ttl_seconds: int = QUIZ_SESSION_TTL_SECONDS):
+        """
+        Initialize the SQLite store.
+
+        Args:
+            db_path: SQLite file holding the states (default QUIZ_SESSION_STORE_PATH)
+            ttl_seconds: Seconds a state is kept after its last save
+        """
+        super().__init__(ttl_seconds)
+        self.db_path = Path(db_path or QUIZ_SESSION_STORE_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._saves = 0
+        self._configure()
+
+    def _configure(self) -> None:
+        from utils.config import SQLITE_PERFORMANCE_SETTINGS
+
+        pragmas = SQLITE_PERFORMANCE_SETTINGS["pragmas"]
+        with self._lock:
+            if SQLITE_PERFORMANCE_SETTINGS["enabled"]:
+                # WAL lets workers read sessions while another one saves
+                for name in ("journal_mode", "synchronous", "busy_timeout"):
+                    self._conn.execute(f"PRAGMA {name}={pragmas[name]}")
+            with self._conn:
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS quiz_sessions (
+                        session_id TEXT PRIMARY KEY,
+                        state BLOB NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                """)
+                self._conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_quiz_sessions_expires
+                    ON quiz_sessions (expires_at)
+                """)
+
+    def load(self, session_id: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM quiz_sessions WHERE session_id = ? AND expires_at > ?",
+                (session_id, time.time())
+            ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def save(self, session_id: str, data: bytes) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO quiz_sessions (session_id, state, expires_at) VALUES (?, ?, ?)",
+                (session_id, sqlite3.Binary(data), now + self.ttl_seconds)
+            )
+            self._saves += 1
+            if self._saves % _PURGE_EVERY_SAVES == 0:
+                self._conn.execute("DELETE FROM quiz_sessions WHERE expires_at <= ?", (now,))
+
+    def delete(self, session_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM quiz_sessions WHERE session_id = ?", (session_id,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisSessionStore(QuizSessionStore):
+    """Store on a Redis-compatible server; expiry is left to the server."""
+
+    KEY_PREFIX = "linuxplus:quiz_session:"
+
+    def __init__(self, url: str = QUIZ_SESSION_REDIS_URL, ttl_seconds: int = QUIZ_SESSION_TTL_SECONDS,
+                 client: Any = None):
+        """
+        Initialize the Redis store.
+
+        Args:
+            url: Server URL, used when no client is given
+            ttl_seconds: Seconds a state is kept after its last save
+            client: An existing redis-py compatible client
+        """
+        super().__init__(ttl_seconds)
+        if client is None:
+            import redis  # type: ignore
+            client = redis.Redis.from_url(url)
+        self._client = client
+
+    def load(self, session_id: str) -> Optional[bytes]:
+        return self._client.get(self.KEY_PREFIX + session_id)
+
+    def save(self, session_id: str, data: bytes) -> None:
+        self._client.set(self.KEY_PREFIX + session_id, data, ex=self.ttl_seconds)
+
+    def delete(self, session_id: str) -> None:
+        self._client.delete(self.KEY_PREFIX + session_id)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def create_quiz_session_store(kind: str = QUIZ_SESSION_STORE) -> QuizSessionStore:
+    """
+    Build the store named by kind ("memory", "sqlite" or "redis").
+
+    Falls back to the memory store (with a warning) when the requested one
+    cannot be opened.
+    """
+    try:
+        if kind == 'sqlite':
+            return SQLiteSessionStore()
+        if kind == 'redis':
+            return RedisSessionStore()
+        if kind != 'memory':
+            logger.warning(f"Unknown QUIZ_SESSION_STORE '{kind}', using memory")
+    except Exception as e:
+        logger.warning(f"Quiz session store '{kind}' unavailable ({e}), using memory")
+    return MemorySessionStore()
+
+
+# Global instance
+_quiz_session_store: Optional[QuizSessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_quiz_session_store() -> QuizSessionStore:
+    """Get the global quiz session store (configured by QUIZ_SESSION_STORE)."""
+    global _quiz_session_store
+    if _quiz_session_store is None:
+        with _store_lock:
+            if _quiz_session_store is None:
+                _quiz_session_store = create_quiz_session_store()
+    return _quiz_session_store
+
+
+def set_quiz_session_store(store: Optional[QuizSessionStore]) -> None:
+    """Replace the global store (None rebuilds it from the configuration on next use)."""
+    global _quiz_session_store
+    with _store_lock:
+        _quiz_session_store = store
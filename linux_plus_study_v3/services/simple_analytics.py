@@ -12,6 +12,9 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 import logging
 
+from utils.performance_metrics import timed, record_file_io, COMPONENT_JSON_PERSISTENCE
+from utils.unit_of_work import get_current_unit_of_work
+
 logger = logging.getLogger(__name__)
 
 class SimpleAnalyticsManager:
@@ -74,17 +77,29 @@ class SimpleAnalyticsManager:
     
     def _load_data(self) -> Dict[str, Any]:
         """Load analytics data from JSON file"""
+        uow = get_current_unit_of_work()
+        if uow is not None:
+            cached = uow.get_cached(self.data_file)
+            if cached is not None:
+                return cached
         try:
-            with open(self.data_file, 'r') as f:
-                return json.load(f)
+            record_file_io('read')
+            with timed(COMPONENT_JSON_PERSISTENCE), open(self.data_file, 'r') as f:
+                data = json.load(f)
+            return uow.cache_read(self.data_file, data) if uow is not None else data
         except Exception as e:
             logger.error(f"Error loading analytics data: {e}")
             return {"anonymous": self._get_default_user_data()}
     
     def _save_data(self, data: Dict[str, Any]):
         """Save analytics data to JSON file"""
+        uow = get_current_unit_of_work()
+        if uow is not None:
+            uow.stage_json(self.data_file, data, indent=2, default=str)
+            return
         try:
-            with open(self.data_file, 'w') as f:
+            record_file_io('write')
+            with timed(COMPONENT_JSON_PERSISTENCE), open(self.data_file, 'w') as f:
                 json.dump(data, f, indent=2, default=str)
         except Exception as e:
             logger.error(f"Error saving analytics data: {e}")
@@ -440,8 +455,11 @@ class SimpleAnalyticsManager:
                 "user_id": user_id,
                 "display_name": user_data.get("display_name", user_id.replace("_", " ").title()),
                 "total_questions": user_data.get("total_questions", 0),
+                "correct_answers": user_data.get("correct_answers", 0),
                 "accuracy": user_data.get("accuracy", 0.0),
                 "level": user_data.get("level", 1),
+                "xp": user_data.get("xp", 0),
+                "total_sessions": user_data.get("total_sessions", 0),
                 "study_streak": user_data.get("study_streak", 0),
                 "total_study_time": user_data.get("total_study_time", 0),
                 "last_activity": user_data.get("last_activity"),
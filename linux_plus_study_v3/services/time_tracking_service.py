@@ -13,6 +13,8 @@ from typing import Dict, Any, Optional
 from pathlib import Path
 import zoneinfo
 
+from utils.unit_of_work import get_current_unit_of_work
+
 
 class TimeTrackingService:
     """Service for tracking quiz time and study time separately."""
@@ -59,6 +61,12 @@ class TimeTrackingService:
     
     def _save_data(self) -> bool:
         """Save time tracking data to file."""
+        uow = get_current_unit_of_work()
+        if uow is not None:
+            uow.stage_json(self.data_file, self.data, indent=2)
+            # Uncommitted changes live only in memory; reload the file on rollback
+            uow.on_rollback(lambda: setattr(self, 'data', self._load_data()))
+            return True
         try:
             self.data_file.parent.mkdir(parents=True, exist_ok=True)
             with open(self.data_file, 'w') as f:
@@ -36,6 +36,7 @@ QUIZ_MODE_TIMED = "timed"
 QUIZ_MODE_SURVIVAL = "survival"
 QUIZ_MODE_CATEGORY_FOCUS = "category"
 QUIZ_MODE_EXAM = "exam"
+QUIZ_MODE_SPACED_REVIEW = "spaced_review"
 
 # --- Quick Fire Mode Constants ---
 QUICK_FIRE_QUESTIONS = 5
@@ -55,6 +56,22 @@ SURVIVAL_MODE_LIVES = 3  # 3 lives in survival mode
 # --- Exam Mode Constants ---
 EXAM_MODE_QUESTIONS = 90  # 90 questions for full exam simulation
 EXAM_MODE_TIME_LIMIT = 5400  # 90 minutes in seconds
+EXAM_PAPER_POOL_SIZE = int(os.getenv("EXAM_PAPER_POOL_SIZE", "4"))  # Exam papers pre-generated in the background
+
+# Exam blueprint (CompTIA Linux+ XK0-005 domain weights). A question counts
+# toward the first domain with a keyword in its category; questions matching
+# no domain only fill a paper when the domains run out of questions.
+EXAM_BLUEPRINT: Dict[str, Dict[str, Any]] = {
+    "System Management": {"weight": 0.32, "keywords": ["System Management", "Hardware", "Systems Operation"]},
+    "Security": {"weight": 0.21, "keywords": ["Security"]},
+    "Scripting, Containers, and Automation": {"weight": 0.19, "keywords": ["Automation", "Scripting", "Containers"]},
+    "Troubleshooting": {"weight": 0.28, "keywords": ["Troubleshooting"]},
+}
+
+# --- Spaced Review Mode Constants ---
+SPACED_REVIEW_QUESTIONS = 20  # Maximum questions per review session
+SPACED_REVIEW_NEW_CARDS = 10  # Never-reviewed questions introduced per session
+SPACED_REVIEW_TARGET_RETENTION = 0.9  # Recall probability reviews are scheduled for
 
 # --- Colorama Setup (CLI Colors) ---
 def _initialize_colors():
@@ -327,6 +344,22 @@ DATABASE_POOL_SETTINGS: Dict[str, Any] = {
     "echo": False,             # Log all SQL statements (set to True for debugging)
 }
 
+# SQLite Performance Profile (applied to every new SQLite connection)
+SQLITE_PERFORMANCE_SETTINGS: Dict[str, Any] = {
+    "enabled": os.getenv("SQLITE_PERFORMANCE_PROFILE", "true").lower() != "false",
+    "pragmas": {
+        "journal_mode": "WAL",     # Readers no longer block the writer (persistent per database file)
+        "synchronous": "NORMAL",   # Safe with WAL; fsync only at checkpoints
+        "busy_timeout": 5000,      # Wait up to 5s for a lock instead of failing immediately
+        "cache_size": -20000,      # ~20 MB page cache per connection
+        "temp_store": "MEMORY",    # GROUP BY / ORDER BY temp b-trees stay in memory
+        "mmap_size": 134217728,    # Memory-map up to 128 MB of the database file
+    },
+    "pool_size": 5,                # Connections kept open (one per concurrently active thread)
+    "max_overflow": 10,            # Extra connections under burst load
+    "pool_timeout": 30,            # Timeout waiting for a connection from the pool
+}
+
 # Database Configuration
 DATABASE_SETTINGS: Dict[str, Any] = {
     "sqlite": {
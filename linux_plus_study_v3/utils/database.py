@@ -11,14 +11,15 @@ import sys
 import logging
 from contextlib import contextmanager
 from typing import Optional, Dict, Any
-from sqlalchemy import create_engine, MetaData, text
+from sqlalchemy import create_engine, MetaData, text, event, inspect
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.pool import QueuePool, StaticPool
 
 # Add project root to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.config import get_database_config
+from utils.config import get_database_config, SQLITE_PERFORMANCE_SETTINGS
+from utils.performance_metrics import instrument_sqlalchemy_engine
 
 class DatabasePoolManager:
     """Manages database connections with pooling for web applications."""
@@ -70,6 +71,17 @@ class DatabasePoolManager:
                     "pool_timeout": config.get("pool_timeout", 30),
                 })
                 self.logger.info(f"Initializing {self.db_type} with connection pooling")
+            elif self.db_type == "sqlite" and self._use_sqlite_profile(config["url"]):
+                # Each thread checks out its own connection; WAL lets readers run
+                # alongside the writer instead of serializing on one shared connection
+                engine_kwargs.update({
+                    "poolclass": QueuePool,
+                    "pool_size": SQLITE_PERFORMANCE_SETTINGS["pool_size"],
+                    "max_overflow": SQLITE_PERFORMANCE_SETTINGS["max_overflow"],
+                    "pool_timeout": SQLITE_PERFORMANCE_SETTINGS["pool_timeout"],
+                    "connect_args": {"check_same_thread": False},
+                })
+                self.logger.info("Initializing sqlite with per-thread connection pool and WAL")
             else:
                 # SQLite or pooling disabled
                 if self.db_type == "sqlite":
@@ -78,6 +90,9 @@ class DatabasePoolManager:
                 self.logger.info(f"Initializing {self.db_type} without connection pooling")
             
             self.engine = create_engine(config["url"], **engine_kwargs)
+            if self.db_type == "sqlite" and SQLITE_PERFORMANCE_SETTINGS["enabled"]:
+                event.listen(self.engine, "connect", lambda dbapi_connection, _record: apply_sqlite_pragmas(dbapi_connection))
+            instrument_sqlalchemy_engine(self.engine)
             self.metadata = MetaData()
             
             # Create session factories
@@ -86,11 +101,39 @@ class DatabasePoolManager:
             
             # Test connection
             self._test_connection()
+            self._ensure_indexes()
             
         except Exception as e:
             self.logger.error(f"Failed to initialize database engine: {e}")
             raise
     
+    def _use_sqlite_profile(self, url: str) -> bool:
+        """Whether the SQLite performance profile applies (file databases only)."""
+        return SQLITE_PERFORMANCE_SETTINGS["enabled"] and ":memory:" not in url and url != "sqlite://"
+    
+    def _ensure_indexes(self) -> None:
+        """
+        Create model indexes missing from an existing analytics table.
+        
+        Databases created with create_all before the indexes were declared
+        (see init_database.py) never ran the migrations, so they are
+        brought up to date here. Missing tables are left to init_database.py.
+        """
+        try:
+            from models.analytics import Analytics
+            
+            table = Analytics.__table__
+            inspector = inspect(self.engine)
+            if not inspector.has_table(table.name):
+                return
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(self.engine)
+                    self.logger.info(f"Created missing index {index.name}")
+        except Exception as e:
+            self.logger.warning(f"Could not verify analytics indexes: {e}")
+    
     def _test_connection(self) -> None:
         """Test database connection to ensure it's working."""
         try:
@@ -144,6 +187,10 @@ class DatabasePoolManager:
             if self.scoped_session_factory:
                 self.scoped_session_factory.remove()
             if self.engine:
+                if self.db_type == "sqlite" and SQLITE_PERFORMANCE_SETTINGS["enabled"]:
+                    # Refresh planner statistics for tables whose shape changed
+                    with self.engine.connect() as conn:
+                        conn.exec_driver_sql("PRAGMA optimize")
                 self.engine.dispose()
             self.logger.info("All database connections closed")
         except Exception as e:
@@ -170,6 +217,25 @@ class DatabasePoolManager:
             "invalid": getattr(pool, 'invalid', 0),
         }
 
+def apply_sqlite_pragmas(dbapi_connection: Any, pragmas: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Apply the SQLite performance pragmas to a new DB-API connection.
+    
+    Args:
+        dbapi_connection: sqlite3 connection
+        pragmas: Pragma name -> value (default SQLITE_PERFORMANCE_SETTINGS["pragmas"])
+    """
+    pragmas = pragmas if pragmas is not None else SQLITE_PERFORMANCE_SETTINGS["pragmas"]
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            try:
+                cursor.execute(f"PRAGMA {name}={value}")
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"Could not apply PRAGMA {name}={value}: {e}")
+    finally:
+        cursor.close()
+
 # Global database manager instance
 _db_manager: Optional[DatabasePoolManager] = None
 
@@ -258,7 +324,10 @@ def get_db_connection():
     # Ensure data directory exists
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
     
-    return sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path)
+    if SQLITE_PERFORMANCE_SETTINGS["enabled"]:
+        apply_sqlite_pragmas(conn)
+    return conn
 
 def setup_database_for_web():
     """Set up database for web mode - alias for get_database_manager."""
@@ -2,11 +2,21 @@
 """
 Game Value Configuration System for Linux+ Study Game.
 Centralizes all hardcoded display values, thresholds, and game mechanics.
+
+Hot paths read an immutable, versioned GameValuesSnapshot
+(``get_game_values().scoring.xp_multiplier``) instead of walking the
+settings objects. Every change publishes a new snapshot in one reference
+swap and notifies subscribers, so readers never see a half-applied update.
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, List, Type
 from pathlib import Path
+import copy
 import json
-from dataclasses import dataclass, asdict, field
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass, asdict, field, fields, make_dataclass
 
 @dataclass
 class ScoringSettings:
@@ -114,22 +124,110 @@ class GameValueSettings:
     system: SystemSettings = field(default_factory=SystemSettings)
     leaderboard: LeaderboardSettings = field(default_factory=LeaderboardSettings)
 
+# Category name -> settings class, in GameValueSettings field order
+SETTINGS_CATEGORIES: Dict[str, Type[Any]] = {
+    f.name: f.default_factory for f in fields(GameValueSettings)  # type: ignore[misc]
+}
+
+# Seconds between checks of game_values.json for edits made by another process
+RELOAD_CHECK_INTERVAL = float(os.getenv("GAME_VALUES_RELOAD_INTERVAL", "2.0"))
+
+
+def _frozen_variant(settings_cls: Type[Any]) -> Type[Any]:
+    """Build an immutable (frozen, slotted) copy of a settings dataclass."""
+    return make_dataclass(
+        f"Frozen{settings_cls.__name__}",
+        [(f.name, f.type) for f in fields(settings_cls)],
+        frozen=True,
+        slots=True,
+    )
+
+
+_FROZEN_CATEGORIES: Dict[str, Type[Any]] = {
+    name: _frozen_variant(cls) for name, cls in SETTINGS_CATEGORIES.items()
+}
+
+
+@dataclass(frozen=True)
+class GameValuesSnapshot:
+    """
+    Immutable view of all game values at one version.
+
+    Categories are frozen dataclasses, so a value is two attribute reads:
+    ``snapshot.scoring.points_per_correct``.
+    """
+    version: int
+    scoring: Any
+    streaks: Any
+    quiz: Any
+    accuracy: Any
+    levels: Any
+    display: Any
+    time: Any
+    system: Any
+    leaderboard: Any
+
+    @classmethod
+    def compile(cls, settings: GameValueSettings, version: int) -> 'GameValuesSnapshot':
+        """Freeze a settings object into a snapshot."""
+        categories = {
+            name: frozen_cls(**asdict(getattr(settings, name)))
+            for name, frozen_cls in _FROZEN_CATEGORIES.items()
+        }
+        return cls(version=version, **categories)
+
+    def get(self, category: str, key: Optional[str] = None, default: Any = None) -> Any:
+        """
+        Look up a value by name.
+
+        Args:
+            category: Settings category (e.g. 'scoring')
+            key: Value name; None returns the whole category as a dict
+            default: Returned when the category or key does not exist
+        """
+        category_obj = getattr(self, category, None) if category in _FROZEN_CATEGORIES else None
+        if category_obj is None:
+            return default
+        if key is None:
+            return {name: getattr(category_obj, name) for name in category_obj.__slots__}
+        return getattr(category_obj, key, default)
+
+
+GameValuesObserver = Callable[[GameValuesSnapshot], None]
+
+
 class GameValueManager:
     """Manages game value configuration with persistence."""
     
     def __init__(self, config_file: Optional[Path] = None):
         self.config_file = config_file or Path("data/game_values.json")
-        self._settings = self._load_settings()
+        self._lock = threading.RLock()
+        self._observers: List[Any] = []
+        self._file_mtime = self._stat_mtime()
+        self._next_reload_check = time.monotonic() + RELOAD_CHECK_INTERVAL
+        self._settings = self._load_settings(fallback=GameValueSettings())
+        self._snapshot = GameValuesSnapshot.compile(self._settings, 1)
     
-    def _load_settings(self) -> GameValueSettings:
-        """Load settings from file or create defaults."""
+    def _load_settings(self, fallback: Optional[GameValueSettings] = None) -> Optional[GameValueSettings]:
+        """
+        Load settings from file or create defaults.
+        
+        Args:
+            fallback: Returned when the file exists but cannot be parsed
+                (the defaults at startup; on a reload, None keeps the
+                current snapshot instead of resetting every value)
+        """
         if self.config_file.exists():
             try:
                 with open(self.config_file, 'r') as f:
                     data = json.load(f)
                 return self._dict_to_settings(data)
             except (json.JSONDecodeError, KeyError, TypeError) as e:
-                print(f"Error loading game values config: {e}. Using defaults.")
+                if fallback is None:
+                    print(f"Error loading game values config: {e}. Keeping the current values.")
+                else:
+                    print(f"Error loading game values config: {e}. Using defaults.")
+                return fallback
         
         return GameValueSettings()
     
@@ -137,33 +235,114 @@ class GameValueManager:
         """Convert dictionary to GameValueSettings."""
         settings = GameValueSettings()
         
-        if 'scoring' in data:
-            settings.scoring = ScoringSettings(**data['scoring'])
-        if 'streaks' in data:
-            settings.streaks = StreakSettings(**data['streaks'])
-        if 'quiz' in data:
-            settings.quiz = QuizSettings(**data['quiz'])
-        if 'accuracy' in data:
-            settings.accuracy = AccuracySettings(**data['accuracy'])
-        if 'levels' in data:
-            settings.levels = LevelSettings(**data['levels'])
-        if 'display' in data:
-            settings.display = DisplaySettings(**data['display'])
-        if 'time' in data:
-            settings.time = TimeSettings(**data['time'])
-        if 'system' in data:
-            settings.system = SystemSettings(**data['system'])
-        if 'leaderboard' in data:
-            settings.leaderboard = LeaderboardSettings(**data['leaderboard'])
+        for category, settings_cls in SETTINGS_CATEGORIES.items():
+            if category in data:
+                setattr(settings, category, settings_cls(**data[category]))
             
         return settings
     
+    def _stat_mtime(self) -> Optional[int]:
+        try:
+            return self.config_file.stat().st_mtime_ns
+        except OSError:
+            return None
+    
+    # ------------------------------------------------------------------
+    # Snapshots and change notification
+    # ------------------------------------------------------------------
+    @property
+    def version(self) -> int:
+        """Version of the current snapshot (increments on every change)."""
+        return self._snapshot.version
+    
+    def snapshot(self) -> GameValuesSnapshot:
+        """
+        Get the current immutable snapshot.
+        
+        At most every RELOAD_CHECK_INTERVAL seconds this also stats
+        game_values.json and reloads it if another process changed it.
+        """
+        if time.monotonic() >= self._next_reload_check:
+            self._check_external_changes()
+        return self._snapshot
+    
+    def subscribe(self, callback: GameValuesObserver) -> None:
+        """
+        Call callback(snapshot) after every change.
+        
+        Bound methods are held weakly, so subscribing does not keep the
+        subscriber (e.g. a controller) alive.
+        """
+        ref = weakref.WeakMethod(callback) if hasattr(callback, '__self__') else (lambda: callback)
+        with self._lock:
+            self._observers.append(ref)
+    
+    def unsubscribe(self, callback: GameValuesObserver) -> None:
+        """Stop notifying callback."""
+        with self._lock:
+            self._observers = [ref for ref in self._observers if ref() not in (None, callback)]
+    
+    def _publish(self, settings: GameValueSettings) -> GameValuesSnapshot:
+        """Swap in settings, compile the next snapshot and notify observers."""
+        with self._lock:
+            self._settings = settings
+            snapshot = GameValuesSnapshot.compile(settings, self._snapshot.version + 1)
+            self._snapshot = snapshot
+            observers = []
+            live = []
+            for ref in self._observers:
+                callback = ref()
+                if callback is not None:
+                    observers.append(callback)
+                    live.append(ref)
+            self._observers = live
+        for callback in observers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"Error notifying game values observer: {e}")
+        return snapshot
+    
+    def _check_external_changes(self) -> None:
+        with self._lock:
+            self._next_reload_check = time.monotonic() + RELOAD_CHECK_INTERVAL
+            mtime = self._stat_mtime()
+            if mtime == self._file_mtime:
+                return
+        settings = self._load_settings()
+        if settings is None:
+            return  # Mid-write or broken: keep the current values and retry at the next check
+        with self._lock:
+            self._file_mtime = mtime
+        self._publish(settings)
+    
+    def reload(self) -> GameValuesSnapshot:
+        """Re-read game_values.json now and publish it (an unreadable file keeps the current snapshot)."""
+        mtime = self._stat_mtime()
+        settings = self._load_settings()
+        if settings is None:
+            return self._snapshot
+        with self._lock:
+            self._file_mtime = mtime
+        return self._publish(settings)
+    
+    # ------------------------------------------------------------------
+    # Persistence and updates
+    # ------------------------------------------------------------------
     def save_settings(self) -> bool:
         """Save current settings to file."""
         try:
             self.config_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.config_file, 'w') as f:
-                json.dump(asdict(self._settings), f, indent=2)
+            # Temp file then rename, so a reload in another process never reads a half-written file
+            temp_file = self.config_file.with_name(f"{self.config_file.name}.{os.getpid()}.tmp")
+            try:
+                with open(temp_file, 'w') as f:
+                    json.dump(asdict(self._settings), f, indent=2)
+                temp_file.replace(self.config_file)
+            except Exception:
+                temp_file.unlink(missing_ok=True)
+                raise
+            self._file_mtime = self._stat_mtime()
             return True
         except Exception as e:
             print(f"Error saving game values config: {e}")
@@ -176,29 +355,30 @@ class GameValueManager:
     def update_settings(self, **kwargs: Any) -> bool:
         """Update settings with new values."""
         try:
-            for category, values in kwargs.items():
-                if hasattr(self._settings, category) and isinstance(values, dict):
-                    category_obj = getattr(self._settings, category)
-                    for key, value in values.items():
-                        if hasattr(category_obj, key):
-                            setattr(category_obj, key, value)
-            return self.save_settings()
+            with self._lock:
+                # Work on a copy so readers only ever see the old or the new values
+                settings = copy.deepcopy(self._settings)
+                for category, values in kwargs.items():
+                    if hasattr(settings, category) and isinstance(values, dict):
+                        category_obj = getattr(settings, category)
+                        for key, value in values.items():
+                            if hasattr(category_obj, key):
+                                setattr(category_obj, key, value)
+                self._publish(settings)
+                return self.save_settings()
         except Exception as e:
             print(f"Error updating game values: {e}")
             return False
     
     def reset_to_defaults(self) -> bool:
         """Reset all settings to defaults."""
-        self._settings = GameValueSettings()
-        return self.save_settings()
+        with self._lock:
+            self._publish(GameValueSettings())
+            return self.save_settings()
     
-    def get_value(self, category: str, key: str, default: Any = None) -> Any:
-        """Get a specific value from the configuration."""
-        try:
-            category_obj = getattr(self._settings, category)
-            return getattr(category_obj, key, default)
-        except AttributeError:
-            return default
+    def get_value(self, category: str, key: Optional[str], default: Any = None) -> Any:
+        """Get a specific value (or a whole category when key is None) from the configuration."""
+        return self.snapshot().get(category, key, default)
     
     def get_scoring_config(self) -> Dict[str, Any]:
         """Get scoring configuration as dictionary for templates."""
@@ -218,6 +398,10 @@ def get_game_value_manager() -> GameValueManager:
         _game_value_manager = GameValueManager()
     return _game_value_manager
 
+def get_game_values() -> GameValuesSnapshot:
+    """Get the current immutable game values snapshot (for hot paths)."""
+    return get_game_value_manager().snapshot()
+
 def get_game_value(category: str, key: str, default: Any = None) -> Any:
     """Convenience function to get a game value."""
     return get_game_value_manager().get_value(category, key, default)
@@ -225,20 +409,20 @@ def get_game_value(category: str, key: str, default: Any = None) -> Any:
 # Template helper functions for backward compatibility
 def get_points_per_correct() -> int:
     """Get points per correct answer."""
-    return get_game_value('scoring', 'points_per_correct', 10)
+    return get_game_values().scoring.points_per_correct
 
 def get_streak_bonus() -> int:
     """Get streak bonus points."""
-    return get_game_value('scoring', 'streak_bonus', 5)
+    return get_game_values().scoring.streak_bonus
 
 def get_hint_penalty() -> int:
     """Get hint penalty points."""
-    return get_game_value('scoring', 'hint_penalty', 5)
+    return get_game_values().scoring.hint_penalty
 
 def get_default_question_count() -> int:
     """Get default number of questions."""
-    return get_game_value('quiz', 'default_question_count', 10)
+    return get_game_values().quiz.default_question_count
 
 def get_streak_threshold() -> int:
     """Get streak bonus threshold."""
-    return get_game_value('scoring', 'streak_bonus_threshold', 3)
+    return get_game_values().scoring.streak_bonus_threshold
@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""
+Performance Metrics for Linux+ Study System
+
+Opt-in instrumentation layer for the web application. When enabled it records
+per-endpoint latency histograms, time spent in JSON persistence, database and
+question selection, and file read/write counts per request. Results are exposed
+through a Prometheus text endpoint (/metrics) and an on-demand sampling profiler
+(/debug/profile?endpoint=...).
+
+Enable with PERF_METRICS_ENABLED=true. When disabled, every hook in this module
+returns immediately and no Flask handlers or routes are registered.
+"""
+
+import os
+import sys
+import bisect
+import threading
+import time
+import logging
+from collections import Counter, defaultdict, deque
+from typing import Dict, Any, Optional, List, Deque, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Allow enabling metrics via environment variable (disabled by default)
+_metrics_enabled = os.getenv('PERF_METRICS_ENABLED', 'false').lower() == 'true'
+
+# Latency bucket boundaries in seconds (Prometheus histogram "le" labels)
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Number of recent samples kept per endpoint for percentile estimation
+RESERVOIR_SIZE = 2048
+
+# Instrumented components reported in the time breakdown
+COMPONENT_JSON_PERSISTENCE = "json_persistence"
+COMPONENT_DATABASE = "database"
+COMPONENT_QUESTION_SELECTION = "question_selection"
+COMPONENT_STARTUP = "startup"
+
+_PROFILE_INTERVAL_SECONDS = 0.005
+_PROFILE_MAX_STACK_DEPTH = 40
+
+
+def is_metrics_enabled() -> bool:
+    """Return True when performance instrumentation is active."""
+    return _metrics_enabled
+
+
+def set_metrics_enabled(enabled: bool) -> None:
+    """
+    Toggle instrumentation at runtime.
+
+    Flask hooks are only registered by PerformanceMetrics.init_app when metrics
+    are enabled, so this should be called before the app is created.
+
+    Args:
+        enabled: Whether instrumentation should be recorded
+    """
+    global _metrics_enabled
+    _metrics_enabled = enabled
+
+
+class _RequestState:
+    """Per-request accumulators, stored thread-locally for the active request."""
+
+    __slots__ = ("components", "file_reads", "file_writes")
+
+    def __init__(self):
+        self.components: Dict[str, float] = defaultdict(float)
+        self.file_reads = 0
+        self.file_writes = 0
+
+
+_request_local = threading.local()
+
+
+class _EndpointStats:
+    """Latency histogram plus bounded sample reservoir for one endpoint."""
+
+    __slots__ = ("bucket_counts", "count", "total", "samples",
+                 "file_reads", "file_writes", "components")
+
+    def __init__(self):
+        self.bucket_counts: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.samples: Deque[float] = deque(maxlen=RESERVOIR_SIZE)
+        self.file_reads = 0
+        self.file_writes = 0
+        self.components: Dict[str, float] = defaultdict(float)
+
+    def observe(self, duration: float) -> None:
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.count += 1
+        self.total += duration
+        self.samples.append(duration)
+
+    def percentiles(self, quantiles: Tuple[float, ...] = (0.5, 0.95, 0.99)) -> Dict[float, float]:
+        if not self.samples:
+            return {q: 0.0 for q in quantiles}
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {q: ordered[min(last, int(round(q * last)))] for q in quantiles}
+
+
+class _Timer:
+    """Context manager that adds elapsed time to a component bucket."""
+
+    __slots__ = ("registry", "component", "start")
+
+    def __init__(self, registry: "MetricsRegistry", component: str):
+        self.registry = registry
+        self.component = component
+        self.start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.registry.record_component(self.component, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    """Shared no-op context manager used while metrics are disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _SamplingProfiler:
+    """
+    Periodically samples the stack of a single thread.
+
+    Uses sys._current_frames() from a daemon thread, so the profiled request
+    runs unmodified; the cost is one stack walk every sampling interval.
+    """
+
+    def __init__(self, thread_id: int, interval: float = _PROFILE_INTERVAL_SECONDS):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="perf-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack: List[str] = []
+            while frame is not None and len(stack) < _PROFILE_MAX_STACK_DEPTH:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[";".join(stack)] += 1
+            self.samples += 1
+
+    def report(self, endpoint: str, duration: float, top: int = 25) -> Dict[str, Any]:
+        """Summarize collected samples as collapsed stacks and per-function counts."""
+        self_counts: Counter = Counter()
+        inclusive_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+            for frame_name in set(frames):
+                inclusive_counts[frame_name] += count
+
+        return {
+            "endpoint": endpoint,
+            "duration_ms": round(duration * 1000, 3),
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "top_self": self_counts.most_common(top),
+            "top_inclusive": inclusive_counts.most_common(top),
+            "collapsed_stacks": dict(self.stacks.most_common(top)),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe store for request latency, component timings and file I/O."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, _EndpointStats] = defaultdict(_EndpointStats)
+        self._component_seconds: Dict[str, float] = defaultdict(float)
+        self._component_calls: Dict[str, int] = defaultdict(int)
+        self._file_reads = 0
+        self._file_writes = 0
+        self._started_at = time.time()
+
+        # Sampling profiler state: endpoint -> armed flag / finished report
+        self._profile_armed: Dict[str, float] = {}
+        self._profile_reports: Dict[str, Dict[str, Any]] = {}
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def timed(self, component: str):
+        """Return a context manager that times a block for the given component."""
+        if not _metrics_enabled:
+            return _NULL_TIMER
+        return _Timer(self, component)
+
+    def record_component(self, component: str, seconds: float) -> None:
+        """Add elapsed seconds to a component and to the active request, if any."""
+        with self._lock:
+            self._component_seconds[component] += seconds
+            self._component_calls[component] += 1
+        state: Optional[_RequestState] = getattr(_request_local, "state", None)
+        if state is not None:
+            state.components[component] += seconds
+
+    def record_file_io(self, operation: str) -> None:
+        """
+        Count a file read or write.
+
+        Args:
+            operation: Either 'read' or 'write'
+        """
+        if not _metrics_enabled:
+            return
+        is_write = operation == "write"
+        with self._lock:
+            if is_write:
+                self._file_writes += 1
+            else:
+                self._file_reads += 1
+        state: Optional[_RequestState] = getattr(_request_local, "state", None)
+        if state is not None:
+            if is_write:
+                state.file_writes += 1
+            else:
+                state.file_reads += 1
+
+    def begin_request(self) -> None:
+        """Start per-request accumulation on the current thread."""
+        _request_local.state = _RequestState()
+
+    def end_request(self, endpoint: str, duration: float) -> None:
+        """Fold the current request's accumulators into the endpoint stats."""
+        state: Optional[_RequestState] = getattr(_request_local, "state", None)
+        _request_local.state = None
+        with self._lock:
+            stats = self._endpoints[endpoint]
+            stats.observe(duration)
+            if state is not None:
+                stats.file_reads += state.file_reads
+                stats.file_writes += state.file_writes
+                for component, seconds in state.components.items():
+                    stats.components[component] += seconds
+
+    # ------------------------------------------------------------------
+    # Sampling profiler
+    # ------------------------------------------------------------------
+    def arm_profile(self, endpoint: str) -> None:
+        """Capture a sampling profile for the next request to an endpoint."""
+        with self._lock:
+            self._profile_reports.pop(endpoint, None)
+            self._profile_armed[endpoint] = time.time()
+
+    def take_profile_report(self, endpoint: str) -> Optional[Dict[str, Any]]:
+        """Return and clear the finished profile report for an endpoint."""
+        with self._lock:
+            return self._profile_reports.pop(endpoint, None)
+
+    def is_profile_armed(self, endpoint: str) -> bool:
+        with self._lock:
+            return endpoint in self._profile_armed
+
+    def claim_profile(self, *endpoint_keys: str) -> Optional[str]:
+        """Atomically claim an armed profile matching any of the given keys."""
+        if not self._profile_armed:
+            return None
+        with self._lock:
+            for key in endpoint_keys:
+                if key and key in self._profile_armed:
+                    del self._profile_armed[key]
+                    return key
+        return None
+
+    def store_profile_report(self, endpoint: str, report: Dict[str, Any]) -> None:
+        with self._lock:
+            self._profile_reports[endpoint] = report
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def get_snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable summary of all collected metrics."""
+        with self._lock:
+            endpoints: Dict[str, Any] = {}
+            for name, stats in self._endpoints.items():
+                pct = stats.percentiles()
+                endpoints[name] = {
+                    "count": stats.count,
+                    "mean_ms": round(stats.total / stats.count * 1000, 3) if stats.count else 0.0,
+                    "p50_ms": round(pct[0.5] * 1000, 3),
+                    "p95_ms": round(pct[0.95] * 1000, 3),
+                    "p99_ms": round(pct[0.99] * 1000, 3),
+                    "file_reads_per_request": round(stats.file_reads / stats.count, 3) if stats.count else 0.0,
+                    "file_writes_per_request": round(stats.file_writes / stats.count, 3) if stats.count else 0.0,
+                    "components_ms": {c: round(s * 1000, 3) for c, s in stats.components.items()},
+                }
+            return {
+                "enabled": _metrics_enabled,
+                "uptime_seconds": round(time.time() - self._started_at, 3),
+                "file_reads": self._file_reads,
+                "file_writes": self._file_writes,
+                "components": {
+                    c: {"seconds": round(s, 6), "calls": self._component_calls[c]}
+                    for c, s in self._component_seconds.items()
+                },
+                "endpoints": endpoints,
+            }
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            lines.append("# HELP linuxplus_http_request_duration_seconds Request latency by endpoint.")
+            lines.append("# TYPE linuxplus_http_request_duration_seconds histogram")
+            for name, stats in sorted(self._endpoints.items()):
+                label = _escape_label(name)
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, stats.bucket_counts):
+                    cumulative += count
+                    lines.append(
+                        f'linuxplus_http_request_duration_seconds_bucket{{endpoint="{label}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'linuxplus_http_request_duration_seconds_bucket{{endpoint="{label}",le="+Inf"}} {stats.count}'
+                )
+                lines.append(f'linuxplus_http_request_duration_seconds_sum{{endpoint="{label}"}} {stats.total:.6f}')
+                lines.append(f'linuxplus_http_request_duration_seconds_count{{endpoint="{label}"}} {stats.count}')
+
+            lines.append("# HELP linuxplus_http_request_latency_seconds Recent-sample latency quantiles by endpoint.")
+            lines.append("# TYPE linuxplus_http_request_latency_seconds summary")
+            for name, stats in sorted(self._endpoints.items()):
+                label = _escape_label(name)
+                for quantile, value in stats.percentiles().items():
+                    lines.append(
+                        f'linuxplus_http_request_latency_seconds{{endpoint="{label}",quantile="{quantile}"}} {value:.6f}'
+                    )
+                lines.append(f'linuxplus_http_request_latency_seconds_sum{{endpoint="{label}"}} {stats.total:.6f}')
+                lines.append(f'linuxplus_http_request_latency_seconds_count{{endpoint="{label}"}} {stats.count}')
+
+            lines.append("# HELP linuxplus_component_seconds_total Time spent per instrumented component.")
+            lines.append("# TYPE linuxplus_component_seconds_total counter")
+            for component, seconds in sorted(self._component_seconds.items()):
+                lines.append(f'linuxplus_component_seconds_total{{component="{_escape_label(component)}"}} {seconds:.6f}')
+
+            lines.append("# HELP linuxplus_component_calls_total Calls per instrumented component.")
+            lines.append("# TYPE linuxplus_component_calls_total counter")
+            for component, calls in sorted(self._component_calls.items()):
+                lines.append(f'linuxplus_component_calls_total{{component="{_escape_label(component)}"}} {calls}')
+
+            lines.append("# HELP linuxplus_request_component_seconds_total Component time attributed to each endpoint.")
+            lines.append("# TYPE linuxplus_request_component_seconds_total counter")
+            for name, stats in sorted(self._endpoints.items()):
+                for component, seconds in sorted(stats.components.items()):
+                    lines.append(
+                        f'linuxplus_request_component_seconds_total{{endpoint="{_escape_label(name)}",'
+                        f'component="{_escape_label(component)}"}} {seconds:.6f}'
+                    )
+
+            lines.append("# HELP linuxplus_file_operations_total JSON file reads and writes.")
+            lines.append("# TYPE linuxplus_file_operations_total counter")
+            lines.append(f'linuxplus_file_operations_total{{operation="read"}} {self._file_reads}')
+            lines.append(f'linuxplus_file_operations_total{{operation="write"}} {self._file_writes}')
+
+            lines.append("# HELP linuxplus_request_file_operations_total File reads and writes attributed to each endpoint.")
+            lines.append("# TYPE linuxplus_request_file_operations_total counter")
+            for name, stats in sorted(self._endpoints.items()):
+                label = _escape_label(name)
+                lines.append(f'linuxplus_request_file_operations_total{{endpoint="{label}",operation="read"}} {stats.file_reads}')
+                lines.append(f'linuxplus_request_file_operations_total{{endpoint="{label}",operation="write"}} {stats.file_writes}')
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Clear all collected metrics."""
+        with self._lock:
+            self._endpoints.clear()
+            self._component_seconds.clear()
+            self._component_calls.clear()
+            self._file_reads = 0
+            self._file_writes = 0
+            self._profile_armed.clear()
+            self._profile_reports.clear()
+            self._started_at = time.time()
+
+
+def _escape_label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class PerformanceMetrics:
+    """Flask integration for the metrics registry."""
+
+    def __init__(self, app=None, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or get_metrics_registry()
+        self.app = app
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        """Register request hooks and the /metrics and /debug/profile routes."""
+        if not _metrics_enabled:
+            return
+
+        from flask import Response, g, jsonify, request
+
+        registry = self.registry
+
+        @app.before_request
+        def _perf_before_request():
+            registry.begin_request()
+            g.perf_start = time.perf_counter()
+            rule = request.url_rule.rule if request.url_rule else None
+            claimed = registry.claim_profile(request.endpoint or "", rule or "")
+            if claimed:
+                profiler = _SamplingProfiler(threading.get_ident())
+                profiler.start()
+                g.perf_profiler = (claimed, profiler)
+
+        @app.after_request
+        def _perf_after_request(response):
+            start = getattr(g, "perf_start", None)
+            if start is None:
+                return response
+            duration = time.perf_counter() - start
+            endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+            registry.end_request(endpoint, duration)
+
+            profiling = getattr(g, "perf_profiler", None)
+            if profiling:
+                key, profiler = profiling
+                profiler.stop()
+                registry.store_profile_report(key, profiler.report(key, duration))
+                g.perf_profiler = None
+            return response
+
+        @app.route('/metrics')
+        def perf_metrics():
+            """Prometheus text exposition of the collected metrics."""
+            return Response(registry.render_prometheus(),
+                            mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+        @app.route('/debug/profile')
+        def perf_debug_profile():
+            """
+            Capture a sampling profile of the next request to an endpoint.
+
+            The first call arms the profiler; once a matching request has run,
+            a subsequent call returns (and clears) the report.
+            """
+            if request.remote_addr not in ("127.0.0.1", "::1") and \
+                    os.getenv('PERF_PROFILE_ALLOW_REMOTE', 'false').lower() != 'true':
+                return jsonify({"success": False, "error": "Profiling is only available locally"}), 403
+
+            endpoint = request.args.get('endpoint', '').strip()
+            if not endpoint:
+                return jsonify({"success": True, "metrics": registry.get_snapshot()})
+
+            report = registry.take_profile_report(endpoint)
+            if report:
+                return jsonify({"success": True, "status": "complete", "profile": report})
+
+            if not registry.is_profile_armed(endpoint):
+                registry.arm_profile(endpoint)
+            return jsonify({
+                "success": True,
+                "status": "armed",
+                "message": f"Profiler armed for '{endpoint}'. Trigger a request, then call this endpoint again."
+            })
+
+        logger.info("Performance metrics enabled: /metrics and /debug/profile registered")
+
+
+def instrument_sqlalchemy_engine(engine) -> None:
+    """
+    Attribute SQL execution time on an engine to the database component.
+
+    Args:
+        engine: SQLAlchemy engine to instrument
+    """
+    if not _metrics_enabled or engine is None:
+        return
+    try:
+        from sqlalchemy import event
+    except ImportError:
+        return
+
+    registry = get_metrics_registry()
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('perf_query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('perf_query_start')
+        if starts:
+            registry.record_component(COMPONENT_DATABASE, time.perf_counter() - starts.pop())
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# Global instance
+_metrics_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the global metrics registry instance."""
+    global _metrics_registry
+    if _metrics_registry is None:
+        _metrics_registry = MetricsRegistry()
+    return _metrics_registry
+
+
+def timed(component: str):
+    """
+    Time a block of code against a component.
+
+    Returns a shared no-op context manager when metrics are disabled.
+
+    Args:
+        component: Component name (e.g. COMPONENT_JSON_PERSISTENCE)
+    """
+    if not _metrics_enabled:
+        return _NULL_TIMER
+    return _Timer(get_metrics_registry(), component)
+
+
+def record_file_io(operation: str) -> None:
+    """Count a file 'read' or 'write' against the active request."""
+    if not _metrics_enabled:
+        return
+    get_metrics_registry().record_file_io(operation)
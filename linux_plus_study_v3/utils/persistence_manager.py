@@ -19,6 +19,8 @@ from utils.config import (
     HISTORY_FILE, ACHIEVEMENTS_FILE, WEB_SETTINGS_FILE, 
     DATA_DIR, PROJECT_ROOT
 )
+from utils.performance_metrics import timed, record_file_io, COMPONENT_JSON_PERSISTENCE
+from utils.unit_of_work import get_current_unit_of_work
 
 class PersistenceManager:
     """
@@ -103,6 +105,10 @@ class PersistenceManager:
     
     def _safe_write_json(self, file_path: Path, data: Dict[str, Any]) -> bool:
         """Safely write JSON data to a file with backup and atomic operation."""
+        uow = get_current_unit_of_work()
+        if uow is not None:
+            return self._stage_write_json(uow, file_path, data)
+        
         with self._lock:
             try:
                 # Create backup
@@ -113,7 +119,8 @@ class PersistenceManager:
                 
                 # Write to temporary file first (atomic operation)
                 temp_file = file_path.with_suffix('.tmp')
-                with open(temp_file, 'w', encoding='utf-8') as f:
+                record_file_io('write')
+                with timed(COMPONENT_JSON_PERSISTENCE), open(temp_file, 'w', encoding='utf-8') as f:
                     json.dump(data, f, indent=2, ensure_ascii=False, default=str)
                 
                 # Move temp file to actual file (atomic on most filesystems)
@@ -138,6 +145,27 @@ class PersistenceManager:
                     pass
                 return False
     
+    def _stage_write_json(self, uow: Any, file_path: Path, data: Dict[str, Any]) -> bool:
+        """Stage a write in the active unit of work; backup and save time apply at commit."""
+        cache_key = str(file_path)
+        with self._lock:
+            self._cache[cache_key] = data.copy()
+        
+        def mark_saved() -> None:
+            self._last_save_times[cache_key] = time.time()
+        
+        def drop_cache() -> None:
+            # Disk still holds the last committed version
+            with self._lock:
+                self._cache.pop(cache_key, None)
+        
+        uow.stage_json(file_path, data,
+                       before_replace=lambda: self._create_backup(file_path),
+                       after_commit=mark_saved,
+                       indent=2, ensure_ascii=False, default=str)
+        uow.on_rollback(drop_cache)
+        return True
+    
     def _safe_read_json(self, file_path: Path, default_content: Dict[str, Any]) -> Dict[str, Any]:
         """Safely read JSON data from a file with fallback to defaults."""
         cache_key = str(file_path)
@@ -151,7 +179,8 @@ class PersistenceManager:
             self._ensure_file_exists(file_path, default_content)
             
             # Read file
-            with open(file_path, 'r', encoding='utf-8') as f:
+            record_file_io('read')
+            with timed(COMPONENT_JSON_PERSISTENCE), open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
             # Validate and merge with defaults
@@ -222,7 +251,7 @@ class PersistenceManager:
         processed_data = achievements_data.copy()
         if "days_studied" in processed_data and hasattr(processed_data["days_studied"], '__iter__'):
             if not isinstance(processed_data["days_studied"], list):
-                processed_data["days_studied"] = list(processed_data["days_studied"])
+                processed_data["days_studied"] = sorted(processed_data["days_studied"])
         
         return self._safe_write_json(self.achievements_file, processed_data)
     
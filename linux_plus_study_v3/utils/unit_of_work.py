@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Unit of Work for Linux+ Study System
+
+Collects the JSON writes made by every subsystem while handling a single
+event (e.g. one submitted answer) and commits them in one batch. Inside a
+unit of work:
+
+- Writes are staged instead of hitting disk. Repeated writes of the same
+  file coalesce, so each dirty file is serialized and written exactly once.
+- Reads of a file that was already loaded or staged return the in-memory
+  data, so the file is parsed at most once per unit of work.
+- On commit, every staged file is written to a temp file first. Only then
+  are the temp files renamed into place. If any write or rename fails, the
+  files already replaced are restored, so nothing is left changed.
+- On failure, the staged data is discarded, and the in-memory state
+  snapshotted through snapshot_attrs/snapshot_items is restored.
+
+Outside a unit of work all stores behave exactly as before.
+"""
+
+import copy
+import json
+import logging
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from utils.performance_metrics import timed, record_file_io, COMPONENT_JSON_PERSISTENCE
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+_MISSING = object()
+
+
+class UnitOfWorkError(Exception):
+    """Raised when a unit of work fails to commit."""
+
+
+class _StagedFile:
+    """A pending JSON write."""
+
+    __slots__ = ("path", "data", "dump_kwargs", "before_replace", "after_commit")
+
+    def __init__(self, path: Path, data: Any, dump_kwargs: Dict[str, Any],
+                 before_replace: Optional[Callable[[], Any]],
+                 after_commit: Optional[Callable[[], Any]]):
+        self.path = path
+        self.data = data
+        self.dump_kwargs = dump_kwargs
+        self.before_replace = before_replace
+        self.after_commit = after_commit
+
+
+class UnitOfWork:
+    """Batches JSON file writes and in-memory mutations for one event."""
+
+    def __init__(self, name: str = "unit_of_work"):
+        self.name = name
+        self._staged: Dict[str, _StagedFile] = {}
+        self._read_cache: Dict[str, Any] = {}
+        self._undo: List[Callable[[], None]] = []
+        self._on_commit: List[Callable[[], None]] = []
+        self._depth = 0
+        self.committed = False
+        self.rolled_back = False
+
+    # ------------------------------------------------------------------
+    # File staging
+    # ------------------------------------------------------------------
+    def stage_json(self, path: PathLike, data: Any, before_replace: Optional[Callable[[], Any]] = None,
+                   after_commit: Optional[Callable[[], Any]] = None, **dump_kwargs: Any) -> None:
+        """
+        Stage a JSON write; later writes to the same path replace earlier ones.
+
+        Args:
+            path: Destination file
+            data: JSON-serializable data (serialized at commit time)
+            before_replace: Called once before the file is replaced (e.g. backup)
+            after_commit: Called once after all files were replaced (e.g. cache update)
+            **dump_kwargs: Keyword arguments for json.dump (indent, default, ...)
+        """
+        key = str(Path(path))
+        previous = self._staged.get(key)
+        self._staged[key] = _StagedFile(
+            Path(path), data, dump_kwargs or {"indent": 2},
+            before_replace or (previous.before_replace if previous else None),
+            after_commit or (previous.after_commit if previous else None),
+        )
+        self._read_cache[key] = data
+
+    def get_cached(self, path: PathLike, default: Any = None) -> Any:
+        """Return staged or previously loaded data for a path, or default."""
+        return self._read_cache.get(str(Path(path)), default)
+
+    def cache_read(self, path: PathLike, data: Any) -> Any:
+        """Remember data loaded from disk so later reads in this unit reuse it."""
+        self._read_cache[str(Path(path))] = data
+        return data
+
+    def is_staged(self, path: PathLike) -> bool:
+        return str(Path(path)) in self._staged
+
+    @property
+    def staged_paths(self) -> List[Path]:
+        return [staged.path for staged in self._staged.values()]
+
+    # ------------------------------------------------------------------
+    # In-memory rollback
+    # ------------------------------------------------------------------
+    def on_rollback(self, callback: Callable[[], None]) -> None:
+        """Register a callback run (in reverse order) when the unit rolls back."""
+        self._undo.append(callback)
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        """Register a side effect (e.g. a database update) run after a successful commit."""
+        self._on_commit.append(callback)
+
+    def snapshot_attrs(self, obj: Any, *names: str, deep: bool = False) -> None:
+        """
+        Snapshot object attributes so they are restored on rollback.
+
+        Containers are copied (shallow by default) so in-place mutation is undone.
+
+        Args:
+            obj: Object whose attributes will be restored
+            *names: Attribute names
+            deep: Deep-copy values instead of shallow-copying containers
+        """
+        saved = {}
+        for name in names:
+            value = getattr(obj, name, _MISSING)
+            saved[name] = copy.deepcopy(value) if deep else _copy_container(value)
+
+        def restore() -> None:
+            for name, value in saved.items():
+                if value is _MISSING:
+                    if hasattr(obj, name):
+                        delattr(obj, name)
+                else:
+                    setattr(obj, name, value)
+
+        self._undo.append(restore)
+
+    def snapshot_items(self, mapping: Dict[Any, Any], *keys: Any) -> None:
+        """
+        Deep-copy selected mapping entries so they are restored on rollback.
+
+        Args:
+            mapping: Dictionary that will be mutated
+            *keys: Keys to snapshot (missing keys are removed again on rollback)
+        """
+        saved = {key: copy.deepcopy(mapping[key]) if key in mapping else _MISSING for key in keys}
+
+        def restore() -> None:
+            for key, value in saved.items():
+                if value is _MISSING:
+                    mapping.pop(key, None)
+                else:
+                    mapping[key] = value
+
+        self._undo.append(restore)
+
+    def snapshot_mapping(self, mapping: Dict[Any, Any]) -> None:
+        """
+        Deep-copy a whole mapping so it is restored in place on rollback.
+
+        Args:
+            mapping: Dictionary that will be mutated (identity is preserved)
+        """
+        saved = copy.deepcopy(mapping)
+
+        def restore() -> None:
+            mapping.clear()
+            mapping.update(saved)
+
+        self._undo.append(restore)
+
+    # ------------------------------------------------------------------
+    # Commit / rollback
+    # ------------------------------------------------------------------
+    def commit(self) -> int:
+        """
+        Write all staged files with a two-phase temp-file-then-rename commit.
+
+        Returns:
+            int: Number of files written
+
+        Raises:
+            UnitOfWorkError: If any file could not be written or replaced; files
+            already replaced are restored, so no file is left changed
+        """
+        staged = list(self._staged.values())
+        temp_files: List[Path] = []
+        # Hard links to the current files (None where a file is new), so a
+        # failed phase 2 can put back what it already replaced
+        backups: List[Optional[Path]] = []
+        try:
+            # Phase 1: serialize everything to temp files
+            for entry in staged:
+                entry.path.parent.mkdir(parents=True, exist_ok=True)
+                temp_file = entry.path.with_name(entry.path.name + ".uow.tmp")
+                record_file_io('write')
+                with timed(COMPONENT_JSON_PERSISTENCE), open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(entry.data, f, **entry.dump_kwargs)
+                temp_files.append(temp_file)
+                backups.append(_link_backup(entry.path))
+        except Exception as e:
+            _unlink_all(temp_files + [b for b in backups if b is not None])
+            raise UnitOfWorkError(f"Failed to stage {self.name}: {e}") from e
+
+        # Phase 2: swap files into place
+        replaced = 0
+        try:
+            for entry, temp_file in zip(staged, temp_files):
+                if entry.before_replace:
+                    try:
+                        entry.before_replace()
+                    except Exception as e:
+                        logger.warning(f"Pre-commit hook failed for {entry.path}: {e}")
+                temp_file.replace(entry.path)
+                replaced += 1
+        except Exception as e:
+            for entry, backup in zip(staged[:replaced], backups[:replaced]):
+                try:
+                    if backup is not None:
+                        backup.replace(entry.path)
+                    else:
+                        entry.path.unlink()
+                except OSError as restore_error:
+                    logger.error(f"Could not restore {entry.path} after a failed commit: {restore_error}")
+            _unlink_all(temp_files[replaced:] + [b for b in backups if b is not None])
+            raise UnitOfWorkError(f"Failed to commit {self.name}: {e}") from e
+        _unlink_all([b for b in backups if b is not None])
+
+        for entry in staged:
+            if entry.after_commit:
+                try:
+                    entry.after_commit()
+                except Exception as e:
+                    logger.warning(f"Post-commit hook failed for {entry.path}: {e}")
+
+        callbacks = list(self._on_commit)
+        self.committed = True
+        self._clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Commit callback failed in {self.name}: {e}")
+        return len(staged)
+
+    def rollback(self) -> None:
+        """Discard staged writes and restore snapshotted in-memory state."""
+        for callback in reversed(self._undo):
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Rollback step failed in {self.name}: {e}")
+        self.rolled_back = True
+        self._clear()
+
+    def _clear(self) -> None:
+        self._staged.clear()
+        self._read_cache.clear()
+        self._undo.clear()
+        self._on_commit.clear()
+
+
+def _link_backup(path: Path) -> Optional[Path]:
+    """Keep the current content of path under a second name (None if path does not exist)."""
+    if not path.exists():
+        return None
+    backup = path.with_name(path.name + ".uow.bak")
+    try:
+        backup.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(path, backup)
+    except OSError:
+        # No hard links on this filesystem; fall back to a copy
+        shutil.copy2(path, backup)
+    return backup
+
+
+def _unlink_all(paths: List[Path]) -> None:
+    for path in paths:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def _copy_container(value: Any) -> Any:
+    if isinstance(value, (list, dict, set)):
+        return copy.copy(value)
+    return value
+
+
+_local = threading.local()
+
+
+def get_current_unit_of_work() -> Optional[UnitOfWork]:
+    """Return the unit of work active on this thread, if any."""
+    return getattr(_local, "current", None)
+
+
+@contextmanager
+def unit_of_work(name: str = "unit_of_work") -> Iterator[UnitOfWork]:
+    """
+    Run a block inside a unit of work; nested calls join the outer unit.
+
+    Commits on normal exit and rolls back if the block raises.
+
+    Args:
+        name: Label used in log messages
+    """
+    current = get_current_unit_of_work()
+    if current is not None:
+        current._depth += 1
+        try:
+            yield current
+        finally:
+            current._depth -= 1
+        return
+
+    uow = UnitOfWork(name)
+    _local.current = uow
+    try:
+        yield uow
+    except BaseException:
+        _local.current = None
+        uow.rollback()
+        raise
+    _local.current = None
+    try:
+        uow.commit()
+    except Exception:
+        uow.rollback()
+        raise
@@ -337,11 +337,12 @@ class DataValidator:
         Returns:
             tuple: (is_valid: bool, error_message: str)
         """
-        from utils.config import QUIZ_MODE_STANDARD, QUIZ_MODE_VERIFY
+        from utils.config import QUIZ_MODE_STANDARD, QUIZ_MODE_VERIFY, QUIZ_MODE_SPACED_REVIEW
         
         valid_modes = [
             QUIZ_MODE_STANDARD, 
             QUIZ_MODE_VERIFY, 
+            QUIZ_MODE_SPACED_REVIEW,
             "quick_fire", 
             "mini_quiz", 
             "daily_challenge", 
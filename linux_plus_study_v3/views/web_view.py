@@ -62,6 +62,7 @@ from utils.config import get_config_value
 from werkzeug.utils import secure_filename
 from typing import Any, Dict, Optional
 from utils.persistence_manager import get_persistence_manager
+from utils.unit_of_work import unit_of_work
 
 # Define TypedDict for question object structure
 class QuestionExportDict(TypedDict):
@@ -277,7 +278,10 @@ class LinuxPlusStudyWeb:
         
         # Setup export/import routes
         self.setup_export_import_routes()
-        
+
+        # Load/save each browser's quiz session around quiz requests
+        self.setup_quiz_session_state(self.app)
+
         # Analytics and error tracking are handled by simple_analytics service
     def set_debug_mode(self, enabled: bool = True):
         """Toggle debug mode for the application."""
@@ -397,6 +401,89 @@ class LinuxPlusStudyWeb:
         # Store reference to prevent "not accessed" warning
         self.cleanup_request_handler = cleanup_request
     
+    # Endpoints that read or change the quiz session
+    QUIZ_SESSION_ENDPOINTS = frozenset({
+        'api_status', 'api_start_quiz', 'api_get_question', 'api_acknowledge_break',
+        'api_submit_answer', 'api_end_quiz', 'api_quick_fire_status', 'api_start_quick_fire',
+        'api_start_daily_challenge', 'api_start_pop_quiz', 'api_start_mini_quiz',
+        'api_start_timed_challenge', 'api_start_survival_mode', 'api_start_exam_mode',
+        'api_start_category_focus', 'api_get_hint', 'api_clear_statistics',
+    })
+
+    def setup_quiz_session_state(self, app: Flask) -> None:
+        """
+        Keep quiz sessions in the quiz session store instead of the process.
+
+        Before a quiz request the browser's session is loaded into the shared
+        quiz controller; afterwards it is saved back if it changed. Quiz
+        requests hold a lock in between, so concurrent sessions in one worker
+        do not see each other's state. That lock is one process-wide
+        state_lock: every quiz request in a worker is serialized, whichever
+        browser it comes from. Any worker can then serve any request, given a
+        FLASK_SECRET_KEY shared by all workers.
+
+        When a session cannot be loaded the request runs against a fresh
+        session (and nothing is saved over the stored one), never against
+        whatever the previous request left in the controller.
+        """
+        from flask import g, session
+        from services.quiz_session_store import (
+            decode_session_state, encode_session_state, get_quiz_session_store
+        )
+
+        state_lock = threading.Lock()
+        self.quiz_session_lock = state_lock
+
+        @app.before_request
+        def load_quiz_session() -> None:
+            if request.endpoint not in self.QUIZ_SESSION_ENDPOINTS:
+                return
+            session_id = session.get('quiz_session_id')
+            if not session_id:
+                session_id = session['quiz_session_id'] = secrets.token_urlsafe(16)
+            state_lock.acquire()
+            g.quiz_session_locked = True
+            try:
+                stored = get_quiz_session_store().load(session_id)
+                self.quiz_controller.load_session_state(decode_session_state(stored))
+            except Exception as e:
+                # The controller still holds the previous request's session; start fresh
+                self.logger.error(f"Failed to load quiz session: {e}")
+                try:
+                    self.quiz_controller.load_session_state(None)
+                except Exception as reset_error:
+                    self.logger.error(f"Failed to reset quiz session: {reset_error}")
+                    return jsonify({'success': False, 'error': 'Quiz session unavailable'}), 503
+                return
+            g.quiz_session = (session_id, stored)
+
+        @app.after_request
+        def save_quiz_session(response: Any) -> Any:
+            loaded = g.pop('quiz_session', None)
+            if loaded is None:
+                return response
+            session_id, stored = loaded
+            try:
+                state = self.quiz_controller.export_session_state()
+                store = get_quiz_session_store()
+                if state:
+                    data = encode_session_state(state)
+                    if data != stored:
+                        store.save(session_id, data)
+                elif stored is not None:
+                    store.delete(session_id)
+            except Exception as e:
+                self.logger.error(f"Failed to save quiz session: {e}")
+            return response
+
+        @app.teardown_request
+        def release_quiz_session(exception: Optional[BaseException] = None) -> None:
+            if g.pop('quiz_session_locked', False):
+                state_lock.release()
+
+        # Store references to prevent "not accessed" warnings
+        self.quiz_session_handlers = (load_quiz_session, save_quiz_session, release_quiz_session)
+
     # Register cleanup on application shutdown
     import atexit
     atexit.register(cleanup_database_connections)
@@ -2027,6 +2114,7 @@ class LinuxPlusStudyWeb:
                 
                 # Ensure current settings are applied to quiz controller
                 self._ensure_settings_applied()
+                self.quiz_controller.current_user_id = get_current_user_id()
                 
                 # Store number of questions if provided BEFORE starting the session
                 if num_questions and quiz_mode not in ['survival', 'exam']:
@@ -2249,25 +2337,28 @@ class LinuxPlusStudyWeb:
                 question_data = current_question['question_data']
                 question_index = current_question['original_index']
                 
-                result = self.quiz_controller.submit_answer(
-                    question_data, 
-                    user_answer_index, 
-                    question_index
-                )
-                
-                # Track analytics for this answer
-                try:
-                    user_id, analytics = ensure_analytics_user_sync()
-                    if analytics and user_id:
-                        # Use update_quiz_results for proper XP and achievement tracking
-                        analytics.update_quiz_results(
-                            user_id=user_id,
-                            correct=result.get('is_correct', False),
-                            topic=getattr(self.quiz_controller, 'category_filter', None) or question_data[3],  # Use question category
-                            difficulty="intermediate"  # Default difficulty
-                        )
-                except Exception as e:
-                    print(f"Error tracking analytics: {e}")
+                # One unit of work for the whole answer: every store touched by the
+                # quiz, achievements, time tracking and analytics is written once
+                with unit_of_work("api_submit_answer"):
+                    result = self.quiz_controller.submit_answer(
+                        question_data, 
+                        user_answer_index, 
+                        question_index
+                    )
+                    
+                    # Track analytics for this answer
+                    try:
+                        user_id, analytics = ensure_analytics_user_sync()
+                        if analytics and user_id:
+                            # Use update_quiz_results for proper XP and achievement tracking
+                            analytics.update_quiz_results(
+                                user_id=user_id,
+                                correct=result.get('is_correct', False),
+                                topic=getattr(self.quiz_controller, 'category_filter', None) or question_data[3],  # Use question category
+                                difficulty="intermediate"  # Default difficulty
+                            )
+                    except Exception as e:
+                        print(f"Error tracking analytics: {e}")
                 
                 # Clear current question cache after processing
                 self.quiz_controller.clear_current_question_cache()
@@ -2770,6 +2861,30 @@ class LinuxPlusStudyWeb:
                 self.logger.error(f"Statistics API error: {e}")
                 return jsonify({'error': str(e), 'success': False})
 
+        @self.app.route('/api/leaderboard/global')
+        def api_global_leaderboard():
+            """Cross-profile leaderboard: ?window=daily|weekly|all_time&limit=10"""
+            try:
+                from services.leaderboard_service import get_leaderboard_service, LEADERBOARD_WINDOWS, WINDOW_ALL_TIME
+                
+                window = request.args.get('window', WINDOW_ALL_TIME)
+                if window not in LEADERBOARD_WINDOWS:
+                    return jsonify({'success': False, 'error': f'Invalid window: {window}'}), 400
+                limit = max(1, min(request.args.get('limit', 10, type=int) or 10, 100))
+                
+                leaderboard = get_leaderboard_service()
+                user_id = get_current_user_id()
+                return jsonify({
+                    'success': True,
+                    'window': window,
+                    'period': leaderboard.period_for(window),
+                    'entries': leaderboard.get_top(window, limit),
+                    'current_user': leaderboard.get_rank(user_id, window)
+                })
+            except Exception as e:
+                self.logger.error(f"Global leaderboard API error: {e}")
+                return jsonify({'success': False, 'error': str(e)})
+
         @self.app.route('/api/achievements')
         def api_achievements():
             """API endpoint for achievements data"""
@@ -3056,6 +3171,10 @@ class LinuxPlusStudyWeb:
                 default_data['display_name'] = f'Profile {profile_id}'
                 analytics._update_user_data(profile_id, default_data)
                 
+                # Drop the profile's standings from the global leaderboard
+                from services.leaderboard_service import get_leaderboard_service
+                get_leaderboard_service().remove_user(profile_id)
+                
                 return jsonify({'success': True, 'message': 'Profile data reset successfully'})
             except Exception as e:
                 self.logger.error(f"Reset profile error: {e}")
@@ -3101,17 +3220,31 @@ class LinuxPlusStudyWeb:
                     # Don't fail completely if analytics clear fails
                 
                 # Clear simple analytics data
+                cleared_user_ids = {'anonymous'}
+                if hasattr(self, 'quiz_controller') and self.quiz_controller:
+                    cleared_user_ids.add(self.quiz_controller.current_user_id)
                 try:
                     from services.simple_analytics import get_analytics_manager
                     analytics = get_analytics_manager()
                     if analytics:
                         # Reset all user data to defaults
+                        cleared_user_ids.update(analytics._load_data())
                         analytics.user_data = {}
                         analytics._save_data(analytics.user_data)
                         self.logger.info("Cleared simple analytics user data")
                 except Exception as simple_analytics_error:
                     self.logger.error(f"Simple analytics clear error: {simple_analytics_error}")
                 
+                # Remove the cleared profiles from the global leaderboard
+                try:
+                    from services.leaderboard_service import get_leaderboard_service
+                    leaderboard = get_leaderboard_service()
+                    for user_id in cleared_user_ids:
+                        leaderboard.remove_user(user_id)
+                    self.logger.info(f"Removed {len(cleared_user_ids)} profiles from the global leaderboard")
+                except Exception as leaderboard_error:
+                    self.logger.error(f"Global leaderboard clear error: {leaderboard_error}")
+                
                 # Reset game state if available
                 try:
                     if hasattr(self, 'game_state') and self.game_state: